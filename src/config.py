@@ -35,6 +35,14 @@ DAFTAR_KOIN = [
 AI_MODEL_NAME = 'deepseek/deepseek-v3.2'
 AI_TEMPERATURE = 0.0             # 0.0 = Logis & Konsisten, 1.0 = Kreatif & Halusinasi
 AI_CONFIDENCE_THRESHOLD = 70     # Minimal keyakinan (%) untuk berani eksekusi
+AI_MAX_INFLIGHT = 4              # Maks request AI (LLM) yang berjalan paralel
+AI_REQUEST_TIMEOUT = 60          # Deadline per request AI (detik), lewat = WAIT
+
+# Cache Respon AI (Prompt identik tidak dikirim ulang -> hemat token & latency)
+AI_CACHE_ENABLED = False         # Opt-in: keputusan lama bisa dipakai ulang selama TTL
+AI_CACHE_FILE = 'ai_response_cache.sqlite'
+AI_CACHE_TTL_SECONDS = 3600      # Umur maksimal entry cache (detik)
+AI_CACHE_MAX_ENTRIES = 500       # Batas entry (LRU eviction)
 
 # Reasoning (Untuk Model yang Support Reasoning Tokens)
 AI_REASONING_ENABLED = False     # Aktifkan fitur reasoning? (True/False)
@@ -52,6 +60,9 @@ AI_SENTIMENT_MODEL = 'arcee-ai/trinity-large-preview:free' # Model ekonomis untu
 SENTIMENT_ANALYSIS_INTERVAL = '1h'         # Seberapa sering cek sentimen
 SENTIMENT_UPDATE_INTERVAL = '1h'           # Interval update data raw sentimen
 SENTIMENT_PROVIDER = 'RSS_Feed'  # Sumber: 'RSS_Feed'
+SENTIMENT_SKIP_UNCHANGED = True            # [NEW] Skip AI call jika berita, F&G & inflow tidak berubah
+SENTIMENT_DELTA_MAX_HEADLINES = 5          # [NEW] Maks headline baru untuk mode "delta" (lebih dari ini -> analisa full)
+SENTIMENT_MAX_DELTA_CHAIN = 3              # [NEW] Setelah N delta berturut-turut, paksa analisa full
 
 # Analisa Visual (Chart Pattern)
 USE_PATTERN_RECOGNITION = True
@@ -81,6 +92,13 @@ DEFAULT_LEVERAGE = 10
 DEFAULT_MARGIN_TYPE = 'isolated' # 'isolated' (aman) atau 'cross' (beresiko/gabungan)
 MAX_POSITIONS_PER_CATEGORY = 5   # Batas maksimal koin aktif per kategori (Layer 1, AI, Meme, dll)
 
+# [NEW] Exposure Limiter (Korelasi antar aset, matriks dari candle TIMEFRAME_TREND)
+USE_EXPOSURE_LIMITER = True
+EXPOSURE_CORRELATION_THRESHOLD = 0.75   # Posisi searah dengan korelasi >= ini dianggap risiko yang sama
+EXPOSURE_MAX_CORRELATED = 3             # Tolak entry jika sudah ada >= 3 posisi berkorelasi searah
+EXPOSURE_DOWNSIZE_PER_CORRELATED = 0.25 # Size entry dikurangi 25% per posisi berkorelasi
+EXPOSURE_MIN_SCALE = 0.25               # Batas bawah pengurangan size
+
 # Stop Loss (SL) & Take Profit (TP) Defaults
 DEFAULT_SL_PERCENT = 0.015       # 1.5% (Fallback jika ATR gagal)
 DEFAULT_TP_PERCENT = 0.025       # 2.5% (Fallback)
@@ -153,6 +171,10 @@ VOLUME_SPIKE_MULTIPLIER = 1.5    # Volume harus 2x rata-rata untuk konfirmasi sw
 
 # Order Book Analysis
 ORDERBOOK_RANGE_PERCENT = 0.02   # Kedalaman depth 2%
+ORDERBOOK_BANDS = [0.005, 0.01, 0.02, 0.05]  # [NEW] Band imbalance multi-level (0.5/1/2/5%)
+ORDERBOOK_WALL_MULTIPLIER = 5.0  # [NEW] Level dianggap 'wall' jika notional >= 5x median level di band 5%
+USE_LOCAL_ORDER_BOOK = False     # [NEW] Order book penuh lokal dari stream diff (@depth@100ms) + snapshot REST
+ORDERBOOK_SNAPSHOT_LIMIT = 1000  # Jumlah level snapshot REST untuk sinkronisasi local book (weight 20)
 
 # ------------------------------------------------------------------------------
 # 4.4 GROUP: BITCOIN KING EFFECT (Korelasi)
@@ -177,6 +199,7 @@ TRAILING_ACTIVATION_THRESHOLD = 0.80  # Aktif saat harga jalan 80% ke TP
 TRAILING_CALLBACK_RATE = 0.0075       # Jarak trail 0.75%
 TRAILING_MIN_PROFIT_LOCK = 0.005      # Kunci minimal profit 0.5%
 TRAILING_SL_UPDATE_COOLDOWN = 3       # Interval update ke exchange
+TRAILING_EVAL_INTERVAL = 0.5          # Interval evaluasi trailing (detik), harga per simbol di-coalesce
 
 # Mekanisme Retry & Error Handling
 ORDER_SLTP_RETRIES = 3           # Retry pasang SL/TP max 3 kali
@@ -192,10 +215,21 @@ PAKAI_DEMO = True               # False = Real Money, True = Testnet
 # Identitas File
 LOG_FILENAME = 'bot_trading.log'
 TRACKER_FILENAME = 'safety_tracker.json'
+TRACKER_WAL_COMPACT_RECORDS = 500       # [NEW] Tulis ulang snapshot tracker setelah N record WAL
+TRACKER_WAL_COMPACT_BYTES = 512 * 1024  # [NEW] ... atau setelah WAL sebesar ini (bytes)
+TRACKER_WAL_FSYNC = True                # [NEW] fsync tiap append WAL (durable, sedikit lebih lambat)
 
 # Database (MongoDB)
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "bot_trading_easy_peasy")
+MONGO_RECONNECT_INTERVAL = 30   # [NEW] Jeda minimal antar percobaan reconnect (connect blocking s/d 5 detik)
+
+# [NEW] Journal Write-Behind (insert_many batch di thread, gagal -> spill JSONL lalu retry berurutan)
+JOURNAL_SPILL_FILE = 'journal_spill.jsonl'
+JOURNAL_QUARANTINE_FILE = 'journal_quarantine.jsonl' # Trade yang ditolak permanen oleh MongoDB (cek manual)
+JOURNAL_BATCH_SIZE = 50
+JOURNAL_FLUSH_INTERVAL = 2      # Detik
+JOURNAL_RETRY_INTERVAL = 30     # Detik antar retry spill saat Mongo down
 
 # Credential Loading (Dari .env)
 API_KEY_LIVE = os.getenv("BINANCE_API_KEY")
@@ -219,9 +253,26 @@ CMC_API_KEY = os.getenv("CMC_API_KEY")
 CONCURRENCY_LIMIT = 20           # Max thread worker
 LOOP_SLEEP_DELAY = 1             # Sleep main loop (detik)
 ERROR_SLEEP_DELAY = 5            # Sleep on error (detik)
+POSITION_RECONCILE_INTERVAL = 300 # [NEW] Rekonsiliasi posisi via REST (detik); posisi realtime dari ACCOUNT_UPDATE
+OPEN_ORDERS_RECONCILE_INTERVAL = 300 # [NEW] Rekonsiliasi open order via REST (detik); realtime dari ORDER_TRADE_UPDATE
 API_REQUEST_TIMEOUT = 10         # Timeout request (detik)
 API_RECV_WINDOW = 10000          # RecvWindow Binance (ms)
 LOOP_SKIP_DELAY = 2              # Delay skip coin
+SCAN_MAX_CONCURRENCY = 5         # Maks koin dianalisa paralel saat candle close (event-driven scheduler)
+USE_INCREMENTAL_INDICATORS = True # Update indikator O(1) per candle close (False = hitung ulang penuh via pandas_ta)
+INDICATOR_BACKEND = 'thread'     # Backend hitung ulang penuh pandas_ta: 'thread' | 'process' (multi-core, untuk DAFTAR_KOIN besar)
+INDICATOR_PROCESS_WORKERS = 0    # Jumlah worker process (0 = semua core CPU)
+INDICATOR_BATCH_WINDOW = 0.5     # Jeda kumpulkan candle close sebelum batch dispatch ke process pool (detik)
+OHLCV_CACHE_ENABLED = True       # Simpan candle ke disk -> restart hanya fetch tail candle yang hilang
+OHLCV_CACHE_DIR = 'ohlcv_cache'  # Folder file .npy per (symbol, timeframe)
+OHLCV_CACHE_SAVE_INTERVAL = '15m' # Interval snapshot candle ke disk
+RATE_LIMIT_WEIGHT_PER_MINUTE = 2400 # Limit weight REST Binance Futures per IP per menit
+RATE_LIMIT_PRIORITY_SHARE = {    # Porsi maks budget weight per prioritas (sisanya dicadangkan untuk prioritas lebih tinggi)
+    'ORDER': 0.95,               # Entry, SL/TP, cancel
+    'SAFETY': 0.85,              # Sync posisi / open orders / balance
+    'MARKET': 0.7,               # Order book / ticker
+    'SLOW': 0.5                  # Initial load, funding, OI, LSR
+}
 
 # External Info / News Sources
 CMC_FNG_URL = "https://pro-api.coinmarketcap.com/v3/fear-and-greed/latest"
@@ -229,6 +280,15 @@ DEFILLAMA_STABLECOIN_URL = "https://stablecoins.llama.fi/stablecoincharts/all"
 WS_URL_FUTURES_LIVE = "wss://fstream.binance.com/stream?streams="
 WS_URL_FUTURES_TESTNET = "wss://stream.binancefuture.com/stream?streams="
 WS_KEEP_ALIVE_INTERVAL = 1800
+WS_MAX_STREAMS_PER_CONNECTION = 200 # Maks stream per koneksi WS (stream market di-shard ke beberapa koneksi)
+WS_MAX_URL_LENGTH = 4000         # URL combined lebih panjang dari ini -> pakai pesan SUBSCRIBE
+WS_SUBSCRIBE_BATCH = 100         # Jumlah stream per pesan SUBSCRIBE
+WS_RECONNECT_BASE_DELAY = 1      # Backoff reconnect awal per shard (detik)
+WS_RECONNECT_MAX_DELAY = 60      # Backoff reconnect maksimum per shard (detik)
+WS_JSON_DECODER = 'auto'         # Decoder JSON WS: 'auto' (orjson > msgspec > json) | 'orjson' | 'msgspec' | 'json'
+WS_QUEUE_SIZE_LOSSLESS = 10000   # Kapasitas antrian kline & user data (lossless, reader menunggu jika penuh)
+WS_QUEUE_SIZE_TRADES = 5000      # Kapasitas antrian aggTrade (drop oldest jika penuh)
+WS_METRICS_INTERVAL = 300        # Interval log metrics antrian WS (detik)
 
 NEWS_MAX_PER_SOURCE = 15
 NEWS_MAX_TOTAL = 200
@@ -449,6 +509,37 @@ OUTPUT FORMAT (JSON ONLY):
 }}
 """
 
+PROMPT_SENTIMENT_DELTA = """
+ROLE: You are an expert Crypto Narrative Analyst. You previously produced the SENTIMENT REPORT below. Update it using ONLY the new data.
+
+TASK: Revise the previous report in INDONESIAN language. Keep unchanged conclusions, adjust only what the new headlines affect.
+
+--------------------------------------------------
+[PREVIOUS REPORT]
+- Overall Sentiment: {prev_sentiment} (Score: {prev_score})
+- Summary: {prev_summary}
+- Key Drivers: {prev_drivers}
+- Risk Assessment: {prev_risk}
+
+[MARKET MOOD (UNCHANGED)]
+- Fear & Greed Index: {fng_value} ({fng_text})
+- Stablecoin Inflow: {inflow_status}
+
+[NEW HEADLINES SINCE PREVIOUS REPORT]
+{news_str}
+--------------------------------------------------
+
+OUTPUT FORMAT (JSON ONLY):
+{{
+  "analysis": "sentiment",
+  "overall_sentiment": "BULLISH" | "BEARISH" | "NEUTRAL" | "MIXED",
+  "sentiment_score": 0-100,
+  "summary": "Full updated summary in Indonesian (max 1 paragraph). Mention key drivers.",
+  "key_drivers": ["List of 2-3 main factors driving the sentiment"],
+  "risk_assessment": "RISK LEVEL (Low/Medium/High) - Short reason why."
+}}
+"""
+
 PROMPT_MARKET_ANALYSIS_OUTPUT_FORMAT = """
 OUTPUT FORMAT (JSON ONLY):
 {{
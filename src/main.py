@@ -6,18 +6,21 @@ import time
 import html
 import ccxt.async_support as ccxt
 import config
-from src.utils.helper import logger, kirim_tele, kirim_tele_sync, parse_timeframe_to_seconds, get_next_rounded_time, get_coin_leverage
-from src.utils.prompt_builder import build_market_prompt, build_sentiment_prompt
+from src.utils.helper import logger, kirim_tele, kirim_tele_sync, parse_timeframe_to_seconds, get_next_rounded_time, get_coin_leverage, get_coin_config
+from src.utils.prompt_builder import build_market_prompt, build_sentiment_prompt, build_sentiment_delta_prompt
 from src.utils.calc import calculate_trade_scenarios, calculate_dual_scenarios, calculate_profit_loss_estimation
 
 # MODULE IMPORTS
-from src.modules.market_data import MarketDataManager
+from src.modules.market_data import MarketDataManager, shutdown_indicator_pool
 from src.modules.sentiment import SentimentAnalyzer
 from src.modules.onchain import OnChainAnalyzer
-from src.modules.ai_brain import AIBrain
+from src.modules.ai_brain import AIBrain, AIDecisionPipeline
 from src.modules.executor import OrderExecutor
 from src.modules.pattern_recognizer import PatternRecognizer
 from src.modules.journal import TradeJournal
+from src.modules.scheduler import ScanScheduler
+from src.modules.trailing_engine import TrailingEngine
+from src.modules.exposure import ExposureManager
 
 # GLOBAL INSTANCES
 market_data = None
@@ -27,6 +30,47 @@ ai_brain = None
 executor = None
 pattern_recognizer = None
 journal = None
+_securing = set() # [NEW] Simbol yang sedang dipasang SL/TP (hindari install ganda WS + loop)
+_secure_tasks = set() # [NEW] Referensi task secure_positions dari ACCOUNT_UPDATE (task tanpa referensi bisa di-GC)
+
+def _on_secure_task_done(task):
+    _secure_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"❌ Secure Positions Task Error: {task.exception()}")
+
+async def secure_positions(symbols=None):
+    """
+    Pasang SL/TP untuk posisi yang belum aman (paralel, lock per simbol di executor).
+    symbols: batasi ke simbol tertentu (mis. dari ACCOUNT_UPDATE), None = semua posisi.
+    """
+    async def secure(symbol, pos):
+        _securing.add(symbol)
+        try:
+            logger.info(f"🛡️ Found Unsecured Position: {symbol}. Installing Safety...")
+            success = await executor.install_safety_orders(symbol, pos)
+            if success:
+                if symbol not in executor.safety_orders_tracker:
+                    executor.safety_orders_tracker[symbol] = {}
+                executor.safety_orders_tracker[symbol].update({
+                    "status": "SECURED",
+                    "last_check": time.time()
+                })
+                await executor.save_tracker()
+        finally:
+            _securing.discard(symbol)
+
+    unsecured = []
+    for base_sym, pos in list(executor.position_cache.items()):
+        symbol = pos['symbol']
+        if (symbols is not None and symbol not in symbols) or symbol in _securing:
+            continue
+        tracker = executor.safety_orders_tracker.get(symbol, {})
+        status = tracker.get('status', 'NONE')
+        
+        if status in ['NONE', 'PENDING', 'WAITING_ENTRY']:
+            unsecured.append(secure(symbol, pos))
+    if unsecured:
+        await asyncio.gather(*unsecured)
 
 async def safety_monitor_loop():
     """
@@ -38,29 +82,18 @@ async def safety_monitor_loop():
     logger.info("🛡️ Safety Monitor Started")
     while True:
         try:
+            stream_state = market_data.user_stream_state()
+
             # 1. Sync & Cleanup Pending Orders
-            await executor.sync_pending_orders()
+            await executor.sync_pending_orders(stream_state)
             
             # 2. Sync Posisi vs Tracker (Housekeeping)
-            # Pastikan jika ada posisi manual/baru yang belum masuk tracker, kita amankan.
-            count = await executor.sync_positions()
+            # [NEW] Posisi realtime dari ACCOUNT_UPDATE; REST hanya rekonsiliasi berkala / saat user stream putus
+            if executor.needs_position_reconcile(stream_state):
+                await executor.reconcile_positions(stream_state)
             
-            for base_sym, pos in executor.position_cache.items():
-                symbol = pos['symbol']
-                tracker = executor.safety_orders_tracker.get(symbol, {})
-                status = tracker.get('status', 'NONE')
-                
-                if status in ['NONE', 'PENDING', 'WAITING_ENTRY']:
-                    logger.info(f"🛡️ Found Unsecured Position: {symbol}. Installing Safety...")
-                    success = await executor.install_safety_orders(symbol, pos)
-                    if success:
-                        if symbol not in executor.safety_orders_tracker:
-                            executor.safety_orders_tracker[symbol] = {}
-                        executor.safety_orders_tracker[symbol].update({
-                            "status": "SECURED",
-                            "last_check": time.time()
-                        })
-                        await executor.save_tracker()
+            # Pastikan jika ada posisi manual/baru yang belum masuk tracker, kita amankan.
+            await secure_positions()
 
             # Sleep agak lama karena load utama sudah di WebSocket
             await asyncio.sleep(60) 
@@ -73,11 +106,6 @@ async def safety_monitor_loop():
             logger.error(f"Safety Loop Error: {e}")
             await asyncio.sleep(config.ERROR_SLEEP_DELAY)
 
-async def trailing_price_handler(symbol, price):
-    """Callback untuk menangani update harga realtime dari WebSocket"""
-    if config.ENABLE_TRAILING_STOP and executor:
-        await executor.check_trailing_on_price(symbol, price)
-
 async def main():
     global market_data, sentiment, onchain, ai_brain, executor, pattern_recognizer, journal
     
@@ -90,6 +118,8 @@ async def main():
     next_sentiment_update_time = get_next_rounded_time(config.SENTIMENT_UPDATE_INTERVAL)
     # Jadwal terpisah untuk Analisa AI (agar tidak boros token tiap jam kalau mau)
     next_sentiment_analysis_time = get_next_rounded_time(config.SENTIMENT_ANALYSIS_INTERVAL)
+    # [NEW] Jadwal snapshot candle ke disk (restart cepat)
+    next_ohlcv_save_time = get_next_rounded_time(getattr(config, 'OHLCV_CACHE_SAVE_INTERVAL', '15m'))
     
     logger.info(f"⏳ Next Sentiment Data Refresh: {time.ctime(next_sentiment_update_time)}")
     logger.info(f"⏳ Next Sentiment AI Analysis: {time.ctime(next_sentiment_analysis_time)}")
@@ -102,7 +132,8 @@ async def main():
         'options': {
             'defaultType': 'future',
             'adjustForTimeDifference': True, 
-            'recvWindow': config.API_RECV_WINDOW
+            'recvWindow': config.API_RECV_WINDOW,
+            'warnOnFetchOpenOrdersWithoutSymbol': False # [NEW] Sync pending order: 1 call semua simbol
         }
     })
     if config.PAKAI_DEMO: exchange.enable_demo_trading(True)
@@ -115,8 +146,10 @@ async def main():
     onchain = OnChainAnalyzer()
     ai_brain = AIBrain()
     executor = OrderExecutor(exchange)
+    exposure = ExposureManager(executor, market_data) if getattr(config, 'USE_EXPOSURE_LIMITER', True) else None
     pattern_recognizer = PatternRecognizer(market_data)
     journal = TradeJournal()
+    journal.start() # [NEW] Write-behind: log_trade tidak pernah menunggu MongoDB
 
     # 3. PRELOAD DATA
     await market_data.initialize_data()
@@ -125,14 +158,23 @@ async def main():
     # 4. START BACKGROUND TASKS
     # WebSocket Callback Wrappers
     async def account_update_cb(payload):
-        # Trigger sync when account balance/position changes
-        await executor.sync_positions()
+        # [NEW] Delta posisi langsung dari event (tanpa fetch_positions)
+        changed = executor.apply_account_update(payload)
+        if changed:
+            # Posisi baru -> pasang SL/TP sekarang (task terpisah: antrian user event tidak tertahan)
+            task = asyncio.create_task(secure_positions(changed))
+            _secure_tasks.add(task)
+            task.add_done_callback(_on_secure_task_done)
 
     async def order_update_cb(payload):
         # Handle order updates from WebSocket (FILLED, CANCELED, EXPIRED)
         o = payload['o']
+        if payload.get('e') == 'ALGO_UPDATE':
+            executor.on_algo_update(o) # [NEW] SL/TP = algo order: index ID dari event algo
+            return
         sym = o['s'].replace('USDT', '/USDT')
         status = o['X']
+        executor.on_order_update(o) # [NEW] Index order ID SL/TP (dipakai amend trailing SL)
         
         # --- [NEW] Handle CANCELED/EXPIRED Orders (Realtime) ---
         if status == 'CANCELED':
@@ -322,443 +364,506 @@ async def main():
                      )
                      await kirim_tele(msg)
 
-            # Trigger safety check immediately
-            await executor.sync_positions()
+            # Posisi ikut ter-update via ACCOUNT_UPDATE (dikirim Binance untuk setiap fill)
 
     def whale_handler(symbol, amount, side):
         # Callback from Market Data (AggTrade)
         onchain.detect_whale(symbol, amount, side)
 
-    asyncio.create_task(market_data.start_stream(account_update_cb, order_update_cb, whale_handler))
-    asyncio.create_task(safety_monitor_loop())
-
-    logger.info("🚀 MAIN LOOP RUNNING...")
-
-    # 5. MAIN TRADING LOOP
-    ticker_idx = 0
-    while True:
-        try:
-            # Round Robin Scan (One coin per loop to save API/AI limit)
-            
-            # --- STEP 0: PERIODIC UPDATE SCHEDULER ---
-            current_time = time.time()
-
-            # A. DATA REFRESH (RSS & FnG & OnChain)
-            if current_time >= next_sentiment_update_time:
-                logger.info("🔄 Refreshing Sentiment & On-Chain Data (Fetch Only)...")
-                try:
-                    # Jalankan di background task agar tidak memblokir main loop (Fire & Forget)
-                    asyncio.create_task(sentiment.update_all())
-                    asyncio.create_task(asyncio.to_thread(onchain.fetch_stablecoin_inflows))
-                    
-                    # Schedule Next Update
-                    next_sentiment_update_time = get_next_rounded_time(config.SENTIMENT_UPDATE_INTERVAL)
-                    logger.info(f"✅ Data Refreshed. Next: {time.ctime(next_sentiment_update_time)}")
-                except Exception as e:
-                     logger.error(f"❌ Failed to refresh data: {e}")
-
-            # B. AI SENTIMENT ANALYSIS (Report Generation)
-            if config.ENABLE_SENTIMENT_ANALYSIS and current_time >= next_sentiment_analysis_time:
-                 logger.info("🧠 Running Dedicated Sentiment Analysis (AI)...")
-                 async def run_sentiment_analysis():
-                    try:
-                        # Prepare Prompt
-                        s_data = sentiment.get_latest()
-                        o_data = onchain.get_latest()
-                        prompt = build_sentiment_prompt(s_data, o_data)
-                        
-                        # Ask AI
-                        logger.info(f"📝 SENTIMENT AI PROMPT:\n{prompt}")
-                        result = await ai_brain.analyze_sentiment(prompt)
-                        
-                        if result:
-                            # [NEW] Save Analysis to Cache
-                            sentiment.save_analysis(result)
-
-                            # Kirim ke Telegram Channel Sentiment
-                            mood = result.get('overall_sentiment', 'UNKNOWN')
-                            score = result.get('sentiment_score', 0)
-                            summary = result.get('summary', '-')
-                            drivers = result.get('key_drivers', [])
-                            risk = result.get('risk_assessment', 'N/A')
-                            drivers_str = "\n".join([f"• {d}" for d in drivers])
-                            
-                            icon = "😐"
-                            if score > 60: icon = "🚀"
-                            elif score < 40: icon = "🐻"
-                            
-                            msg = (
-                                f"📢 <b>PASAR SAAT INI {mood} {icon}</b>\n"
-                                f"Score: {score}/100\n\n"
-                                f"📝 <b>Ringkasan:</b>\n{summary}\n\n"
-                                f"🔑 <b>Faktor Utama:</b>\n{drivers_str}\n\n"
-                                f"⚠️ <b>Risk Assessment:</b>\n{risk}\n\n"
-                                f"<i>Analisa ini digenerate otomatis oleh AI ({config.AI_SENTIMENT_MODEL})</i>"
-                            )
-                            
-                            logger.info(f"📤 SENTIMENT TELEGRAM MESSAGE:\n{msg}")
-                            await kirim_tele(msg, channel='sentiment')
-                            logger.info("✅ Sentiment Report Sent.")
-                    except Exception as e:
-                        logger.error(f"❌ Sentiment Loop Error: {e}")
-
-                 # Run in background
-                 asyncio.create_task(run_sentiment_analysis())
-                 
-                 # Schedule Next Analysis
-                 next_sentiment_analysis_time = get_next_rounded_time(config.SENTIMENT_ANALYSIS_INTERVAL)
-                 logger.info(f"✅ Analysis Triggered. Next: {time.ctime(next_sentiment_analysis_time)}")
-
-            coin_cfg = config.DAFTAR_KOIN[ticker_idx]
-            symbol = coin_cfg['symbol']
-            
-            ticker_idx = (ticker_idx + 1) % len(config.DAFTAR_KOIN)
-            
-            # --- STEP A: COLLECT DATA ---
-            tech_data = await market_data.get_technical_data(symbol)
-            if not tech_data:
-                logger.warning(f"⚠️ No tech data or insufficient history for {symbol}")
-                await asyncio.sleep(config.LOOP_SKIP_DELAY)
-                continue
-
-            sentiment_data = sentiment.get_latest(symbol=symbol)
-            onchain_data = onchain.get_latest(symbol=symbol)
-
-            # --- STEP B: CHECK EXCLUSION (Cooldown / Existing Position) ---
-            # 1. Active Position Check (Active OR Pending)
-            if executor.has_active_or_pending_trade(symbol):
-                await asyncio.sleep(config.LOOP_SLEEP_DELAY)
-                continue
-            
-            # 2. Cooldown Check
-            if executor.is_under_cooldown(symbol):
-                # Logger handled inside is_under_cooldown but we can skip silently here to reduce spam
-                await asyncio.sleep(config.LOOP_SLEEP_DELAY)
-                continue
-
-            # [NEW] Check Category Limit
-            category = coin_cfg.get('category', 'UNKNOWN')
-            if config.MAX_POSITIONS_PER_CATEGORY > 0:
-                current_cat_count = executor.get_open_positions_count_by_category(category)
-                if current_cat_count >= config.MAX_POSITIONS_PER_CATEGORY:
-                   await asyncio.sleep(config.LOOP_SLEEP_DELAY)
-                   continue
+    # 5. EVENT-DRIVEN SCAN (Candle Close -> Scheduler -> Analisa)
+    async def analyze_symbol(symbol):
+        coin_cfg = get_coin_config(symbol)
+        if not coin_cfg:
+            return # Bukan koin trading (mis. helper store BTC)
+
+        # --- STEP A: COLLECT DATA ---
+        tech_data = await market_data.get_technical_data(symbol)
+        if not tech_data:
+            logger.warning(f"⚠️ No tech data or insufficient history for {symbol}")
+            return
+
+        sentiment_data = sentiment.get_latest(symbol=symbol)
+        onchain_data = onchain.get_latest(symbol=symbol)
+
+        # --- STEP B: CHECK EXCLUSION (Cooldown / Existing Position) ---
+        # 1. Active Position Check (Active OR Pending)
+        if executor.has_active_or_pending_trade(symbol):
+            return
+        
+        # 2. Cooldown Check
+        if executor.is_under_cooldown(symbol):
+            # Logger handled inside is_under_cooldown but we can skip silently here to reduce spam
+            return
+
+        # [NEW] Check Category Limit
+        category = coin_cfg.get('category', 'UNKNOWN')
+        if config.MAX_POSITIONS_PER_CATEGORY > 0:
+            current_cat_count = executor.get_open_positions_count_by_category(category)
+            if current_cat_count >= config.MAX_POSITIONS_PER_CATEGORY:
+               return
+        
+        # --- STEP C: TRADITIONAL FILTER FIRST ---
+        # Don't waste AI tokens on garbage setups
+        # Rule: Harusnya ada sinyal teknikal dasar dulu (e.g. RSI extreme atau Trend following)
+        is_interesting = False
+        
+        # Filter 1: Trend Alignment (King Filter) & Correlation Check
+        # [KING EXCEPTION] BTC tidak perlu cek korelasi (pasti 1.0, tidak bermakna)
+        if symbol == config.BTC_SYMBOL:
+            # BTC adalah "The King" - selalu independent
+            btc_corr = 1.0  # Hardcoded, tidak perlu panggil fungsi
+            show_btc_context = False  # Tidak perlu menampilkan BTC context untuk BTC sendiri
             
-            # --- STEP C: TRADITIONAL FILTER FIRST ---
-            # Don't waste AI tokens on garbage setups
-            # Rule: Harusnya ada sinyal teknikal dasar dulu (e.g. RSI extreme atau Trend following)
-            is_interesting = False
+            # Trend following logic untuk BTC
+            if tech_data['price_vs_ema'] in ["Above", "Below"]:
+                is_interesting = True
+        else:
+            # Non-BTC: Cek korelasi dan config seperti biasa
+            btc_corr = await market_data.get_btc_correlation(symbol)
             
-            # Filter 1: Trend Alignment (King Filter) & Correlation Check
-            # [KING EXCEPTION] BTC tidak perlu cek korelasi (pasti 1.0, tidak bermakna)
-            if symbol == config.BTC_SYMBOL:
-                # BTC adalah "The King" - selalu independent
-                btc_corr = 1.0  # Hardcoded, tidak perlu panggil fungsi
-                show_btc_context = False  # Tidak perlu menampilkan BTC context untuk BTC sendiri
+            # [LOGIC UPDATE] Cek Konfigurasi BTC Correlation Per-Koin
+            use_btc_corr_config = coin_cfg.get('btc_corr', True)  # Default True
+            show_btc_context = False
+
+            if use_btc_corr_config:
+                if btc_corr >= config.CORRELATION_THRESHOLD_BTC:
+                    # High Correlation: Show BTC Data & Enforce Trend Following
+                    show_btc_context = True  # Allow AI to see BTC
+                    
+                    if tech_data['btc_trend'] == "BULLISH" and tech_data['price_vs_ema'] == "Above":
+                        is_interesting = True
+                    elif tech_data['btc_trend'] == "BEARISH" and tech_data['price_vs_ema'] == "Below":
+                        is_interesting = True
+                    else:
+                        pass  # Conflicting signal (e.g. BTC Bullish but Altcoin Below EMA) -> Skip
+                else:
+                    # Low Correlation: Hide BTC Data (Prevent Hallucination)
+                    show_btc_context = False
+                    # Allow entry based on independent structure
+                    is_interesting = True
+            else:
+                # [BTC CORRELATION OFF BY CONFIG]
+                # Hide BTC Data completely
+                show_btc_context = False
                 
-                # Trend following logic untuk BTC
+                # Anggap independent, cek teknikal internal saja
                 if tech_data['price_vs_ema'] in ["Above", "Below"]:
                     is_interesting = True
-            else:
-                # Non-BTC: Cek korelasi dan config seperti biasa
-                btc_corr = await market_data.get_btc_correlation(symbol)
+                else:
+                    pass
+
+        
+        # Filter 2: RSI Extremes (Reversal)
+        if tech_data['rsi'] < config.RSI_OVERSOLD or tech_data['rsi'] > config.RSI_OVERBOUGHT:
+            is_interesting = True
+        
+
+        if not is_interesting:
+            return
+
+        # Strategy Selection is now handled by AI
+        tech_data['strategy_mode'] = 'AI_DECISION'
+
+        # --- STEP D: AI ANALYSIS ---
+        # Candle-Based Throttling (Smart Execution)
+        # Logic: Hanya tanya AI jika candle Exec Timeframe (misal 1H) sudah close & berganti baru.
+        # Kita bandingkan timestamp candle terakhir yang datanya kita ambil vs yang terakhir kita analisa.
+        
+        current_candle_ts = tech_data.get('candle_timestamp', 0)
+        last_analyzed_ts = analyzed_candle_ts.get(symbol, 0)
+        
+        if current_candle_ts <= last_analyzed_ts:
+            # Candle ID masih sama = Candle belum ganti = Skip Analisa
+            return
+
+
+        logger.info(f"🤖 Asking AI: {symbol} (Corr: {btc_corr:.2f}, Candle: {current_candle_ts}) ...")
+        
+        # Pattern Recognition (Vision)
+        pattern_ctx = await pattern_recognizer.analyze_pattern(symbol)
+        
+        # Validasi Pattern Output - Skip jika gagal/terpotong
+        if not pattern_ctx.get('is_valid', True):
+            logger.warning(f"⚠️ Skipping {symbol} - Pattern analysis invalid/truncated")
+            return
+        
+        # Order Book Depth Analysis (Scalping Context)
+        ob_depth = await market_data.get_order_book_depth(symbol)
+        tech_data['order_book'] = ob_depth
+        
+        tech_data['btc_correlation'] = btc_corr
+        
+        # Calculate Trade Scenarios BEFORE AI Call
+        # AI need to know what "Market" vs "Liquidity Hunt" looks like
+        current_price = tech_data['price']
+        
+        # [NEW] Generate BOTH Long AND Short Scenarios for Neutral Prompt
+        # AI will decide direction based on its own analysis, not pre-guessed bias
+        dual_scenarios = calculate_dual_scenarios(
+            price=current_price,
+            atr=tech_data.get('atr', 0)
+        )
+
+        # [NEW] Get Cached Sentiment Analysis
+        sentiment_analysis = sentiment.get_analysis()
+
+        prompt = build_market_prompt(
+            symbol, 
+            tech_data, 
+            sentiment_data, 
+            onchain_data, 
+            pattern_ctx, 
+            dual_scenarios, 
+            show_btc_context=show_btc_context,
+            sentiment_analysis=sentiment_analysis
+        )
+        
+        # Print Prompt for Debugging
+        logger.info(f"📝 AI PROMPT INPUT for {symbol}:\n{prompt}")
+
+        # Update Timestamp (Candle ID) instead of System Time
+        # Ditandai saat submit agar candle yang sama tidak dikirim 2x selama AI masih berjalan
+        analyzed_candle_ts[symbol] = current_candle_ts
+
+        # --- STEP E: AI PIPELINE (Non-blocking, keputusan dieksekusi begitu selesai) ---
+        ai_pipeline.submit(symbol, prompt, {
+            'coin_cfg': coin_cfg,
+            'category': category,
+            'tech_data': tech_data,
+            'dual_scenarios': dual_scenarios,
+            'btc_corr': btc_corr,
+            'prompt': prompt
+        })
+
+    async def execute_decision(symbol, ai_decision, ctx):
+        """Callback AIDecisionPipeline: eksekusi keputusan AI untuk 1 simbol."""
+        coin_cfg = ctx['coin_cfg']
+        category = ctx['category']
+        tech_data = ctx['tech_data']
+        dual_scenarios = ctx['dual_scenarios']
+        btc_corr = ctx['btc_corr']
+        prompt = ctx['prompt']
+
+        decision = ai_decision.get('decision', 'WAIT').upper()
+        confidence = ai_decision.get('confidence', 0)
+        reason = html.escape(str(ai_decision.get('reason', '')))
+
+        # --- STEP F: EXECUTION ---
+        if decision in ['BUY', 'SELL', 'LONG', 'SHORT']:
+            # Mapping AI Output
+            side = 'buy' if decision in ['BUY', 'LONG'] else 'sell'
+            
+            # Get Strategy Selected by AI
+            strategy_mode = ai_decision.get('selected_strategy', 'STANDARD')
+
+            if confidence >= config.AI_CONFIDENCE_THRESHOLD:
+                # [NEW] Re-check setelah AI (koin lain bisa entry selama menunggu, scan berjalan paralel)
+                if executor.has_active_or_pending_trade(symbol):
+                    return
+                if config.MAX_POSITIONS_PER_CATEGORY > 0 and executor.get_open_positions_count_by_category(category) >= config.MAX_POSITIONS_PER_CATEGORY:
+                    logger.info(f"🛑 Category Limit Reached while analyzing {symbol} ({category}). Skip entry.")
+                    return
+
+                # [NEW] Correlation-Aware Exposure (tolak / downsize jika risiko terkonsentrasi)
+                exposure_check = exposure.check_entry(symbol, side) if exposure else None
+                if exposure_check:
+                    exposure.log_decision(symbol, exposure_check)
+                    if not exposure_check['allowed']:
+                        return
+
+                # Execute!
+                lev = coin_cfg.get('leverage', config.DEFAULT_LEVERAGE)
                 
-                # [LOGIC UPDATE] Cek Konfigurasi BTC Correlation Per-Koin
-                use_btc_corr_config = coin_cfg.get('btc_corr', True)  # Default True
-                show_btc_context = False
+                # Dynamic Sizing
+                dynamic_amt = await executor.calculate_dynamic_amount_usdt(symbol, lev)
+                if dynamic_amt:
+                    amt = dynamic_amt
+                    logger.info(f"💰 Dynamic Size: ${amt:.2f} (Risk {config.RISK_PERCENT_PER_TRADE}%)")
+                else:
+                    amt = coin_cfg.get('amount', config.DEFAULT_AMOUNT_USDT)
 
-                if use_btc_corr_config:
-                    if btc_corr >= config.CORRELATION_THRESHOLD_BTC:
-                        # High Correlation: Show BTC Data & Enforce Trend Following
-                        show_btc_context = True  # Allow AI to see BTC
-                        
-                        if tech_data['btc_trend'] == "BULLISH" and tech_data['price_vs_ema'] == "Above":
-                            is_interesting = True
-                        elif tech_data['btc_trend'] == "BEARISH" and tech_data['price_vs_ema'] == "Below":
-                            is_interesting = True
-                        else:
-                            pass  # Conflicting signal (e.g. BTC Bullish but Altcoin Below EMA) -> Skip
-                    else:
-                        # Low Correlation: Hide BTC Data (Prevent Hallucination)
-                        show_btc_context = False
-                        # Allow entry based on independent structure
-                        is_interesting = True
+                if exposure_check and exposure_check['scale'] < 1.0:
+                    amt = max(amt * exposure_check['scale'], config.MIN_ORDER_USDT)
+                
+                # EXECUTION LOGIC UPDATE
+                # 1. Determine Mode from AI
+                exec_mode = ai_decision.get('execution_mode', 'MARKET').upper()
+                
+                # 2. Use CACHED Dual Scenarios (Already calculated before AI call)
+                # Select Long or Short based on AI decision
+                params = dual_scenarios['long'] if side == 'buy' else dual_scenarios['short']
+                
+                # 3. Select Parameters
+                final_setup = {}
+                order_type = 'market'
+                
+                if exec_mode == 'LIMIT' and params.get('liquidity_hunt'):
+                    # Apply Liquidity Hunt (Limit Order) Logic
+                    order_type = 'limit'
+                    mode_data = params['liquidity_hunt']
+                    entry_price = mode_data['entry']
+                    sl_price = mode_data['sl']
+                    tp_price = mode_data['tp']
+                    logger.info(f"🔫 Limit Setup Selected. Entry @ {entry_price:.4f}")
                 else:
-                    # [BTC CORRELATION OFF BY CONFIG]
-                    # Hide BTC Data completely
-                    show_btc_context = False
-                    
-                    # Anggap independent, cek teknikal internal saja
-                    if tech_data['price_vs_ema'] in ["Above", "Below"]:
-                        is_interesting = True
+                    # Default / Market Logic
+                    # [MODIFIED] Check Config First
+                    if not config.ENABLE_MARKET_ORDERS:
+                         # FORCE FALLBACK TO LIMIT
+                         order_type = 'limit'
+                         mode_data = params.get('liquidity_hunt', params['market'])
+                         entry_price = mode_data.get('entry', tech_data['price'])
+                         sl_price = mode_data['sl']
+                         tp_price = mode_data['tp']
+                         logger.info(f"🛡️ Market Order Disabled. Forcing Limit Order @ {entry_price:.4f}")
+                         exec_mode = 'LIMIT (FORCED)'
                     else:
-                        pass
+                         order_type = 'market'
+                         mode_data = params['market']
+                         entry_price = tech_data['price'] # Market order uses current price roughly
+                         sl_price = mode_data['sl']
+                         tp_price = mode_data['tp']
 
-            
-            # Filter 2: RSI Extremes (Reversal)
-            if tech_data['rsi'] < config.RSI_OVERSOLD or tech_data['rsi'] > config.RSI_OVERBOUGHT:
-                is_interesting = True
-            
+                rr_ratio = abs(tp_price - entry_price) / abs(entry_price - sl_price) if abs(entry_price - sl_price) > 0 else 0
+                
+                # Formatting Message
+                margin_usdt = amt
+                position_size_usdt = amt * lev
+                direction_icon = "🟢" if side == 'buy' else "🔴"
+                
+                # [NEW] Calculate Profit/Loss Estimation
+                pnl_est = calculate_profit_loss_estimation(
+                    entry_price=entry_price,
+                    tp_price=tp_price,
+                    sl_price=sl_price,
+                    side=side,
+                    amount_usdt=amt,
+                    leverage=lev
+                )
+                
+                # [MESSAGE UPDATE] Conditional BTC Lines
+                btc_trend_icon = "🟢" if tech_data['btc_trend'] == "BULLISH" else "🔴"
+                btc_corr_icon = "🔒" if btc_corr >= config.CORRELATION_THRESHOLD_BTC else "🔓"
+                
+                btc_lines = ""
+                if config.USE_BTC_CORRELATION:
+                    btc_lines = (f"BTC Trend: {btc_trend_icon} {tech_data['btc_trend']}\n"
+                                 f"BTC Correlation: {btc_corr_icon} {btc_corr:.2f}\n")
 
-            if not is_interesting:
-                await asyncio.sleep(config.LOOP_SKIP_DELAY)
-                continue
 
-            # Strategy Selection is now handled by AI
-            tech_data['strategy_mode'] = 'AI_DECISION'
+                # [NEW] Prepare Sentiment Context
+                sentiment_analysis_cached = sentiment.get_analysis() or {}
+                s_score = sentiment_analysis_cached.get('sentiment_score', 50)
+                s_mood = sentiment_analysis_cached.get('overall_sentiment', 'NEUTRAL')
+                
+                s_icon = "😐"
+                if s_score > 60: s_icon = "🚀"
+                elif s_score < 40: s_icon = "🐻"
+                
+                sentiment_line = f"Mood: {s_icon} {s_mood} (Score: {s_score}) by {config.AI_SENTIMENT_MODEL}"
+
+                # Execution Type Header
+                type_str = "🚀 AGRESSIVE (MARKET)" if order_type == 'market' else "🪤 PASSIVE (LIQUIDITY HUNT)"
+
+                msg = (f"🧠 <b>AI SIGNAL MATCHED</b>\n"
+                       f"{type_str}\n"
+                       f"{sentiment_line}\n\n"
+                       f"Coin: {symbol}\n"
+                       f"Signal: {direction_icon} {decision} ({confidence}%)\n"
+                       f"Timeframe: {config.TIMEFRAME_EXEC}\n"
+                       f"{btc_lines}"
+                       f"Strategy: {strategy_mode}\n\n"
+                       f"🛒 <b>Order Details:</b>\n"
+                       f"• Type: {order_type.upper()}\n"
+                       f"• Entry: {entry_price:.4f}\n"
+                       f"• TP: {tp_price:.4f}\n"
+                       f"• SL: {sl_price:.4f}\n"
+                       f"• R:R: 1:{rr_ratio:.2f}\n\n"
+                       f"📈 <b>Estimasi Hasil:</b>\n"
+                       f"• Jika TP: <b>+${pnl_est['profit_usdt']:.2f}</b> (+{pnl_est['profit_percent']:.2f}%)\n"
+                       f"• Jika SL: <b>-${pnl_est['loss_usdt']:.2f}</b> (-{pnl_est['loss_percent']:.2f}%)\n\n"
+                       f"💰 <b>Size & Risk:</b>\n"
+                       f"• Margin: ${margin_usdt:.2f}\n"
+                       f"• Size: ${position_size_usdt:.2f} (x{lev})\n\n"
+                       f"📝 <b>Reason:</b>\n"
+                       f"{reason}\n\n"
+                       f"⚠️ <b>Disclaimer:</b>\n"
+                       f"• Sinyal dibuat oleh AI dari berbagai sumber, tetap DYOR & SUYBI (Sayangi Uangmu Yang Berharga Itu).\n"
+                       f"• Pattern recognition by {config.AI_VISION_MODEL}\n"
+                       f"• Final analyze & execution by {config.AI_MODEL_NAME}")
+                
+                logger.info(f"📤 Sending Tele Message:\n{msg}")
+                await kirim_tele(msg)
+                
+                atr_val = tech_data.get('atr', 0)
+                
+                # --- [NEW] Build Technical & Config Snapshots ---
+                technical_snapshot = {
+                    'rsi': tech_data.get('rsi', 0),
+                    'atr': atr_val,
+                    'price': tech_data.get('price', 0),
+                    'price_vs_ema': tech_data.get('price_vs_ema', ''),
+                    'btc_trend': tech_data.get('btc_trend', ''),
+                    'btc_correlation': btc_corr,
+                    'stoch_rsi_k': tech_data.get('stoch_k', 0),
+                    'stoch_rsi_d': tech_data.get('stoch_d', 0),
+                    'adx': tech_data.get('adx', 0),
+                    'macd_histogram': tech_data.get('macd_histogram', 0),
+                    'bb_upper': tech_data.get('bb_upper', 0),
+                    'bb_lower': tech_data.get('bb_lower', 0),
+                    'order_book_imbalance': tech_data.get('order_book', {}).get('imbalance_pct', 0),
+                }
+                config_snapshot = {
+                    'atr_multiplier_tp': config.ATR_MULTIPLIER_TP1,
+                    'trap_safety_sl': config.TRAP_SAFETY_SL,
+                    'risk_percent': config.RISK_PERCENT_PER_TRADE,
+                    'leverage': lev,
+                    'ai_confidence': confidence,
+                    'ai_model': config.AI_MODEL_NAME,
+                    'timeframe_exec': config.TIMEFRAME_EXEC,
+                    'strategy_mode': strategy_mode,
+                    'exec_mode': exec_mode,
+                    'dynamic_size': config.USE_DYNAMIC_SIZE,
+                }
 
-            # --- STEP D: AI ANALYSIS ---
-            # Candle-Based Throttling (Smart Execution)
-            # Logic: Hanya tanya AI jika candle Exec Timeframe (misal 1H) sudah close & berganti baru.
-            # Kita bandingkan timestamp candle terakhir yang datanya kita ambil vs yang terakhir kita analisa.
-            
-            current_candle_ts = tech_data.get('candle_timestamp', 0)
-            last_analyzed_ts = analyzed_candle_ts.get(symbol, 0)
-            
-            if current_candle_ts <= last_analyzed_ts:
-                # Candle ID masih sama = Candle belum ganti = Skip Analisa
-                await asyncio.sleep(config.LOOP_SLEEP_DELAY)
-                continue
+                await executor.execute_entry(
+                    symbol=symbol,
+                    side=side,
+                    order_type=order_type,
+                    price=entry_price,
+                    amount_usdt=amt,
+                    leverage=lev,
+                    strategy_tag=f"AI_{strategy_mode}_{exec_mode}",
+                    atr_value=atr_val,
+                    ai_prompt=prompt,
+                    ai_reason=reason,
+                    technical_data=technical_snapshot,
+                    config_snapshot=config_snapshot
+                )
+            else:
+                logger.info(f"🛑 AI Vote Low Confidence: {confidence}% (Need {config.AI_CONFIDENCE_THRESHOLD}%)")
 
+    ai_pipeline = AIDecisionPipeline(ai_brain, execute_decision)
+    scheduler = ScanScheduler(analyze_symbol, next_eligible_fn=executor.next_eligible_time)
+    market_data.add_candle_close_listener(scheduler.on_candle_close)
 
-            logger.info(f"🤖 Asking AI: {symbol} (Corr: {btc_corr:.2f}, Candle: {current_candle_ts}) ...")
-            
-            # Pattern Recognition (Vision)
-            pattern_ctx = await pattern_recognizer.analyze_pattern(symbol)
-            
-            # Validasi Pattern Output - Skip jika gagal/terpotong
-            if not pattern_ctx.get('is_valid', True):
-                logger.warning(f"⚠️ Skipping {symbol} - Pattern analysis invalid/truncated")
-                await asyncio.sleep(config.LOOP_SKIP_DELAY)
-                continue
-            
-            # Order Book Depth Analysis (Scalping Context)
-            ob_depth = await market_data.get_order_book_depth(symbol)
-            tech_data['order_book'] = ob_depth
-            
-            tech_data['btc_correlation'] = btc_corr
-            
-            # Calculate Trade Scenarios BEFORE AI Call
-            # AI need to know what "Market" vs "Liquidity Hunt" looks like
-            current_price = tech_data['price']
-            
-            # [NEW] Generate BOTH Long AND Short Scenarios for Neutral Prompt
-            # AI will decide direction based on its own analysis, not pre-guessed bias
-            dual_scenarios = calculate_dual_scenarios(
-                price=current_price,
-                atr=tech_data.get('atr', 0)
-            )
-
-            # [NEW] Get Cached Sentiment Analysis
-            sentiment_analysis = sentiment.get_analysis()
-
-            prompt = build_market_prompt(
-                symbol, 
-                tech_data, 
-                sentiment_data, 
-                onchain_data, 
-                pattern_ctx, 
-                dual_scenarios, 
-                show_btc_context=show_btc_context,
-                sentiment_analysis=sentiment_analysis
-            )
-            
-            # Print Prompt for Debugging
-            logger.info(f"📝 AI PROMPT INPUT for {symbol}:\n{prompt}")
+    # [NEW] Trailing Stop: 1 loop evaluasi (latest price per simbol SECURED), bukan 1 task per tick
+    trailing_cb = None
+    if config.ENABLE_TRAILING_STOP:
+        trailing_engine = TrailingEngine(executor)
+        trailing_engine.start()
+        trailing_cb = trailing_engine.on_price
 
-            ai_decision = await ai_brain.analyze_market(prompt)
-            
-            # Update Timestamp (Candle ID) instead of System Time
-            analyzed_candle_ts[symbol] = current_candle_ts
-            
-            decision = ai_decision.get('decision', 'WAIT').upper()
-            confidence = ai_decision.get('confidence', 0)
-            reason = html.escape(str(ai_decision.get('reason', '')))
-
-            # --- STEP E: EXECUTION ---
-            if decision in ['BUY', 'SELL', 'LONG', 'SHORT']:
-                # Mapping AI Output
-                side = 'buy' if decision in ['BUY', 'LONG'] else 'sell'
-                
-                # Get Strategy Selected by AI
-                strategy_mode = ai_decision.get('selected_strategy', 'STANDARD')
+    asyncio.create_task(market_data.start_stream(account_update_cb, order_update_cb, whale_handler, trailing_cb))
+    asyncio.create_task(safety_monitor_loop())
+    asyncio.create_task(executor.run_timers()) # [NEW] Expiry limit order & akhir cooldown tepat waktu (timer heap)
+    scheduler.start()
 
-                if confidence >= config.AI_CONFIDENCE_THRESHOLD:
-                    # Execute!
-                    lev = coin_cfg.get('leverage', config.DEFAULT_LEVERAGE)
-                    
-                    # Dynamic Sizing
-                    dynamic_amt = await executor.calculate_dynamic_amount_usdt(symbol, lev)
-                    if dynamic_amt:
-                        amt = dynamic_amt
-                        logger.info(f"💰 Dynamic Size: ${amt:.2f} (Risk {config.RISK_PERCENT_PER_TRADE}%)")
-                    else:
-                        amt = coin_cfg.get('amount', config.DEFAULT_AMOUNT_USDT)
-                    
-                    # EXECUTION LOGIC UPDATE
-                    # 1. Determine Mode from AI
-                    exec_mode = ai_decision.get('execution_mode', 'MARKET').upper()
-                    
-                    # 2. Use CACHED Dual Scenarios (Already calculated before AI call)
-                    # Select Long or Short based on AI decision
-                    params = dual_scenarios['long'] if side == 'buy' else dual_scenarios['short']
-                    
-                    # 3. Select Parameters
-                    final_setup = {}
-                    order_type = 'market'
-                    
-                    if exec_mode == 'LIMIT' and params.get('liquidity_hunt'):
-                        # Apply Liquidity Hunt (Limit Order) Logic
-                        order_type = 'limit'
-                        mode_data = params['liquidity_hunt']
-                        entry_price = mode_data['entry']
-                        sl_price = mode_data['sl']
-                        tp_price = mode_data['tp']
-                        logger.info(f"🔫 Limit Setup Selected. Entry @ {entry_price:.4f}")
-                    else:
-                        # Default / Market Logic
-                        # [MODIFIED] Check Config First
-                        if not config.ENABLE_MARKET_ORDERS:
-                             # FORCE FALLBACK TO LIMIT
-                             order_type = 'limit'
-                             mode_data = params.get('liquidity_hunt', params['market'])
-                             entry_price = mode_data.get('entry', tech_data['price'])
-                             sl_price = mode_data['sl']
-                             tp_price = mode_data['tp']
-                             logger.info(f"🛡️ Market Order Disabled. Forcing Limit Order @ {entry_price:.4f}")
-                             exec_mode = 'LIMIT (FORCED)'
-                        else:
-                             order_type = 'market'
-                             mode_data = params['market']
-                             entry_price = tech_data['price'] # Market order uses current price roughly
-                             sl_price = mode_data['sl']
-                             tp_price = mode_data['tp']
-
-                    rr_ratio = abs(tp_price - entry_price) / abs(entry_price - sl_price) if abs(entry_price - sl_price) > 0 else 0
-                    
-                    # Formatting Message
-                    margin_usdt = amt
-                    position_size_usdt = amt * lev
-                    direction_icon = "🟢" if side == 'buy' else "🔴"
-                    
-                    # [NEW] Calculate Profit/Loss Estimation
-                    pnl_est = calculate_profit_loss_estimation(
-                        entry_price=entry_price,
-                        tp_price=tp_price,
-                        sl_price=sl_price,
-                        side=side,
-                        amount_usdt=amt,
-                        leverage=lev
-                    )
-                    
-                    # [MESSAGE UPDATE] Conditional BTC Lines
-                    btc_trend_icon = "🟢" if tech_data['btc_trend'] == "BULLISH" else "🔴"
-                    btc_corr_icon = "🔒" if btc_corr >= config.CORRELATION_THRESHOLD_BTC else "🔓"
-                    
-                    btc_lines = ""
-                    if config.USE_BTC_CORRELATION:
-                        btc_lines = (f"BTC Trend: {btc_trend_icon} {tech_data['btc_trend']}\n"
-                                     f"BTC Correlation: {btc_corr_icon} {btc_corr:.2f}\n")
+    # Initial Scan semua koin (tidak perlu menunggu candle close pertama)
+    for coin in config.DAFTAR_KOIN:
+        scheduler.enqueue(coin['symbol'])
 
+    logger.info("🚀 MAIN LOOP RUNNING...")
 
-                    # [NEW] Prepare Sentiment Context
-                    sentiment_analysis_cached = sentiment.get_analysis() or {}
-                    s_score = sentiment_analysis_cached.get('sentiment_score', 50)
-                    s_mood = sentiment_analysis_cached.get('overall_sentiment', 'NEUTRAL')
-                    
-                    s_icon = "😐"
-                    if s_score > 60: s_icon = "🚀"
-                    elif s_score < 40: s_icon = "🐻"
-                    
-                    sentiment_line = f"Mood: {s_icon} {s_mood} (Score: {s_score}) by {config.AI_SENTIMENT_MODEL}"
-
-                    # Execution Type Header
-                    type_str = "🚀 AGRESSIVE (MARKET)" if order_type == 'market' else "🪤 PASSIVE (LIQUIDITY HUNT)"
-
-                    msg = (f"🧠 <b>AI SIGNAL MATCHED</b>\n"
-                           f"{type_str}\n"
-                           f"{sentiment_line}\n\n"
-                           f"Coin: {symbol}\n"
-                           f"Signal: {direction_icon} {decision} ({confidence}%)\n"
-                           f"Timeframe: {config.TIMEFRAME_EXEC}\n"
-                           f"{btc_lines}"
-                           f"Strategy: {strategy_mode}\n\n"
-                           f"🛒 <b>Order Details:</b>\n"
-                           f"• Type: {order_type.upper()}\n"
-                           f"• Entry: {entry_price:.4f}\n"
-                           f"• TP: {tp_price:.4f}\n"
-                           f"• SL: {sl_price:.4f}\n"
-                           f"• R:R: 1:{rr_ratio:.2f}\n\n"
-                           f"📈 <b>Estimasi Hasil:</b>\n"
-                           f"• Jika TP: <b>+${pnl_est['profit_usdt']:.2f}</b> (+{pnl_est['profit_percent']:.2f}%)\n"
-                           f"• Jika SL: <b>-${pnl_est['loss_usdt']:.2f}</b> (-{pnl_est['loss_percent']:.2f}%)\n\n"
-                           f"💰 <b>Size & Risk:</b>\n"
-                           f"• Margin: ${margin_usdt:.2f}\n"
-                           f"• Size: ${position_size_usdt:.2f} (x{lev})\n\n"
-                           f"📝 <b>Reason:</b>\n"
-                           f"{reason}\n\n"
-                           f"⚠️ <b>Disclaimer:</b>\n"
-                           f"• Sinyal dibuat oleh AI dari berbagai sumber, tetap DYOR & SUYBI (Sayangi Uangmu Yang Berharga Itu).\n"
-                           f"• Pattern recognition by {config.AI_VISION_MODEL}\n"
-                           f"• Final analyze & execution by {config.AI_MODEL_NAME}")
-                    
-                    logger.info(f"📤 Sending Tele Message:\n{msg}")
-                    await kirim_tele(msg)
-                    
-                    atr_val = tech_data.get('atr', 0)
+    try:
+        # 6. PERIODIC UPDATE LOOP (Sentiment & On-Chain)
+        while True:
+            try:
+                # --- PERIODIC UPDATE SCHEDULER ---
+                current_time = time.time()
+
+                # A. DATA REFRESH (RSS & FnG & OnChain)
+                if current_time >= next_sentiment_update_time:
+                    logger.info("🔄 Refreshing Sentiment & On-Chain Data (Fetch Only)...")
+                    try:
+                        # Jalankan di background task agar tidak memblokir main loop (Fire & Forget)
+                        asyncio.create_task(sentiment.update_all())
+                        asyncio.create_task(asyncio.to_thread(onchain.fetch_stablecoin_inflows))
                     
-                    # --- [NEW] Build Technical & Config Snapshots ---
-                    technical_snapshot = {
-                        'rsi': tech_data.get('rsi', 0),
-                        'atr': atr_val,
-                        'price': tech_data.get('price', 0),
-                        'price_vs_ema': tech_data.get('price_vs_ema', ''),
-                        'btc_trend': tech_data.get('btc_trend', ''),
-                        'btc_correlation': btc_corr,
-                        'stoch_rsi_k': tech_data.get('stoch_k', 0),
-                        'stoch_rsi_d': tech_data.get('stoch_d', 0),
-                        'adx': tech_data.get('adx', 0),
-                        'macd_histogram': tech_data.get('macd_histogram', 0),
-                        'bb_upper': tech_data.get('bb_upper', 0),
-                        'bb_lower': tech_data.get('bb_lower', 0),
-                        'order_book_imbalance': tech_data.get('order_book', {}).get('imbalance_pct', 0),
-                    }
-                    config_snapshot = {
-                        'atr_multiplier_tp': config.ATR_MULTIPLIER_TP1,
-                        'trap_safety_sl': config.TRAP_SAFETY_SL,
-                        'risk_percent': config.RISK_PERCENT_PER_TRADE,
-                        'leverage': lev,
-                        'ai_confidence': confidence,
-                        'ai_model': config.AI_MODEL_NAME,
-                        'timeframe_exec': config.TIMEFRAME_EXEC,
-                        'strategy_mode': strategy_mode,
-                        'exec_mode': exec_mode,
-                        'dynamic_size': config.USE_DYNAMIC_SIZE,
-                    }
-
-                    await executor.execute_entry(
-                        symbol=symbol,
-                        side=side,
-                        order_type=order_type,
-                        price=entry_price,
-                        amount_usdt=amt,
-                        leverage=lev,
-                        strategy_tag=f"AI_{strategy_mode}_{exec_mode}",
-                        atr_value=atr_val,
-                        ai_prompt=prompt,
-                        ai_reason=reason,
-                        technical_data=technical_snapshot,
-                        config_snapshot=config_snapshot
-                    )
-                else:
-                    logger.info(f"🛑 AI Vote Low Confidence: {confidence}% (Need {config.AI_CONFIDENCE_THRESHOLD}%)")
+                        # Schedule Next Update
+                        next_sentiment_update_time = get_next_rounded_time(config.SENTIMENT_UPDATE_INTERVAL)
+                        logger.info(f"✅ Data Refreshed. Next: {time.ctime(next_sentiment_update_time)}")
+                    except Exception as e:
+                         logger.error(f"❌ Failed to refresh data: {e}")
+
+                # B. AI SENTIMENT ANALYSIS (Report Generation)
+                if config.ENABLE_SENTIMENT_ANALYSIS and current_time >= next_sentiment_analysis_time:
+                     logger.info("🧠 Running Dedicated Sentiment Analysis (AI)...")
+                     async def run_sentiment_analysis():
+                        try:
+                            # Prepare Prompt
+                            s_data = sentiment.get_latest()
+                            o_data = onchain.get_latest()
+
+                            # [NEW] Skip / Delta jika input tidak berubah material
+                            plan = sentiment.plan_analysis(o_data.get('stablecoin_inflow', 'Neutral'))
+                            if plan['mode'] == "skip":
+                                logger.info("♻️ Sentiment inputs unchanged. Reusing cached analysis (AI call skipped).")
+                                return
+                            if plan['mode'] == "delta":
+                                logger.info(f"🧩 Sentiment Delta Mode: {len(plan['new_headlines'])} new headlines.")
+                                prompt = build_sentiment_delta_prompt(s_data, o_data, sentiment.get_analysis(), plan['new_headlines'])
+                            else:
+                                prompt = build_sentiment_prompt(s_data, o_data)
+                        
+                            # Ask AI
+                            logger.info(f"📝 SENTIMENT AI PROMPT:\n{prompt}")
+                            result = await ai_brain.analyze_sentiment(prompt)
+                        
+                            if result:
+                                # [NEW] Save Analysis to Cache
+                                sentiment.save_analysis(result)
+                                sentiment.mark_analyzed(plan)
+
+                                # Kirim ke Telegram Channel Sentiment
+                                mood = result.get('overall_sentiment', 'UNKNOWN')
+                                score = result.get('sentiment_score', 0)
+                                summary = result.get('summary', '-')
+                                drivers = result.get('key_drivers', [])
+                                risk = result.get('risk_assessment', 'N/A')
+                                drivers_str = "\n".join([f"• {d}" for d in drivers])
+                            
+                                icon = "😐"
+                                if score > 60: icon = "🚀"
+                                elif score < 40: icon = "🐻"
+                            
+                                msg = (
+                                    f"📢 <b>PASAR SAAT INI {mood} {icon}</b>\n"
+                                    f"Score: {score}/100\n\n"
+                                    f"📝 <b>Ringkasan:</b>\n{summary}\n\n"
+                                    f"🔑 <b>Faktor Utama:</b>\n{drivers_str}\n\n"
+                                    f"⚠️ <b>Risk Assessment:</b>\n{risk}\n\n"
+                                    f"<i>Analisa ini digenerate otomatis oleh AI ({config.AI_SENTIMENT_MODEL})</i>"
+                                )
+                            
+                                logger.info(f"📤 SENTIMENT TELEGRAM MESSAGE:\n{msg}")
+                                await kirim_tele(msg, channel='sentiment')
+                                logger.info("✅ Sentiment Report Sent.")
+                        except Exception as e:
+                            logger.error(f"❌ Sentiment Loop Error: {e}")
+
+                     # Run in background
+                     asyncio.create_task(run_sentiment_analysis())
+                 
+                     # Schedule Next Analysis
+                     next_sentiment_analysis_time = get_next_rounded_time(config.SENTIMENT_ANALYSIS_INTERVAL)
+                     logger.info(f"✅ Analysis Triggered. Next: {time.ctime(next_sentiment_analysis_time)}")
 
-            # Rate Limit Protection
-            await asyncio.sleep(config.ERROR_SLEEP_DELAY) 
+                # C. OHLCV DISK CACHE SNAPSHOT
+                if current_time >= next_ohlcv_save_time:
+                    asyncio.create_task(market_data.save_ohlcv_cache())
+                    next_ohlcv_save_time = get_next_rounded_time(getattr(config, 'OHLCV_CACHE_SAVE_INTERVAL', '15m'))
+
+                await asyncio.sleep(config.LOOP_SLEEP_DELAY)
+
+            except Exception as e:
+                logger.error(f"Main Loop Error: {e}")
+                await asyncio.sleep(config.ERROR_SLEEP_DELAY)
+    finally:
+        # [NEW] Shutdown: flush antrian journal (write-behind) sebelum event loop ditutup
+        if journal:
+            await journal.close()
 
-        except Exception as e:
-            logger.error(f"Main Loop Error: {e}")
-            await asyncio.sleep(config.ERROR_SLEEP_DELAY)
 
 if __name__ == "__main__":
     try:
@@ -768,4 +873,6 @@ if __name__ == "__main__":
         kirim_tele_sync("🛑 Bot Stopped Manually")
     except Exception as e:
         print(f"💀 Fatal Crash: {e}")
-        kirim_tele_sync(f"💀 Bot Crash: {e}")
\ No newline at end of file
+        kirim_tele_sync(f"💀 Bot Crash: {e}")
+    finally:
+        shutdown_indicator_pool()
\ No newline at end of file
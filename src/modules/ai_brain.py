@@ -1,8 +1,10 @@
 
 from openai import AsyncOpenAI
+import asyncio
 import json
 import config
 from src.utils.helper import logger
+from src.modules.llm_cache import LLMResponseCache
 import re
 
 class AIBrain:
@@ -22,6 +24,11 @@ class AIBrain:
             self.client = None
             logger.warning("⚠️ AI_API_KEY not found. AI Brain is disabled.")
 
+        # [NEW] Response Cache (prompt identik -> tidak panggil API lagi)
+        self.cache = None
+        if self.client and getattr(config, 'AI_CACHE_ENABLED', False):
+            self.cache = LLMResponseCache()
+
     def _build_reasoning_config(self):
         """
         Build reasoning configuration berdasarkan config.
@@ -39,6 +46,17 @@ class AIBrain:
         }
         return reasoning_config
 
+    def _cache_lookup(self, model, temperature, reasoning, prompt_text):
+        """Return (cache_key, cached_response). cache_key None jika cache nonaktif."""
+        if self.cache is None:
+            return None, None
+        key = self.cache.make_key(model, temperature, reasoning, prompt_text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            st = self.cache.stats()
+            logger.info(f"🗃️ AI Cache HIT ({model}) | Hits: {st['hits']} Misses: {st['misses']} ({st['hit_rate']:.0f}%)")
+        return key, cached
+
     async def analyze_market(self, prompt_text):
         """
         Send prompt to AI and parse JSON response.
@@ -46,6 +64,11 @@ class AIBrain:
         if not self.client:
             return {"decision": "WAIT", "confidence": 0, "reason": "AI Key Missing"}
 
+        reasoning_config = self._build_reasoning_config()
+        cache_key, cached = self._cache_lookup(self.model_name, config.AI_TEMPERATURE, reasoning_config, prompt_text)
+        if cached is not None:
+            return cached
+
         try:
             # Generate Content
             completion = await self.client.chat.completions.create(
@@ -53,7 +76,7 @@ class AIBrain:
                     "HTTP-Referer": config.AI_APP_URL, 
                     "X-Title": config.AI_APP_TITLE, 
                 },
-                extra_body=self._build_reasoning_config(),
+                extra_body=reasoning_config,
                 model=self.model_name,
                 messages=[ 
                     {
@@ -101,6 +124,9 @@ class AIBrain:
             
             # Log full response dengan indentasi agar rapi
             logger.info(f"🧠 FULL AI RESPONSE:\n{json.dumps(decision_json, indent=2, ensure_ascii=False)}")
+
+            if cache_key:
+                await self.cache.put(cache_key, decision_json)
             return decision_json
 
         except Exception as e:
@@ -119,6 +145,11 @@ class AIBrain:
 
         # Tentukan Model: Gunakan config khusus jika ada, jika tidak fallback ke default model
         target_model = getattr(config, 'AI_SENTIMENT_MODEL', self.model_name)
+        sentiment_temperature = 0.3
+
+        cache_key, cached = self._cache_lookup(target_model, sentiment_temperature, None, prompt_text)
+        if cached is not None:
+            return cached
         
         try:
             completion = await self.client.chat.completions.create(
@@ -129,7 +160,7 @@ class AIBrain:
                 model=target_model,
                 messages=[{"role": "user", "content": prompt_text}],
                 # Sentiment boleh lebih kreatif sedikit
-                temperature=0.3 
+                temperature=sentiment_temperature
             )
             
             raw_text = completion.choices[0].message.content
@@ -144,8 +175,69 @@ class AIBrain:
                 decision_json = json.loads(cleaned_text)
                 
             logger.info(f"🧠 Sentiment Analysis Done via {target_model}")
+
+            if cache_key:
+                await self.cache.put(cache_key, decision_json)
             return decision_json
 
         except Exception as e:
             logger.error(f"❌ Sentiment Analysis Failed: {e}")
             return None
+
+
+class AIDecisionPipeline:
+    """
+    Pipeline keputusan AI (concurrent, bounded).
+    - Menerima prompt dari banyak simbol sekaligus (submit tidak blocking).
+    - Maks `max_inflight` request LLM berjalan paralel (Semaphore).
+    - Deadline per request: lewat batas -> keputusan WAIT.
+    - Keputusan dikirim ke `on_decision(symbol, decision, context)` begitu selesai (urutan selesai, bukan urutan submit).
+    """
+
+    def __init__(self, ai_brain, on_decision, max_inflight=None, timeout=None):
+        self.ai_brain = ai_brain
+        self.on_decision = on_decision
+        self.max_inflight = max_inflight or getattr(config, 'AI_MAX_INFLIGHT', 4)
+        self.timeout = timeout or getattr(config, 'AI_REQUEST_TIMEOUT', 60)
+
+        self._sem = asyncio.Semaphore(self.max_inflight)
+        self._tasks = set()
+
+        self.inflight = 0
+        self.completed = 0
+        self.timeouts = 0
+
+    @property
+    def pending(self):
+        """Jumlah request yang belum selesai (menunggu slot + sedang berjalan)."""
+        return len(self._tasks)
+
+    def submit(self, symbol, prompt_text, context=None):
+        task = asyncio.create_task(self._run(symbol, prompt_text, context))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, symbol, prompt_text, context):
+        async with self._sem:
+            self.inflight += 1
+            try:
+                decision = await asyncio.wait_for(self.ai_brain.analyze_market(prompt_text), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                logger.warning(f"⏱️ AI Deadline Exceeded for {symbol} ({self.timeout}s). Skip.")
+                decision = {"decision": "WAIT", "confidence": 0, "reason": "AI Timeout"}
+            finally:
+                self.inflight -= 1
+                self.completed += 1
+
+        try:
+            await self.on_decision(symbol, decision, context)
+        except Exception as e:
+            logger.error(f"❌ Decision Handler Error {symbol}: {e}")
+        return decision
+
+    async def drain(self):
+        """Tunggu semua request yang sedang berjalan selesai."""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
@@ -0,0 +1,262 @@
+import math
+from collections import deque
+import numpy as np
+import config
+from src.utils.helper import parse_timeframe_to_seconds
+
+# Rolling Pearson correlation (close price) setiap simbol vs BTC di TIMEFRAME_TREND.
+# Running sums Σx, Σy, Σxy, Σx², Σy² atas window `period` candle CLOSE yang timestamp-nya
+# sama (aligned) -> update O(1) per candle close, bukan hitung ulang 500 bar per query.
+
+
+class _PairWindow:
+    """Window aligned (x = simbol, y = referensi) dengan running sums."""
+    __slots__ = ('period', 'rows', 'kx', 'ky', 'sx', 'sy', 'sxy', 'sxx', 'syy', 'pushes', 'last_ts', '_cache')
+
+    def __init__(self, period):
+        self.period = period
+        self.rows = deque()  # (ts, x - kx, y - ky)
+        self.kx = self.ky = None  # Offset (nilai pertama) -> running sums stabil secara numerik
+        self.sx = self.sy = self.sxy = self.sxx = self.syy = 0.0
+        self.pushes = 0
+        self.last_ts = None
+        self._cache = None  # (last_ts, corr)
+
+    def push(self, ts, x, y):
+        if self.kx is None:
+            self.kx, self.ky = x, y
+        dx, dy = x - self.kx, y - self.ky
+        self.rows.append((ts, dx, dy))
+        self.sx += dx; self.sy += dy
+        self.sxy += dx * dy; self.sxx += dx * dx; self.syy += dy * dy
+
+        if len(self.rows) > self.period:
+            _, ox, oy = self.rows.popleft()
+            self.sx -= ox; self.sy -= oy
+            self.sxy -= ox * oy; self.sxx -= ox * ox; self.syy -= oy * oy
+
+        self.last_ts = ts
+        self.pushes += 1
+        if self.pushes % self.period == 0:
+            self._recompute()  # Buang drift floating point setiap 1 putaran window
+
+    def _recompute(self):
+        self.sx = self.sy = self.sxy = self.sxx = self.syy = 0.0
+        for _, dx, dy in self.rows:
+            self.sx += dx; self.sy += dy
+            self.sxy += dx * dy; self.sxx += dx * dx; self.syy += dy * dy
+
+    def corr(self, live=None):
+        """
+        Pearson atas `period` baris terakhir.
+        live: (ts, x, y) candle berjalan yang aligned -> ikut dihitung (menggantikan baris tertua), O(1).
+        """
+        key = (self.last_ts, live)
+        if self._cache is not None and self._cache[0] == key:
+            return self._cache[1]
+
+        n = len(self.rows)
+        sx, sy, sxy, sxx, syy = self.sx, self.sy, self.sxy, self.sxx, self.syy
+        if live is not None and self.kx is not None:
+            _, x, y = live
+            dx, dy = x - self.kx, y - self.ky
+            sx += dx; sy += dy
+            sxy += dx * dy; sxx += dx * dx; syy += dy * dy
+            n += 1
+            if n > self.period:
+                _, ox, oy = self.rows[0]
+                sx -= ox; sy -= oy
+                sxy -= ox * oy; sxx -= ox * ox; syy -= oy * oy
+                n -= 1
+        if n < self.period:
+            return None
+
+        cov = n * sxy - sx * sy
+        var_x = n * sxx - sx * sx
+        var_y = n * syy - sy * sy
+        denom = math.sqrt(var_x * var_y) if var_x > 0 and var_y > 0 else 0.0
+        value = max(-1.0, min(1.0, cov / denom)) if denom > 0 else 0.0
+
+        self._cache = (key, value)
+        return value
+
+
+class CorrelationEngine:
+    """
+    Korelasi semua simbol watchlist vs referensi (BTC).
+
+    - on_candle_close(): dipanggil dari _handle_kline, update O(1) per simbol.
+    - correlation(): nilai per simbol (running sums + candle berjalan), di-cache per timestamp candle.
+    - correlation_matrix(): matriks N x N candle close (portfolio / exposure), di-cache per candle close referensi.
+    - Store (ring buffer) tetap sumber kebenaran: jika state tertinggal (gap / warmup),
+      state di-rebuild dari bars[:-1] seperti IndicatorEngine._sync_state.
+    """
+
+    def __init__(self, period=None, reference=None, timeframe=None):
+        self.period = period or config.CORRELATION_PERIOD
+        self.reference = reference or config.BTC_SYMBOL
+        self.timeframe = timeframe or config.TIMEFRAME_TREND
+        self.history = self.period * 2  # Close yang disimpan per simbol (toleransi candle tidak aligned)
+        self.interval_ms = parse_timeframe_to_seconds(self.timeframe) * 1000
+
+        self._closes = {}  # {symbol: {ts: close}} (urut naik, maks `history`)
+        self._pairs = {}   # {symbol: _PairWindow}
+        self._matrix_cache = None  # ((last_ts, symbols), matrix)
+
+    # --- UPDATE ---
+    def _append_close(self, symbol, ts, close):
+        closes = self._closes.get(symbol)
+        if closes is None:
+            return False
+        last_ts = next(reversed(closes)) if closes else None
+        if last_ts is not None and ts <= last_ts:
+            return False  # Duplikat / out-of-order
+        if last_ts is not None and ts - last_ts != self.interval_ms:
+            self.invalidate(symbol)  # Candle terlewat -> rebuild dari store saat dibutuhkan
+            return False
+        closes[ts] = close
+        if len(closes) > self.history:
+            del closes[next(iter(closes))]
+        cached_last_ts = self._matrix_cache[0][0] if self._matrix_cache is not None else None
+        if cached_last_ts is not None and ts <= cached_last_ts:
+            self._matrix_cache = None  # Close telat (setelah referensi) masuk window matriks yang sudah di-cache
+        return True
+
+    def on_candle_close(self, symbol, timeframe, candle):
+        if timeframe != self.timeframe:
+            return
+        ts, close = int(candle[0]), float(candle[4])
+        if not self._append_close(symbol, ts, close):
+            return
+
+        if symbol == self.reference:
+            # Simbol yang sudah close di ts yang sama -> pasangkan sekarang
+            for sym, pair in self._pairs.items():
+                x = self._closes.get(sym, {}).get(ts)
+                if x is not None and (pair.last_ts is None or ts > pair.last_ts):
+                    pair.push(ts, x, close)
+        else:
+            pair = self._pairs.get(symbol)
+            y = self._closes.get(self.reference, {}).get(ts)
+            if pair is not None and y is not None and (pair.last_ts is None or ts > pair.last_ts):
+                pair.push(ts, close, y)
+
+    # --- SYNC DARI STORE ---
+    def seed(self, symbol, bars):
+        """Isi ulang close dari store (candle close saja = bars[:-1])."""
+        arr = np.asarray(bars.view() if hasattr(bars, 'view') else list(bars), dtype=np.float64)
+        closed = arr[:-1][-self.history:] if len(arr) else arr
+        self._closes[symbol] = {int(ts): float(c) for ts, c in zip(closed[:, 0], closed[:, 4])} if len(closed) else {}
+        if symbol == self.reference:
+            self._pairs.clear()
+        else:
+            self._pairs.pop(symbol, None)
+        self._matrix_cache = None
+
+    def _build_pair(self, symbol):
+        closes = self._closes.get(symbol, {})
+        ref = self._closes.get(self.reference, {})
+        pair = _PairWindow(self.period)
+        common = [ts for ts in closes if ts in ref][-self.period:]
+        for ts in common:
+            pair.push(ts, closes[ts], ref[ts])
+        self._pairs[symbol] = pair
+        return pair
+
+    def _is_stale(self, symbol, bars):
+        closes = self._closes.get(symbol)
+        if not closes or len(bars) < 2:
+            return True
+        return next(reversed(closes)) != int(bars[-2][0])
+
+    def sync(self, symbol, bars_sym, bars_ref):
+        """Pastikan state simbol & referensi sinkron dengan candle close terakhir di store."""
+        if self._is_stale(self.reference, bars_ref):
+            self.seed(self.reference, bars_ref)
+        if symbol != self.reference and self._is_stale(symbol, bars_sym):
+            self.seed(symbol, bars_sym)
+
+    def _live_pair(self, symbol, bars_sym, bars_ref):
+        """
+        Pasangan candle terakhir di store (belum close di salah satu / kedua sisi) jika timestamp-nya
+        aligned -> semantik sama dengan intersect seluruh store (termasuk candle berjalan).
+        """
+        if not len(bars_sym) or not len(bars_ref):
+            return None
+        sym_ts, ref_ts = int(bars_sym[-1][0]), int(bars_ref[-1][0])
+        ts = min(sym_ts, ref_ts)
+        x = float(bars_sym[-1][4]) if sym_ts == ts else self._closes.get(symbol, {}).get(ts)
+        y = float(bars_ref[-1][4]) if ref_ts == ts else self._closes.get(self.reference, {}).get(ts)
+        if x is None or y is None:
+            return None
+        return (ts, x, y)
+
+    def invalidate(self, symbol=None):
+        if symbol is None or symbol == self.reference:
+            self._closes.clear()
+            self._pairs.clear()
+        else:
+            self._closes.pop(symbol, None)
+            self._pairs.pop(symbol, None)
+        self._matrix_cache = None
+
+    # --- QUERY ---
+    def correlation(self, symbol, bars_sym=None, bars_ref=None):
+        """
+        Korelasi simbol vs referensi (window `period` candle aligned).
+        Jika bars diberikan: state disinkronkan dengan store dan candle berjalan ikut dihitung.
+        Returns None jika data belum cukup.
+        """
+        if symbol == self.reference:
+            return 1.0
+        live = None
+        if bars_sym is not None and bars_ref is not None:
+            self.sync(symbol, bars_sym, bars_ref)
+            live = self._live_pair(symbol, bars_sym, bars_ref)
+        pair = self._pairs.get(symbol)
+        if pair is None:
+            if symbol not in self._closes or self.reference not in self._closes:
+                return None
+            pair = self._build_pair(symbol)
+        if live is not None and pair.last_ts is not None and live[0] <= pair.last_ts:
+            live = None
+        return pair.corr(live)
+
+    def correlation_matrix(self, symbols=None):
+        """
+        Matriks korelasi N x N atas `period` candle close referensi terakhir.
+        Simbol yang tidak punya close lengkap di window -> baris/kolom NaN (diagonal tetap 1).
+
+        Returns:
+            (symbols, np.ndarray N x N)
+        """
+        symbols = tuple(symbols) if symbols is not None else tuple(self._closes)
+        ref = self._closes.get(self.reference, {})
+        window = list(ref)[-self.period:]
+        key = (window[-1] if window else None, symbols)
+        if self._matrix_cache is not None and self._matrix_cache[0] == key:
+            return list(symbols), self._matrix_cache[1]
+
+        n = len(symbols)
+        matrix = np.full((n, n), np.nan)
+        np.fill_diagonal(matrix, 1.0)
+        if len(window) >= self.period and n:
+            data = np.full((len(window), n), np.nan)
+            for j, sym in enumerate(symbols):
+                closes = self._closes.get(sym, {})
+                data[:, j] = [closes.get(ts, np.nan) for ts in window]
+
+            valid = ~np.isnan(data).any(axis=0)
+            idx = np.flatnonzero(valid)
+            if len(idx):
+                block = data[:, idx]
+                dev = block - block.mean(axis=0)
+                norm = np.sqrt((dev * dev).sum(axis=0))
+                safe = np.where(norm > 0, norm, 1.0)
+                corr = (dev.T @ dev) / np.outer(safe, safe)
+                corr[(norm == 0)[:, None] | (norm == 0)[None, :]] = 0.0
+                np.fill_diagonal(corr, 1.0)
+                matrix[np.ix_(idx, idx)] = np.clip(corr, -1.0, 1.0)
+
+        self._matrix_cache = (key, matrix)
+        return list(symbols), matrix
@@ -0,0 +1,159 @@
+import asyncio
+from collections import OrderedDict, deque
+from src.utils.helper import logger
+
+# Antrian event WebSocket per tipe. Reader WS hanya decode + publish (tidak pernah
+# menunggu handler), consumer khusus memproses isi antrian.
+#   LOSSLESS     : kline, ORDER_TRADE_UPDATE / ALGO_UPDATE / ACCOUNT_UPDATE (tidak boleh hilang)
+#   LATEST_WINS  : miniTicker, depth (hanya nilai terbaru per simbol yang relevan)
+#   DROP_OLDEST  : aggTrade (bounded FIFO, buang yang paling lama jika penuh)
+
+
+class _BaseEventQueue:
+    """Basis antrian event (1 consumer per antrian)."""
+
+    def __init__(self, name, maxsize=0):
+        self.name = name
+        self.maxsize = maxsize
+        self.processed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self._waiter = None
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def _wait(self):
+        self._waiter = asyncio.get_running_loop().create_future()
+        try:
+            await self._waiter
+        finally:
+            self._waiter = None
+
+    def _track_depth(self):
+        depth = self.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def stats(self):
+        return {
+            "depth": self.qsize(),
+            "max_depth": self.max_depth,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced
+        }
+
+
+class LatestWinsQueue(_BaseEventQueue):
+    """1 slot per key (mis. simbol). Item baru menimpa item lama yang belum diproses."""
+
+    def __init__(self, name, maxsize=0):
+        super().__init__(name, maxsize)
+        self._items = OrderedDict()
+
+    def qsize(self):
+        return len(self._items)
+
+    async def put(self, item, key=None):
+        if key in self._items:
+            self._items[key] = item  # Posisi antrian tetap, isi diganti yang terbaru
+            self.coalesced += 1
+        else:
+            self._items[key] = item
+            self._track_depth()
+        self._wake()
+
+    async def get(self):
+        while not self._items:
+            await self._wait()
+        _, item = self._items.popitem(last=False)
+        return item
+
+
+class DropOldestQueue(_BaseEventQueue):
+    """FIFO bounded. Jika penuh, item paling lama dibuang (reader tidak pernah menunggu)."""
+
+    def __init__(self, name, maxsize=5000):
+        super().__init__(name, maxsize)
+        self._items = deque()
+
+    def qsize(self):
+        return len(self._items)
+
+    async def put(self, item, key=None):
+        if self.maxsize and len(self._items) >= self.maxsize:
+            self._items.popleft()
+            self.dropped += 1
+        self._items.append(item)
+        self._track_depth()
+        self._wake()
+
+    async def get(self):
+        while not self._items:
+            await self._wait()
+        return self._items.popleft()
+
+
+class LosslessQueue(_BaseEventQueue):
+    """FIFO bounded tanpa drop. Jika penuh, reader menunggu (backpressure) dan dicatat di log."""
+
+    def __init__(self, name, maxsize=10000):
+        super().__init__(name, maxsize)
+        self._queue = asyncio.Queue(maxsize)
+
+    def qsize(self):
+        return self._queue.qsize()
+
+    async def put(self, item, key=None):
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            logger.warning(f"⚠️ WS Queue [{self.name}] full ({self.maxsize}). Reader waiting for consumer...")
+            await self._queue.put(item)
+        self._track_depth()
+
+    async def get(self):
+        return await self._queue.get()
+
+
+class EventChannel:
+    """Antrian + consumer task yang menjalankan handler(item) satu per satu."""
+
+    def __init__(self, queue, handler, key_fn=None):
+        self.queue = queue
+        self.handler = handler
+        self.key_fn = key_fn
+        self._task = None
+
+    @property
+    def name(self):
+        return self.queue.name
+
+    async def publish(self, item):
+        await self.queue.put(item, self.key_fn(item) if self.key_fn else None)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._consume())
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _consume(self):
+        while True:
+            item = await self.queue.get()
+            try:
+                await self.handler(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"WS Consumer [{self.name}] Error: {e}")
+            finally:
+                self.queue.processed += 1
@@ -1,31 +1,62 @@
 import asyncio
+import random
 import time
+import uuid
 import json
 import os
 import ccxt.async_support as ccxt
 import config
 from src.utils.helper import logger, kirim_tele
+from src.modules.rest_scheduler import rest_scheduler, PRIORITY_ORDER, PRIORITY_SAFETY
+from src.utils.tracker_wal import TrackerWAL
+from src.modules.timer_service import TimerService
+
+# [NEW] Tipe order Binance -> slot di index order ID safety (lihat OrderExecutor.safety_order_ids)
+SAFETY_ORDER_KINDS = {'STOP_MARKET': 'sl', 'TAKE_PROFIT_MARKET': 'tp'}
+OPEN_ORDER_STATUSES = ('NEW', 'PARTIALLY_FILLED')
+
+def _is_duplicate_order_error(error):
+    """Binance -4116: ClientOrderId is duplicated (order dengan client ID ini sudah ada)."""
+    msg = str(error).lower()
+    return '-4116' in msg or 'duplicat' in msg
 
 class OrderExecutor:
     def __init__(self, exchange):
         self.exchange = exchange
         self.safety_orders_tracker = {}
         self.position_cache = {}
+        self._position_event_ts = {} # [NEW] base -> waktu terima ACCOUNT_UPDATE terakhir (ms, jam lokal)
+        self._last_reconcile = 0.0
+        self._reconcile_stream_state = None
+        self.position_drift_count = 0
+        # [NEW] Open order set (ORDER_TRADE_UPDATE)
+        self.open_order_ids = set()
+        self._open_orders_stream_state = None
+        self._last_open_orders_resync = 0.0
+        self._order_events_during_resync = None
+        self.timers = TimerService() # [NEW] Timer terpusat: akhir cooldown & expiry limit order
         self.symbol_cooldown = {}
-        self._safety_lock = asyncio.Lock()  # Prevent race condition on safety orders
+        self._safety_locks = {}  # [NEW] Lock per simbol: securing 1 posisi tidak memblok posisi lain
         self._trailing_last_update = {} # [NEW] Throttle for Trailing SL Update to Exchange
+        self.safety_order_ids = {} # [NEW] {symbol: {'sl': order_id, 'tp': order_id}} -> amend SL tanpa fetch_open_orders
+        self.category_map = {c['symbol']: c.get('category', 'UNKNOWN') for c in config.DAFTAR_KOIN} # [NEW] Index kategori (dibangun 1x)
+        # [NEW] Tracker persistence: snapshot + write-ahead log (tulis hanya field yang berubah)
+        self.tracker_wal = TrackerWAL(
+            config.TRACKER_FILENAME,
+            compact_records=getattr(config, 'TRACKER_WAL_COMPACT_RECORDS', 500),
+            compact_bytes=getattr(config, 'TRACKER_WAL_COMPACT_BYTES', 512 * 1024),
+            fsync=getattr(config, 'TRACKER_WAL_FSYNC', True)
+        )
+        self._tracker_io_lock = asyncio.Lock()
         self.load_tracker()
 
     # --- TRACKER MANAGEMENT ---
     def load_tracker(self):
-        if os.path.exists(config.TRACKER_FILENAME):
-            try:
-                with open(config.TRACKER_FILENAME, 'r') as f:
-                    self.safety_orders_tracker = json.load(f)
-            except Exception as e:
-                logger.error(f"Failed to load tracker: {e}")
-                self.safety_orders_tracker = {}
-        else:
+        """Load snapshot tracker + replay WAL (crash-safe)."""
+        try:
+            self.safety_orders_tracker = self.tracker_wal.load()
+        except Exception as e:
+            logger.error(f"Failed to load tracker: {e}")
             self.safety_orders_tracker = {}
 
     # --- [NEW] REALTIME TRAILING CHECK (CALLED BY WEBSOCKET) ---
@@ -51,22 +82,31 @@ class OrderExecutor:
         await self.update_trailing_sl(symbol, current_price)
 
     async def save_tracker(self):
-        """Non-blocking save tracker ke file."""
+        """
+        Non-blocking save tracker ke file.
+        [NEW] Hanya mutasi sejak save terakhir yang di-append ke WAL; snapshot penuh ditulis
+        saat compaction (atomic rename).
+        """
         try:
-            await asyncio.to_thread(self._save_tracker_sync)
+            async with self._tracker_io_lock:  # Urutan record di WAL = urutan mutasi
+                records = self.tracker_wal.diff(self.safety_orders_tracker)  # Di event loop: tidak race dengan mutasi
+                if not records and not self.tracker_wal.needs_compaction():
+                    return
+                await asyncio.to_thread(self._save_tracker_sync, records)
         except Exception as e:
             logger.error(f"⚠️ Gagal save tracker: {e}")
 
-    def _save_tracker_sync(self):
+    def _save_tracker_sync(self, records):
         """Sync helper untuk save tracker (dijalankan di thread pool)."""
-        with open(config.TRACKER_FILENAME, 'w') as f:
-            json.dump(self.safety_orders_tracker, f, indent=2, sort_keys=True)
+        self.tracker_wal.append(records)
+        if self.tracker_wal.needs_compaction():
+            self.tracker_wal.compact()
 
     # --- RISK & SIZING HELPERS ---
     async def get_available_balance(self):
         """Fetch USDT Available Balance"""
         try:
-            bal = await self.exchange.fetch_balance()
+            bal = await rest_scheduler.request(self.exchange, 'fetch_balance', priority=PRIORITY_SAFETY)
             return float(bal['USDT']['free'])
         except Exception as e:
             logger.error(f"❌ Failed fetch balance: {e}")
@@ -95,7 +135,7 @@ class OrderExecutor:
     def get_open_positions_count_by_category(self, target_category):
         """Hitung jumlah posisi aktif di kategori tertentu"""
         count = 0
-        cat_map = {c['symbol']: c['category'] for c in config.DAFTAR_KOIN}
+        cat_map = self.category_map
         
         for base, pos in self.position_cache.items():
             sym = pos['symbol']
@@ -126,16 +166,28 @@ class OrderExecutor:
         """Set cooldown for a symbol"""
         end_time = time.time() + duration_seconds
         self.symbol_cooldown[symbol] = end_time
+        self.timers.schedule(('cooldown', symbol), end_time, self._end_cooldown, symbol) # [NEW] Cleanup tepat waktu
         logger.info(f"❄️ Cooldown set for {symbol} until {time.strftime('%H:%M:%S', time.localtime(end_time))} ({duration_seconds}s)")
 
+    def _end_cooldown(self, symbol):
+        if self.symbol_cooldown.get(symbol, 0) <= time.time():
+            self.symbol_cooldown.pop(symbol, None)
+            logger.info(f"🔥 Cooldown ended for {symbol}")
+
     def is_under_cooldown(self, symbol):
         """Check if symbol is under cooldown"""
-        if symbol in self.symbol_cooldown:
-            if time.time() < self.symbol_cooldown[symbol]:
-                return True
-            else:
-                del self.symbol_cooldown[symbol] # Cleanup
-        return False
+        return time.time() < self.symbol_cooldown.get(symbol, 0)
+
+    def next_eligible_time(self, symbol):
+        """
+        [NEW] Waktu (epoch) paling awal simbol boleh dianalisa untuk entry baru.
+        0 = sekarang, inf = ada posisi / order pending (menunggu event, bukan waktu).
+        Dipakai ScanScheduler untuk skip simbol tanpa menganalisa.
+        """
+        if self.has_active_or_pending_trade(symbol):
+            return float('inf')
+        cooldown_end = self.symbol_cooldown.get(symbol, 0)
+        return cooldown_end if cooldown_end > time.time() else 0
 
     # --- EXECUTION LOGIC ---
     async def execute_entry(self, symbol, side, order_type, price, amount_usdt, leverage, strategy_tag, atr_value=0, ai_prompt=None, ai_reason=None, technical_data=None, config_snapshot=None):
@@ -151,8 +203,8 @@ class OrderExecutor:
         try:
             # 2. Set Leverage & Margin
             try:
-                await self.exchange.set_leverage(leverage, symbol)
-                await self.exchange.set_margin_mode(config.DEFAULT_MARGIN_TYPE, symbol)
+                await rest_scheduler.request(self.exchange, 'set_leverage', leverage, symbol, priority=PRIORITY_ORDER)
+                await rest_scheduler.request(self.exchange, 'set_margin_mode', config.DEFAULT_MARGIN_TYPE, symbol, priority=PRIORITY_ORDER)
             except ccxt.BaseError as e:
                 err_msg = str(e).lower()
                 if "already set" not in err_msg and "no need to change" not in err_msg:
@@ -160,7 +212,7 @@ class OrderExecutor:
 
             # 3. Hitung Qty
             if price is None or price == 0:
-                ticker = await self.exchange.fetch_ticker(symbol)
+                ticker = await rest_scheduler.request(self.exchange, 'fetch_ticker', symbol, priority=PRIORITY_ORDER)
                 price_exec = ticker['last']
             else:
                 price_exec = price
@@ -172,10 +224,13 @@ class OrderExecutor:
 
             # 4. Create Order
             if order_type.lower() == 'limit':
-                order = await self.exchange.create_order(symbol, 'limit', side, qty, price_exec)
+                order = await rest_scheduler.request(self.exchange, 'create_order', symbol, 'limit', side, qty, price_exec, priority=PRIORITY_ORDER)
+                if order.get('status') in (None, 'open'):
+                    self.open_order_ids.add(str(order['id'])) # Event NEW bisa datang setelah sweep berikutnya
                 # Save to tracker as WAITING_ENTRY
                 self.safety_orders_tracker[symbol] = {
                     "status": "WAITING_ENTRY",
+                    "side": 'LONG' if side == 'buy' else 'SHORT', # [NEW] Dipakai Exposure Manager
                     "entry_id": str(order['id']),
                     "created_at": time.time(),
                     "expires_at": time.time() + config.LIMIT_ORDER_EXPIRY_SECONDS,
@@ -186,6 +241,7 @@ class OrderExecutor:
                     "technical_data": technical_data or {},
                     "config_snapshot": config_snapshot or {}
                 }
+                self.schedule_expiry(symbol, order['id'], self.safety_orders_tracker[symbol]['expires_at'])
                 await self.save_tracker()
                 await kirim_tele(f"⏳ <b>LIMIT PLACED ({strategy_tag})</b>\n{symbol} {side} @ {price_exec:.4f}\n(Trap SL set by ATR: {atr_value:.4f})")
 
@@ -195,6 +251,7 @@ class OrderExecutor:
                 # langsung punya data ATR saat mendeteksi posisi baru.
                 self.safety_orders_tracker[symbol] = {
                     "status": "PENDING", 
+                    "side": 'LONG' if side == 'buy' else 'SHORT', # [NEW] Dipakai Exposure Manager
                     "strategy": strategy_tag,
                     "atr_value": atr_value,
                     "created_at": time.time(),
@@ -207,7 +264,7 @@ class OrderExecutor:
                 await self.save_tracker()
 
                 try:
-                    order = await self.exchange.create_order(symbol, 'market', side, qty)
+                    order = await rest_scheduler.request(self.exchange, 'create_order', symbol, 'market', side, qty, priority=PRIORITY_ORDER)
                     await kirim_tele(f"✅ <b>MARKET FILLED</b>\n{symbol} {side} (Size: ${amount_usdt*leverage:.2f})")
                 except Exception as e:
                     # [ROLLBACK] Jika order gagal, hapus dari tracker
@@ -222,20 +279,63 @@ class OrderExecutor:
             await kirim_tele(f"❌ <b>ENTRY ERROR</b>\n{symbol}: {e}", alert=True)
 
     # --- SAFETY ORDERS (SL/TP) ---
+    def _symbol_lock(self, symbol):
+        lock = self._safety_locks.get(symbol)
+        if lock is None:
+            lock = self._safety_locks[symbol] = asyncio.Lock()
+        return lock
+
+    async def _request_with_retry(self, endpoint, *args, label=''):
+        """
+        [NEW] Request order dengan retry (ORDER_SLTP_RETRIES) + jittered exponential backoff.
+        Hanya error jaringan/timeout yang di-retry; error order (mis. harga invalid) langsung raise.
+        create_order: 1 newClientOrderId tetap untuk semua attempt (idempotent). Timeout bisa saja
+        sudah diterima exchange -> retry ditolak duplicate (-4116) -> order dicari via client ID.
+        """
+        retries = max(1, getattr(config, 'ORDER_SLTP_RETRIES', 3))
+        base_delay = getattr(config, 'ORDER_SLTP_RETRY_DELAY', 2)
+
+        client_id = None
+        if endpoint == 'create_order':
+            args = list(args) + [None] * (6 - len(args))  # symbol, type, side, amount, price, params
+            args[5] = dict(args[5] or {})
+            client_id = args[5].setdefault('newClientOrderId', f"sltp-{uuid.uuid4().hex[:24]}")
+
+        for attempt in range(retries):
+            try:
+                return await rest_scheduler.request(self.exchange, endpoint, *args, priority=PRIORITY_ORDER)
+            except ccxt.NetworkError as e:
+                if attempt + 1 >= retries:
+                    raise
+                delay = base_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
+                logger.warning(f"⚠️ {label} failed (attempt {attempt + 1}/{retries}), retry in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+            except ccxt.ExchangeError as e:
+                if client_id is None or attempt == 0 or not _is_duplicate_order_error(e):
+                    raise
+                # Attempt sebelumnya (timeout) ternyata sudah masuk -> pakai order itu, jangan buat order kedua
+                logger.warning(f"⚠️ {label} already placed by previous attempt ({client_id}), fetching order.")
+                symbol, order_type = args[0], str(args[1]).upper()
+                return await rest_scheduler.request(self.exchange, 'fetch_order', None, symbol, {
+                    'origClientOrderId': client_id, 'trigger': order_type not in ('LIMIT', 'MARKET')
+                }, priority=PRIORITY_ORDER)
+
     async def install_safety_orders(self, symbol, pos_data):
         """
         Pasang SL dan TP untuk posisi yang sudah terbuka.
+        [NEW] Lock per simbol; SL & TP dikirim paralel (1 round trip) dengan retry.
         """
-        async with self._safety_lock:  # Prevent race condition
+        async with self._symbol_lock(symbol):  # Prevent race condition (per simbol)
             entry_price = float(pos_data['entryPrice'])
             quantity = float(pos_data['contracts'])
             side = pos_data['side']
             
             # 1. Cancel Old Orders
             try:
-                await self.exchange.fapiPrivateDeleteAllOpenOrders({'symbol': symbol.replace('/', '')})
+                await self._request_with_retry('fapiPrivateDeleteAllOpenOrders', {'symbol': symbol.replace('/', '')}, label=f"Cancel orders {symbol}")
             except ccxt.BaseError as e:
                 logger.debug(f"Cancel old orders for {symbol}: {e}")
+            self.safety_order_ids.pop(symbol, None)
             
             # 2. Hitung Jarak SL/TP
             # Cek apakah kita punya data ATR dari tracker (saat entry)
@@ -280,14 +380,21 @@ class OrderExecutor:
             p_tp = self.exchange.price_to_precision(symbol, tp_price)
 
             try:
-                # A. STOP LOSS (STOP_MARKET)
-                await self.exchange.create_order(symbol, 'STOP_MARKET', side_api, None, None, {
-                    'stopPrice': p_sl, 'closePosition': True, 'workingType': 'MARK_PRICE'
-                })
-                # B. TAKE PROFIT (TAKE_PROFIT_MARKET)
-                await self.exchange.create_order(symbol, 'TAKE_PROFIT_MARKET', side_api, None, None, {
-                    'stopPrice': p_tp, 'closePosition': True, 'workingType': 'CONTRACT_PRICE'
-                })
+                # A. STOP LOSS (STOP_MARKET) + B. TAKE PROFIT (TAKE_PROFIT_MARKET), dikirim bersamaan.
+                # (batchOrders tidak bisa: Binance USDⓈ-M menolak order kondisional di endpoint batch)
+                sl_order, tp_order = await asyncio.gather(
+                    self._request_with_retry('create_order', symbol, 'STOP_MARKET', side_api, None, None, {
+                        'stopPrice': p_sl, 'closePosition': True, 'workingType': 'MARK_PRICE'
+                    }, label=f"SL {symbol}"),
+                    self._request_with_retry('create_order', symbol, 'TAKE_PROFIT_MARKET', side_api, None, None, {
+                        'stopPrice': p_tp, 'closePosition': True, 'workingType': 'CONTRACT_PRICE'
+                    }, label=f"TP {symbol}"),
+                    return_exceptions=True
+                )
+                for kind, result in (('sl', sl_order), ('tp', tp_order)):
+                    if isinstance(result, Exception):
+                        raise result  # Posisi belum aman -> Safety Monitor akan memasang ulang
+                    self._set_safety_order_id(symbol, kind, result)
                 
                 logger.info(f"✅ Safety Orders Installed: {symbol} | SL {p_sl} | TP {p_tp}")
 
@@ -299,7 +406,9 @@ class OrderExecutor:
                         "tp_price": tp_price,
                         "sl_price_initial": sl_price,
                         "side": side, # LONG/SHORT
-                        "trailing_active": False 
+                        "trailing_active": False,
+                        "sl_order_id": self.get_safety_order_id(symbol, 'sl'),
+                        "tp_order_id": self.get_safety_order_id(symbol, 'tp')
                     })
                     await self.save_tracker()
 
@@ -456,57 +565,208 @@ class OrderExecutor:
 
     async def _amend_sl_order(self, symbol, new_sl_price, side):
         """
-        Helper: Cancel old SL and create new one (or use modifyOrder if supported, 
-        but Cancel+Replace is safer/standard for simple bots).
-        Note: Since we use STOP_MARKET with closePosition=True, we just need to update trigger price.
+        Helper: Geser SL ke trigger baru memakai order ID yang sudah di-cache (tanpa fetch_open_orders).
+        - Qty posisi diketahui: place-then-cancel (SL baru reduceOnly dulu, baru cancel SL lama)
+          -> tidak ada jeda tanpa stop. closePosition tidak dipakai di sini karena Binance hanya
+          mengizinkan 1 order closePosition per arah (-4130).
+        - Qty tidak diketahui: cancel-then-place (closePosition) seperti sebelumnya, 2 call.
+        Binance tidak mendukung modify untuk STOP_MARKET (PUT /fapi/v1/order hanya LIMIT).
+        SL/TP adalah algo order (ccxt >= 4.5.37): cancel / lookup wajib pakai {'trigger': True}.
         """
+        async with self._symbol_lock(symbol):
+            await self._amend_sl_order_locked(symbol, new_sl_price, side)
+
+    async def _amend_sl_order_locked(self, symbol, new_sl_price, side):
         try:
-             # Binance Futures allows cancelling generic orders. 
-             # To be robust, let's Cancel All Open Orders for this symbol (TP is static, but SL moves).
-             # Wait! If we cancel ALL, we lose the TP order too.
-             # Ideally we should identify the SL order ID. But to keep it simple and robust:
-             # We can just Cancel ALL and Re-Place TP + New SL. 
-             # Or better: Fetch open orders, find STOP_MARKET, cancel it.
-             
-             orders = await self.exchange.fetch_open_orders(symbol)
-             sl_order_id = None
-             
-             for o in orders:
-                 if o['type'] == 'stop_market' or o['type'] == 'STOP_MARKET':
-                     sl_order_id = o['id']
-                     break
-            
-             if sl_order_id:
-                 try:
-                     await self.exchange.cancel_order(sl_order_id, symbol)
-                 except Exception as e:
-                     logger.warning(f"Failed to cancel old SL {sl_order_id}: {e}")
-
-             # Place New SL
-             p_sl = self.exchange.price_to_precision(symbol, new_sl_price)
-             side_api = 'sell' if side == 'LONG' else 'buy'
-             
-             await self.exchange.create_order(symbol, 'STOP_MARKET', side_api, None, None, {
+            old_sl_id = self.get_safety_order_id(symbol, 'sl')
+            if old_sl_id is None:
+                # Cache kosong (mis. habis restart): cari sekali lewat REST
+                old_sl_id = await self._lookup_sl_order_id(symbol)
+
+            p_sl = self.exchange.price_to_precision(symbol, new_sl_price)
+            side_api = 'sell' if side == 'LONG' else 'buy'
+            pos = self.position_cache.get(symbol.split('/')[0])
+            qty = pos.get('contracts') if pos else None
+
+            if qty:
+                new_order = await self._request_with_retry('create_order', symbol, 'STOP_MARKET', side_api,
+                                                           self.exchange.amount_to_precision(symbol, qty), None, {
+                    'stopPrice': p_sl, 'reduceOnly': True, 'workingType': 'MARK_PRICE'
+                }, label=f"SL {symbol}")
+                if old_sl_id and not await self._cancel_safety_order(symbol, old_sl_id):
+                    # SL lama masih hidup -> batalkan SL baru, jangan menumpuk stop reduceOnly
+                    new_id = new_order.get('id') if isinstance(new_order, dict) else None
+                    if new_id and not await self._cancel_safety_order(symbol, str(new_id)):
+                        logger.error(f"❌ {symbol}: 2 SL aktif ({old_sl_id}, {new_id}), cek manual!")
+                        await kirim_tele(f"⚠️ <b>DUPLICATE SL</b>\n{symbol}: SL {old_sl_id} & {new_id} aktif, cek manual.", alert=True)
+                    raise RuntimeError(f"cancel old SL {old_sl_id} failed")
+                self._set_safety_order_id(symbol, 'sl', new_order)
+            else:
+                if old_sl_id and not await self._cancel_safety_order(symbol, old_sl_id):
+                    raise RuntimeError(f"cancel old SL {old_sl_id} failed")  # closePosition kedua ditolak (-4130)
+                new_order = await self._request_with_retry('create_order', symbol, 'STOP_MARKET', side_api, None, None, {
                     'stopPrice': p_sl, 'closePosition': True, 'workingType': 'MARK_PRICE'
-             })
-             
+                }, label=f"SL {symbol}")
+                self._set_safety_order_id(symbol, 'sl', new_order)
+
+            # ID SL baru harus ikut tersimpan (setelah restart, ID lama = cancel meleset)
+            await self.save_tracker()
+
         except Exception as e:
             logger.error(f"❌ Failed to Amend SL {symbol}: {e}")
 
+    # --- [NEW] SAFETY ORDER ID INDEX ---
+    def get_safety_order_id(self, symbol, kind):
+        ids = self.safety_order_ids.get(symbol)
+        if ids and ids.get(kind):
+            return ids[kind]
+        # Fallback: ID yang tersimpan di tracker (bertahan setelah restart)
+        return self.safety_orders_tracker.get(symbol, {}).get(f'{kind}_order_id')
+
+    def _set_safety_order_id(self, symbol, kind, order):
+        order_id = order.get('id') if isinstance(order, dict) else None
+        if order_id:
+            self._index_safety_order(symbol, kind, str(order_id))
+
+    def _clear_safety_order_id(self, symbol, kind, order_id):
+        """Hapus ID hanya jika masih sama (event order lama tidak boleh menghapus ID order baru)."""
+        if self.get_safety_order_id(symbol, kind) != order_id:
+            return
+        self.safety_order_ids.get(symbol, {}).pop(kind, None)
+        self.safety_orders_tracker.get(symbol, {}).pop(f'{kind}_order_id', None)
+
+    async def _cancel_safety_order(self, symbol, order_id):
+        """Cancel algo order SL/TP. Return True jika order sudah tidak aktif (termasuk sudah hilang)."""
+        try:
+            await rest_scheduler.request(self.exchange, 'cancel_order', order_id, symbol, {'trigger': True}, priority=PRIORITY_ORDER)
+            return True
+        except ccxt.OrderNotFound:
+            return True  # Sudah ter-trigger / dibatalkan
+        except Exception as e:
+            logger.warning(f"Failed to cancel SL {order_id}: {e}")
+            return False
+
+    async def _lookup_sl_order_id(self, symbol):
+        orders = await rest_scheduler.request(self.exchange, 'fetch_open_orders', symbol, None, None, {'trigger': True},
+                                              priority=PRIORITY_ORDER)
+        for o in orders:
+            if o['type'] == 'stop_market' or o['type'] == 'STOP_MARKET':
+                self._set_safety_order_id(symbol, 'sl', o)
+                return str(o['id'])
+        return None
+
+    def on_order_update(self, o):
+        """
+        [NEW] Jaga index SL/TP dari ORDER_TRADE_UPDATE (payload['o']) tanpa REST.
+        NEW -> simpan ID, CANCELED/EXPIRED/FILLED -> hapus ID (jika masih ID yang sama).
+        Juga menjaga set open order (dipakai sync_pending_orders).
+        """
+        self._track_open_order(str(o.get('i', '')), o.get('X'))
+        kind = SAFETY_ORDER_KINDS.get(o.get('ot') or o.get('o'))
+        if not kind:
+            return
+        symbol = o['s'].replace('USDT', '/USDT')
+        order_id = str(o.get('i', ''))
+        status = o.get('X')
+        if status == 'NEW':
+            # Stop yang ter-trigger muncul sebagai order MARKET baru ('ot' tetap STOP_MARKET): bukan SL aktif
+            if o.get('o') in SAFETY_ORDER_KINDS:
+                self._index_safety_order(symbol, kind, order_id)
+        elif status in ('CANCELED', 'EXPIRED', 'FILLED'):
+            self._clear_safety_order_id(symbol, kind, order_id)
+
+    def on_algo_update(self, o):
+        """
+        [NEW] Index SL/TP dari ALGO_UPDATE (payload['o']): SL/TP hidup sebagai algo order.
+        NEW -> simpan algoId ('aid'); selain itu (CANCELED/TRIGGERED/FINISHED/REJECTED/EXPIRED) -> hapus.
+        """
+        kind = SAFETY_ORDER_KINDS.get(o.get('o'))
+        if not kind:
+            return
+        symbol = o['s'].replace('USDT', '/USDT')
+        order_id = str(o.get('aid', ''))
+        if o.get('X') == 'NEW':
+            self._index_safety_order(symbol, kind, order_id)
+        elif o.get('X') != 'TRIGGERING':
+            self._clear_safety_order_id(symbol, kind, order_id)
+
+    def _index_safety_order(self, symbol, kind, order_id):
+        self.safety_order_ids.setdefault(symbol, {})[kind] = order_id
+        if symbol in self.safety_orders_tracker:
+            self.safety_orders_tracker[symbol][f'{kind}_order_id'] = order_id
+
     async def remove_from_tracker(self, symbol):
         """Async remove symbol from safety tracker and save."""
+        self.safety_order_ids.pop(symbol, None)
         if symbol in self.safety_orders_tracker:
             del self.safety_orders_tracker[symbol]
             await self.save_tracker()
             logger.info(f"🗑️ Tracker cleaned for {symbol}")
 
+    # --- [NEW] EVENT-SOURCED POSITIONS ---
+    def apply_account_update(self, payload):
+        """
+        Update position_cache dari delta posisi ACCOUNT_UPDATE (tanpa REST).
+        Payload: {"e": "ACCOUNT_UPDATE", "E": ms, "a": {"P": [{"s": "BTCUSDT", "pa": "-0.1", "ep": "50000", "ps": "BOTH"}, ...]}}
+        Return: list simbol yang posisinya baru terbuka / berubah (bukan yang tertutup).
+        """
+        # Waktu terima lokal (bukan 'E' exchange): dibandingkan dengan waktu mulai fetch REST lokal,
+        # clock skew tidak boleh membuat snapshot REST lama menimpa event yang lebih baru
+        received_ts = int(time.time() * 1000)
+        changed = []
+        for p in payload.get('a', {}).get('P', []):
+            try:
+                symbol = p['s'].replace('USDT', '/USDT')
+                base = symbol.split('/')[0]
+                amt = float(p.get('pa', 0))
+                pos_side = p.get('ps', 'BOTH')
+                self._position_event_ts[base] = received_ts
+
+                if amt == 0:
+                    current = self.position_cache.get(base)
+                    # Hedge mode: leg lain yang ditutup tidak boleh menghapus posisi yang masih terbuka
+                    if current and (pos_side == 'BOTH' or current['side'] == pos_side):
+                        del self.position_cache[base]
+                    continue
+
+                side = pos_side if pos_side in ('LONG', 'SHORT') else ('LONG' if amt > 0 else 'SHORT')
+                self.position_cache[base] = {
+                    'symbol': symbol,
+                    'contracts': abs(amt),
+                    'side': side,
+                    'entryPrice': float(p.get('ep', 0))
+                }
+                changed.append(symbol)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"⚠️ Invalid ACCOUNT_UPDATE position {p}: {e}")
+        return changed
+
+    def needs_position_reconcile(self, stream_state=None):
+        """
+        REST reconcile hanya jika perlu:
+        - user stream tidak tersedia / putus (fallback polling),
+        - user stream baru reconnect (event selama putus bisa hilang),
+        - interval POSITION_RECONCILE_INTERVAL terlewati.
+        stream_state: (connected, reconnects) dari MarketDataManager.user_stream_state()
+        """
+        if stream_state is None or not stream_state[0]:
+            return True
+        if stream_state != self._reconcile_stream_state:
+            return True
+        return time.time() - self._last_reconcile >= getattr(config, 'POSITION_RECONCILE_INTERVAL', 300)
+
+    async def reconcile_positions(self, stream_state=None):
+        """REST reconcile (low frequency) + deteksi drift terhadap cache hasil event WS."""
+        self._reconcile_stream_state = stream_state
+        return await self.sync_positions()
+
     async def sync_positions(self):
         """Fetch real-time positions from Exchange"""
         try:
-            positions = await self.exchange.fetch_positions()
+            fetch_started = int(time.time() * 1000)
+            positions = await rest_scheduler.request(self.exchange, 'fetch_positions', priority=PRIORITY_SAFETY)
             # [FIX] Rebuild cache from scratch to remove closed positions
             new_cache = {}
-            count = 0
             for pos in positions:
                 amt = float(pos['contracts'])
                 if amt > 0:
@@ -518,18 +778,71 @@ class OrderExecutor:
                         'side': 'LONG' if pos['side'] == 'long' else 'SHORT',
                         'entryPrice': float(pos['entryPrice'])
                     }
-                    count += 1
-            
+
+            # [NEW] Drift detection: cache dari event WS vs snapshot REST.
+            # Simbol yang di-update WS selama fetch berlangsung -> versi WS lebih baru, dipertahankan.
+            for base in set(self.position_cache) | set(new_cache):
+                if self._position_event_ts.get(base, 0) >= fetch_started:
+                    if base in self.position_cache:
+                        new_cache[base] = self.position_cache[base]
+                    else:
+                        new_cache.pop(base, None)
+                    continue
+                old, new = self.position_cache.get(base), new_cache.get(base)
+                if old is None or new is None or old['side'] != new['side'] or old['contracts'] != new['contracts']:
+                    if self._last_reconcile:  # Sync pertama (startup) bukan drift
+                        self.position_drift_count += 1
+                        logger.warning(f"⚠️ Position drift {base}: cache {old} -> exchange {new}")
+
             self.position_cache = new_cache
-            return count
+            self._last_reconcile = time.time()
+            return len(new_cache)
         except Exception as e:
             logger.error(f"Sync Pos Error: {e}")
             return 0
             
-    async def sync_pending_orders(self):
+    # --- [NEW] OPEN ORDER SET (dari ORDER_TRADE_UPDATE) ---
+    def _track_open_order(self, order_id, status):
+        if status in OPEN_ORDER_STATUSES:
+            self.open_order_ids.add(order_id)
+        else:
+            self.open_order_ids.discard(order_id)
+        if self._order_events_during_resync is not None:
+            self._order_events_during_resync.append((order_id, status))
+
+    def needs_open_orders_resync(self, stream_state=None):
+        """Set open order dari event hanya valid jika user stream hidup & tidak reconnect sejak resync terakhir."""
+        if stream_state is None or not stream_state[0]:
+            return True
+        if stream_state != self._open_orders_stream_state:
+            return True
+        return time.time() - self._last_open_orders_resync >= getattr(config, 'OPEN_ORDERS_RECONCILE_INTERVAL', 300)
+
+    async def resync_open_orders(self, stream_state=None):
+        """1x fetch_open_orders tanpa simbol (semua simbol) -> rebuild set open order."""
+        self._order_events_during_resync = []
+        try:
+            orders = await rest_scheduler.request(self.exchange, 'fetch_open_orders', priority=PRIORITY_SAFETY)
+            open_ids = {str(o['id']) for o in orders}
+            # Event WS yang datang selama fetch lebih baru dari snapshot REST
+            for order_id, status in self._order_events_during_resync:
+                if status in OPEN_ORDER_STATUSES:
+                    open_ids.add(order_id)
+                else:
+                    open_ids.discard(order_id)
+            self.open_order_ids = open_ids
+            self._open_orders_stream_state = stream_state
+            self._last_open_orders_resync = time.time()
+        finally:
+            self._order_events_during_resync = None
+
+    async def sync_pending_orders(self, stream_state=None):
         """
         [NEW] Sync open orders to detect manual cancellations.
         Only checks symbols that are in 'WAITING_ENTRY' status.
+        Open order diambil dari set hasil ORDER_TRADE_UPDATE; REST (1 call semua simbol)
+        hanya jika user stream putus / baru reconnect / interval rekonsiliasi lewat.
+        Expiry limit order ditangani TimerService via run_timers (tepat waktu, bukan per sweep 60 detik).
         """
         # 1. Identify symbols to check
         symbols_to_check = []
@@ -540,81 +853,85 @@ class OrderExecutor:
         if not symbols_to_check:
             return
 
-        # 2. Check symbols in parallel
-        sem = asyncio.Semaphore(getattr(config, 'CONCURRENCY_LIMIT', 10))
+        # 2. Pastikan set open order valid
+        if self.needs_open_orders_resync(stream_state):
+            try:
+                await self.resync_open_orders(stream_state)
+            except Exception as e:
+                logger.error(f"⚠️ Sync Pending Error (open orders): {e}")
+                return  # Set belum valid -> jangan hapus tracker berdasarkan data lama
+
         changes_made = False
+        for symbol in symbols_to_check:
+            tracker_data = self.safety_orders_tracker.get(symbol)
+            if not tracker_data or tracker_data.get('status') != 'WAITING_ENTRY':
+                continue
+            tracked_id = str(tracker_data.get('entry_id', ''))
+            if time.time() > tracker_data.get('expires_at', float('inf')):
+                await self._expire_order(symbol, tracked_id)  # Fallback jika timer expiry tidak berjalan
+                continue
+            if tracked_id in self.open_order_ids:
+                continue
+
+            # Order is missing! Either Filled or Cancelled.
+            # Case A: Filled? (Check Position Cache)
+            base = symbol.split('/')[0]
+            if base in self.position_cache:
+                # It is filled! Update tracker.
+                logger.info(f"✅ Order {symbol} found filled during sync. Queuing for Safety Orders (PENDING).")
+                tracker_data['status'] = 'PENDING'
+                tracker_data['last_check'] = time.time()
+                changes_made = True
+
+            # Case B: Cancelled/Expired?
+            else:
+                # Not active, not in open orders -> Cancelled manually
+                logger.info(f"🗑️ Found Stale/Cancelled Order for {symbol}. Removing from tracker.")
+                del self.safety_orders_tracker[symbol]
+                changes_made = True
 
-        async def check_symbol(symbol):
-            nonlocal changes_made
-            async with sem:
-                try:
-                    # Fetch Open Orders from Binance
-                    open_orders = await self.exchange.fetch_open_orders(symbol)
-                    open_order_ids = [str(o['id']) for o in open_orders]
-                    
-                    # Check if our tracked order exists
-                    # (Re-check existence in case it was modified concurrently - rare but safe)
-                    if symbol not in self.safety_orders_tracker:
-                        return
+                await kirim_tele(
+                    f"🗑️ <b>ORDER SYNC</b>\n"
+                    f"Order for {symbol} was cancelled manually/expired.\n"
+                    f"Tracker cleaned."
+                )
 
-                    tracker_data = self.safety_orders_tracker[symbol]
-                    tracked_id = str(tracker_data.get('entry_id', ''))
-                    
-                    # [NEW] Check Expiry Time First
-                    current_time = time.time()
-                    expires_at = tracker_data.get('expires_at', float('inf'))
-
-                    if current_time > expires_at:
-                        # Order expired -> Cancel & Cleanup
-                        logger.info(f"⏰ Limit Order {symbol} expired after timeout. Cancelling...")
-                        try:
-                            await self.exchange.cancel_order(tracked_id, symbol)
-                        except Exception as e:
-                            logger.warning(f"⚠️ Failed to cancel expired order {symbol} (might be already gone): {e}")
-
-                        # Clean tracker
-                        del self.safety_orders_tracker[symbol]
-                        changes_made = True
-                        
-                        await kirim_tele(
-                            f"⏰ <b>ORDER EXPIRED</b>\n"
-                            f"Limit Order {symbol} dibatalkan karena timeout > 2 jam.\n"
-                            f"Tracker cleaned."
-                        )
-                        return # Skip further checks since we removed it
-                    
-                    if tracked_id not in open_order_ids:
-                        # Order is missing! Either Filled or Cancelled.
-                        
-                        # Case A: Filled? (Check Position Cache)
-                        base = symbol.split('/')[0]
-                        if base in self.position_cache:
-                            # It is filled! Update tracker.
-                            logger.info(f"✅ Order {symbol} found filled during sync. Queuing for Safety Orders (PENDING).")
-                            self.safety_orders_tracker[symbol]['status'] = 'PENDING'
-                            self.safety_orders_tracker[symbol]['last_check'] = time.time()
-                            changes_made = True
-                        
-                        # Case B: Cancelled/Expired?
-                        else:
-                            # Not active, not in open orders -> Cancelled manually
-                            logger.info(f"🗑️ Found Stale/Cancelled Order for {symbol}. Removing from tracker.")
-                            if symbol in self.safety_orders_tracker:
-                                del self.safety_orders_tracker[symbol]
-                                changes_made = True
-
-                            await kirim_tele(
-                                f"🗑️ <b>ORDER SYNC</b>\n"
-                                f"Order for {symbol} was cancelled manually/expired.\n"
-                                f"Tracker cleaned."
-                            )
+        # 3. Save only if needed
+        if changes_made:
+            await self.save_tracker()
 
-                except Exception as e:
-                    logger.error(f"⚠️ Sync Pending Error for {symbol}: {e}")
+    # --- [NEW] TIMERS (LIMIT ORDER EXPIRY & COOLDOWN) ---
+    def schedule_expiry(self, symbol, entry_id, expires_at):
+        self.timers.schedule(('expiry', symbol), expires_at, self._expire_order, symbol, str(entry_id))
+
+    async def run_timers(self):
+        """Jalankan TimerService (expiry limit order + akhir cooldown tepat waktu, tanpa polling)."""
+        for symbol, data in list(self.safety_orders_tracker.items()):
+            if data.get('status') == 'WAITING_ENTRY' and 'expires_at' in data:
+                self.schedule_expiry(symbol, data.get('entry_id', ''), data['expires_at'])
+        logger.info(f"⏰ Timer Service Started ({len(self.timers)} pending)")
+        await self.timers.run()
+
+    async def _expire_order(self, symbol, entry_id):
+        tracker_data = self.safety_orders_tracker.get(symbol)
+        # Entry heap basi (order sudah fill / cancel / diganti order baru) -> abaikan
+        if not tracker_data or tracker_data.get('status') != 'WAITING_ENTRY' or str(tracker_data.get('entry_id', '')) != entry_id:
+            return
 
-        # Run all checks
-        await asyncio.gather(*[check_symbol(sym) for sym in symbols_to_check])
+        # Order expired -> Cancel & Cleanup
+        logger.info(f"⏰ Limit Order {symbol} expired after timeout. Cancelling...")
+        try:
+            await rest_scheduler.request(self.exchange, 'cancel_order', entry_id, symbol, priority=PRIORITY_ORDER)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to cancel expired order {symbol} (might be already gone): {e}")
 
-        # 3. Save only if needed
-        if changes_made:
+        # Clean tracker
+        if self.safety_orders_tracker.get(symbol) is tracker_data:
+            del self.safety_orders_tracker[symbol]
             await self.save_tracker()
+
+            await kirim_tele(
+                f"⏰ <b>ORDER EXPIRED</b>\n"
+                f"Limit Order {symbol} dibatalkan karena timeout > 2 jam.\n"
+                f"Tracker cleaned."
+            )
@@ -0,0 +1,138 @@
+import math
+import config
+from src.utils.helper import logger
+
+
+def normalize_side(side):
+    """'buy' / 'long' -> 'LONG', 'sell' / 'short' -> 'SHORT'."""
+    return 'LONG' if str(side).upper() in ('BUY', 'LONG') else 'SHORT'
+
+
+class ExposureManager:
+    """
+    Limiter exposure berbasis korelasi antar aset (di atas MAX_POSITIONS_PER_CATEGORY).
+
+    - Matriks korelasi watchlist di-cache (refresh 1x per candle close TIMEFRAME_TREND BTC,
+      + maks 1x per close simbol ter-index yang pasangannya masih NaN: close telat dari BTC).
+    - check_entry() O(posisi): untuk setiap posisi / pending entry, korelasi searah
+      (korelasi positif + arah sama, atau korelasi negatif + arah berlawanan) >= threshold
+      dihitung sebagai risiko terkonsentrasi -> entry di-downsize atau ditolak.
+    """
+
+    def __init__(self, executor, market_data=None):
+        self.executor = executor
+        self.market_data = market_data
+
+        self.threshold = getattr(config, 'EXPOSURE_CORRELATION_THRESHOLD', 0.75)
+        self.max_correlated = getattr(config, 'EXPOSURE_MAX_CORRELATED', 3)
+        self.downsize_step = getattr(config, 'EXPOSURE_DOWNSIZE_PER_CORRELATED', 0.25)
+        self.min_scale = getattr(config, 'EXPOSURE_MIN_SCALE', 0.25)
+
+        self._index = {}  # {symbol: idx matriks}
+        self._matrix = None
+        self._matrix_key = None
+        self._gap_close_ts = {}  # {symbol: ts close terakhir yang sudah dicoba untuk pasangan NaN}
+
+    # --- CORRELATION INDEX ---
+    def update_correlations(self, symbols, matrix):
+        self._index = {sym: i for i, sym in enumerate(symbols)}
+        self._matrix = matrix
+
+    def _closed_bar_ts(self, symbol):
+        bars = self.market_data.market_store.get(symbol, {}).get(config.TIMEFRAME_TREND, [])
+        return int(bars[-2][0]) if len(bars) >= 2 else None
+
+    def refresh_correlations(self, force=False):
+        """
+        Ambil ulang matriks dari MarketDataManager jika ada candle trend BTC baru yang close.
+        force=True: ambil ulang walau candle BTC sama (close simbol lain yang telat masuk).
+        Return True jika matriks diambil ulang.
+        """
+        if self.market_data is None:
+            return False
+        key = self._closed_bar_ts(config.BTC_SYMBOL)
+        if key is None or (key == self._matrix_key and not force):
+            return False
+        symbols, matrix = self.market_data.get_correlation_matrix()
+        self.update_correlations(symbols, matrix)
+        self._matrix_key = key
+        return True
+
+    def _has_new_gap_close(self, pairs, fetched):
+        """
+        Pasangan NaN (keduanya ter-index) yang salah satu simbolnya punya close baru sejak dicek terakhir
+        -> matriks perlu diambil ulang. Simbol di luar watchlist / history kurang tidak memicu fetch berulang.
+        """
+        stale = False
+        for sym in {s for pair in pairs for s in pair if s in self._index}:
+            ts = self._closed_bar_ts(sym)
+            if ts is None or self._gap_close_ts.get(sym) == ts:
+                continue
+            self._gap_close_ts[sym] = ts
+            stale = stale or not fetched  # Baru di-fetch di panggilan ini -> close tersebut sudah ikut
+        return stale
+
+    def correlation(self, sym_a, sym_b):
+        i, j = self._index.get(sym_a), self._index.get(sym_b)
+        if i is None or j is None or self._matrix is None:
+            return None
+        value = float(self._matrix[i, j])
+        return None if math.isnan(value) else value
+
+    # --- EXPOSURE ---
+    def open_exposures(self):
+        """[(symbol, side)] posisi aktif + entry yang belum terisi (WAITING_ENTRY / PENDING)."""
+        exposures = {pos['symbol']: pos['side'] for pos in self.executor.position_cache.values()}
+        for sym, data in self.executor.safety_orders_tracker.items():
+            if sym not in exposures and data.get('status') in ('WAITING_ENTRY', 'PENDING') and data.get('side'):
+                exposures[sym] = data['side']
+        return list(exposures.items())
+
+    def check_entry(self, symbol, side):
+        """
+        Evaluasi entry baru.
+
+        Returns:
+            dict: {allowed, scale, correlated: [(symbol, corr), ...], reason}
+        """
+        fetched = self.refresh_correlations()
+        side = normalize_side(side)
+        others = [(other, other_side) for other, other_side in self.open_exposures() if other != symbol]
+
+        # [NEW] Kolom masih NaN (close simbol telat dari BTC) -> ambil ulang, jangan tunggu candle berikutnya
+        gaps = [(symbol, other) for other, _ in others
+                if symbol in self._index and other in self._index and self.correlation(symbol, other) is None]
+        if gaps and self.market_data is not None and self._has_new_gap_close(gaps, fetched):
+            self.refresh_correlations(force=True)
+
+        correlated = []
+        for other, other_side in others:
+            corr = self.correlation(symbol, other)
+            if corr is None:
+                continue
+            directional = corr if other_side == side else -corr
+            if directional >= self.threshold:
+                correlated.append((other, round(corr, 2)))
+
+        n = len(correlated)
+        if self.max_correlated > 0 and n >= self.max_correlated:
+            return {
+                "allowed": False,
+                "scale": 0.0,
+                "correlated": correlated,
+                "reason": f"{n} correlated {side} exposures (>= {self.max_correlated})"
+            }
+
+        scale = max(self.min_scale, 1.0 - self.downsize_step * n)
+        return {
+            "allowed": True,
+            "scale": scale,
+            "correlated": correlated,
+            "reason": f"{n} correlated exposures -> size x{scale:.2f}" if n else "OK"
+        }
+
+    def log_decision(self, symbol, result):
+        if not result['allowed']:
+            logger.info(f"🛑 Exposure Limit {symbol}: {result['reason']} {result['correlated']}. Skip entry.")
+        elif result['scale'] < 1.0:
+            logger.info(f"⚖️ Exposure Downsize {symbol}: {result['reason']} {result['correlated']}")
@@ -0,0 +1,439 @@
+import math
+from collections import deque
+import config
+from src.utils.helper import parse_timeframe_to_seconds
+
+# --- INCREMENTAL INDICATOR PRIMITIVES ---
+# Semua primitive di bawah mereplika semantik pandas / pandas_ta yang dipakai
+# di _calculate_tech_data_threaded, tapi di-update satu candle per langkah (O(1)).
+
+_NAN = float('nan')
+_EPS = 2.220446049250313e-16  # sys.float_info.epsilon (dipakai pandas_ta.zero)
+
+
+def _isnan(x):
+    return x != x
+
+
+class _EwmMean:
+    """
+    Replika Series.ewm(com=..., adjust=False).mean() milik pandas.
+    Termasuk perilaku NaN (leading NaN di-skip, NaN di tengah memperbesar decay).
+    """
+    __slots__ = ('alpha', 'factor', 'value', 'old_wt')
+
+    def __init__(self, com):
+        self.alpha = 1.0 / (1.0 + com)
+        self.factor = 1.0 - self.alpha
+        self.value = _NAN
+        self.old_wt = 1.0
+
+    @classmethod
+    def from_span(cls, span):
+        return cls((span - 1) / 2.0)
+
+    @classmethod
+    def from_alpha(cls, alpha):
+        return cls(1.0 / alpha - 1.0)
+
+    def update(self, x):
+        if not _isnan(self.value):
+            self.old_wt *= self.factor
+            if not _isnan(x):
+                # avoid numerical errors on constant series (sama seperti pandas)
+                if self.value != x:
+                    self.value = (self.old_wt * self.value + self.alpha * x) / (self.old_wt + self.alpha)
+                self.old_wt = 1.0
+        elif not _isnan(x):
+            self.value = x
+        return self.value
+
+    def peek(self, x):
+        """Nilai EWM jika x di-update, tanpa mengubah state."""
+        if _isnan(self.value):
+            return x
+        if _isnan(x) or self.value == x:
+            return self.value
+        old_wt = self.old_wt * self.factor
+        return (old_wt * self.value + self.alpha * x) / (old_wt + self.alpha)
+
+
+class _SeededEwm:
+    """
+    EWM dengan seed SMA pada bar ke-`length` (pandas_ta presma=True).
+    Dipakai untuk EMA (span) dan ATR (rma, alpha=1/length).
+    """
+    __slots__ = ('length', 'ewm', 'seed_buf', 'count')
+
+    def __init__(self, length, ewm):
+        self.length = length
+        self.ewm = ewm
+        self.seed_buf = []
+        self.count = 0
+
+    def update(self, x):
+        self.count += 1
+        if self.count < self.length:
+            self.seed_buf.append(x)
+            return _NAN
+        if self.count == self.length:
+            self.seed_buf.append(x)
+            valid = [v for v in self.seed_buf if not _isnan(v)]
+            seed = math.fsum(valid) / len(valid) if valid else _NAN
+            self.seed_buf = []
+            return self.ewm.update(seed)
+        return self.ewm.update(x)
+
+    @property
+    def value(self):
+        return self.ewm.value if self.count >= self.length else _NAN
+
+    def peek(self, x):
+        if self.count < self.length:
+            return _NAN
+        return self.ewm.peek(x)
+
+
+class _RollingWindow:
+    """
+    Rolling mean & variance (ddof=1) ukuran tetap, sliding Welford add/remove.
+    Output NaN jika window belum penuh atau ada NaN di dalam window.
+    """
+    __slots__ = ('length', 'values', 'n', 'mean_', 'm2', 'nan_count')
+
+    def __init__(self, length):
+        self.length = length
+        self.values = deque()
+        self.n = 0
+        self.mean_ = 0.0
+        self.m2 = 0.0
+        self.nan_count = 0
+
+    def _add(self, x):
+        if _isnan(x):
+            self.nan_count += 1
+            return
+        self.n += 1
+        delta = x - self.mean_
+        self.mean_ += delta / self.n
+        self.m2 += delta * (x - self.mean_)
+
+    def _remove(self, x):
+        if _isnan(x):
+            self.nan_count -= 1
+            return
+        self.n -= 1
+        if self.n == 0:
+            self.mean_ = 0.0
+            self.m2 = 0.0
+            return
+        delta = x - self.mean_
+        self.mean_ -= delta / self.n
+        self.m2 -= delta * (x - self.mean_)
+
+    def update(self, x):
+        self.values.append(x)
+        self._add(x)
+        if len(self.values) > self.length:
+            self._remove(self.values.popleft())
+        return self.mean
+
+    @property
+    def ready(self):
+        return len(self.values) == self.length and self.nan_count == 0
+
+    @property
+    def mean(self):
+        return self.mean_ if self.ready else _NAN
+
+    @property
+    def std(self):
+        if not self.ready or self.length < 2:
+            return _NAN
+        return math.sqrt(max(self.m2, 0.0) / (self.length - 1))
+
+
+class _RollingExtreme:
+    """Rolling min/max dengan monotonic deque (amortized O(1)), NaN-propagating."""
+    __slots__ = ('length', 'is_max', 'window', 'idx', 'nan_idx')
+
+    def __init__(self, length, is_max):
+        self.length = length
+        self.is_max = is_max
+        self.window = deque()   # (index, value) monotonic
+        self.idx = -1
+        self.nan_idx = -1       # index NaN terakhir yang masuk window
+
+    def update(self, x):
+        self.idx += 1
+        start = self.idx - self.length + 1
+        if _isnan(x):
+            self.nan_idx = self.idx
+        else:
+            if self.is_max:
+                while self.window and self.window[-1][1] <= x:
+                    self.window.pop()
+            else:
+                while self.window and self.window[-1][1] >= x:
+                    self.window.pop()
+            self.window.append((self.idx, x))
+        while self.window and self.window[0][0] < start:
+            self.window.popleft()
+        if start < 0 or self.nan_idx >= start or not self.window:
+            return _NAN
+        return self.window[0][1]
+
+
+# --- INDICATOR STATES ---
+
+class ExecIndicatorState:
+    """
+    State indikator untuk timeframe eksekusi (EMA, RSI, ADX, Vol MA, BB, StochRSI, ATR).
+    Setiap update() memproses SATU candle yang sudah close.
+    """
+
+    def __init__(self):
+        self.ema_fast = _SeededEwm(config.EMA_FAST, _EwmMean.from_span(config.EMA_FAST))
+        self.ema_slow = _SeededEwm(config.EMA_SLOW, _EwmMean.from_span(config.EMA_SLOW))
+
+        self.rsi_gain = _EwmMean.from_alpha(1.0 / config.RSI_PERIOD)
+        self.rsi_loss = _EwmMean.from_alpha(1.0 / config.RSI_PERIOD)
+
+        # ATR standalone (prenan=False) & ATR internal ADX (prenan=True)
+        self.atr = _SeededEwm(config.ATR_PERIOD, _EwmMean.from_alpha(1.0 / config.ATR_PERIOD))
+        self.adx_atr = _SeededEwm(config.ADX_PERIOD, _EwmMean.from_alpha(1.0 / config.ADX_PERIOD))
+        self.adx_pos = _EwmMean.from_alpha(1.0 / config.ADX_PERIOD)
+        self.adx_neg = _EwmMean.from_alpha(1.0 / config.ADX_PERIOD)
+        self.adx_dx = _EwmMean.from_alpha(1.0 / config.ADX_PERIOD)
+
+        self.vol_ma = _RollingWindow(config.VOL_MA_PERIOD)
+        self.bb = _RollingWindow(config.BB_LENGTH)
+
+        self.stoch_low = _RollingExtreme(config.STOCHRSI_LEN, is_max=False)
+        self.stoch_high = _RollingExtreme(config.STOCHRSI_LEN, is_max=True)
+        self.stoch_k = _RollingWindow(config.STOCHRSI_K)
+        self.stoch_d = _RollingWindow(config.STOCHRSI_D)
+
+        self.prev = None     # candle close sebelumnya [ts, o, h, l, c, v]
+        self.last = None     # candle close terakhir
+        self.count = 0
+        self.values = {}
+
+        # Minimal bar agar semua indikator valid (sama seperti syarat pandas_ta)
+        self.min_bars = max(
+            config.EMA_SLOW + 4,
+            config.STOCHRSI_LEN + config.RSI_PERIOD + 1,
+            config.BB_LENGTH,
+            config.VOL_MA_PERIOD,
+            config.ATR_PERIOD + 1,
+            config.ADX_PERIOD * 2,
+        )
+
+    @property
+    def last_ts(self):
+        return self.last[0] if self.last is not None else None
+
+    @property
+    def ready(self):
+        return self.count >= self.min_bars
+
+    def update(self, candle):
+        ts, o, h, l, c, v = (float(x) for x in candle[:6])
+        prev = self.last
+
+        ema_fast = self.ema_fast.update(c)
+        ema_slow = self.ema_slow.update(c)
+
+        # RSI (rma gain/loss)
+        if prev is None:
+            gain = loss = _NAN
+        else:
+            diff = c - prev[4]
+            gain = diff if diff > 0 else 0.0
+            loss = diff if diff < 0 else 0.0
+        avg_gain = self.rsi_gain.update(gain)
+        avg_loss = self.rsi_loss.update(loss)
+        denom = avg_gain + abs(avg_loss)
+        rsi = 100.0 * avg_gain / denom if denom != 0 else _NAN
+
+        # True Range
+        hl = abs(h - l)
+        if prev is None:
+            tr = hl
+            tr_prenan = _NAN
+        else:
+            pc = prev[4]
+            tr = max(hl, abs(h - pc), abs(pc - l))
+            tr_prenan = tr
+        atr = self.atr.update(tr)
+
+        # ADX
+        if prev is None:
+            pos = neg = _NAN
+        else:
+            up = h - prev[2]
+            dn = prev[3] - l
+            pos = up if (up > dn and up > 0) else 0.0
+            neg = dn if (dn > up and dn > 0) else 0.0
+            if abs(pos) < _EPS: pos = 0.0
+            if abs(neg) < _EPS: neg = 0.0
+        rma_pos = self.adx_pos.update(pos)
+        rma_neg = self.adx_neg.update(neg)
+        atr_adx = self.adx_atr.update(tr_prenan)
+        dx = _NAN
+        if not _isnan(atr_adx):
+            k = 100.0 / atr_adx if atr_adx != 0 else math.inf
+            dmp = k * rma_pos
+            dmn = k * rma_neg
+            total = dmp + dmn
+            if total != 0 and not _isnan(total):
+                dx = 100.0 * abs(dmp - dmn) / total
+        adx = self.adx_dx.update(dx)
+
+        # Volume MA & Bollinger Bands
+        vol_ma = self.vol_ma.update(v)
+        bb_mid = self.bb.update(c)
+        bb_std = self.bb.std
+        bb_upper = bb_mid + config.BB_STD * bb_std
+        bb_lower = bb_mid - config.BB_STD * bb_std
+
+        # Stochastic RSI
+        lowest = self.stoch_low.update(rsi)
+        highest = self.stoch_high.update(rsi)
+        rng = highest - lowest
+        if _isnan(rng) or _isnan(rsi):
+            stoch = _NAN
+        elif rng == 0:
+            stoch = 0.0
+        else:
+            stoch = 100.0 * (rsi - lowest) / rng
+        stoch_k = self.stoch_k.update(stoch)
+        stoch_d = self.stoch_d.update(stoch_k)
+
+        self.prev = prev
+        self.last = [ts, o, h, l, c, v]
+        self.count += 1
+        self.values = {
+            "EMA_FAST": ema_fast,
+            "EMA_SLOW": ema_slow,
+            "RSI": rsi,
+            "ADX": adx,
+            "VOL_MA": vol_ma,
+            "BB_UPPER": bb_upper,
+            "BB_LOWER": bb_lower,
+            "STOCH_K": stoch_k,
+            "STOCH_D": stoch_d,
+            "ATR": atr,
+        }
+
+
+class TrendIndicatorState:
+    """State EMA untuk timeframe trend (Global Trend & BTC Trend)."""
+
+    def __init__(self, ema_periods):
+        self.emas = {p: _SeededEwm(p, _EwmMean.from_span(p)) for p in ema_periods}
+        self.last = None
+        self.count = 0
+
+    @property
+    def last_ts(self):
+        return self.last[0] if self.last is not None else None
+
+    def update(self, candle):
+        c = float(candle[4])
+        for ema in self.emas.values():
+            ema.update(c)
+        self.last = [float(x) for x in candle[:6]]
+        self.count += 1
+
+    def ema(self, period):
+        return self.emas[period].value
+
+    def peek_ema(self, period, forming_close):
+        """EMA termasuk candle berjalan (setara ema.iloc[-1] di pandas)."""
+        return self.emas[period].peek(float(forming_close))
+
+
+# --- ENGINE ---
+
+class IndicatorEngine:
+    """
+    Registry state indikator per (symbol, timeframe).
+    - on_candle_close() dipanggil dari _handle_kline saat candle close (O(1)).
+    - State di-rebuild lazily dari market_store jika belum ada / ada gap candle.
+    """
+
+    def __init__(self):
+        self._exec_states = {}
+        self._trend_states = {}
+        self._interval_ms = {}
+
+    def _get_interval_ms(self, timeframe):
+        if timeframe not in self._interval_ms:
+            self._interval_ms[timeframe] = parse_timeframe_to_seconds(timeframe) * 1000
+        return self._interval_ms[timeframe]
+
+    def _trend_periods(self):
+        return sorted({config.EMA_TREND_MAJOR, config.BTC_EMA_PERIOD})
+
+    def _new_state(self, timeframe):
+        if timeframe == config.TIMEFRAME_EXEC:
+            return ExecIndicatorState()
+        return TrendIndicatorState(self._trend_periods())
+
+    def _registry(self, timeframe):
+        if timeframe == config.TIMEFRAME_EXEC:
+            return self._exec_states
+        if timeframe == config.TIMEFRAME_TREND:
+            return self._trend_states
+        return None
+
+    def on_candle_close(self, symbol, timeframe, candle):
+        """Update incremental satu candle close. Gap/out-of-order -> state di-invalidate."""
+        registry = self._registry(timeframe)
+        if registry is None:
+            return
+        state = registry.get(symbol)
+        if state is None or state.last_ts is None:
+            return  # Belum pernah di-build, nanti di-rebuild lazily dari store
+
+        ts = float(candle[0])
+        if ts <= state.last_ts:
+            return  # Duplikat
+        if ts - state.last_ts != self._get_interval_ms(timeframe):
+            # Ada candle yang terlewat (WS reconnect dll) -> rebuild saat dibutuhkan
+            del registry[symbol]
+            return
+        state.update(candle)
+
+    def _sync_state(self, symbol, timeframe, bars):
+        """Pastikan state sinkron dengan bars[-2] (candle close terakhir di store)."""
+        registry = self._registry(timeframe)
+        if registry is None or len(bars) < 2:
+            return None
+
+        last_closed_ts = float(bars[-2][0])
+        state = registry.get(symbol)
+        if state is not None and state.last_ts == last_closed_ts:
+            return state
+
+        # Rebuild dari store (sekali saat warmup / setelah gap)
+        state = self._new_state(timeframe)
+        for i in range(len(bars) - 1):
+            state.update(bars[i])
+        registry[symbol] = state
+        return state
+
+    def exec_state(self, symbol, bars_exec):
+        return self._sync_state(symbol, config.TIMEFRAME_EXEC, bars_exec)
+
+    def trend_state(self, symbol, bars_trend):
+        return self._sync_state(symbol, config.TIMEFRAME_TREND, bars_trend)
+
+    def reset(self, symbol=None):
+        if symbol is None:
+            self._exec_states.clear()
+            self._trend_states.clear()
+        else:
+            self._exec_states.pop(symbol, None)
+            self._trend_states.pop(symbol, None)
@@ -1,88 +1,149 @@
 
+import asyncio
+import os
+import time
+import uuid
 import pandas as pd
+from collections import deque
 from datetime import datetime
 import json
 from src.utils.helper import logger
 from src.modules.mongo_manager import MongoManager
+try:
+    from src import config
+except ImportError:
+    import config
 
 class TradeJournal:
-    def __init__(self):
-        # Initialize MongoManager
-        self.mongo = MongoManager()
+    """
+    Journal trade (MongoDB).
+
+    [NEW] Write-behind: log_trade() hanya menyusun dokumen + masuk antrian (tidak pernah
+    menunggu database). Writer task menulis batch via insert_many di thread terpisah.
+    Batch yang gagal di-spill ke file JSONL append-only dan di-retry berurutan.
+    """
+
+    def __init__(self, mongo=None):
+        self._mongo = mongo  # Lazy: koneksi Mongo (blocking s/d 5 detik) dibuat di thread writer / saat load_trades
+        self.spill_path = getattr(config, 'JOURNAL_SPILL_FILE', 'journal_spill.jsonl')
+        self.quarantine_path = getattr(config, 'JOURNAL_QUARANTINE_FILE', 'journal_quarantine.jsonl')
+        self.batch_size = getattr(config, 'JOURNAL_BATCH_SIZE', 50)
+        self.flush_interval = getattr(config, 'JOURNAL_FLUSH_INTERVAL', 2)
+        self.retry_interval = getattr(config, 'JOURNAL_RETRY_INTERVAL', 30)
+
+        self._queue = deque()
+        self._wakeup = None
+        self._task = None
+        self._stopping = False
+        self._next_retry = 0.0
+        self._flush_lock = asyncio.Lock()
+        self.stats = {"queued": 0, "written": 0, "spilled": 0, "quarantined": 0}
+
+    @property
+    def mongo(self):
+        if self._mongo is None:
+            self._mongo = MongoManager()
+        return self._mongo
+
+    def build_trade_doc(self, data: dict):
+        """
+        Susun dokumen trade dari data close order.
+        Expected data keys: symbol, side, type, entry_price, exit_price, 
+                          size_usdt, pnl_usdt, strategy_tag, prompt, reason
+        """
+        # 1. Hitung Derived Metrics
+        pnl_usdt = float(data.get('pnl_usdt', 0))
+        size_usdt = float(data.get('size_usdt', 0))
+        
+        # PnL % based on Size (Not Margin) - Net Movement
+        pnl_percent = (pnl_usdt / size_usdt * 100) if size_usdt > 0 else 0
+        
+        # ROI % (Data biasanya sudah dikirim, kalau tidak hitung manual)
+        roi_percent = float(data.get('roi_percent', 0))
+        
+        # Result Label
+        if pnl_usdt > 0:
+            result = 'WIN'
+        elif pnl_usdt < 0:
+            result = 'LOSS'
+        else:
+            result = 'BREAKEVEN'
+
+        # 2. Serialize Technical & Config Data (JSON String for compatibility)
+        # MongoDB can store dicts directly, but to maintain compatibility with existing Streamlit
+        # that expects JSON strings in these columns, we will stringify them.
+        # Alternatively, we could store as dict and convert in load_trades. 
+        # Let's stringify here to match CSV behavior exactly for now.
+        tech_data_raw = data.get('technical_data', {})
+        config_snap_raw = data.get('config_snapshot', {})
+        
+        try:
+            tech_json = json.dumps(tech_data_raw, ensure_ascii=False) if isinstance(tech_data_raw, dict) else tech_data_raw
+        except (TypeError, ValueError):
+            tech_json = '{}'
+        
+        try:
+            config_json = json.dumps(config_snap_raw, ensure_ascii=False) if isinstance(config_snap_raw, dict) else config_snap_raw
+        except (TypeError, ValueError):
+            config_json = '{}'
+
+        # 3. Prepare Document
+        timestamp = data.get('timestamp', datetime.now().isoformat())
         
+        trade_doc = {
+            '_id': uuid.uuid4().hex,  # [NEW] ID tetap: insert ulang (retry / replay spill) tidak menduplikasi
+            'timestamp': timestamp,
+            'symbol': data.get('symbol', 'UNKNOWN'),
+            'side': data.get('side', 'UNKNOWN'),
+            'type': data.get('type', 'UNKNOWN'),
+            'entry_price': float(data.get('entry_price', 0)),
+            'exit_price': float(data.get('exit_price', 0)),
+            'size_usdt': float(size_usdt),
+            'pnl_usdt': float(pnl_usdt),
+            'pnl_percent': float(pnl_percent),
+            'roi_percent': float(roi_percent),
+            'fee': float(data.get('fee', 0)),
+            'strategy_tag': data.get('strategy_tag', 'MANUAL'),
+            'result': result,
+            'prompt': data.get('prompt', '-').replace('\n', ' '),
+            'reason': data.get('reason', '-').replace('\n', ' '),
+            'setup_at': data.get('setup_at', ''),
+            'filled_at': data.get('filled_at', ''),
+            'technical_data': tech_json,
+            'config_snapshot': config_json
+        }
+
+        return trade_doc
+
     def log_trade(self, data: dict):
         """
         Mencatat trade yang selesai ke MongoDB.
-        Expected data keys: symbol, side, type, entry_price, exit_price, 
-                          size_usdt, pnl_usdt, strategy_tag, prompt, reason
+        - Writer aktif (start()): masuk antrian write-behind, return langsung (non-blocking).
+        - Writer sedang / sudah berhenti (close()): spill lokal, di-replay saat writer jalan lagi.
+          Tidak pernah insert (atau connect Mongo) di event loop.
+        - Tanpa writer (script / tools): insert langsung seperti sebelumnya.
         """
         try:
-            # 1. Hitung Derived Metrics
-            pnl_usdt = float(data.get('pnl_usdt', 0))
-            size_usdt = float(data.get('size_usdt', 0))
-            
-            # PnL % based on Size (Not Margin) - Net Movement
-            pnl_percent = (pnl_usdt / size_usdt * 100) if size_usdt > 0 else 0
-            
-            # ROI % (Data biasanya sudah dikirim, kalau tidak hitung manual)
-            roi_percent = float(data.get('roi_percent', 0))
-            
-            # Result Label
-            if pnl_usdt > 0:
-                result = 'WIN'
-            elif pnl_usdt < 0:
-                result = 'LOSS'
-            else:
-                result = 'BREAKEVEN'
-
-            # 2. Serialize Technical & Config Data (JSON String for compatibility)
-            # MongoDB can store dicts directly, but to maintain compatibility with existing Streamlit
-            # that expects JSON strings in these columns, we will stringify them.
-            # Alternatively, we could store as dict and convert in load_trades. 
-            # Let's stringify here to match CSV behavior exactly for now.
-            tech_data_raw = data.get('technical_data', {})
-            config_snap_raw = data.get('config_snapshot', {})
-            
-            try:
-                tech_json = json.dumps(tech_data_raw, ensure_ascii=False) if isinstance(tech_data_raw, dict) else tech_data_raw
-            except (TypeError, ValueError):
-                tech_json = '{}'
-            
-            try:
-                config_json = json.dumps(config_snap_raw, ensure_ascii=False) if isinstance(config_snap_raw, dict) else config_snap_raw
-            except (TypeError, ValueError):
-                config_json = '{}'
+            trade_doc = self.build_trade_doc(data)
 
-            # 3. Prepare Document
-            timestamp = data.get('timestamp', datetime.now().isoformat())
-            
-            trade_doc = {
-                'timestamp': timestamp,
-                'symbol': data.get('symbol', 'UNKNOWN'),
-                'side': data.get('side', 'UNKNOWN'),
-                'type': data.get('type', 'UNKNOWN'),
-                'entry_price': float(data.get('entry_price', 0)),
-                'exit_price': float(data.get('exit_price', 0)),
-                'size_usdt': float(size_usdt),
-                'pnl_usdt': float(pnl_usdt),
-                'pnl_percent': float(pnl_percent),
-                'roi_percent': float(roi_percent),
-                'fee': float(data.get('fee', 0)),
-                'strategy_tag': data.get('strategy_tag', 'MANUAL'),
-                'result': result,
-                'prompt': data.get('prompt', '-').replace('\n', ' '),
-                'reason': data.get('reason', '-').replace('\n', ' '),
-                'setup_at': data.get('setup_at', ''),
-                'filled_at': data.get('filled_at', ''),
-                'technical_data': tech_json,
-                'config_snapshot': config_json
-            }
+            if self._task is not None and not self._task.done():
+                # Termasuk saat stopping: writer men-spill sisa antrian setelah flush terakhir
+                self._queue.append(trade_doc)
+                self.stats["queued"] += 1
+                if len(self._queue) >= self.batch_size:
+                    self._wakeup.set()
+                logger.info(f"📝 Trade Queued for Journal: {trade_doc['symbol']} ({trade_doc['result']}) PnL: ${trade_doc['pnl_usdt']:.2f}")
+                return True
+
+            if self._wakeup is not None:
+                self._spill([trade_doc])
+                return True
 
             # 3. Insert to MongoDB
             success = self.mongo.insert_trade(trade_doc)
             
             if success:
-                logger.info(f"📝 Trade Logged to MongoDB: {trade_doc.get('symbol')} ({result}) PnL: ${pnl_usdt:.2f}")
+                logger.info(f"📝 Trade Logged to MongoDB: {trade_doc.get('symbol')} ({trade_doc['result']}) PnL: ${trade_doc['pnl_usdt']:.2f}")
                 return True
             else:
                 logger.error("❌ Failed to insert trade to MongoDB")
@@ -92,6 +153,149 @@ class TradeJournal:
             logger.error(f"❌ Failed to log trade to journal: {e}")
             return False
 
+    # --- [NEW] WRITE-BEHIND ---
+    def start(self):
+        """Jalankan writer task (panggil dari dalam event loop)."""
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._writer_loop())
+        return self._task
+
+    async def close(self):
+        """Hentikan writer: loop keluar sendiri setelah flush terakhir (tanpa cancel)."""
+        if self._task is None:
+            await self.flush()
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _writer_loop(self):
+        logger.info(f"📒 Journal Writer Started (batch {self.batch_size}, spill: {self.spill_path})")
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                stopping = self._stopping  # Dibaca sebelum flush: flush ini pasti mencakup antrian terakhir
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.error(f"❌ Journal Writer Error: {e}")
+                if stopping:
+                    break
+            if self._queue:
+                # Masuk antrian selama flush terakhir berjalan -> spill (di-replay saat start berikutnya)
+                self._spill(self._drain())
+        except asyncio.CancelledError:
+            # Shutdown: dokumen yang belum tertulis disimpan ke spill (tulis lokal, cepat)
+            if self._queue:
+                self._spill(self._drain())
+            raise
+
+    def _drain(self):
+        docs = list(self._queue)
+        self._queue.clear()
+        return docs
+
+    async def flush(self):
+        """Tulis antrian (dan spill lama, berurutan) ke Mongo di thread terpisah."""
+        async with self._flush_lock:
+            docs = self._drain()
+            if os.path.exists(self.spill_path):
+                # Ada backlog -> dokumen baru masuk ke belakang spill agar urutan tetap terjaga
+                if docs:
+                    await asyncio.to_thread(self._spill, docs)
+                if time.monotonic() >= self._next_retry:
+                    await asyncio.to_thread(self._replay_spill)
+                return
+            if docs:
+                await asyncio.to_thread(self._write_or_spill, docs)
+
+    def _write_batches(self, docs):
+        """
+        insert_many per batch. Return jumlah dokumen (prefix) yang selesai: tertulis atau dikarantina
+        (gagal permanen, tidak boleh menahan antrian spill selamanya).
+        """
+        done = 0
+        for i in range(0, len(docs), self.batch_size):
+            chunk = docs[i:i + self.batch_size]
+            processed, rejected = self.mongo.insert_trades(chunk)
+            if rejected:
+                self._quarantine(rejected)
+            self.stats["written"] += processed - len(rejected)
+            done += processed
+            if processed < len(chunk):
+                break
+        return done
+
+    def _quarantine(self, docs):
+        """Dokumen yang ditolak permanen oleh Mongo (validasi / ukuran) -> file terpisah untuk dicek manual."""
+        with open(self.quarantine_path, 'a', encoding='utf-8') as f:
+            for doc in docs:
+                f.write(json.dumps(doc, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.stats["quarantined"] += len(docs)
+        logger.error(f"❌ Journal: {len(docs)} trade(s) rejected by MongoDB, moved to {self.quarantine_path}")
+
+    def _write_or_spill(self, docs):
+        written = self._write_batches(docs)
+        if written < len(docs):
+            self._spill(docs[written:])
+            self._schedule_retry()
+        else:
+            logger.info(f"📝 Journal: {written} trade(s) written to MongoDB")
+
+    def _spill(self, docs):
+        """Append-only JSONL (1 dokumen per baris)."""
+        with open(self.spill_path, 'a', encoding='utf-8') as f:
+            for doc in docs:
+                f.write(json.dumps(doc, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.stats["spilled"] += len(docs)
+        logger.warning(f"⚠️ Journal: {len(docs)} trade(s) spilled to {self.spill_path} (retry later)")
+
+    def _load_spill(self):
+        docs = []
+        with open(self.spill_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    docs.append(json.loads(line))
+                except ValueError:
+                    logger.warning("⚠️ Journal: corrupt spill line skipped")  # Mis. crash saat append
+        return docs
+
+    def _replay_spill(self):
+        """Retry spill berurutan. Sisa yang gagal ditulis ulang (atomic) untuk percobaan berikutnya."""
+        docs = self._load_spill()
+        written = self._write_batches(docs)
+        if written >= len(docs):
+            os.remove(self.spill_path)
+            logger.info(f"✅ Journal: {written} spilled trade(s) replayed to MongoDB")
+            return True
+
+        tmp_path = self.spill_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for doc in docs[written:]:
+                f.write(json.dumps(doc, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.spill_path)
+        self._schedule_retry()
+        return False
+
+    def _schedule_retry(self):
+        self._next_retry = time.monotonic() + self.retry_interval
+
     def load_trades(self, limit=1000):
         """Memuat riwayat trade sebagai DataFrame dari MongoDB."""
         try:
@@ -0,0 +1,137 @@
+import asyncio
+import copy
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import config
+from src.utils.helper import logger
+
+
+class LLMResponseCache:
+    """
+    Cache respon LLM (content-addressed).
+    - Key  : sha256(model, temperature, reasoning config, prompt ter-normalisasi).
+    - Evict: TTL + LRU (maks `max_entries` entry).
+    - Store: memory (OrderedDict) + write-through ke SQLite agar tetap ada setelah restart.
+    """
+
+    def __init__(self, path=None, ttl=None, max_entries=None):
+        self.path = path or getattr(config, 'AI_CACHE_FILE', 'ai_response_cache.sqlite')
+        self.ttl = ttl if ttl is not None else getattr(config, 'AI_CACHE_TTL_SECONDS', 3600)
+        self.max_entries = max_entries or getattr(config, 'AI_CACHE_MAX_ENTRIES', 500)
+
+        self._mem = OrderedDict()  # {key: (created_at, response)}
+        self._db = None
+        self._db_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        self._load()
+
+    # --- KEY ---
+    @staticmethod
+    def normalize_prompt(prompt_text):
+        """Whitespace berbeda (indentasi / baris kosong) dianggap prompt yang sama."""
+        return re.sub(r'\s+', ' ', str(prompt_text)).strip()
+
+    @classmethod
+    def make_key(cls, model, temperature, reasoning, prompt_text):
+        payload = json.dumps({
+            "model": model,
+            "temperature": temperature,
+            "reasoning": reasoning,
+            "prompt": cls.normalize_prompt(prompt_text)
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    # --- LOOKUP ---
+    def _is_expired(self, created_at, now=None):
+        return self.ttl > 0 and ((now or time.time()) - created_at) > self.ttl
+
+    def get(self, key):
+        entry = self._mem.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        created_at, response = entry
+        if self._is_expired(created_at):
+            del self._mem[key]
+            self.misses += 1
+            return None
+
+        self._mem.move_to_end(key)
+        self.hits += 1
+        # Copy agar caller bebas memodifikasi hasil tanpa merusak cache
+        return copy.deepcopy(response)
+
+    async def put(self, key, response):
+        created_at = time.time()
+        self._mem[key] = (created_at, copy.deepcopy(response))
+        self._mem.move_to_end(key)
+
+        evicted = []
+        while len(self._mem) > self.max_entries:
+            old_key, _ = self._mem.popitem(last=False)
+            evicted.append(old_key)
+
+        if self._db is not None:
+            await asyncio.to_thread(self._persist, key, created_at, response, evicted)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._mem),
+            "hit_rate": (self.hits / total * 100) if total else 0.0
+        }
+
+    # --- DISK STORE ---
+    def _load(self):
+        try:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            with self._db_lock:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, created_at REAL, response TEXT)"
+                )
+                if self.ttl > 0:
+                    self._db.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl,))
+                self._db.commit()
+                rows = self._db.execute(
+                    "SELECT key, created_at, response FROM llm_cache ORDER BY created_at DESC LIMIT ?",
+                    (self.max_entries,)
+                ).fetchall()
+
+            for key, created_at, response in reversed(rows):
+                self._mem[key] = (created_at, json.loads(response))
+
+            if rows:
+                logger.info(f"🗃️ AI Cache Loaded: {len(rows)} entries from {self.path}")
+        except Exception as e:
+            logger.warning(f"⚠️ AI Cache disk store unavailable ({e}). Using memory only.")
+            self._db = None
+
+    def _persist(self, key, created_at, response, evicted):
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, created_at, response) VALUES (?, ?, ?)",
+                    (key, created_at, json.dumps(response, ensure_ascii=False))
+                )
+                if evicted:
+                    self._db.executemany("DELETE FROM llm_cache WHERE key = ?", [(k,) for k in evicted])
+                self._db.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ AI Cache persist failed: {e}")
+
+    def close(self):
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
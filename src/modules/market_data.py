@@ -1,16 +1,27 @@
 
 import asyncio
-import json
+import os
 import time
 import numpy as np
 import pandas as pd
 import pandas_ta as ta
 import ccxt.async_support as ccxt
-import websockets
 import config
-from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from scipy.signal import argrelextrema
 from src.utils.helper import logger, kirim_tele, wib_time, parse_timeframe_to_seconds
+from src.modules.indicator_engine import IndicatorEngine
+from src.utils.ring_buffer import OHLCVRingBuffer, snapshot_bars
+from src.utils.ohlcv_store import OHLCVDiskStore, merge_tail
+from src.modules.rest_scheduler import rest_scheduler, PRIORITY_SAFETY, PRIORITY_MARKET, PRIORITY_SLOW
+from src.modules.stream_manager import StreamManager, WebSocketShard, shard_streams
+from src.utils.json_codec import get_json_decoder
+from src.modules.event_queues import EventChannel, LosslessQueue, LatestWinsQueue, DropOldestQueue
+from src.modules.order_book import LocalOrderBook
+from src.utils.orderbook_analytics import analyze_order_book
+from src.modules.correlation_engine import CorrelationEngine
+from src.utils import ta_vectorized as ta_vec
 
 # --- STATIC CALCULATION FUNCTIONS (Thread-Safe) ---
 
@@ -53,11 +64,10 @@ def _calculate_market_structure_static(bars, lookback=5):
     try:
         if len(bars) < 50: return "INSUFFICIENT_DATA"
 
-        df = pd.DataFrame(bars, columns=['timestamp','open','high','low','close','volume'])
-
-        # Vektorisasi menggunakan scipy.signal.argrelextrema
-        high_vals = df['high'].values
-        low_vals = df['low'].values
+        # Vektorisasi menggunakan scipy.signal.argrelextrema (langsung dari array kolumnar)
+        arr = np.asarray(bars, dtype=np.float64)
+        high_vals = arr[:, 2]
+        low_vals = arr[:, 3]
 
         # Cari indeks swing high/low (order=lookback -> cek N candle kiri & kanan)
         swing_high_idx = argrelextrema(high_vals, np.greater_equal, order=lookback)[0]
@@ -65,7 +75,7 @@ def _calculate_market_structure_static(bars, lookback=5):
 
         # Exclude candle terakhir (current open) dari hasil
         # Dengan menfilter indeks yang >= len(df) - lookback - 1
-        max_valid_idx = len(df) - lookback - 1
+        max_valid_idx = len(arr) - lookback - 1
         swing_high_idx = swing_high_idx[swing_high_idx < max_valid_idx]
         swing_low_idx = swing_low_idx[swing_low_idx < max_valid_idx]
 
@@ -104,7 +114,7 @@ def _calculate_wick_rejection_static(bars, lookback=5):
     Mendeteksi candle dengan wick besar sebagai tanda rejection.
     """
     try:
-        if not bars or len(bars) < lookback:
+        if bars is None or len(bars) < lookback:
             return {"recent_rejection": "NONE", "rejection_strength": 0.0}
 
         # Analyze last N candles
@@ -166,7 +176,7 @@ def _calculate_wick_rejection_static(bars, lookback=5):
 def _calculate_tech_data_threaded(bars_exec, bars_trend, symbol):
     """
     Heavy Calculation Logic (Pandas/TA) to be run in a separate thread.
-    Takes Lists of bars (snapshots), not Deques.
+    Takes snapshots of bars (list / ndarray copy), not live ring buffers.
     """
     try:
         if len(bars_exec) < config.EMA_SLOW + 5: return None
@@ -275,6 +285,120 @@ def _calculate_tech_data_threaded(bars_exec, bars_trend, symbol):
         logger.error(f"Threaded Calc Error {symbol}: {e}")
         return None
 
+def _assemble_tech_data(cur, ind, bars_exec, bars_trend, structure, global_trend):
+    """
+    Susun dict tech_data (format identik dengan _calculate_tech_data_threaded)
+    dari candle close terakhir `cur` [ts, o, h, l, c, v] & nilai indikator `ind`.
+    Dipakai jalur incremental & vectorized.
+    """
+    ts, op, hi, lo, cl, vol = cur[:6]
+
+    ema_pos = "Above" if cl > ind['EMA_FAST'] else "Below"
+    trend_major = "Bullish" if cl > ind['EMA_SLOW'] else "Bearish"
+
+    return {
+        "price": cl,
+        "rsi": ind['RSI'],
+        "adx": ind['ADX'],
+        "ema_fast": ind['EMA_FAST'],
+        "ema_slow": ind['EMA_SLOW'], # EMA Trend Major
+        "vol_ma": ind['VOL_MA'],
+        "volume": vol,
+        "bb_upper": ind['BB_UPPER'],
+        "bb_lower": ind['BB_LOWER'],
+        "stoch_k": ind['STOCH_K'],
+        "stoch_d": ind['STOCH_D'],
+        "atr": ind['ATR'],
+        "price_vs_ema": ema_pos,
+        "trend_major": trend_major,
+        "pivots": _calculate_pivot_points_static(bars_trend),
+        "market_structure": structure,
+        "wick_rejection": _calculate_wick_rejection_static(bars_exec),
+        "candle_timestamp": int(ts),
+        "last_candle": {
+            "open": op,
+            "high": hi,
+            "low": lo,
+            "close": cl,
+            "timestamp": int(ts)
+        },
+        "global_trend_1d": global_trend
+    }
+
+def _group_by_alignment(items, bars_idx):
+    """Kelompokkan job dengan panjang & candle close terakhir yang sama (bisa di-stack jadi 1 matriks)."""
+    groups = {}
+    for item in items:
+        bars = item[bars_idx]
+        groups.setdefault((len(bars), float(bars[-2][0])), []).append(item)
+    return groups.values()
+
+def _calculate_tech_data_vectorized(jobs):
+    """
+    Batch kalkulasi lintas simbol (NumPy kolom-per-kolom, tanpa DataFrame per simbol).
+    jobs: [(symbol, bars_exec, bars_trend), ...]
+    Return: {symbol: tech_data} (format sama dengan _calculate_tech_data_threaded)
+    """
+    results = {}
+    try:
+        # 1. Global Trend (EMA Trend Major) - stack closes timeframe trend
+        global_trends = {}
+        trend_jobs = [job for job in jobs if len(job[2]) > config.EMA_TREND_MAJOR]
+        for members in _group_by_alignment(trend_jobs, 2):
+            # Candle close saja (index -1 = candle berjalan)
+            closes = np.stack([np.asarray(job[2], dtype=np.float64)[:-1, 4] for job in members], axis=1)
+            ema_major = ta_vec.ema(closes, config.EMA_TREND_MAJOR)[-1]
+            for i, job in enumerate(members):
+                if not np.isnan(ema_major[i]):
+                    global_trends[job[0]] = "BULLISH" if closes[-1, i] > ema_major[i] else "BEARISH"
+
+        # 2. Exec Indicators - stack OHLCV (N, T, 6) -> 1x pass untuk semua simbol
+        exec_jobs = [job for job in jobs if len(job[1]) >= config.EMA_SLOW + 5]
+        for members in _group_by_alignment(exec_jobs, 1):
+            closed = np.stack([np.asarray(job[1], dtype=np.float64)[:-1] for job in members])
+            ind = ta_vec.compute_exec_indicators(closed)
+
+            for i, (symbol, bars_exec, bars_trend) in enumerate(members):
+                results[symbol] = _assemble_tech_data(
+                    closed[i, -1].tolist(),
+                    {key: float(values[i]) for key, values in ind.items()},
+                    bars_exec,
+                    bars_trend,
+                    _calculate_market_structure_static(bars_trend),
+                    global_trends.get(symbol, "NEUTRAL")
+                )
+    except Exception as e:
+        logger.error(f"Vectorized Calc Error: {e}")
+
+    return results
+
+def _calculate_tech_data_batch(jobs):
+    """
+    Worker entry point (thread ATAU process pool).
+    jobs: [(symbol, bars_exec, bars_trend), ...] dengan bars berupa ndarray snapshot
+    (di-pickle sebagai 1 buffer float64, bukan ribuan list Python).
+    """
+    return [(symbol, _calculate_tech_data_threaded(bars_exec, bars_trend, symbol)) for symbol, bars_exec, bars_trend in jobs]
+
+# --- PROCESS POOL (Optional Backend) ---
+_indicator_pool = None
+_indicator_pool_workers = 0
+
+def _get_indicator_pool():
+    """Lazy init Process Pool untuk kalkulasi pandas_ta (GIL-bound) di semua core."""
+    global _indicator_pool, _indicator_pool_workers
+    if _indicator_pool is None:
+        _indicator_pool_workers = getattr(config, 'INDICATOR_PROCESS_WORKERS', 0) or os.cpu_count() or 1
+        _indicator_pool = ProcessPoolExecutor(max_workers=_indicator_pool_workers)
+        logger.info(f"⚙️ Indicator Process Pool Started ({_indicator_pool_workers} workers)")
+    return _indicator_pool
+
+def shutdown_indicator_pool():
+    global _indicator_pool
+    if _indicator_pool is not None:
+        _indicator_pool.shutdown(wait=False, cancel_futures=True)
+        _indicator_pool = None
+
 
 class MarketDataManager:
     def __init__(self, exchange):
@@ -294,6 +418,17 @@ class MarketDataManager:
         self.ws_url = config.WS_URL_FUTURES_TESTNET if config.PAKAI_DEMO else config.WS_URL_FUTURES_LIVE
         self.listen_key = None
         self.last_heartbeat = time.time()
+
+        # [NEW] WebSocket sharded (diisi saat start_stream)
+        self.stream_manager = None
+        self._ws_callbacks = {}
+        self._ws_handlers = {}
+        self._ws_channels = {}  # {event_type: EventChannel} -> reader WS tidak menunggu handler
+        self._ws_online_notified = False
+
+        # [NEW] Hot path WS: decoder JSON cepat + map simbol raw Binance -> ccxt (tanpa str.replace per pesan)
+        self.json_backend, self._json_loads = get_json_decoder()
+        self._raw_symbol_map = self._build_raw_symbol_map()
         
         # [NEW] Initialize Public Exchange if Demo Mode
         if config.PAKAI_DEMO:
@@ -302,20 +437,12 @@ class MarketDataManager:
                 'options': {'defaultType': 'future'}
             })
         
-        # Initialize Store Structure with Deque
+        # Initialize Store Structure with Columnar Ring Buffer (float64, preallocated)
         for coin in config.DAFTAR_KOIN:
-            self.market_store[coin['symbol']] = {
-                config.TIMEFRAME_EXEC: deque(maxlen=config.LIMIT_EXEC),
-                config.TIMEFRAME_TREND: deque(maxlen=config.LIMIT_TREND),
-                config.TIMEFRAME_SETUP: deque(maxlen=config.LIMIT_SETUP)
-            }
+            self.market_store[coin['symbol']] = self._new_symbol_store()
         # BTC (Wajib ada helper store)
         if config.BTC_SYMBOL not in self.market_store:
-            self.market_store[config.BTC_SYMBOL] = {
-                config.TIMEFRAME_EXEC: deque(maxlen=config.LIMIT_EXEC),
-                config.TIMEFRAME_TREND: deque(maxlen=config.LIMIT_TREND),
-                config.TIMEFRAME_SETUP: deque(maxlen=config.LIMIT_SETUP)
-            }
+            self.market_store[config.BTC_SYMBOL] = self._new_symbol_store()
         
         # Cache for Technical Data to avoid redundant recalculation
         self.tech_cache = {} # {symbol: {ts, data}}
@@ -323,6 +450,55 @@ class MarketDataManager:
         # Cache for Order Book Analysis to avoid spamming API if managed differently
         self.ob_cache = {} # {symbol: {ts, data}}
 
+        # [NEW] Local Order Book penuh dari stream diff (opsional) -> imbalance O(1)
+        self.use_local_order_book = getattr(config, 'USE_LOCAL_ORDER_BOOK', False)
+        self.local_books = {}  # {symbol: LocalOrderBook}
+        self._book_resync_tasks = {}  # {symbol: Task} -> maks 1 snapshot in-flight per simbol
+
+        # [NEW] Incremental Indicator Engine (update O(1) per candle close)
+        self.indicator_engine = IndicatorEngine() if getattr(config, 'USE_INCREMENTAL_INDICATORS', True) else None
+        self._structure_cache = {} # {symbol: (last_closed_ts, structure)}
+
+        # [NEW] Rolling correlation vs BTC (running sums, update per candle close TIMEFRAME_TREND)
+        self.correlation_engine = CorrelationEngine()
+
+        # [NEW] Backend kalkulasi penuh (thread / process) + antrian batch candle close
+        self.indicator_backend = getattr(config, 'INDICATOR_BACKEND', 'thread')
+        self._closed_exec_symbols = set()
+        self._batch_refresh_task = None
+
+        # [NEW] Listener event candle close: fn(symbol, timeframe, candle_ts) (mis. ScanScheduler)
+        self.candle_close_listeners = []
+
+        # [NEW] Cache OHLCV di disk -> restart hanya fetch candle yang hilang (tail)
+        self.ohlcv_store = OHLCVDiskStore() if getattr(config, 'OHLCV_CACHE_ENABLED', True) else None
+        self.ohlcv_fetch_stats = {"full": 0, "tail": 0}
+
+    @staticmethod
+    def _build_raw_symbol_map():
+        symbols = [coin['symbol'] for coin in config.DAFTAR_KOIN] + [config.BTC_SYMBOL]
+        return {sym.split(':')[0].replace('/', '').upper(): sym for sym in symbols}
+
+    def _ccxt_symbol(self, raw_symbol):
+        """'BTCUSDT' -> 'BTC/USDT' (O(1) lookup, simbol baru di-cache)."""
+        sym = self._raw_symbol_map.get(raw_symbol)
+        if sym is None:
+            sym = raw_symbol.replace('USDT', '/USDT')
+            self._raw_symbol_map[raw_symbol] = sym
+        return sym
+
+    def add_candle_close_listener(self, listener):
+        """Daftarkan callback SYNC yang dipanggil setiap ada candle close dari WebSocket."""
+        self.candle_close_listeners.append(listener)
+
+    @staticmethod
+    def _new_symbol_store():
+        return {
+            config.TIMEFRAME_EXEC: OHLCVRingBuffer(config.LIMIT_EXEC),
+            config.TIMEFRAME_TREND: OHLCVRingBuffer(config.LIMIT_TREND),
+            config.TIMEFRAME_SETUP: OHLCVRingBuffer(config.LIMIT_SETUP)
+        }
+
     async def _fetch_lsr(self, symbol):
         """Helper Fetch LSR dengan Fallback ke Public Exchange jika Demo"""
         try:
@@ -332,11 +508,11 @@ class MarketDataManager:
                 target_exchange = self.exchange_public
                 
             clean_sym = symbol.replace('/', '')
-            lsr = await target_exchange.fapiDataGetTopLongShortAccountRatio({
+            lsr = await rest_scheduler.request(target_exchange, 'fapiDataGetTopLongShortAccountRatio', {
                 'symbol': clean_sym,
                 'period': config.TIMEFRAME_EXEC,
                 'limit': 1
-            })
+            }, priority=PRIORITY_SLOW)
             if lsr and len(lsr) > 0:
                 return lsr[0]
             return None
@@ -352,22 +528,22 @@ class MarketDataManager:
         
         async def fetch_pair(symbol):
             try:
-                # 1. Fetch OHLCV
-                bars_exec_raw = await self.exchange.fetch_ohlcv(symbol, config.TIMEFRAME_EXEC, limit=config.LIMIT_EXEC)
-                bars_trend_raw = await self.exchange.fetch_ohlcv(symbol, config.TIMEFRAME_TREND, limit=config.LIMIT_TREND)
-                bars_setup_raw = await self.exchange.fetch_ohlcv(symbol, config.TIMEFRAME_SETUP, limit=config.LIMIT_SETUP)
-
-                # Convert to Deque
-                bars_exec = deque(bars_exec_raw, maxlen=config.LIMIT_EXEC)
-                bars_trend = deque(bars_trend_raw, maxlen=config.LIMIT_TREND)
-                bars_setup = deque(bars_setup_raw, maxlen=config.LIMIT_SETUP)
+                # 1. Fetch OHLCV (disk cache + tail only jika tersedia)
+                bars_exec_raw = await self._load_ohlcv(symbol, config.TIMEFRAME_EXEC, config.LIMIT_EXEC)
+                bars_trend_raw = await self._load_ohlcv(symbol, config.TIMEFRAME_TREND, config.LIMIT_TREND)
+                bars_setup_raw = await self._load_ohlcv(symbol, config.TIMEFRAME_SETUP, config.LIMIT_SETUP)
+
+                # Convert to Ring Buffer (1x alokasi numpy per timeframe)
+                bars_exec = OHLCVRingBuffer(config.LIMIT_EXEC, bars_exec_raw)
+                bars_trend = OHLCVRingBuffer(config.LIMIT_TREND, bars_trend_raw)
+                bars_setup = OHLCVRingBuffer(config.LIMIT_SETUP, bars_setup_raw)
                 
                 # 2. Fetch Funding Rate & Open Interest (Public Endpoint)
                 # Note: CCXT fetch_funding_rate usually works
-                fund_rate = await self.exchange.fetch_funding_rate(symbol)
+                fund_rate = await rest_scheduler.request(self.exchange, 'fetch_funding_rate', symbol, priority=PRIORITY_SLOW)
                 # Open Interest (CCXT)
                 try:
-                    oi_data = await self.exchange.fetch_open_interest(symbol)
+                    oi_data = await rest_scheduler.request(self.exchange, 'fetch_open_interest', symbol, priority=PRIORITY_SLOW)
                     oi_val = float(oi_data.get('openInterestAmount', 0))
                 except ccxt.BaseError:
                     oi_val = 0.0
@@ -399,14 +575,67 @@ class MarketDataManager:
         await asyncio.gather(*tasks)
         self._update_btc_trend()
 
+        if self.ohlcv_store is not None:
+            stats = self.ohlcv_fetch_stats
+            logger.info(f"🗃️ OHLCV Cache: {stats['tail']} tail fetch, {stats['full']} full fetch")
+            await self.save_ohlcv_cache()
+
+    async def _load_ohlcv(self, symbol, timeframe, limit):
+        """
+        Ambil candle dari disk cache lalu fetch HANYA tail yang hilang sejak
+        timestamp terakhir. Fallback ke full fetch jika cache kosong, terlalu
+        pendek, terlalu lama (gap > limit) atau tail tidak nyambung.
+        """
+        if self.ohlcv_store is not None:
+            cached = await asyncio.to_thread(self.ohlcv_store.load, symbol, timeframe, limit)
+            if cached is not None and len(cached) >= limit:
+                last_ts = int(cached[-1][0])
+                interval_ms = parse_timeframe_to_seconds(timeframe) * 1000
+                missing = int((time.time() * 1000 - last_ts) // interval_ms) + 1
+                if missing < limit:
+                    # since=last_ts -> candle terakhir di cache (mungkin belum close) ikut di-refresh
+                    tail = await rest_scheduler.request(self.exchange, 'fetch_ohlcv', symbol, timeframe, since=last_ts, limit=missing + 1, priority=PRIORITY_SLOW)
+                    if tail and tail[0][0] <= last_ts:
+                        self.ohlcv_fetch_stats['tail'] += 1
+                        return merge_tail(cached, tail)[-limit:]
+
+        self.ohlcv_fetch_stats['full'] += 1
+        return await rest_scheduler.request(self.exchange, 'fetch_ohlcv', symbol, timeframe, limit=limit, priority=PRIORITY_SLOW)
+
+    async def save_ohlcv_cache(self):
+        """Snapshot semua ring buffer ke disk (dipanggil setelah init & periodik dari main)."""
+        if self.ohlcv_store is None:
+            return 0
+        async with self.data_lock:
+            items = [
+                (symbol, timeframe, bars.snapshot())
+                for symbol, store in self.market_store.items()
+                for timeframe, bars in store.items()
+                if len(bars) > 0
+            ]
+        try:
+            return await asyncio.to_thread(self.ohlcv_store.save_many, items)
+        except Exception as e:
+            logger.error(f"❌ OHLCV Cache save error: {e}")
+            return 0
+
     def _update_btc_trend(self):
         """Update Global BTC Trend Direction"""
         try:
             bars = self.market_store[config.BTC_SYMBOL][config.TIMEFRAME_TREND]
-            if bars:
-                df_btc = pd.DataFrame(bars, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                ema_btc = df_btc.ta.ema(length=config.BTC_EMA_PERIOD).iloc[-1]
-                price_now = df_btc['close'].iloc[-1]
+            if len(bars) > 0:
+                trend_state = None
+                if self.indicator_engine is not None:
+                    trend_state = self.indicator_engine.trend_state(config.BTC_SYMBOL, bars)
+
+                if trend_state is not None:
+                    # O(1): EMA candle close + 1 langkah untuk candle berjalan
+                    price_now = bars[-1][4]
+                    ema_btc = trend_state.peek_ema(config.BTC_EMA_PERIOD, price_now)
+                else:
+                    df_btc = pd.DataFrame(bars, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+                    ema_btc = df_btc.ta.ema(length=config.BTC_EMA_PERIOD).iloc[-1]
+                    price_now = df_btc['close'].iloc[-1]
                 
                 new_trend = "BULLISH" if price_now > ema_btc else "BEARISH"
                 if new_trend != self.btc_trend:
@@ -418,99 +647,215 @@ class MarketDataManager:
     # --- WEBSOCKET LOGIC ---
     async def get_listen_key(self):
         try:
-            response = await self.exchange.fapiPrivatePostListenKey()
+            response = await rest_scheduler.request(self.exchange, 'fapiPrivatePostListenKey', priority=PRIORITY_SAFETY)
             self.listen_key = response['listenKey']
             return self.listen_key
         except Exception as e:
             logger.error(f"❌ Gagal ListenKey: {e}")
             return None
 
-    async def start_stream(self, callback_account_update=None, callback_order_update=None, callback_whale=None, callback_trailing=None):
-        """Main WebSocket Loop"""
+    def _build_market_stream_groups(self):
+        """Daftar stream market per simbol (list of list) untuk di-shard."""
+        groups = []
+        for coin in config.DAFTAR_KOIN:
+            s_clean = coin['symbol'].replace('/', '').lower()
+            groups.append([
+                f"{s_clean}@kline_{config.TIMEFRAME_EXEC}",
+                f"{s_clean}@kline_{config.TIMEFRAME_TREND}",
+                f"{s_clean}@kline_{config.TIMEFRAME_SETUP}",
+                f"{s_clean}@aggTrade", # Whale Detector Stream
+                f"{s_clean}@miniTicker", # [NEW] Realtime Price for Trailing
+                # [NEW] Order Book: diff stream (local book) atau partial depth20 (cache)
+                f"{s_clean}@depth@100ms" if self.use_local_order_book else f"{s_clean}@depth20@500ms",
+            ])
+
+        # Add BTC Stream manual if not exists
+        all_streams = {st for g in groups for st in g}
+        btc_clean = config.BTC_SYMBOL.replace('/', '').lower()
+        btc_group = []
+        btc_s = f"{btc_clean}@kline_{config.TIMEFRAME_TREND}"
+        if btc_s not in all_streams: btc_group.append(btc_s)
+
+        # [NEW] Force BTC Whale Stream for Context (Global Whale Data)
+        btc_whale_stream = f"{btc_clean}@aggTrade"
+        if btc_whale_stream not in all_streams: btc_group.append(btc_whale_stream)
+
+        if btc_group:
+            groups.append(btc_group)
+        return groups
+
+    async def _user_data_streams(self):
+        """Stream user data (listenKey baru setiap shard user reconnect)."""
+        await self.get_listen_key()
+        return [self.listen_key] if self.listen_key else []
+
+    def user_stream_state(self):
+        """[NEW] (connected, reconnects) shard user data, None jika stream belum jalan."""
+        if self.stream_manager is None:
+            return None
+        for shard in self.stream_manager.shards:
+            if shard.name == 'user':
+                return (shard.connected, shard.reconnects)
+        return None
+
+    async def _on_shard_connect(self, shard):
+        self.last_heartbeat = time.time()
+        logger.info(f"✅ WS Shard [{shard.name}] Connected ({len(shard.streams)} streams)")
+        if not self._ws_online_notified and all(s.connected for s in self.stream_manager.shards):
+            self._ws_online_notified = True
+            await kirim_tele("✅ <b>WebSocket System Online</b>")
+
+    async def _on_ws_message(self, msg):
+        """Reader WS: decode + publish ke antrian per tipe (tanpa menunggu handler)."""
+        self.last_heartbeat = time.time()
+        payload = self._json_loads(msg).get('data')
+        if payload is None:
+            return
+        if self._ws_channels:
+            channel = self._ws_channels.get(payload.get('e'))
+            if channel is not None:
+                await channel.publish(payload)
+        else:
+            await self._dispatch_ws_payload(payload)
+
+    def _build_ws_channels(self):
+        """
+        Antrian + consumer per tipe event:
+        - kline, user data (account/order) : lossless (urutan account & order dijaga di 1 antrian)
+        - depth, miniTicker               : latest-wins per simbol
+          (depth lossless jika USE_LOCAL_ORDER_BOOK: diff tidak boleh hilang / digabung)
+        - aggTrade                        : bounded, drop oldest
+        """
+        handlers = self._ws_handlers
+        lossless_size = getattr(config, 'WS_QUEUE_SIZE_LOSSLESS', 10000)
+        symbol_key = lambda payload: payload.get('s')
+        channels = {}
+
+        if 'kline' in handlers:
+            channels['kline'] = EventChannel(LosslessQueue('kline', lossless_size), handlers['kline'])
+
+        if 'ACCOUNT_UPDATE' in handlers or 'ORDER_TRADE_UPDATE' in handlers:
+            user = EventChannel(LosslessQueue('user', lossless_size), self._dispatch_ws_payload)
+            for evt in ('ACCOUNT_UPDATE', 'ORDER_TRADE_UPDATE', 'ALGO_UPDATE'):
+                if evt in handlers:
+                    channels[evt] = user
+
+        if 'depthUpdate' in handlers:
+            if self.use_local_order_book:
+                channels['depthUpdate'] = EventChannel(LosslessQueue('depth', lossless_size), handlers['depthUpdate'])
+            else:
+                channels['depthUpdate'] = EventChannel(LatestWinsQueue('depth'), handlers['depthUpdate'], key_fn=symbol_key)
+        if '24hrMiniTicker' in handlers:
+            channels['24hrMiniTicker'] = EventChannel(LatestWinsQueue('ticker'), handlers['24hrMiniTicker'], key_fn=symbol_key)
+        if 'aggTrade' in handlers:
+            channels['aggTrade'] = EventChannel(
+                DropOldestQueue('aggTrade', getattr(config, 'WS_QUEUE_SIZE_TRADES', 5000)), handlers['aggTrade']
+            )
+        return channels
+
+    def ws_queue_stats(self):
+        """Metrics antrian WS: {nama: {depth, max_depth, processed, dropped, coalesced}}."""
+        return {ch.name: ch.queue.stats() for ch in self._unique_ws_channels()}
+
+    def _unique_ws_channels(self):
+        # 1 channel bisa dipakai beberapa event (mis. user data)
+        return list({id(c): c for c in self._ws_channels.values()}.values())
+
+    async def _report_ws_metrics(self):
+        interval = getattr(config, 'WS_METRICS_INTERVAL', 300)
         while True:
-            await self.get_listen_key()
-            if not self.listen_key:
-                await asyncio.sleep(5)
-                continue
-                
-            streams = [self.listen_key]
-            # Add Kline Streams & MiniTicker
-            for coin in config.DAFTAR_KOIN:
-                s_clean = coin['symbol'].replace('/', '').lower()
-                streams.append(f"{s_clean}@kline_{config.TIMEFRAME_EXEC}")
-                streams.append(f"{s_clean}@kline_{config.TIMEFRAME_TREND}")
-                streams.append(f"{s_clean}@kline_{config.TIMEFRAME_SETUP}")
-                streams.append(f"{s_clean}@aggTrade") # Whale Detector Stream
-                streams.append(f"{s_clean}@miniTicker") # [NEW] Realtime Price for Trailing
-                streams.append(f"{s_clean}@depth20@500ms") # [NEW] Order Book Cache Stream
-
-            # Add BTC Stream manual if not exists
-            btc_clean = config.BTC_SYMBOL.replace('/', '').lower()
-            btc_s = f"{btc_clean}@kline_{config.TIMEFRAME_TREND}"
-            if btc_s not in streams: streams.append(btc_s)
-
-            # [NEW] Force BTC Whale Stream for Context (Global Whale Data)
-            btc_whale_stream = f"{btc_clean}@aggTrade"
-            if btc_whale_stream not in streams:
-                streams.append(btc_whale_stream)
-                # logger.info("🐋 BTC Whale Stream Subscribed (Context Only)")
-
-            url = self.ws_url + "/".join(streams)
-            logger.info(f"📡 Connecting WS... ({len(streams)} streams)")
-            
-            # Keep Alive Task from Config
-            asyncio.create_task(self._keep_alive_listen_key())
-            
-            # [NEW] Background Task untuk Data Lambat (Funding Rate & OI)
-            asyncio.create_task(self._maintain_slow_data())
+            await asyncio.sleep(interval)
+            stats = self.ws_queue_stats()
+            summary = " | ".join(
+                f"{name}: depth {st['depth']} (max {st['max_depth']}), drop {st['dropped']}, coalesced {st['coalesced']}"
+                for name, st in stats.items()
+            )
+            logger.info(f"📊 WS Queues: {summary}")
+
+    def _build_ws_handlers(self):
+        """Dispatch table event WS -> handler (hanya event yang punya consumer)."""
+        callbacks = self._ws_callbacks
+        handlers = {
+            'kline': self._handle_kline,
+            'depthUpdate': self._handle_depth_update,
+        }
+        if callbacks.get('account_update'):
+            handlers['ACCOUNT_UPDATE'] = callbacks['account_update']
+        if callbacks.get('order_update'):
+            handlers['ORDER_TRADE_UPDATE'] = callbacks['order_update']
+            handlers['ALGO_UPDATE'] = callbacks['order_update']  # SL/TP (algo order) lewat callback yang sama
+        if callbacks.get('whale'):
+            handlers['aggTrade'] = self._handle_agg_trade
+        if callbacks.get('trailing'):
+            handlers['24hrMiniTicker'] = self._handle_mini_ticker
+        return handlers
+
+    async def _dispatch_ws_payload(self, payload):
+        handler = self._ws_handlers.get(payload.get('e'))
+        if handler is not None:
+            await handler(payload)
+
+    async def _handle_agg_trade(self, payload):
+        # "s": "BTCUSDT", "p": "0.001", "q": "100", "m": true
+        amount_usdt = float(payload['p']) * float(payload['q'])
+        if amount_usdt >= config.WHALE_THRESHOLD_USDT:
+            side = "SELL" if payload['m'] else "BUY" # m=True means the maker was a buyer, so the aggressor was a seller (SELL trade).
+            self._ws_callbacks['whale'](self._ccxt_symbol(payload['s']), amount_usdt, side)
+
+    async def _handle_mini_ticker(self, payload):
+        # [NEW] Realtime Price Handler for Trailing Stop
+        # Payload: {"e":"24hrMiniTicker","E":167233,"s":"BTCUSDT","c":"1234.56",...}
+        symbol = self._ccxt_symbol(payload['s'])
+        price = float(payload['c']) # Current Close Price
+        # Consumer antrian ticker (latest-wins) -> tidak ada create_task per pesan
+        await self._safe_callback_execution(self._ws_callbacks['trailing'], symbol, price)
 
-            try:
-                async with websockets.connect(url) as ws:
-                    logger.info("✅ WebSocket Connected!")
-                    await kirim_tele("✅ <b>WebSocket System Online</b>")
-                    self.last_heartbeat = time.time()
-                    
-                    while True:
-                        msg = await ws.recv()
-                        self.last_heartbeat = time.time()
-                        data = json.loads(msg)
-                        
-                        if 'data' in data:
-                            payload = data['data']
-                            evt = payload.get('e', '')
-                            
-                            if evt == 'kline':
-                                await self._handle_kline(payload)
-                            elif evt == 'ACCOUNT_UPDATE' and callback_account_update:
-                                await callback_account_update(payload)
-                            elif evt == 'ORDER_TRADE_UPDATE' and callback_order_update:
-                                await callback_order_update(payload)
-                            elif evt == 'aggTrade' and callback_whale:
-                                # "s": "BTCUSDT", "p": "0.001", "q": "100", "m": true
-                                symbol = payload['s'].replace('USDT', '/USDT')
-                                price = float(payload['p'])
-                                qty = float(payload['q'])
-                                amount_usdt = price * qty
-                                side = "SELL" if payload['m'] else "BUY" # m=True means the maker was a buyer, so the aggressor was a seller (SELL trade).
-                                if amount_usdt >= config.WHALE_THRESHOLD_USDT:
-                                    callback_whale(symbol, amount_usdt, side)
-                            
-                            elif evt == '24hrMiniTicker':
-                                # [NEW] Realtime Price Handler for Trailing Stop
-                                # Payload: {"e":"24hrMiniTicker","E":167233,"s":"BTCUSDT","c":"1234.56",...}
-                                symbol = payload['s'].replace('USDT', '/USDT')
-                                price = float(payload['c']) # Current Close Price
-                                
-                                if callback_trailing:
-                                    # Use fire-and-forget task
-                                    asyncio.create_task(self._safe_callback_execution(callback_trailing, symbol, price))
-
-                            elif evt == 'depthUpdate':
-                                await self._handle_depth_update(payload)
-                                
-            except Exception as e:
-                logger.warning(f"⚠️ WS Disconnected: {e}. Reconnecting...")
-                await asyncio.sleep(5)
+    async def start_stream(self, callback_account_update=None, callback_order_update=None, callback_whale=None, callback_trailing=None):
+        """
+        Main WebSocket Loop (sharded).
+        - Stream market dibagi ke beberapa koneksi (maks WS_MAX_STREAMS_PER_CONNECTION per koneksi).
+        - User data stream (listenKey) di koneksi tersendiri.
+        - Reconnect + backoff per shard: shard yang putus tidak me-resubscribe shard lain.
+        """
+        self._ws_callbacks = {
+            'account_update': callback_account_update,
+            'order_update': callback_order_update,
+            'whale': callback_whale,
+            'trailing': callback_trailing,
+        }
+        self._ws_handlers = self._build_ws_handlers()
+        logger.info(f"⚡ WS JSON Decoder: {self.json_backend}")
+
+        # [NEW] Reader WS -> antrian per tipe -> consumer khusus
+        self._ws_channels = self._build_ws_channels()
+        for channel in self._unique_ws_channels():
+            channel.start()
+        asyncio.create_task(self._report_ws_metrics())
+
+        self.stream_manager = StreamManager()
+        self.stream_manager.add_shard(WebSocketShard(
+            "user", self.ws_url, self._on_ws_message,
+            streams_provider=self._user_data_streams, on_connect=self._on_shard_connect
+        ))
+
+        max_per_shard = getattr(config, 'WS_MAX_STREAMS_PER_CONNECTION', 200)
+        market_shards = shard_streams(self._build_market_stream_groups(), max_per_shard)
+        for i, streams in enumerate(market_shards):
+            self.stream_manager.add_shard(WebSocketShard(
+                f"market-{i}", self.ws_url, self._on_ws_message,
+                streams=streams, on_connect=self._on_shard_connect
+            ))
+
+        total = sum(len(s) for s in market_shards) + 1
+        logger.info(f"📡 Connecting WS... ({total} streams, {len(self.stream_manager.shards)} connections)")
+
+        # Keep Alive Task from Config
+        asyncio.create_task(self._keep_alive_listen_key())
+
+        # [NEW] Background Task untuk Data Lambat (Funding Rate & OI)
+        asyncio.create_task(self._maintain_slow_data())
+
+        await self.stream_manager.run()
 
     async def _maintain_slow_data(self):
         """
@@ -536,7 +881,7 @@ class MarketDataManager:
         """Fetch all funding rates in a single request (Optimization)"""
         try:
             # fetch_funding_rates returns a dict {symbol: {info...}, ...}
-            all_rates = await self.exchange.fetch_funding_rates()
+            all_rates = await rest_scheduler.request(self.exchange, 'fetch_funding_rates', priority=PRIORITY_SLOW)
 
             # Filter only monitored coins
             monitored_symbols = {c['symbol'] for c in config.DAFTAR_KOIN}
@@ -556,7 +901,7 @@ class MarketDataManager:
             try:
                 # Parallel fetch: Open Interest, LSR (Funding Rate moved to bulk)
                 results = await asyncio.gather(
-                    self.exchange.fetch_open_interest(symbol),
+                    rest_scheduler.request(self.exchange, 'fetch_open_interest', symbol, priority=PRIORITY_SLOW),
                     self._fetch_lsr(symbol),
                     return_exceptions=True
                 )
@@ -591,7 +936,7 @@ class MarketDataManager:
         while True:
             await asyncio.sleep(config.WS_KEEP_ALIVE_INTERVAL)
             try:
-                await self.exchange.fapiPrivatePutListenKey({'listenKey': self.listen_key})
+                await rest_scheduler.request(self.exchange, 'fapiPrivatePutListenKey', {'listenKey': self.listen_key}, priority=PRIORITY_SAFETY)
             except ccxt.NetworkError as e:
                 logger.debug(f"Keep alive listen key failed: {e}")
 
@@ -603,40 +948,67 @@ class MarketDataManager:
             logger.error(f"Error in trailing callback: {e}")
 
     async def _handle_kline(self, data):
-        sym = data['s'].replace('USDT', '/USDT')
+        sym = self._ccxt_symbol(data['s'])
         k = data['k']
         interval = k['i']
         new_candle = [int(k['t']), float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v'])]
+        closed_candle = None
         
         async with self.data_lock:
             if sym in self.market_store:
                 target = self.market_store[sym].get(interval)
                 if target is not None:
-                    if target and target[-1][0] == new_candle[0]:
+                    if len(target) > 0 and target[-1][0] == new_candle[0]:
                         target[-1] = new_candle
                     else:
                         target.append(new_candle)
-                        # Deque handles popping automatically
+                        # Ring buffer handles popping automatically
+                        # Candle baru muncul -> candle sebelumnya sudah CLOSE
+                        # (copy, karena baris ring buffer bisa tertimpa saat compaction)
+                        if len(target) >= 2:
+                            closed_candle = list(target[-2])
                 else:
                     # Fallback for unexpected interval
-                    self.market_store[sym][interval] = deque([new_candle], maxlen=config.LIMIT_TREND)
+                    self.market_store[sym][interval] = OHLCVRingBuffer(config.LIMIT_TREND, [new_candle])
+
+        # [NEW] Incremental Indicator Update (O(1) per candle close)
+        if closed_candle is not None and self.indicator_engine is not None:
+            self.indicator_engine.on_candle_close(sym, interval, closed_candle)
+
+        # [NEW] Rolling Correlation (O(1) per candle close trend)
+        if closed_candle is not None:
+            self.correlation_engine.on_candle_close(sym, interval, closed_candle)
+
+        # [NEW] Process backend: kumpulkan semua simbol yang close bersamaan -> 1x dispatch
+        if closed_candle is not None and interval == config.TIMEFRAME_EXEC and self.indicator_backend == 'process':
+            self._queue_batch_refresh(sym)
         
         # Update BTC Trend Realtime
         if sym == config.BTC_SYMBOL and interval == config.TIMEFRAME_TREND:
             self._update_btc_trend()
 
+        # [NEW] Notify Candle Close (Event-Driven Scan)
+        if closed_candle is not None:
+            for listener in self.candle_close_listeners:
+                try:
+                    listener(sym, interval, int(closed_candle[0]))
+                except Exception as e:
+                    logger.error(f"Candle Close Listener Error {sym}: {e}")
+
     async def _handle_depth_update(self, payload):
         """
         Handle WebSocket Partial Depth Update (depth20)
         Payload: {e: depthUpdate, s: BTCUSDT, b: [[p, q], ...], a: [[p, q], ...]}
         """
+        if self.use_local_order_book:
+            return await self._handle_depth_diff(payload)
         try:
-            symbol = payload['s'].replace('USDT', '/USDT')
+            symbol = self._ccxt_symbol(payload['s'])
 
             # Convert strings to floats
-            # WS sends ["price", "qty"] as strings
-            bids = [[float(p), float(q)] for p, q in payload['b']]
-            asks = [[float(p), float(q)] for p, q in payload['a']]
+            # WS sends ["price", "qty"] as strings -> langsung ndarray (N, 2) untuk analytics
+            bids = np.asarray(payload['b'], dtype=np.float64)
+            asks = np.asarray(payload['a'], dtype=np.float64)
 
             # Update Cache (Overwrite is fine for partial depth stream)
             # No lock needed for simple dict replacement, but good practice if structure is complex.
@@ -649,8 +1021,48 @@ class MarketDataManager:
         except Exception as e:
             logger.debug(f"Depth Update Error: {e}")
 
+    async def _handle_depth_diff(self, payload):
+        """
+        [NEW] Handle Diff Depth Update (@depth@100ms) -> Local Order Book.
+        Payload: {e: depthUpdate, s, U, u, pu, b: [[p, q], ...], a: [[p, q], ...]} (qty absolut, 0 = hapus)
+        """
+        try:
+            symbol = self._ccxt_symbol(payload['s'])
+            book = self.local_books.get(symbol)
+            if book is None:
+                book = self.local_books[symbol] = LocalOrderBook(symbol)
+
+            result = book.apply_diff(payload, time.time())
+            if result is False:
+                logger.warning(f"⚠️ Order Book Gap {symbol} (pu {payload.get('pu')} != {book.last_update_id}). Resync snapshot...")
+            if not book.synced:
+                self._schedule_book_resync(symbol)
+        except Exception as e:
+            logger.debug(f"Depth Diff Error: {e}")
+
+    def _schedule_book_resync(self, symbol):
+        task = self._book_resync_tasks.get(symbol)
+        if task is None or task.done():
+            self._book_resync_tasks[symbol] = asyncio.create_task(self._resync_order_book(symbol))
+
+    async def _resync_order_book(self, symbol, attempts=3):
+        """Ambil snapshot REST lalu replay diff yang di-buffer (retry jika snapshot masih tertinggal)."""
+        book = self.local_books[symbol]
+        limit = getattr(config, 'ORDERBOOK_SNAPSHOT_LIMIT', 1000)
+        for attempt in range(attempts):
+            try:
+                snapshot = await rest_scheduler.request(self.exchange, 'fetch_order_book', symbol, limit, priority=PRIORITY_MARKET)
+                if book.apply_snapshot(snapshot):
+                    bids, asks = book.depth()
+                    logger.debug(f"📗 Local Book {symbol} synced (id {book.last_update_id}, {bids}/{asks} levels)")
+                    return True
+            except Exception as e:
+                logger.error(f"❌ Order Book Snapshot Error {symbol}: {e}")
+            await asyncio.sleep(1 + attempt)
+        return False
+
     async def get_btc_correlation(self, symbol, period=config.CORRELATION_PERIOD):
-        """Hitung korelasi Close price simbol vs BTC (Timeframe 1H)"""
+        """Hitung korelasi Close price simbol vs BTC (Timeframe Trend)"""
         try:
             if symbol == config.BTC_SYMBOL: return 1.0
             
@@ -659,103 +1071,288 @@ class MarketDataManager:
             
             if len(bars_sym) < period or len(bars_btc) < period:
                 return config.DEFAULT_CORRELATION_HIGH # Default high correlation to be safe (Follow BTC)
-            
-            # Create DF
-            df_sym = pd.DataFrame(bars_sym, columns=['timestamp','o','h','l','c','v'])
-            df_btc = pd.DataFrame(bars_btc, columns=['timestamp','o','h','l','c','v'])
-            
-            # Merge on timestamp to align candles
-            merged = pd.merge(df_sym[['timestamp','c']], df_btc[['timestamp','c']], on='timestamp', suffixes=('_sym', '_btc'))
-            
-            if len(merged) < period:
+
+            # [NEW] Correlation Engine (running sums, cache per candle close)
+            if period == self.correlation_engine.period:
+                corr = self.correlation_engine.correlation(symbol, bars_sym, bars_btc)
+                return corr if corr is not None else config.DEFAULT_CORRELATION_HIGH
+
+            # Period custom -> hitung langsung dari store
+            # Columnar arrays (tanpa DataFrame)
+            arr_sym = np.asarray(bars_sym.view() if hasattr(bars_sym, 'view') else list(bars_sym), dtype=np.float64)
+            arr_btc = np.asarray(bars_btc.view() if hasattr(bars_btc, 'view') else list(bars_btc), dtype=np.float64)
+
+            # Align candles on timestamp (timestamp di store selalu urut naik)
+            _, idx_sym, idx_btc = np.intersect1d(arr_sym[:, 0], arr_btc[:, 0], assume_unique=True, return_indices=True)
+
+            if len(idx_sym) < period:
                 return config.DEFAULT_CORRELATION_HIGH
-                
-            # Calc Correlation
-            corr = merged['c_sym'].rolling(period).corr(merged['c_btc']).iloc[-1]
-            
-            if pd.isna(corr): return 0.0
-            return corr
+
+            # Calc Correlation (Pearson, window `period` candle terakhir yang match)
+            x = arr_sym[idx_sym[-period:], 4]
+            y = arr_btc[idx_btc[-period:], 4]
+            dx = x - x.mean()
+            dy = y - y.mean()
+            denom = np.sqrt((dx * dx).sum() * (dy * dy).sum())
+
+            if denom == 0 or np.isnan(denom): return 0.0
+            return float((dx * dy).sum() / denom)
             
         except Exception as e:
             logger.error(f"Corr Error {symbol}: {e}")
             return config.DEFAULT_CORRELATION_HIGH # Fallback
 
-    async def get_technical_data(self, symbol):
-        """Retrieve aggregated technical data for AI Prompt"""
-        try:
+    def get_correlation_matrix(self, symbols=None):
+        """
+        [NEW] Matriks korelasi N x N (close TIMEFRAME_TREND) untuk level portfolio.
+        Returns: (symbols, np.ndarray) -> NaN untuk simbol yang datanya belum lengkap.
+        """
+        engine = self.correlation_engine
+        symbols = list(symbols) if symbols is not None else [c['symbol'] for c in config.DAFTAR_KOIN]
+        bars_btc = self.market_store.get(config.BTC_SYMBOL, {}).get(config.TIMEFRAME_TREND, [])
+        for sym in symbols:
+            bars = self.market_store.get(sym, {}).get(config.TIMEFRAME_TREND, [])
+            if len(bars) >= 2 and len(bars_btc) >= 2:
+                engine.sync(sym, bars, bars_btc)
+        return engine.correlation_matrix(symbols)
+
+    async def _run_tech_calc_batch(self, jobs):
+        """
+        Jalankan kalkulasi penuh pandas_ta untuk banyak simbol.
+        - 'process': jobs dibagi rata ke semua worker (1 submit per worker).
+        - 'thread' : 1 thread (pandas_ta GIL-bound, thread tambahan tidak mempercepat).
+        Return: {symbol: tech_data | None}
+        """
+        if not jobs: return {}
+
+        if self.indicator_backend == 'process':
+            try:
+                pool = _get_indicator_pool()
+                loop = asyncio.get_running_loop()
+                n_chunks = min(len(jobs), _indicator_pool_workers)
+                chunks = [jobs[i::n_chunks] for i in range(n_chunks)]
+                results = await asyncio.gather(*[
+                    loop.run_in_executor(pool, _calculate_tech_data_batch, chunk) for chunk in chunks
+                ])
+                return {symbol: data for chunk_res in results for symbol, data in chunk_res}
+            except BrokenProcessPool as e:
+                logger.error(f"❌ Indicator Process Pool Broken: {e}. Fallback ke thread.")
+                shutdown_indicator_pool()
+
+        # Run the heavy calculation in a separate thread to avoid blocking the event loop
+        results = await asyncio.to_thread(_calculate_tech_data_batch, jobs)
+        return dict(results)
+
+    async def refresh_technical_data(self, symbols):
+        """
+        Batch API: pastikan tech_cache up-to-date untuk semua simbol (mis. yang candle-nya baru close).
+        Simbol yang tidak bisa dihitung incremental dikirim ke backend dalam SATU dispatch.
+        Return: {symbol: tech_data statis (tanpa field dinamis)}
+        """
+        results = {}
+        jobs = []
+        job_ts = {}
+
+        for symbol in symbols:
             # 1. Snapshot Data (Thread-Safe Preparation)
-            # Avoid accessing self.market_store inside the thread.
-            # Convert deque to list to ensure we have a static copy.
-            bars_exec = list(self.market_store.get(symbol, {}).get(config.TIMEFRAME_EXEC, []))
-            bars_trend = list(self.market_store.get(symbol, {}).get(config.TIMEFRAME_TREND, []))
+            # Avoid accessing self.market_store inside the thread/process.
+            # Ring buffer -> ndarray copy (1x memcpy) to ensure we have a static copy.
+            bars_exec = snapshot_bars(self.market_store.get(symbol, {}).get(config.TIMEFRAME_EXEC))
+            bars_trend = snapshot_bars(self.market_store.get(symbol, {}).get(config.TIMEFRAME_TREND))
+
+            if len(bars_exec) < config.EMA_SLOW + 5: continue
 
-            if len(bars_exec) < config.EMA_SLOW + 5: return None
-            
             # Determine last closed candle timestamp (bars[-2])
             last_closed_ts = bars_exec[-2][0]
-            
+
             # Check Cache
             cached = self.tech_cache.get(symbol)
             if cached and cached.get('timestamp') == last_closed_ts:
                 # Cache Hit - Use static data
-                tech_data = cached['data']
+                results[symbol] = cached['data']
+                continue
+
+            # Cache Miss - Incremental Engine First (O(1), no DataFrame)
+            tech_data = None
+            if self.indicator_engine is not None:
+                tech_data = self._build_tech_data_incremental(symbol, bars_exec, bars_trend)
+
+            if tech_data:
+                self.tech_cache[symbol] = {'timestamp': last_closed_ts, 'data': tech_data}
+                results[symbol] = tech_data
             else:
-                # Cache Miss - Offload to Thread
-                # Run the heavy calculation in a separate thread to avoid blocking the event loop
-                tech_data = await asyncio.to_thread(
-                    _calculate_tech_data_threaded,
-                    bars_exec,
-                    bars_trend,
-                    symbol
-                )
+                # Fallback - Full recompute (batched)
+                jobs.append((symbol, bars_exec, bars_trend))
+                job_ts[symbol] = last_closed_ts
+
+        computed = await self._run_tech_calc_batch(jobs) if jobs else {}
+        for symbol, tech_data in computed.items():
+            if tech_data:
+                # Update Cache
+                self.tech_cache[symbol] = {'timestamp': job_ts[symbol], 'data': tech_data}
+                results[symbol] = tech_data
+
+        return results
+
+    def _queue_batch_refresh(self, symbol):
+        """Tandai simbol yang candle EXEC-nya baru close untuk dihitung di batch berikutnya."""
+        self._closed_exec_symbols.add(symbol)
+        if self._batch_refresh_task is None or self._batch_refresh_task.done():
+            self._batch_refresh_task = asyncio.create_task(self._flush_batch_refresh())
+
+    async def _flush_batch_refresh(self):
+        """Tunggu sebentar agar semua kline close (datang hampir bersamaan) terkumpul, lalu 1x dispatch."""
+        await asyncio.sleep(getattr(config, 'INDICATOR_BATCH_WINDOW', 0.5))
+        while self._closed_exec_symbols:
+            symbols = list(self._closed_exec_symbols)
+            self._closed_exec_symbols.clear()
+            try:
+                start = time.perf_counter()
+                results = await self.refresh_technical_data(symbols)
+                logger.debug(f"⚙️ Batch Tech Refresh: {len(results)}/{len(symbols)} symbols in {time.perf_counter() - start:.2f}s")
+            except Exception as e:
+                logger.error(f"Batch Tech Refresh Error: {e}")
+
+    def _merge_dynamic_data(self, symbol, tech_data):
+        """Return Combined Data (Static + Dynamic)"""
+        # Dynamic fields: btc_trend, funding_rate, open_interest, lsr
+        result = tech_data.copy()
+        result.update({
+            "btc_trend": self.btc_trend,
+            "funding_rate": self.funding_rates.get(symbol, 0),
+            "open_interest": self.open_interest.get(symbol, 0.0),
+            "lsr": self.lsr_data.get(symbol)
+        })
+        return result
 
-                if tech_data:
-                    # Update Cache
-                    self.tech_cache[symbol] = {
-                        'timestamp': last_closed_ts,
-                        'data': tech_data
-                    }
-                else:
-                    return None
-
-            # 9. Return Combined Data (Static + Dynamic)
-            # Dynamic fields: btc_trend, funding_rate, open_interest, lsr
-            result = tech_data.copy()
-            result.update({
-                "btc_trend": self.btc_trend,
-                "funding_rate": self.funding_rates.get(symbol, 0),
-                "open_interest": self.open_interest.get(symbol, 0.0),
-                "lsr": self.lsr_data.get(symbol)
-            })
+    async def get_technical_data(self, symbol):
+        """Retrieve aggregated technical data for AI Prompt"""
+        try:
+            # Static data (cache / incremental / full recompute)
+            tech_data = (await self.refresh_technical_data([symbol])).get(symbol)
+            if not tech_data:
+                return None
 
-            return result
+            return self._merge_dynamic_data(symbol, tech_data)
         except Exception as e:
             logger.error(f"Get Tech Data Error {symbol}: {e}")
             return None
 
+    async def compute_technical_batch(self, symbols):
+        """
+        Vectorized screening untuk banyak simbol sekaligus.
+        Closes/highs/lows di-stack jadi matriks (T x N) -> EMA, RSI, ATR, BB, StochRSI (dll)
+        dihitung kolom-per-kolom dalam 1 pass, bukan N DataFrame terpisah.
+        Return: {symbol: tech_data} (format sama dengan get_technical_data)
+        """
+        results = {}
+        jobs = []
+        job_ts = {}
+
+        for symbol in symbols:
+            bars_exec = snapshot_bars(self.market_store.get(symbol, {}).get(config.TIMEFRAME_EXEC))
+            bars_trend = snapshot_bars(self.market_store.get(symbol, {}).get(config.TIMEFRAME_TREND))
+            if len(bars_exec) < config.EMA_SLOW + 5: continue
+
+            last_closed_ts = bars_exec[-2][0]
+            cached = self.tech_cache.get(symbol)
+            if cached and cached.get('timestamp') == last_closed_ts:
+                results[symbol] = self._merge_dynamic_data(symbol, cached['data'])
+                continue
+
+            jobs.append((symbol, bars_exec, bars_trend))
+            job_ts[symbol] = last_closed_ts
+
+        if jobs:
+            try:
+                computed = await asyncio.to_thread(_calculate_tech_data_vectorized, jobs)
+            except Exception as e:
+                logger.error(f"Batch Tech Data Error: {e}")
+                computed = {}
+
+            for symbol, tech_data in computed.items():
+                self.tech_cache[symbol] = {'timestamp': job_ts[symbol], 'data': tech_data}
+                results[symbol] = self._merge_dynamic_data(symbol, tech_data)
+
+        return results
+
+    def _get_market_structure_cached(self, symbol, bars_trend):
+        """Market Structure hanya berubah saat candle trend close -> cache per candle."""
+        if len(bars_trend) < 2:
+            return _calculate_market_structure_static(bars_trend)
+
+        key = (bars_trend[-2][0], len(bars_trend))
+        cached = self._structure_cache.get(symbol)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        structure = _calculate_market_structure_static(bars_trend)
+        self._structure_cache[symbol] = (key, structure)
+        return structure
+
+    def _build_tech_data_incremental(self, symbol, bars_exec, bars_trend):
+        """
+        Bangun tech_data dari IndicatorEngine (tanpa DataFrame).
+        Output identik dengan _calculate_tech_data_threaded.
+        Return None jika state belum cukup warm (fallback ke jalur pandas).
+        """
+        try:
+            exec_state = self.indicator_engine.exec_state(symbol, bars_exec)
+            if exec_state is None or not exec_state.ready:
+                return None
+
+            # Global Trend dari EMA Trend Major (candle trend close terakhir)
+            global_trend = "NEUTRAL"
+            if len(bars_trend) > config.EMA_TREND_MAJOR:
+                trend_state = self.indicator_engine.trend_state(symbol, bars_trend)
+                if trend_state is not None:
+                    ema_1d = trend_state.ema(config.EMA_TREND_MAJOR)
+                    if not pd.isna(ema_1d):
+                        global_trend = "BULLISH" if trend_state.last[4] > ema_1d else "BEARISH"
+
+            return _assemble_tech_data(
+                exec_state.last,
+                exec_state.values,
+                bars_exec,
+                bars_trend,
+                self._get_market_structure_cached(symbol, bars_trend),
+                global_trend
+            )
+
+        except Exception as e:
+            logger.error(f"Incremental Calc Error {symbol}: {e}")
+            return None
+
     def _calculate_wick_rejection(self, symbol, lookback=5):
         """Wrapper for backward compatibility / testing"""
-        bars = list(self.market_store.get(symbol, {}).get(config.TIMEFRAME_EXEC, []))
+        bars = snapshot_bars(self.market_store.get(symbol, {}).get(config.TIMEFRAME_EXEC))
         return _calculate_wick_rejection_static(bars, lookback)
 
     def _calculate_market_structure(self, symbol, lookback=5):
         """Wrapper for backward compatibility / testing"""
-        bars = list(self.market_store.get(symbol, {}).get(config.TIMEFRAME_TREND, []))
+        bars = snapshot_bars(self.market_store.get(symbol, {}).get(config.TIMEFRAME_TREND))
         return _calculate_market_structure_static(bars, lookback)
 
     def _calculate_pivot_points(self, symbol):
         """Wrapper for backward compatibility / testing"""
-        bars = list(self.market_store.get(symbol, {}).get(config.TIMEFRAME_TREND, []))
+        bars = snapshot_bars(self.market_store.get(symbol, {}).get(config.TIMEFRAME_TREND))
         return _calculate_pivot_points_static(bars)
 
     async def get_order_book_depth(self, symbol, limit=20):
         """
-        Fetch Order Book and calculate imbalance within 2% range.
-        Return: {bids_vol_usdt, asks_vol_usdt, imbalance_pct}
+        Fetch Order Book + analytics vectorized (orderbook_analytics.analyze_order_book).
+        Return: {bids_vol_usdt, asks_vol_usdt, imbalance_pct, bands, microprice, bid/ask_slope, bid/ask_wall, ...}
         """
         try:
-            bids = []
-            asks = []
+            # 0. [NEW] Local Order Book (level penuh, notional main band dari running sum O(1))
+            book = self.local_books.get(symbol)
+            if book is not None and book.synced:
+                bids, asks = book.top_levels(getattr(config, 'ORDERBOOK_SNAPSHOT_LIMIT', 1000))
+                result = analyze_order_book(bids, asks)
+                running = book.imbalance()
+                if result is not None and running is not None:
+                    result.update(running)
+                    return result
 
             # 1. Try Cache First (Zero Latency)
             cached = self.ob_cache.get(symbol)
@@ -765,38 +1362,13 @@ class MarketDataManager:
             else:
                 # 2. Fallback to API (Network Latency)
                 # This happens only at startup before first WS message arrives
-                ob = await self.exchange.fetch_order_book(symbol, limit)
+                ob = await rest_scheduler.request(self.exchange, 'fetch_order_book', symbol, limit, priority=PRIORITY_MARKET)
                 bids = ob['bids']
                 asks = ob['asks']
-            
-            if not bids or not asks: return None
-            
-            mid_price = (bids[0][0] + asks[0][0]) / 2
-            
-            # Filter Range from Config
-            range_limit = config.ORDERBOOK_RANGE_PERCENT
-            
-            bids_vol = 0
-            for price, qty in bids:
-                if price < mid_price * (1 - range_limit): break
-                bids_vol += price * qty
-                
-            asks_vol = 0
-            for price, qty in asks:
-                if price > mid_price * (1 + range_limit): break
-                asks_vol += price * qty
-                
-            total_vol = bids_vol + asks_vol
-            if total_vol == 0: return None
-            
-            imbalance = ((bids_vol - asks_vol) / total_vol) * 100 # Positive = Bullish (More Bids)
-            
-            return {
-                "bids_vol_usdt": bids_vol,
-                "asks_vol_usdt": asks_vol,
-                "imbalance_pct": imbalance
-            }
-            
+
+            # Band / microprice / slope / wall dalam 1 pass NumPy
+            return analyze_order_book(bids, asks)
+
         except Exception as e:
             logger.error(f"❌ Order Book Error {symbol}: {e}")
             return None
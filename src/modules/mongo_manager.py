@@ -2,13 +2,15 @@
 import os
 import time
 from pymongo import MongoClient, ASCENDING, DESCENDING
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError, BulkWriteError
 from src.utils.helper import logger
 try:
     from src import config
 except ImportError:
     import config
 
+DUPLICATE_KEY_ERROR = 11000
+
 class MongoManager:
     _instance = None
 
@@ -27,12 +29,14 @@ class MongoManager:
         self.client = None
         self.db = None
         self.trades_collection = None
+        self._last_connect_attempt = 0.0
         
         self.connect()
         self._initialized = True
 
     def connect(self):
         """Establishes connection to MongoDB."""
+        self._last_connect_attempt = time.time()
         try:
             # Set shorter timeout for initial connection check
             self.client = MongoClient(self.uri, serverSelectionTimeoutMS=5000)
@@ -72,14 +76,24 @@ class MongoManager:
         except Exception as e:
             logger.warning(f"⚠️ Failed to create indexes: {e}")
 
+    def ensure_connected(self) -> bool:
+        """
+        [NEW] Reconnect dengan throttle: saat Mongo down, percobaan connect (blocking s/d 5 detik)
+        hanya dilakukan 1x per MONGO_RECONNECT_INTERVAL, sisanya langsung gagal.
+        """
+        if self.db is not None:
+            return True
+        if time.time() - self._last_connect_attempt < getattr(config, 'MONGO_RECONNECT_INTERVAL', 30):
+            return False
+        return self.connect()
+
     def insert_trade(self, trade_data: dict) -> bool:
         """
         Inserts a single trade document.
         """
         try:
-            if self.db is None:
-                if not self.connect():
-                    return False
+            if not self.ensure_connected():
+                return False
             
             result = self.trades_collection.insert_one(trade_data)
             return result.acknowledged
@@ -87,6 +101,55 @@ class MongoManager:
             logger.error(f"❌ Failed to insert trade to MongoDB: {e}")
             return False
 
+    def insert_trades(self, trades: list):
+        """
+        [NEW] Batch insert (ordered), idempotent lewat `_id` yang dibuat journal.
+        Return (processed, rejected):
+        - processed: jumlah dokumen (prefix dari list) yang selesai: tertulis, sudah ada (duplicate _id
+          dari attempt yang terputus), atau ditolak permanen. Sisa dokumen di-retry caller.
+        - rejected: dokumen yang gagal permanen (validasi / ukuran) -> dikarantina caller.
+        Hanya error koneksi yang dianggap retryable.
+        """
+        if not trades:
+            return 0, []
+        try:
+            if not self.ensure_connected():
+                return 0, []
+            # Copy: insert_many menambahkan _id ke dokumen input
+            self.trades_collection.insert_many([dict(t) for t in trades], ordered=True)
+            return len(trades), []
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors') or []
+            if not errors:
+                # Mis. write concern error: retry aman, dokumen yang sudah masuk akan jadi duplicate _id
+                logger.error(f"❌ Batch insert not confirmed ({e.details.get('nInserted', 0)}/{len(trades)}): {e}")
+                return e.details.get('nInserted', 0), []
+            index = errors[0]['index']  # Ordered: berhenti di error pertama
+            rejected = []
+            if errors[0].get('code') != DUPLICATE_KEY_ERROR:
+                logger.error(f"❌ Trade rejected by MongoDB: {errors[0].get('errmsg')}")
+                rejected.append(trades[index])
+            processed, rest_rejected = self.insert_trades(trades[index + 1:])
+            return index + 1 + processed, rejected + rest_rejected
+        except ConnectionFailure as e:
+            # AutoReconnect / NetworkTimeout / ServerSelectionTimeout: sebagian sub-batch bisa sudah terkirim
+            logger.error(f"❌ Failed to batch insert trades to MongoDB: {e}")
+            self.db = None  # Paksa reconnect (throttled) di percobaan berikutnya
+            return 0, []
+        except Exception as e:
+            # Mis. DocumentTooLarge / InvalidDocument: cari dokumen penyebabnya satu per satu
+            if len(trades) == 1:
+                logger.error(f"❌ Trade rejected by MongoDB: {e}")
+                return 1, list(trades)
+            processed, rejected = 0, []
+            for trade in trades:
+                n, rej = self.insert_trades([trade])
+                if n == 0:
+                    break
+                processed += n
+                rejected += rej
+            return processed, rejected
+
     def get_trades(self, filter_query: dict = {}, sort_by: str = "timestamp", ascending: bool = False, limit: int = 0):
         """
         Retrieves trades based on filter.
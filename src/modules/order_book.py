@@ -0,0 +1,230 @@
+from bisect import bisect_left, bisect_right, insort
+import config
+
+# Local Order Book dari stream diff depth Binance Futures (<symbol>@depth@100ms).
+# Aturan sinkronisasi (dokumentasi Binance "How to manage a local order book"):
+#   1. Buffer event diff, ambil snapshot REST (lastUpdateId).
+#   2. Buang event dengan u < lastUpdateId.
+#   3. Event pertama harus U <= lastUpdateId <= u.
+#   4. Event berikutnya: pu harus == u event sebelumnya, jika tidak -> resync.
+#   5. Qty absolut, qty 0 = hapus level.
+
+
+class LocalOrderBook:
+    """
+    Order book penuh per simbol.
+
+    - Harga disimpan di list terurut (bisect) + dict harga -> qty.
+    - Notional bid/ask dalam ORDERBOOK_RANGE_PERCENT dari mid dijaga secara
+      incremental: update level hanya menambah delta, pergeseran mid hanya
+      menjumlah level yang keluar/masuk band. Query imbalance O(1).
+    """
+
+    RECOMPUTE_EVERY = 5000  # Full recompute berkala untuk membuang drift floating point
+
+    def __init__(self, symbol, range_pct=None, max_buffer=1000):
+        self.symbol = symbol
+        self.range_pct = range_pct if range_pct is not None else config.ORDERBOOK_RANGE_PERCENT
+        self.max_buffer = max_buffer
+
+        self._bid_prices = []  # ascending, best bid = [-1]
+        self._ask_prices = []  # ascending, best ask = [0]
+        self._bids = {}
+        self._asks = {}
+
+        self._lo = 0.0  # batas bawah band bid
+        self._hi = 0.0  # batas atas band ask
+        self.bid_notional = 0.0
+        self.ask_notional = 0.0
+
+        self.last_update_id = None
+        self.synced = False
+        self._first_event = False
+        self._buffer = []
+        self._updates_since_recompute = 0
+
+        self.resyncs = 0
+        self.updated_at = 0.0
+
+    # --- LEVEL OPS ---
+    def _set_level(self, is_bid, price, qty):
+        book = self._bids if is_bid else self._asks
+        prices = self._bid_prices if is_bid else self._ask_prices
+        old = book.get(price, 0.0)
+
+        if qty == 0.0:
+            if price not in book:
+                return
+            del book[price]
+            idx = bisect_left(prices, price)
+            if idx < len(prices) and prices[idx] == price:
+                prices.pop(idx)
+        else:
+            if price not in book:
+                insort(prices, price)
+            book[price] = qty
+
+        # Delta notional jika level di dalam band
+        if is_bid and price >= self._lo:
+            self.bid_notional += price * (qty - old)
+        elif not is_bid and price <= self._hi:
+            self.ask_notional += price * (qty - old)
+
+    def _sum_range(self, is_bid, low, high):
+        """Notional level dengan low <= price <= high."""
+        book = self._bids if is_bid else self._asks
+        prices = self._bid_prices if is_bid else self._ask_prices
+        i = bisect_left(prices, low)
+        j = bisect_right(prices, high)
+        return sum(p * book[p] for p in prices[i:j])
+
+    def _rebase_band(self):
+        """Geser band mengikuti mid terbaru (hanya level yang melintasi batas yang dihitung)."""
+        mid = self.mid_price()
+        if mid is None:
+            return
+        new_lo = mid * (1 - self.range_pct)
+        new_hi = mid * (1 + self.range_pct)
+
+        if new_lo < self._lo:
+            self.bid_notional += self._sum_range(True, new_lo, self._lo) - self._bids.get(self._lo, 0.0) * self._lo
+        elif new_lo > self._lo:
+            self.bid_notional -= self._sum_range(True, self._lo, new_lo) - self._bids.get(new_lo, 0.0) * new_lo
+
+        if new_hi > self._hi:
+            self.ask_notional += self._sum_range(False, self._hi, new_hi) - self._asks.get(self._hi, 0.0) * self._hi
+        elif new_hi < self._hi:
+            self.ask_notional -= self._sum_range(False, new_hi, self._hi) - self._asks.get(new_hi, 0.0) * new_hi
+
+        self._lo, self._hi = new_lo, new_hi
+
+    def _recompute(self):
+        mid = self.mid_price()
+        self._updates_since_recompute = 0
+        if mid is None:
+            self._lo = self._hi = 0.0
+            self.bid_notional = self.ask_notional = 0.0
+            return
+        self._lo = mid * (1 - self.range_pct)
+        self._hi = mid * (1 + self.range_pct)
+        self.bid_notional = self._sum_range(True, self._lo, float('inf'))
+        self.ask_notional = self._sum_range(False, 0.0, self._hi)
+
+    def _apply_levels(self, bids, asks):
+        for price, qty in bids:
+            self._set_level(True, float(price), float(qty))
+        for price, qty in asks:
+            self._set_level(False, float(price), float(qty))
+
+        self._updates_since_recompute += 1
+        if self._updates_since_recompute >= self.RECOMPUTE_EVERY:
+            self._recompute()
+        else:
+            self._rebase_band()
+
+    # --- SYNC ---
+    def reset(self):
+        self._bid_prices.clear()
+        self._ask_prices.clear()
+        self._bids.clear()
+        self._asks.clear()
+        self.last_update_id = None
+        self.synced = False
+        self._recompute()
+
+    def apply_snapshot(self, snapshot):
+        """
+        Load snapshot REST (format ccxt: bids, asks, nonce=lastUpdateId) lalu replay buffer.
+        """
+        self.reset()
+        for price, qty in snapshot['bids']:
+            if qty:
+                self._bids[float(price)] = float(qty)
+        for price, qty in snapshot['asks']:
+            if qty:
+                self._asks[float(price)] = float(qty)
+        self._bid_prices = sorted(self._bids)
+        self._ask_prices = sorted(self._asks)
+        self._recompute()
+
+        self.last_update_id = int(snapshot['nonce'])
+        self.synced = True
+        self._first_event = True
+
+        buffered, self._buffer = self._buffer, []
+        for i, event in enumerate(buffered):
+            if self.apply_diff(event) is False:
+                self._buffer.extend(buffered[i + 1:])  # Simpan sisa event untuk snapshot berikutnya
+                break
+        return self.synced
+
+    def apply_diff(self, event, ts=None):
+        """
+        Terapkan 1 event depthUpdate (diff).
+
+        Returns:
+            True  : diterapkan
+            None  : diabaikan / di-buffer (belum sinkron atau event lama)
+            False : sequence gap -> perlu resync snapshot
+        """
+        if not self.synced:
+            self._buffer.append(event)
+            if len(self._buffer) > self.max_buffer:
+                self._buffer.pop(0)
+            return None
+
+        first_id, final_id = event['U'], event['u']
+        if final_id < self.last_update_id:
+            return None
+
+        if self._first_event:
+            if first_id > self.last_update_id:
+                return self._mark_gap(event)
+            self._first_event = False
+        elif event.get('pu') != self.last_update_id:
+            return self._mark_gap(event)
+
+        self._apply_levels(event['b'], event['a'])
+        self.last_update_id = final_id
+        if ts is not None:
+            self.updated_at = ts
+        return True
+
+    def _mark_gap(self, event):
+        self.synced = False
+        self.resyncs += 1
+        self._buffer = [event]
+        return False
+
+    # --- QUERIES ---
+    def best_bid(self):
+        return self._bid_prices[-1] if self._bid_prices else None
+
+    def best_ask(self):
+        return self._ask_prices[0] if self._ask_prices else None
+
+    def mid_price(self):
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    def depth(self):
+        return len(self._bid_prices), len(self._ask_prices)
+
+    def top_levels(self, n=20):
+        """[[price, qty], ...] best-first (format sama dengan ob_cache)."""
+        bids = [[p, self._bids[p]] for p in reversed(self._bid_prices[-n:])]
+        asks = [[p, self._asks[p]] for p in self._ask_prices[:n]]
+        return bids, asks
+
+    def imbalance(self):
+        """O(1): notional bid/ask dalam band + imbalance (format get_order_book_depth)."""
+        total = self.bid_notional + self.ask_notional
+        if not self.synced or total <= 0:
+            return None
+        return {
+            "bids_vol_usdt": self.bid_notional,
+            "asks_vol_usdt": self.ask_notional,
+            "imbalance_pct": ((self.bid_notional - self.ask_notional) / total) * 100
+        }
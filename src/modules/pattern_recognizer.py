@@ -10,6 +10,7 @@ import config
 import matplotlib
 matplotlib.use('Agg') # Force non-interactive backend
 from src.utils.helper import logger
+from src.utils.ring_buffer import snapshot_bars
 from src.utils.prompt_builder import build_pattern_recognition_prompt
 
 class PatternRecognizer:
@@ -36,7 +37,8 @@ class PatternRecognizer:
 
     def get_setup_candles(self, symbol):
         """Retrieve candles for the SETUP timeframe"""
-        return self.market_data.market_store.get(symbol, {}).get(config.TIMEFRAME_SETUP, [])
+        # Snapshot (ring buffer -> ndarray copy) karena dipakai di thread terpisah
+        return snapshot_bars(self.market_data.market_store.get(symbol, {}).get(config.TIMEFRAME_SETUP))
 
     def generate_chart_image(self, symbol):
         """
@@ -44,7 +46,7 @@ class PatternRecognizer:
         Returns (base64_string, raw_stats_dict).
         """
         candles = self.get_setup_candles(symbol)
-        if not candles or len(candles) < config.MACD_SLOW: # Need at least MACD_SLOW
+        if len(candles) < config.MACD_SLOW: # Need at least MACD_SLOW
             return None, None
         
         try:
@@ -167,7 +169,7 @@ class PatternRecognizer:
 
         # Check Cache based on last candle timestamp
         candles = self.get_setup_candles(symbol)
-        if not candles: 
+        if len(candles) == 0: 
             return {"analysis": "Not enough data.", "is_valid": False}
         
         last_ts = candles[-1][0] # Timestamp newest candle
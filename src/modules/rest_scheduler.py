@@ -0,0 +1,203 @@
+import asyncio
+import time
+import ccxt.async_support as ccxt
+import config
+from src.utils.helper import logger
+
+# Prioritas request (angka kecil = lebih penting)
+PRIORITY_ORDER = 0    # create/cancel order, SL/TP, leverage
+PRIORITY_SAFETY = 1   # fetch_positions, open orders, balance, listenKey
+PRIORITY_MARKET = 2   # order book / ticker untuk keputusan trading
+PRIORITY_SLOW = 3     # initial load, funding, OI, LSR
+
+_PRIORITY_NAMES = {
+    PRIORITY_ORDER: 'ORDER',
+    PRIORITY_SAFETY: 'SAFETY',
+    PRIORITY_MARKET: 'MARKET',
+    PRIORITY_SLOW: 'SLOW',
+}
+
+# Weight endpoint Binance USDⓈ-M Futures (IP limit per menit)
+ENDPOINT_WEIGHTS = {
+    'fetch_balance': 5,
+    'fetch_positions': 5,
+    'fetch_funding_rates': 10,
+    'fetch_funding_rate': 1,
+    'fetch_open_interest': 1,
+    'fetch_ticker': 1,
+    'create_order': 1,
+    'fetch_order': 1,
+    'cancel_order': 1,
+    'set_leverage': 1,
+    'set_margin_mode': 1,
+    'fapiPrivateDeleteAllOpenOrders': 1,
+    'fapiPrivatePostListenKey': 1,
+    'fapiPrivatePutListenKey': 1,
+    'fapiDataGetTopLongShortAccountRatio': 1,
+}
+
+_USED_WEIGHT_HEADER = 'x-mbx-used-weight-1m'
+
+
+def _arg(args, kwargs, index, name):
+    if name in kwargs:
+        return kwargs[name]
+    return args[index] if len(args) > index else None
+
+
+def estimate_weight(endpoint, args=(), kwargs=None):
+    """Perkiraan weight request berdasarkan endpoint + parameter (limit / symbol)."""
+    kwargs = kwargs or {}
+    if endpoint == 'fetch_ohlcv':
+        limit = _arg(args, kwargs, 3, 'limit') or 500
+        if limit < 100: return 1
+        if limit < 500: return 2
+        if limit <= 1000: return 5
+        return 10
+    if endpoint == 'fetch_order_book':
+        limit = _arg(args, kwargs, 1, 'limit') or 500
+        if limit <= 50: return 2
+        if limit <= 100: return 5
+        if limit <= 500: return 10
+        return 20
+    if endpoint == 'fetch_open_orders':
+        # Tanpa symbol = semua simbol (mahal)
+        return 1 if _arg(args, kwargs, 0, 'symbol') else 40
+    return ENDPOINT_WEIGHTS.get(endpoint, 1)
+
+
+class RestRequestScheduler:
+    """
+    Scheduler REST terpusat dengan akuntansi weight Binance (per IP, window 1 menit).
+
+    - Setiap request mendaftarkan weight-nya sebelum dikirim. Prioritas rendah
+      hanya boleh memakai sebagian budget (RATE_LIMIT_PRIORITY_SHARE), sisanya
+      selalu tersedia untuk order & safety (SL/TP tidak pernah kehabisan weight).
+    - Request yang melebihi budget ditahan sampai window menit berikutnya
+      (burst di-smooth, bukan 429). Prioritas tinggi yang menunggu selalu
+      didahulukan.
+    - Header X-MBX-USED-WEIGHT-1M dipakai untuk sinkronisasi dengan hitungan server.
+    - 429 / 418 -> semua request ditahan sampai Retry-After.
+    """
+
+    def __init__(self, weight_limit=None, priority_share=None):
+        self.weight_limit = weight_limit or getattr(config, 'RATE_LIMIT_WEIGHT_PER_MINUTE', 2400)
+        share = priority_share or getattr(config, 'RATE_LIMIT_PRIORITY_SHARE', {})
+        self.priority_share = {
+            PRIORITY_ORDER: share.get('ORDER', 0.95),
+            PRIORITY_SAFETY: share.get('SAFETY', 0.85),
+            PRIORITY_MARKET: share.get('MARKET', 0.7),
+            PRIORITY_SLOW: share.get('SLOW', 0.5),
+        }
+
+        self._window = int(time.time() // 60)
+        self.used_weight = 0
+        self.blocked_until = 0.0
+        self._waiting = {p: 0 for p in _PRIORITY_NAMES}
+
+        self.requests = {p: 0 for p in _PRIORITY_NAMES}
+        self.deferred = 0
+        self.rate_limit_hits = 0
+
+    # --- BUDGET ---
+    def _roll_window(self, now):
+        window = int(now // 60)
+        if window != self._window:
+            self._window = window
+            self.used_weight = 0
+
+    def _ceiling(self, priority):
+        return self.weight_limit * self.priority_share.get(priority, self.priority_share[PRIORITY_SLOW])
+
+    def _delay(self, weight, priority, now):
+        """Detik yang harus ditunggu sebelum request boleh dikirim (0 = kirim sekarang)."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if any(self._waiting[p] for p in self._waiting if p < priority):  # prioritas lebih tinggi didahulukan
+            return 0.05
+        # Request tunggal > ceiling tetap boleh jika window masih kosong
+        if self.used_weight > 0 and self.used_weight + weight > self._ceiling(priority):
+            return (self._window + 1) * 60 - now
+        return 0.0
+
+    async def acquire(self, weight, priority=PRIORITY_SLOW):
+        now = time.time()
+        self._roll_window(now)
+        delay = self._delay(weight, priority, now)
+        if delay > 0:
+            self.deferred += 1
+            self._waiting[priority] += 1
+            try:
+                while delay > 0:
+                    await asyncio.sleep(min(delay, 1.0))
+                    now = time.time()
+                    self._roll_window(now)
+                    delay = self._delay(weight, priority, now)
+            finally:
+                self._waiting[priority] -= 1
+
+        self.used_weight += weight
+        self.requests[priority] += 1
+
+    def _sync_headers(self, exchange):
+        headers = getattr(exchange, 'last_response_headers', None)
+        if not isinstance(headers, dict):
+            return
+        for key, value in headers.items():
+            if key.lower() == _USED_WEIGHT_HEADER:
+                try:
+                    # Server lebih akurat (termasuk request proses lain di IP yang sama)
+                    self.used_weight = max(self.used_weight, int(value))
+                except (TypeError, ValueError):
+                    pass
+                return
+
+    def _retry_after(self, exchange, default):
+        headers = getattr(exchange, 'last_response_headers', None)
+        if isinstance(headers, dict):
+            for key, value in headers.items():
+                if key.lower() == 'retry-after':
+                    try:
+                        return float(value)
+                    except (TypeError, ValueError):
+                        break
+        return default
+
+    # --- REQUEST ---
+    async def request(self, exchange, endpoint, *args, priority=PRIORITY_SLOW, **kwargs):
+        """
+        Jalankan `exchange.<endpoint>(*args, **kwargs)` lewat budget weight.
+
+        Contoh:
+            await rest_scheduler.request(self.exchange, 'create_order', symbol, 'market', side, qty,
+                                         priority=PRIORITY_ORDER)
+        """
+        weight = estimate_weight(endpoint, args, kwargs)
+        await self.acquire(weight, priority)
+        try:
+            result = await getattr(exchange, endpoint)(*args, **kwargs)
+        except (ccxt.RateLimitExceeded, ccxt.DDoSProtection) as e:
+            # 429 (RateLimitExceeded) / 418 (DDoSProtection = IP ban)
+            self.rate_limit_hits += 1
+            is_ban = isinstance(e, ccxt.DDoSProtection)
+            backoff = self._retry_after(exchange, 120 if is_ban else 60)
+            self.blocked_until = max(self.blocked_until, time.time() + backoff)
+            self.used_weight = max(self.used_weight, self.weight_limit)
+            logger.error(f"🚫 Rate Limit Hit ({endpoint}, {_PRIORITY_NAMES.get(priority)}). Pause REST {backoff:.0f}s: {e}")
+            raise
+        self._sync_headers(exchange)
+        return result
+
+    def stats(self):
+        return {
+            "used_weight": self.used_weight,
+            "weight_limit": self.weight_limit,
+            "deferred": self.deferred,
+            "rate_limit_hits": self.rate_limit_hits,
+            "requests": {_PRIORITY_NAMES[p]: n for p, n in self.requests.items()},
+            "blocked_for": max(0.0, self.blocked_until - time.time()),
+        }
+
+
+# Satu instance per proses: rate limit Binance dihitung per IP, bukan per modul
+rest_scheduler = RestRequestScheduler()
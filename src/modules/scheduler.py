@@ -0,0 +1,100 @@
+import asyncio
+import time
+import config
+from src.utils.helper import logger
+
+
+class ScanScheduler:
+    """
+    Scheduler scan berbasis event (pengganti round-robin ticker_idx di main).
+
+    - Diisi oleh event candle close dari MarketDataManager._handle_kline.
+    - Hanya simbol yang candle EXEC-nya close yang di-enqueue (dedupe per simbol).
+    - Diproses N worker paralel (bounded concurrency), 1 simbol tidak pernah
+      dianalisa 2x bersamaan.
+    - [NEW] Simbol yang belum eligible (cooldown / posisi aktif, lihat
+      OrderExecutor.next_eligible_time) di-skip tanpa dianalisa.
+    Latency candle close -> keputusan tidak lagi bergantung jumlah koin di DAFTAR_KOIN.
+    """
+
+    def __init__(self, handler, max_concurrency=None, next_eligible_fn=None):
+        self.handler = handler  # async def handler(symbol)
+        self.max_concurrency = max_concurrency or getattr(config, 'SCAN_MAX_CONCURRENCY', 5)
+        self.next_eligible_fn = next_eligible_fn  # fn(symbol) -> epoch detik (0 = sekarang)
+
+        self.queue = asyncio.Queue()
+        self._queued = {}       # {symbol: enqueue_time} -> dedupe + latency metric
+        self._running = set()
+        self._rescan = set()    # Event masuk saat simbol sedang diproses -> ulang setelah selesai
+        self._workers = []
+
+        self.processed = 0
+        self.skipped = 0
+        self.last_latency = 0.0
+
+    def on_candle_close(self, symbol, timeframe, candle_ts=None):
+        """Listener untuk MarketDataManager (sync, dipanggil dari _handle_kline)."""
+        if timeframe == config.TIMEFRAME_EXEC:
+            self.enqueue(symbol)
+
+    def is_eligible(self, symbol):
+        if self.next_eligible_fn is None:
+            return True
+        return self.next_eligible_fn(symbol) <= time.time()
+
+    def enqueue(self, symbol):
+        if symbol in self._queued:
+            return False
+        if not self.is_eligible(symbol):
+            self.skipped += 1
+            return False
+        if symbol in self._running:
+            self._rescan.add(symbol)
+            return False
+        self._queued[symbol] = time.time()
+        self.queue.put_nowait(symbol)
+        return True
+
+    def start(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.max_concurrency)]
+            logger.info(f"🗓️ Scan Scheduler Started ({self.max_concurrency} workers)")
+        return self._workers
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self, worker_id):
+        while True:
+            symbol = await self.queue.get()
+            queued_at = self._queued.pop(symbol, time.time())
+            self._running.add(symbol)
+            try:
+                self.last_latency = time.time() - queued_at
+                if not self.is_eligible(symbol):  # Status bisa berubah selama antri (mis. entry baru)
+                    self.skipped += 1
+                    continue
+                await self.handler(symbol)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Scan Error {symbol}: {e}")
+            finally:
+                self._running.discard(symbol)
+                self.processed += 1
+                self.queue.task_done()
+                if symbol in self._rescan:
+                    self._rescan.discard(symbol)
+                    self.enqueue(symbol)
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "running": len(self._running),
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "last_latency": self.last_latency
+        }
@@ -1,3 +1,4 @@
+import hashlib
 import requests
 import feedparser
 import random
@@ -39,6 +40,12 @@ class SentimentAnalyzer:
         # [NEW] Storage untuk hasil analisa AI (Cache)
         self.analyzed_result = None
 
+        # [NEW] State input analisa terakhir (skip AI call jika tidak ada perubahan)
+        self._analysis_fingerprint = None
+        self._analyzed_mood = None         # (fng_value, fng_text, inflow)
+        self._analyzed_headlines = set()
+        self._delta_chain = 0
+
     def save_analysis(self, result: dict):
         """Simpan hasil analisa AI yang sudah matang."""
         self.analyzed_result = result
@@ -49,6 +56,62 @@ class SentimentAnalyzer:
         """Ambil hasil analisa AI yang tersimpan."""
         return self.analyzed_result
 
+    def input_fingerprint(self, inflow_status, headlines=None) -> str:
+        """
+        Fingerprint input analisa sentimen: F&G + stablecoin inflow + set headline.
+        Urutan headline diabaikan (raw_news di-shuffle setiap fetch).
+        """
+        headlines = self.raw_news if headlines is None else headlines
+        h = hashlib.sha1()
+        h.update(f"{self.last_fng['value']}|{self.last_fng['classification']}|{inflow_status}".encode('utf-8'))
+        for news in sorted(set(headlines)):
+            h.update(b"\n")
+            h.update(news.encode('utf-8'))
+        return h.hexdigest()
+
+    def plan_analysis(self, inflow_status) -> dict:
+        """
+        Tentukan mode analisa AI berikutnya:
+        - 'skip' : input identik / hanya berita lama yang hilang -> pakai analyzed_result
+        - 'delta': mood sama, hanya sedikit headline baru -> prompt pendek
+        - 'full' : analisa ulang lengkap
+
+        Returns:
+            dict: mode, fingerprint, new_headlines, headlines (snapshot untuk mark_analyzed)
+        """
+        headlines = list(self.raw_news)
+        fingerprint = self.input_fingerprint(inflow_status, headlines)
+        mood = (self.last_fng['value'], self.last_fng['classification'], inflow_status)
+        new_headlines = [n for n in headlines if n not in self._analyzed_headlines]
+
+        plan = {
+            "mode": "full",
+            "fingerprint": fingerprint,
+            "mood": mood,
+            "new_headlines": new_headlines,
+            "headlines": headlines
+        }
+
+        if not getattr(config, 'SENTIMENT_SKIP_UNCHANGED', True) or self.analyzed_result is None:
+            return plan
+
+        if fingerprint == self._analysis_fingerprint:
+            plan['mode'] = "skip"
+        elif mood == self._analyzed_mood:
+            if not new_headlines:
+                plan['mode'] = "skip"
+            elif (len(new_headlines) <= getattr(config, 'SENTIMENT_DELTA_MAX_HEADLINES', 5)
+                  and self._delta_chain < getattr(config, 'SENTIMENT_MAX_DELTA_CHAIN', 3)):
+                plan['mode'] = "delta"
+        return plan
+
+    def mark_analyzed(self, plan: dict):
+        """Simpan state input setelah analisa AI (full/delta) berhasil."""
+        self._analysis_fingerprint = plan['fingerprint']
+        self._analyzed_mood = plan['mood']
+        self._analyzed_headlines = set(plan['headlines'])
+        self._delta_chain = self._delta_chain + 1 if plan['mode'] == "delta" else 0
+
     def fetch_fng(self):
         """Fetch Fear & Greed Index from CoinMarketCap"""
         try:
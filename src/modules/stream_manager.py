@@ -0,0 +1,137 @@
+import asyncio
+import json
+import random
+import time
+import websockets
+import config
+from src.utils.helper import logger
+
+
+def shard_streams(groups, max_per_shard):
+    """
+    Bagi stream ke beberapa koneksi.
+    `groups` = list of list (stream per simbol) -> stream 1 simbol selalu di shard yang sama.
+    """
+    shards = []
+    current = []
+    for group in groups:
+        if current and len(current) + len(group) > max_per_shard:
+            shards.append(current)
+            current = []
+        current.extend(group)
+    if current:
+        shards.append(current)
+    return shards
+
+
+class WebSocketShard:
+    """
+    1 koneksi WebSocket (combined stream) dengan reconnect + exponential backoff sendiri.
+    Shard lain tidak terpengaruh saat shard ini putus.
+    """
+
+    def __init__(self, name, base_url, on_message, streams=None, streams_provider=None, on_connect=None):
+        self.name = name
+        self.base_url = base_url          # mis. wss://fstream.binance.com/stream?streams=
+        self.on_message = on_message      # async fn(raw_message)
+        self.streams = list(streams or [])
+        self.streams_provider = streams_provider  # async fn() -> list (mis. listenKey baru tiap reconnect)
+        self.on_connect = on_connect      # async fn(shard)
+
+        self.connected = False
+        self.reconnects = 0
+        self.messages = 0
+        self.last_message = 0.0
+        self._backoff = getattr(config, 'WS_RECONNECT_BASE_DELAY', 1)
+
+    def _build_url(self, streams):
+        url = self.base_url + "/".join(streams)
+        if len(url) <= getattr(config, 'WS_MAX_URL_LENGTH', 4000):
+            return url, []
+        # URL terlalu panjang -> connect tanpa stream lalu SUBSCRIBE
+        return self.base_url.split('?')[0], streams
+
+    async def _subscribe(self, ws, streams):
+        batch = getattr(config, 'WS_SUBSCRIBE_BATCH', 100)
+        for i in range(0, len(streams), batch):
+            await ws.send(json.dumps({"method": "SUBSCRIBE", "params": streams[i:i + batch], "id": i // batch + 1}))
+            await asyncio.sleep(0.25)  # Limit Binance: 10 pesan masuk / detik per koneksi
+
+    def _next_backoff(self):
+        delay = self._backoff
+        self._backoff = min(self._backoff * 2, getattr(config, 'WS_RECONNECT_MAX_DELAY', 60))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def run(self):
+        while True:
+            try:
+                streams = await self.streams_provider() if self.streams_provider else self.streams
+                if not streams:
+                    raise ConnectionError("no streams to subscribe")
+                self.streams = streams
+
+                url, pending = self._build_url(streams)
+                async with websockets.connect(url) as ws:
+                    if pending:
+                        await self._subscribe(ws, pending)
+                    self.connected = True
+                    if self.on_connect:
+                        await self.on_connect(self)
+
+                    first = True
+                    while True:
+                        msg = await ws.recv()
+                        if first:
+                            # Koneksi stabil -> reset backoff
+                            self._backoff = getattr(config, 'WS_RECONNECT_BASE_DELAY', 1)
+                            first = False
+                        self.messages += 1
+                        self.last_message = time.time()
+                        await self.on_message(msg)
+
+            except asyncio.CancelledError:
+                self.connected = False
+                raise
+            except Exception as e:
+                self.connected = False
+                self.reconnects += 1
+                delay = self._next_backoff()
+                logger.warning(f"⚠️ WS Shard [{self.name}] Disconnected: {e}. Reconnecting in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+
+
+class StreamManager:
+    """Kumpulan shard WebSocket. Setiap shard berjalan sebagai task independen."""
+
+    def __init__(self):
+        self.shards = []
+        self._tasks = []
+
+    def add_shard(self, shard):
+        self.shards.append(shard)
+        return shard
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(shard.run()) for shard in self.shards]
+        return self._tasks
+
+    async def run(self):
+        await asyncio.gather(*self.start())
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self):
+        return {
+            shard.name: {
+                "streams": len(shard.streams),
+                "connected": shard.connected,
+                "reconnects": shard.reconnects,
+                "messages": shard.messages
+            }
+            for shard in self.shards
+        }
@@ -0,0 +1,85 @@
+import asyncio
+import heapq
+import itertools
+import time
+from src.utils.helper import logger
+
+
+class TimerService:
+    """
+    Timer terpusat berbasis min-heap (deadline epoch detik).
+
+    - 1 timer aktif per key (mis. ('cooldown', 'BTC/USDT')); schedule ulang = ganti deadline.
+    - Cancel / reschedule bersifat lazy: entry heap lama dibuang saat sampai di puncak.
+    - run(): tidur tepat sampai deadline terdekat (bukan polling), dibangunkan jika ada
+      timer baru yang lebih awal. Callback boleh sync atau async.
+    """
+
+    def __init__(self):
+        self._heap = []     # (deadline, seq, key)
+        self._timers = {}   # key -> (deadline, seq, callback, args)
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self.fired = 0
+
+    def schedule(self, key, deadline, callback, *args):
+        seq = next(self._seq)
+        self._timers[key] = (deadline, seq, callback, args)
+        heapq.heappush(self._heap, (deadline, seq, key))
+        if self._heap[0][1] == seq:
+            self._wakeup.set()  # Deadline terdekat berubah -> run() hitung ulang jeda tidur
+
+    def cancel(self, key):
+        return self._timers.pop(key, None) is not None
+
+    def deadline(self, key):
+        timer = self._timers.get(key)
+        return timer[0] if timer else None
+
+    def next_deadline(self):
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def __len__(self):
+        return len(self._timers)
+
+    def _discard_stale(self):
+        while self._heap:
+            deadline, seq, key = self._heap[0]
+            timer = self._timers.get(key)
+            if timer is not None and timer[1] == seq:
+                return
+            heapq.heappop(self._heap)
+
+    def pop_due(self, now=None):
+        """Ambil (dan hapus) semua timer yang deadline-nya sudah lewat, urut deadline."""
+        now = time.time() if now is None else now
+        due = []
+        while True:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return due
+            _, _, key = heapq.heappop(self._heap)
+            _, _, callback, args = self._timers.pop(key)
+            due.append((key, callback, args))
+
+    async def run(self):
+        while True:
+            for key, callback, args in self.pop_due():
+                self.fired += 1
+                try:
+                    result = callback(*args)
+                    if asyncio.iscoroutine(result):
+                        await result
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"⚠️ Timer Error {key}: {e}")
+
+            next_deadline = self.next_deadline()
+            timeout = max(0.0, next_deadline - time.time()) if next_deadline is not None else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
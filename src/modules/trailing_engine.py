@@ -0,0 +1,95 @@
+import asyncio
+import config
+from src.utils.helper import logger
+
+
+class TrailingEngine:
+    """
+    Evaluasi trailing stop terpusat (pengganti 1 task per pesan miniTicker).
+
+    - on_price() dipanggil untuk setiap tick: simbol tanpa tracker SECURED
+      langsung di-skip (O(1) dict lookup).
+    - Simbol SECURED hanya menyimpan 1 slot harga (last / high / low sejak
+      evaluasi terakhir).
+    - Satu loop mengevaluasi semua slot yang berubah setiap TRAILING_EVAL_INTERVAL
+      memakai logic OrderExecutor.check_trailing_on_price (aktivasi + update SL).
+    """
+
+    def __init__(self, executor, interval=None):
+        self.executor = executor
+        self.interval = interval or getattr(config, 'TRAILING_EVAL_INTERVAL', 0.5)
+
+        self._slots = {}  # {symbol: [last, high, low]} -> hanya simbol yang berubah sejak evaluasi terakhir
+        self._task = None
+
+        self.ticks = 0
+        self.ignored = 0
+        self.evaluations = 0
+
+    async def on_price(self, symbol, price):
+        """Callback miniTicker dari MarketDataManager.start_stream."""
+        self.ticks += 1
+        tracker = self.executor.safety_orders_tracker.get(symbol)
+        if tracker is None or tracker.get('status') != 'SECURED':
+            self.ignored += 1
+            return
+
+        slot = self._slots.get(symbol)
+        if slot is None:
+            self._slots[symbol] = [price, price, price]
+        else:
+            slot[0] = price
+            if price > slot[1]: slot[1] = price
+            if price < slot[2]: slot[2] = price
+
+    def _eval_price(self, symbol, slot):
+        """
+        Harga yang dievaluasi untuk 1 slot.
+        Trailing aktif -> pakai ekstrem searah posisi (high untuk LONG, low untuk SHORT)
+        supaya puncak di antara 2 evaluasi tidak terlewat.
+        """
+        last, high, low = slot
+        tracker = self.executor.safety_orders_tracker.get(symbol, {})
+        if not tracker.get('trailing_active'):
+            return last
+        return high if tracker.get('side', 'LONG') == 'LONG' else low
+
+    async def evaluate(self):
+        """Evaluasi semua slot yang berubah (1 putaran)."""
+        if not self._slots:
+            return 0
+
+        slots, self._slots = self._slots, {}
+        symbols = list(slots)
+        results = await asyncio.gather(
+            *(self.executor.check_trailing_on_price(sym, self._eval_price(sym, slots[sym])) for sym in symbols),
+            return_exceptions=True
+        )
+        for sym, res in zip(symbols, results):
+            if isinstance(res, Exception):
+                logger.error(f"Error in trailing evaluation {sym}: {res}")
+
+        self.evaluations += len(symbols)
+        return len(symbols)
+
+    async def run(self):
+        logger.info(f"🔄 Trailing Engine Started (interval {self.interval}s)")
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.evaluate()
+            except Exception as e:
+                logger.error(f"Trailing Engine Error: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    def stats(self):
+        return {
+            "ticks": self.ticks,
+            "ignored": self.ignored,
+            "evaluations": self.evaluations,
+            "pending": len(self._slots)
+        }
@@ -0,0 +1,48 @@
+import json
+import config
+from src.utils.helper import logger
+
+# Decoder JSON untuk hot path WebSocket.
+# orjson / msgspec (jika terinstall) 2-4x lebih cepat dari stdlib json.
+
+
+def _orjson_decoder():
+    import orjson
+    return orjson.loads
+
+
+def _msgspec_decoder():
+    import msgspec
+    return msgspec.json.Decoder().decode
+
+
+_BACKENDS = {
+    'orjson': _orjson_decoder,
+    'msgspec': _msgspec_decoder,
+}
+
+
+def get_json_decoder(name=None):
+    """
+    Pilih fungsi decode JSON.
+
+    Args:
+        name: 'auto' | 'orjson' | 'msgspec' | 'json' (default: config.WS_JSON_DECODER)
+
+    Returns:
+        tuple: (nama_backend, fungsi loads(str|bytes) -> object)
+    """
+    name = (name or getattr(config, 'WS_JSON_DECODER', 'auto')).lower()
+    candidates = list(_BACKENDS) if name == 'auto' else [name]
+
+    for candidate in candidates:
+        factory = _BACKENDS.get(candidate)
+        if factory is None:
+            continue
+        try:
+            return candidate, factory()
+        except ImportError:
+            if name != 'auto':
+                logger.warning(f"⚠️ JSON decoder '{candidate}' not installed. Falling back to stdlib json.")
+
+    return 'json', json.loads
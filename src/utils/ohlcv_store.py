@@ -0,0 +1,77 @@
+import os
+import numpy as np
+import config
+from src.utils.helper import logger
+from src.utils.ring_buffer import OHLCV_COLUMNS
+
+
+class OHLCVDiskStore:
+    """
+    Cache candle OHLCV di disk: 1 file .npy (float64, shape (N, 6)) per (symbol, timeframe).
+
+    - load() memakai np.load(mmap_mode='r') -> tidak ada parsing, langsung siap
+      di-copy ke OHLCVRingBuffer.
+    - save() atomic (tulis file sementara lalu os.replace) agar crash di tengah
+      penulisan tidak meninggalkan file korup.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or getattr(config, 'OHLCV_CACHE_DIR', 'ohlcv_cache')
+
+    def path(self, symbol, timeframe):
+        safe_symbol = symbol.replace('/', '-').replace(':', '-')
+        return os.path.join(self.directory, f"{safe_symbol}_{timeframe}.npy")
+
+    def load(self, symbol, timeframe, limit=None):
+        """Return ndarray (N, 6) (maks `limit` baris terakhir) atau None jika belum ada / rusak."""
+        path = self.path(symbol, timeframe)
+        if not os.path.exists(path):
+            return None
+        try:
+            data = np.load(path, mmap_mode='r')
+            if data.ndim != 2 or data.shape[1] != len(OHLCV_COLUMNS):
+                logger.warning(f"⚠️ OHLCV Cache invalid shape {data.shape}: {path}")
+                return None
+            if limit:
+                data = data[-limit:]
+            return np.array(data, dtype=np.float64)
+        except Exception as e:
+            logger.warning(f"⚠️ OHLCV Cache load failed {path}: {e}")
+            return None
+
+    def save(self, symbol, timeframe, rows):
+        """Simpan snapshot candle (ndarray / list of lists)."""
+        arr = np.asarray(rows, dtype=np.float64)
+        if arr.size == 0:
+            return False
+        arr = arr.reshape(-1, len(OHLCV_COLUMNS))
+
+        path = self.path(symbol, timeframe)
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.save(f, arr)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ OHLCV Cache save failed {path}: {e}")
+            return False
+
+    def save_many(self, items):
+        """Bulk save: items = iterable of (symbol, timeframe, rows). Return jumlah file tersimpan."""
+        return sum(1 for symbol, timeframe, rows in items if self.save(symbol, timeframe, rows))
+
+
+def merge_tail(cached, tail):
+    """
+    Gabungkan candle dari disk dengan tail hasil fetch.
+    Candle cache dengan timestamp >= candle pertama tail diganti (candle terakhir
+    di cache bisa jadi masih berjalan saat disimpan).
+    """
+    cached = np.asarray(cached, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+    tail = np.asarray(tail, dtype=np.float64).reshape(-1, len(OHLCV_COLUMNS))
+    if len(tail) == 0:
+        return cached
+    keep = cached[cached[:, 0] < tail[0, 0]]
+    return np.concatenate([keep, tail])
@@ -0,0 +1,127 @@
+import numpy as np
+import config
+
+# --- VECTORIZED ORDER BOOK ANALYTICS ---
+# Input: bids (harga turun) & asks (harga naik) berbentuk [[price, qty], ...] (list / ndarray).
+# Semua metrik dihitung dalam 1 pass NumPy (cumsum + searchsorted), tanpa loop per level.
+
+DEFAULT_BANDS = (0.005, 0.01, 0.02, 0.05)
+
+
+def band_label(band):
+    """0.005 -> '0.5%' (key dict yang aman untuk JSON / Mongo)."""
+    return f"{band * 100:g}%"
+
+
+def _as_levels(levels):
+    arr = np.asarray(levels, dtype=np.float64)
+    return arr.reshape(-1, 2) if arr.size else np.empty((0, 2))
+
+
+def _imbalance(bids_vol, asks_vol):
+    total = bids_vol + asks_vol
+    safe = np.where(total > 0, total, 1.0)
+    return (bids_vol - asks_vol) / safe * 100
+
+
+def _slope(dist_pct, cum_notional, n):
+    """Least squares lewat origin: USDT kumulatif per 1% jarak dari mid."""
+    d, c = dist_pct[:n], cum_notional[:n]
+    denom = float(np.dot(d, d))
+    return float(np.dot(d, c) / denom) if denom > 0 else 0.0
+
+
+def _wall(prices, notional, dist_pct, n, multiplier):
+    """Level terbesar dalam band jika >= multiplier x median notional level."""
+    if n < 3:
+        return None
+    window = notional[:n]
+    idx = int(window.argmax())
+    median = float(np.partition(window, n // 2)[n // 2])  # Median (upper) tanpa overhead np.median
+    if median <= 0 or window[idx] < median * multiplier:
+        return None
+    return {
+        "price": float(prices[idx]),
+        "notional_usdt": float(window[idx]),
+        "distance_pct": float(dist_pct[idx]),
+        "strength": float(window[idx] / median)
+    }
+
+
+def analyze_order_book(bids, asks, bands=None, main_band=None, wall_multiplier=None):
+    """
+    Analisa order book lengkap.
+
+    Args:
+        bids, asks: [[price, qty], ...] terurut best-first
+        bands: batas kedalaman (fraksi dari mid), default config.ORDERBOOK_BANDS
+        main_band: band untuk key lama bids_vol_usdt / asks_vol_usdt / imbalance_pct
+                   (default config.ORDERBOOK_RANGE_PERCENT)
+        wall_multiplier: level dianggap wall jika >= multiplier x median (config.ORDERBOOK_WALL_MULTIPLIER)
+
+    Returns:
+        dict atau None (book kosong / tidak ada volume di main band)
+    """
+    b = _as_levels(bids)
+    a = _as_levels(asks)
+    if not len(b) or not len(a):
+        return None
+
+    bands = tuple(bands or getattr(config, 'ORDERBOOK_BANDS', DEFAULT_BANDS))
+    main_band = main_band if main_band is not None else config.ORDERBOOK_RANGE_PERCENT
+    wall_multiplier = wall_multiplier or getattr(config, 'ORDERBOOK_WALL_MULTIPLIER', 5.0)
+    all_bands = np.asarray(sorted(set(bands) | {main_band}), dtype=np.float64)
+
+    bp, bq = b[:, 0], b[:, 1]
+    ap, aq = a[:, 0], a[:, 1]
+    best_bid, best_ask = bp[0], ap[0]
+    mid = (best_bid + best_ask) / 2
+
+    b_notional = bp * bq
+    a_notional = ap * aq
+    b_cum = np.cumsum(b_notional)
+    a_cum = np.cumsum(a_notional)
+
+    # Jumlah level di dalam tiap band (semantik sama dengan loop lama: bid >= mid*(1-r), ask <= mid*(1+r))
+    n_bids = np.searchsorted(-bp, -(mid * (1 - all_bands)), side='right')
+    n_asks = np.searchsorted(ap, mid * (1 + all_bands), side='right')
+    bids_vol = np.where(n_bids > 0, b_cum[np.maximum(n_bids - 1, 0)], 0.0)
+    asks_vol = np.where(n_asks > 0, a_cum[np.maximum(n_asks - 1, 0)], 0.0)
+    imbalance = _imbalance(bids_vol, asks_vol)
+
+    main_idx = int(np.searchsorted(all_bands, main_band))
+    if bids_vol[main_idx] + asks_vol[main_idx] == 0:
+        return None
+
+    band_stats = {}
+    for band, b_vol, a_vol, imb in zip(all_bands.tolist(), bids_vol.tolist(), asks_vol.tolist(), imbalance.tolist()):
+        if band in bands:
+            band_stats[band_label(band)] = {"bids_vol_usdt": b_vol, "asks_vol_usdt": a_vol, "imbalance_pct": imb}
+
+    # Microprice: mid berbobot qty top-of-book (condong ke sisi yang lebih tipis)
+    top_qty = bq[0] + aq[0]
+    microprice = (best_bid * aq[0] + best_ask * bq[0]) / top_qty if top_qty > 0 else mid
+
+    # Slope & wall dihitung di band terluar
+    b_dist = (mid - bp) / mid * 100
+    a_dist = (ap - mid) / mid * 100
+    nb_max, na_max = int(n_bids[-1]), int(n_asks[-1])
+    bid_slope = _slope(b_dist, b_cum, nb_max)
+    ask_slope = _slope(a_dist, a_cum, na_max)
+
+    return {
+        "bids_vol_usdt": float(bids_vol[main_idx]),
+        "asks_vol_usdt": float(asks_vol[main_idx]),
+        "imbalance_pct": float(imbalance[main_idx]),  # Positive = Bullish (More Bids)
+        "bands": band_stats,
+        "mid_price": float(mid),
+        "microprice": float(microprice),
+        "microprice_bias_pct": float((microprice - mid) / mid * 100),
+        "spread_pct": float((best_ask - best_bid) / mid * 100),
+        "bid_slope": bid_slope,
+        "ask_slope": ask_slope,
+        "slope_ratio": bid_slope / ask_slope if ask_slope > 0 else 0.0,
+        "bid_wall": _wall(bp, b_notional, b_dist, nb_max, wall_multiplier),
+        "ask_wall": _wall(ap, a_notional, a_dist, na_max, wall_multiplier),
+        "levels": (len(b), len(a))
+    }
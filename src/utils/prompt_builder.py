@@ -124,6 +124,18 @@ def build_market_prompt(symbol, tech_data, sentiment_data, onchain_data, pattern
         ask_vol = ob_data.get('asks_vol_usdt', 0) / 1000 # to K
         imbalance = ob_data.get('imbalance_pct', 0)
         ob_imp = f"Bids: ${bid_vol:.1f}K | Asks: ${ask_vol:.1f}K | Imbalance: {imbalance:+.1f}%"
+
+    # [NEW] Order Book Analytics (multi-band, microprice, wall)
+    ob_detail = "N/A"
+    if ob_data and ob_data.get('bands'):
+        bands_str = " | ".join(f"{label}: {b['imbalance_pct']:+.1f}%" for label, b in ob_data['bands'].items())
+        walls = []
+        for side in ('bid', 'ask'):
+            wall = ob_data.get(f'{side}_wall')
+            if wall:
+                walls.append(f"{side.upper()} wall {format_price(wall['price'])} (${wall['notional_usdt'] / 1000:.1f}K, {wall['strength']:.1f}x)")
+        ob_detail = (f"Band Imbalance [{bands_str}] | Microprice Bias: {ob_data.get('microprice_bias_pct', 0):+.3f}% "
+                     f"| Slope Bid/Ask: {ob_data.get('slope_ratio', 0):.2f} | Walls: {', '.join(walls) if walls else 'None'}")
     
     # Volume & Market Data
     volume = tech_data.get('volume', 0)
@@ -366,6 +378,7 @@ TASK: Analyze market data for {symbol} using the Multi-Timeframe logic below. De
 
 [ORDER BOOK DEPTH]
 - Depth (2%): {ob_imp}
+- Structure: {ob_detail}
 - NOTE: Significant Imbalance (>20%) suggests potential Liquidity Hunt or Breakout.
 
 [MARKET DATA]
@@ -453,6 +466,28 @@ def build_sentiment_prompt(sentiment_data, onchain_data):
     )
     return prompt
 
+def build_sentiment_delta_prompt(sentiment_data, onchain_data, previous_analysis, new_headlines):
+    """
+    Prompt sentimen versi "delta": hanya headline baru sejak analisa terakhir
+    + ringkasan hasil sebelumnya. Dipakai saat F&G & inflow tidak berubah.
+    """
+    previous_analysis = previous_analysis or {}
+    drivers = previous_analysis.get('key_drivers', [])
+    news_str = "\n".join([f"- {n}" for n in new_headlines]) if new_headlines else "No major news."
+
+    prompt = config.PROMPT_SENTIMENT_DELTA.format(
+        prev_sentiment=previous_analysis.get('overall_sentiment', 'NEUTRAL'),
+        prev_score=previous_analysis.get('sentiment_score', 50),
+        prev_summary=previous_analysis.get('summary', '-'),
+        prev_drivers="; ".join(drivers) if drivers else "-",
+        prev_risk=previous_analysis.get('risk_assessment', 'N/A'),
+        fng_value=sentiment_data.get('fng_value', 50),
+        fng_text=sentiment_data.get('fng_text', 'Neutral'),
+        inflow_status=onchain_data.get('stablecoin_inflow', 'Neutral'),
+        news_str=news_str
+    )
+    return prompt
+
 def build_pattern_recognition_prompt(symbol, timeframe, raw_data=None):
     """
     Menyusun prompt untuk Vision AI Pattern Recognition.
@@ -0,0 +1,107 @@
+import numpy as np
+
+OHLCV_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+
+class OHLCVRingBuffer:
+    """
+    Ring buffer kolumnar (float64) untuk data OHLCV per (symbol, timeframe).
+
+    Pengganti deque of lists di market_store:
+    - Satu blok numpy preallocated (tanpa alokasi list per candle).
+    - API kompatibel deque: append, [-1] get/set, len, iter, maxlen.
+    - view() mengembalikan array (N, 6) berurutan TANPA copy.
+
+    Layout: kapasitas fisik 2x maxlen. Append hanya menulis 1 baris; saat ujung
+    buffer tercapai, maxlen-1 baris terakhir digeser sekali ke awal (amortized O(1)).
+    Dengan begitu window aktif selalu contiguous -> view() zero-copy.
+    """
+
+    __slots__ = ('maxlen', '_buf', '_start', '_end')
+
+    def __init__(self, maxlen, rows=None):
+        if maxlen <= 0:
+            raise ValueError("maxlen harus > 0")
+        self.maxlen = int(maxlen)
+        self._buf = np.empty((2 * self.maxlen, len(OHLCV_COLUMNS)), dtype=np.float64)
+        self._start = 0
+        self._end = 0
+        if rows is not None:
+            self.extend(rows)
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __getitem__(self, idx):
+        return self.view()[idx]
+
+    def __setitem__(self, idx, row):
+        self.view()[idx] = row
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __repr__(self):
+        return f"OHLCVRingBuffer(len={len(self)}, maxlen={self.maxlen})"
+
+    def append(self, row):
+        """Tambah 1 candle. Candle tertua dibuang otomatis jika penuh (seperti deque)."""
+        if self._end == self._buf.shape[0]:
+            # Compaction: sisakan ruang untuk 1 baris baru
+            keep = min(len(self), self.maxlen - 1)
+            if keep > 0:
+                self._buf[:keep] = self._buf[self._end - keep:self._end]
+            self._start = 0
+            self._end = keep
+
+        self._buf[self._end] = row
+        self._end += 1
+        if self._end - self._start > self.maxlen:
+            self._start += 1
+
+    def extend(self, rows):
+        """Bulk load (mis. hasil fetch_ohlcv). Hanya maxlen baris terakhir yang disimpan."""
+        arr = np.asarray(rows, dtype=np.float64)
+        if arr.size == 0:
+            return
+        arr = arr.reshape(-1, len(OHLCV_COLUMNS))[-self.maxlen:]
+
+        if len(self) == 0:
+            n = len(arr)
+            self._buf[:n] = arr
+            self._start = 0
+            self._end = n
+        else:
+            for row in arr:
+                self.append(row)
+
+    def clear(self):
+        self._start = 0
+        self._end = 0
+
+    def view(self):
+        """Array (N, 6) berurutan lama -> baru. Zero-copy: JANGAN dipakai lintas await/thread."""
+        return self._buf[self._start:self._end]
+
+    def snapshot(self):
+        """Copy statis (aman dikirim ke thread/process lain)."""
+        return self.view().copy()
+
+    def column(self, name):
+        """Zero-copy view satu kolom, mis. column('close')."""
+        return self.view()[:, OHLCV_COLUMNS.index(name)]
+
+    def nbytes(self):
+        return self._buf.nbytes
+
+
+def snapshot_bars(bars):
+    """
+    Snapshot thread-safe dari store candle.
+    OHLCVRingBuffer -> ndarray copy, selain itu (deque/list) -> list.
+    """
+    if bars is None:
+        return []
+    if hasattr(bars, 'snapshot'):
+        return bars.snapshot()
+    return list(bars)
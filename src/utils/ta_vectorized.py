@@ -0,0 +1,185 @@
+import numpy as np
+import config
+
+# --- VECTORIZED (CROSS-SYMBOL) INDICATOR KERNELS ---
+# Semua input berbentuk matriks (T, N): T candle (lama -> baru) x N simbol.
+# Semantik mereplika pandas / pandas_ta yang dipakai di _calculate_tech_data_threaded
+# (sama seperti primitive di indicator_engine), tapi dihitung kolom-per-kolom sekaligus.
+
+_EPS = 2.220446049250313e-16  # sys.float_info.epsilon (dipakai pandas_ta.zero)
+
+
+def ewm_mean(x, alpha):
+    """Replika Series.ewm(alpha=..., adjust=False).mean() untuk setiap kolom (termasuk perilaku NaN)."""
+    out = np.empty_like(x)
+    factor = 1.0 - alpha
+    value = np.full(x.shape[1], np.nan)
+    old_wt = np.ones(x.shape[1])
+
+    for t in range(x.shape[0]):
+        xt = x[t]
+        has_val = ~np.isnan(value)
+        obs = ~np.isnan(xt)
+
+        old_wt = np.where(has_val, old_wt * factor, old_wt)
+        # avoid numerical errors on constant series (sama seperti pandas)
+        upd = has_val & obs & (value != xt)
+        value = np.where(upd, (old_wt * value + alpha * xt) / (old_wt + alpha), value)
+        old_wt = np.where(has_val & obs, 1.0, old_wt)
+        value = np.where(~has_val & obs, xt, value)
+        out[t] = value
+    return out
+
+
+def seeded_ewm(x, length, alpha):
+    """EWM dengan seed SMA pada bar ke-`length` (pandas_ta presma=True)."""
+    y = np.full_like(x, np.nan)
+    if x.shape[0] < length:
+        return y
+    head = x[:length]
+    count = np.count_nonzero(~np.isnan(head), axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y[length - 1] = np.where(count > 0, np.nansum(head, axis=0) / count, np.nan)
+    y[length:] = x[length:]
+    return ewm_mean(y, alpha)
+
+
+def ema(close, length):
+    return seeded_ewm(close, length, 2.0 / (length + 1))
+
+
+def _rolling(x, length, reducer):
+    out = np.full_like(x, np.nan)
+    if x.shape[0] < length:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(x, length, axis=0)  # (T-L+1, N, L)
+    out[length - 1:] = reducer(windows)
+    return out
+
+
+def rolling_mean(x, length):
+    return _rolling(x, length, lambda w: w.mean(axis=-1))
+
+
+def rolling_std(x, length):
+    """Rolling std ddof=1 (pandas default)."""
+    if length < 2:
+        return np.full_like(x, np.nan)
+    return _rolling(x, length, lambda w: w.std(axis=-1, ddof=1))
+
+
+def rolling_min(x, length):
+    return _rolling(x, length, lambda w: w.min(axis=-1))
+
+
+def rolling_max(x, length):
+    return _rolling(x, length, lambda w: w.max(axis=-1))
+
+
+def _shift(x):
+    prev = np.empty_like(x)
+    prev[0] = np.nan
+    prev[1:] = x[:-1]
+    return prev
+
+
+def rsi(close, length):
+    diff = close - _shift(close)
+    gain = np.where(diff > 0, diff, 0.0)
+    loss = np.where(diff < 0, diff, 0.0)
+    gain[0] = loss[0] = np.nan
+
+    avg_gain = ewm_mean(gain, 1.0 / length)
+    avg_loss = ewm_mean(loss, 1.0 / length)
+    denom = avg_gain + np.abs(avg_loss)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denom != 0, 100.0 * avg_gain / denom, np.nan)
+
+
+def true_range(high, low, close, prenan=False):
+    prev_close = _shift(close)
+    hl = np.abs(high - low)
+    tr = np.fmax(np.fmax(hl, np.abs(high - prev_close)), np.abs(prev_close - low))
+    tr[0] = np.nan if prenan else hl[0]
+    return tr
+
+
+def atr(high, low, close, length):
+    return seeded_ewm(true_range(high, low, close), length, 1.0 / length)
+
+
+def adx(high, low, close, length):
+    up = high - _shift(high)
+    dn = _shift(low) - low
+    pos = np.where((up > dn) & (up > 0), up, 0.0)
+    neg = np.where((dn > up) & (dn > 0), dn, 0.0)
+    pos[np.abs(pos) < _EPS] = 0.0
+    neg[np.abs(neg) < _EPS] = 0.0
+    pos[0] = neg[0] = np.nan
+
+    alpha = 1.0 / length
+    rma_pos = ewm_mean(pos, alpha)
+    rma_neg = ewm_mean(neg, alpha)
+    atr_adx = seeded_ewm(true_range(high, low, close, prenan=True), length, alpha)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = np.where(atr_adx != 0, 100.0 / atr_adx, np.inf)
+        dmp = k * rma_pos
+        dmn = k * rma_neg
+        total = dmp + dmn
+        valid = ~np.isnan(atr_adx) & ~np.isnan(total) & (total != 0)
+        dx = np.where(valid, 100.0 * np.abs(dmp - dmn) / total, np.nan)
+    return ewm_mean(dx, alpha)
+
+
+def bbands(close, length, std):
+    mid = rolling_mean(close, length)
+    dev = rolling_std(close, length)
+    return mid - std * dev, mid, mid + std * dev
+
+
+def stochrsi(rsi_values, length, k, d):
+    lowest = rolling_min(rsi_values, length)
+    highest = rolling_max(rsi_values, length)
+    rng = highest - lowest
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stoch = np.where(rng == 0, 0.0, 100.0 * (rsi_values - lowest) / rng)
+    stoch[np.isnan(rng) | np.isnan(rsi_values)] = np.nan
+
+    stoch_k = rolling_mean(stoch, k)
+    stoch_d = rolling_mean(stoch_k, d)
+    return stoch_k, stoch_d
+
+
+def compute_exec_indicators(ohlcv):
+    """
+    Hitung semua indikator timeframe eksekusi untuk banyak simbol sekaligus.
+
+    Args:
+        ohlcv (ndarray): (N, T, 6) candle CLOSED yang sudah di-align per timestamp.
+
+    Returns:
+        dict: {KEY: ndarray (N,)} nilai pada candle terakhir, key sama dengan
+        ExecIndicatorState.values (EMA_FAST, EMA_SLOW, RSI, ADX, ...).
+    """
+    high = ohlcv[:, :, 2].T
+    low = ohlcv[:, :, 3].T
+    close = ohlcv[:, :, 4].T
+    volume = ohlcv[:, :, 5].T
+
+    rsi_values = rsi(close, config.RSI_PERIOD)
+    bb_lower, _, bb_upper = bbands(close, config.BB_LENGTH, config.BB_STD)
+    stoch_k, stoch_d = stochrsi(rsi_values, config.STOCHRSI_LEN, config.STOCHRSI_K, config.STOCHRSI_D)
+
+    return {
+        "EMA_FAST": ema(close, config.EMA_FAST)[-1],
+        "EMA_SLOW": ema(close, config.EMA_SLOW)[-1],
+        "RSI": rsi_values[-1],
+        "ADX": adx(high, low, close, config.ADX_PERIOD)[-1],
+        "VOL_MA": rolling_mean(volume, config.VOL_MA_PERIOD)[-1],
+        "BB_UPPER": bb_upper[-1],
+        "BB_LOWER": bb_lower[-1],
+        "STOCH_K": stoch_k[-1],
+        "STOCH_D": stoch_d[-1],
+        "ATR": atr(high, low, close, config.ATR_PERIOD)[-1],
+    }
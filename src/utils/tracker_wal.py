@@ -0,0 +1,133 @@
+import copy
+import json
+import os
+from src.utils.helper import logger
+
+# Write-ahead log untuk safety_orders_tracker.
+#   <snapshot>        : JSON penuh tracker (format lama, tetap bisa dibaca manusia)
+#   <snapshot>.wal    : JSONL append-only, 1 baris per mutasi
+#       {"op": "set", "s": "BTC/USDT", "f": {field: value, ...}, "u": [field_dihapus, ...]}
+#       {"op": "del", "s": "BTC/USDT"}
+# Record bersifat last-writer-wins -> replay WAL di atas snapshot hasil compaction-nya
+# sendiri menghasilkan state yang sama (aman jika crash di antara rename snapshot & truncate WAL).
+
+
+def apply_record(state, record):
+    symbol = record['s']
+    if record['op'] == 'del':
+        state.pop(symbol, None)
+        return
+    entry = state.setdefault(symbol, {})
+    entry.update(record.get('f', {}))
+    for field in record.get('u', ()):
+        entry.pop(field, None)
+
+
+class TrackerWAL:
+    """Snapshot + WAL tracker. Biaya tulis per update sebanding dengan field yang berubah."""
+
+    def __init__(self, snapshot_path, compact_records=500, compact_bytes=512 * 1024, fsync=True):
+        self.snapshot_path = snapshot_path
+        self.wal_path = snapshot_path + '.wal'
+        self.compact_records = compact_records
+        self.compact_bytes = compact_bytes
+        self.fsync = fsync
+
+        self._shadow = {}  # State terakhir yang sudah tercatat di disk (untuk diff)
+        self._force_compact = False  # Append gagal -> shadow != disk, snapshot penuh wajib ditulis
+        self.wal_records = 0
+        self.wal_bytes = 0
+
+    # --- LOAD / REPLAY ---
+    def load(self):
+        """Snapshot + replay WAL. Baris terakhir yang terpotong (crash saat append) diabaikan."""
+        state = {}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r') as f:
+                state = json.load(f)
+
+        replayed = 0
+        torn = False
+        if os.path.exists(self.wal_path):
+            with open(self.wal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"⚠️ Tracker WAL: torn record ignored ({self.wal_path})")
+                        torn = True
+                        break
+                    apply_record(state, record)
+                    replayed += 1
+        if replayed:
+            logger.info(f"♻️ Tracker WAL: {replayed} record(s) replayed")
+
+        self._shadow = copy.deepcopy(state)
+        if replayed or torn:
+            self.compact()  # Mulai dari WAL kosong (append baru tidak boleh berada di belakang record terpotong)
+        return state
+
+    # --- DIFF ---
+    def diff(self, state):
+        """Record mutasi sejak tulis terakhir (shadow ikut di-update)."""
+        records = []
+        for symbol, entry in state.items():
+            old = self._shadow.get(symbol)
+            if old is None:
+                records.append({"op": "set", "s": symbol, "f": copy.deepcopy(entry)})
+                self._shadow[symbol] = copy.deepcopy(entry)
+                continue
+            changed = {k: v for k, v in entry.items() if k not in old or old[k] != v}
+            removed = [k for k in old if k not in entry]
+            if changed or removed:
+                record = {"op": "set", "s": symbol, "f": copy.deepcopy(changed)}
+                if removed:
+                    record["u"] = removed
+                records.append(record)
+                apply_record(self._shadow, record)
+
+        for symbol in [s for s in self._shadow if s not in state]:
+            records.append({"op": "del", "s": symbol})
+            del self._shadow[symbol]
+        return records
+
+    # --- WRITE ---
+    def append(self, records):
+        if not records:
+            return 0
+        data = ''.join(json.dumps(r, ensure_ascii=False, sort_keys=True) + '\n' for r in records)
+        try:
+            with open(self.wal_path, 'a', encoding='utf-8') as f:
+                f.write(data)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+        except Exception:
+            self._force_compact = True
+            raise
+        self.wal_records += len(records)
+        self.wal_bytes += len(data)
+        return len(data)
+
+    def needs_compaction(self):
+        return (self._force_compact or self.wal_records >= self.compact_records
+                or self.wal_bytes >= self.compact_bytes)
+
+    def compact(self, state=None):
+        """Tulis snapshot baru (tmp + fsync + os.replace) lalu kosongkan WAL."""
+        state = self._shadow if state is None else state
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # Crash di titik ini aman: replay WAL lama di atas snapshot baru = state yang sama
+        with open(self.wal_path, 'w') as f:
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self.wal_records = 0
+        self.wal_bytes = 0
+        self._force_compact = False
@@ -16,6 +16,12 @@ config.DAFTAR_KOIN = [{'symbol': f'COIN{i}/USDT'} for i in range(20)]
 config.ORDERBOOK_RANGE_PERCENT = 0.02
 
 from src.modules.market_data import MarketDataManager
+from src.utils.orderbook_analytics import analyze_order_book
+
+import numpy as np
+
+LEVEL_SIZES = (20, 100, 1000)
+N_ITER = 2000
 
 class MockExchange:
     def __init__(self):
@@ -71,5 +77,69 @@ async def benchmark():
     speedup = baseline_duration / optimized_duration if optimized_duration > 0 else 0
     print(f"\nSpeedup Factor: {speedup:.2f}x")
 
+    benchmark_analytics()
+
+
+def make_book(levels, tick=0.01, seed=0):
+    rng = np.random.default_rng(seed)
+    bids = np.column_stack([100.0 - tick * np.arange(1, levels + 1), rng.uniform(0.1, 10, levels)])
+    asks = np.column_stack([100.0 + tick * np.arange(1, levels + 1), rng.uniform(0.1, 10, levels)])
+    return bids, asks
+
+
+def loop_metrics(bids, asks, bands=(0.005, 0.01, 0.02, 0.05), wall_multiplier=5.0):
+    """Baseline: metrik yang sama dengan for-loop Python (gaya get_order_book_depth lama)."""
+    mid = (bids[0][0] + asks[0][0]) / 2
+    out = {}
+    for band in bands:
+        bids_vol = 0
+        for price, qty in bids:
+            if price < mid * (1 - band): break
+            bids_vol += price * qty
+        asks_vol = 0
+        for price, qty in asks:
+            if price > mid * (1 + band): break
+            asks_vol += price * qty
+        total = bids_vol + asks_vol
+        out[band] = ((bids_vol - asks_vol) / total * 100) if total else 0
+
+    micro = (bids[0][0] * asks[0][1] + asks[0][0] * bids[0][1]) / (bids[0][1] + asks[0][1])
+    outer = bands[-1]
+    for levels, sign in ((bids, -1), (asks, 1)):
+        cum, num, den, notionals = 0, 0, 0, []
+        for price, qty in levels:
+            dist = (price - mid) / mid * 100 * sign
+            if dist > outer * 100: break
+            cum += price * qty
+            num += dist * cum
+            den += dist * dist
+            notionals.append(price * qty)
+        slope = num / den if den else 0
+        if len(notionals) >= 3:
+            median = sorted(notionals)[len(notionals) // 2]
+            wall = max(notionals) >= median * wall_multiplier
+    return out, micro, slope
+
+
+def benchmark_analytics():
+    print(f"\n--- Benchmarking Order Book Analytics (bands 0.5/1/2/5%, microprice, slope, walls) ---")
+    for levels in LEVEL_SIZES:
+        # Tick disesuaikan agar band 5% tetap terisi di semua ukuran book
+        bids, asks = make_book(levels, tick=5.0 / levels)
+        bid_list, ask_list = bids.tolist(), asks.tolist()
+
+        start = time.perf_counter()
+        for _ in range(N_ITER):
+            loop_metrics(bid_list, ask_list)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(N_ITER):
+            analyze_order_book(bids, asks)
+        vec_time = time.perf_counter() - start
+
+        print(f"[{levels:>4} levels] Python loop: {loop_time / N_ITER * 1e6:8.1f} us | "
+              f"NumPy: {vec_time / N_ITER * 1e6:8.1f} us | {loop_time / vec_time:.2f}x")
+
 if __name__ == "__main__":
     asyncio.run(benchmark())
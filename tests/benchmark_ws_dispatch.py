@@ -0,0 +1,122 @@
+
+import asyncio
+import json
+import random
+import time
+import sys
+import os
+
+# Add root and src to path to simulate app environment
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(repo_root)
+sys.path.append(os.path.join(repo_root, 'src'))
+
+# Mock config
+import src.config as config
+config.DAFTAR_KOIN = [{'symbol': f'COIN{i}/USDT'} for i in range(100)]
+config.PAKAI_DEMO = False # Avoid creating public exchange in __init__
+
+from src.modules.market_data import MarketDataManager
+from src.utils.json_codec import get_json_decoder
+
+N_MESSAGES = 50_000
+
+
+def make_messages(n):
+    """Campuran realistis: aggTrade & depth dominan, miniTicker, sedikit kline."""
+    rng = random.Random(42)
+    raws = [c['symbol'].replace('/', '') for c in config.DAFTAR_KOIN]
+    msgs = []
+    for i in range(n):
+        raw = rng.choice(raws)
+        stream = raw.lower()
+        r = rng.random()
+        if r < 0.55:
+            payload = {"e": "aggTrade", "E": i, "s": raw, "a": i, "p": f"{rng.uniform(1, 100):.4f}",
+                       "q": f"{rng.uniform(0.1, 50):.3f}", "f": i, "l": i, "T": i, "m": rng.random() < 0.5}
+            stream += "@aggTrade"
+        elif r < 0.85:
+            payload = {"e": "depthUpdate", "E": i, "T": i, "s": raw, "U": i, "u": i, "pu": i,
+                       "b": [[f"{100 - j * 0.1:.2f}", f"{rng.uniform(1, 10):.3f}"] for j in range(20)],
+                       "a": [[f"{100 + j * 0.1:.2f}", f"{rng.uniform(1, 10):.3f}"] for j in range(20)]}
+            stream += "@depth20@500ms"
+        elif r < 0.98:
+            payload = {"e": "24hrMiniTicker", "E": i, "s": raw, "c": f"{rng.uniform(1, 100):.4f}",
+                       "o": "1.0", "h": "2.0", "l": "0.5", "v": "1000", "q": "1000"}
+            stream += "@miniTicker"
+        else:
+            payload = {"e": "kline", "E": i, "s": raw, "k": {"t": (i // 50) * 60000, "i": config.TIMEFRAME_EXEC,
+                       "o": "1.0", "h": "2.0", "l": "0.5", "c": "1.5", "v": "100"}}
+            stream += f"@kline_{config.TIMEFRAME_EXEC}"
+        msgs.append(json.dumps({"stream": stream, "data": payload}))
+    return msgs
+
+
+def whale_cb(symbol, amount, side):
+    pass
+
+
+async def trailing_cb(symbol, price):
+    pass
+
+
+async def baseline_loop(mgr, msgs):
+    """Replika loop lama start_stream: json.loads + if/elif + str.replace per pesan."""
+    start = time.perf_counter()
+    for msg in msgs:
+        data = json.loads(msg)
+        if 'data' in data:
+            payload = data['data']
+            evt = payload.get('e', '')
+
+            if evt == 'kline':
+                await mgr._handle_kline(payload)
+            elif evt == 'ACCOUNT_UPDATE':
+                pass
+            elif evt == 'ORDER_TRADE_UPDATE':
+                pass
+            elif evt == 'aggTrade':
+                symbol = payload['s'].replace('USDT', '/USDT')
+                price = float(payload['p'])
+                qty = float(payload['q'])
+                amount_usdt = price * qty
+                side = "SELL" if payload['m'] else "BUY"
+                if amount_usdt >= config.WHALE_THRESHOLD_USDT:
+                    whale_cb(symbol, amount_usdt, side)
+            elif evt == '24hrMiniTicker':
+                symbol = payload['s'].replace('USDT', '/USDT')
+                price = float(payload['c'])
+                asyncio.create_task(mgr._safe_callback_execution(trailing_cb, symbol, price))
+            elif evt == 'depthUpdate':
+                await mgr._handle_depth_update(payload)
+    await asyncio.sleep(0) # flush trailing tasks
+    return time.perf_counter() - start
+
+
+async def optimized_loop(mgr, msgs):
+    start = time.perf_counter()
+    for msg in msgs:
+        await mgr._on_ws_message(msg)
+    await asyncio.sleep(0)
+    return time.perf_counter() - start
+
+
+async def run_benchmark():
+    print(f"--- Benchmarking WebSocket Receive/Dispatch ({N_MESSAGES} messages, {len(config.DAFTAR_KOIN)} coins) ---")
+    msgs = make_messages(N_MESSAGES)
+
+    mgr = MarketDataManager(exchange=None)
+    mgr._ws_callbacks = {'whale': whale_cb, 'trailing': trailing_cb}
+
+    baseline = await baseline_loop(mgr, msgs)
+    print(f"\n[Baseline] json + if/elif chain : {N_MESSAGES / baseline:,.0f} msg/s ({baseline:.3f}s)")
+
+    for backend in ('json', 'auto'):
+        mgr.json_backend, mgr._json_loads = get_json_decoder(backend)
+        mgr._ws_handlers = mgr._build_ws_handlers()
+        optimized = await optimized_loop(mgr, msgs)
+        print(f"[Optimized] {mgr.json_backend:<8} + dispatch table: {N_MESSAGES / optimized:,.0f} msg/s ({optimized:.3f}s) "
+              f"-> {baseline / optimized:.2f}x")
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,37 @@
+import sys
+import os
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+
+@pytest.fixture
+def exchange():
+    """Mock exchange ccxt (async) dengan endpoint yang dipakai OrderExecutor."""
+    exchange = MagicMock()
+    exchange.price_to_precision = MagicMock(side_effect=lambda s, p: f"{float(p):.2f}")
+    exchange.amount_to_precision = MagicMock(side_effect=lambda s, q: str(q))
+    exchange.create_order = AsyncMock()
+    exchange.cancel_order = AsyncMock()
+    exchange.fetch_open_orders = AsyncMock(return_value=[])
+    exchange.fetch_positions = AsyncMock(return_value=[])
+    exchange.fapiPrivateDeleteAllOpenOrders = AsyncMock()
+    return exchange
+
+
+@pytest.fixture
+def executor(exchange):
+    # Import di dalam fixture: beberapa test mengganti modul 'config' sebelum import executor
+    from src.modules.executor import OrderExecutor
+
+    with patch.object(OrderExecutor, 'load_tracker', MagicMock()):
+        exc = OrderExecutor(exchange)
+    exc.save_tracker = AsyncMock()
+    exc.safety_orders_tracker = {}
+    return exc
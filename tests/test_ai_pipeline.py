@@ -0,0 +1,90 @@
+import sys
+import os
+import asyncio
+import time
+import pytest
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+from src.modules.ai_brain import AIDecisionPipeline
+
+
+class SlowBrain:
+    """Mock AIBrain: latency per prompt bisa diatur"""
+    def __init__(self, delays):
+        self.delays = delays
+        self.active = 0
+        self.peak = 0
+
+    async def analyze_market(self, prompt_text):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delays.get(prompt_text, 0.01))
+            return {"decision": "BUY", "confidence": 80, "reason": prompt_text}
+        finally:
+            self.active -= 1
+
+
+@pytest.mark.asyncio
+async def test_bounded_inflight_and_completion_order():
+    brain = SlowBrain({'slow': 0.2})
+    delivered = []
+
+    async def on_decision(symbol, decision, ctx):
+        delivered.append((symbol, decision['decision'], ctx['n']))
+
+    pipeline = AIDecisionPipeline(brain, on_decision, max_inflight=3, timeout=5)
+    start = time.monotonic()
+    pipeline.submit('SLOW/USDT', 'slow', {'n': 0})
+    for i in range(1, 9):
+        pipeline.submit(f"C{i}/USDT", f"p{i}", {'n': i})
+    await pipeline.drain()
+    elapsed = time.monotonic() - start
+
+    assert brain.peak == 3
+    assert len(delivered) == 9
+    # Simbol lambat tidak memblokir yang lain -> diterima paling akhir
+    assert delivered[-1][0] == 'SLOW/USDT'
+    assert elapsed < 0.5
+    assert pipeline.pending == 0 and pipeline.inflight == 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_returns_wait():
+    brain = SlowBrain({'hang': 10})
+    delivered = {}
+
+    async def on_decision(symbol, decision, ctx):
+        delivered[symbol] = decision
+
+    pipeline = AIDecisionPipeline(brain, on_decision, max_inflight=2, timeout=0.05)
+    pipeline.submit('HANG/USDT', 'hang')
+    pipeline.submit('OK/USDT', 'ok')
+    await pipeline.drain()
+
+    assert delivered['HANG/USDT']['decision'] == 'WAIT'
+    assert delivered['OK/USDT']['decision'] == 'BUY'
+    assert pipeline.timeouts == 1
+
+
+@pytest.mark.asyncio
+async def test_handler_error_does_not_break_pipeline():
+    brain = SlowBrain({})
+    calls = []
+
+    async def on_decision(symbol, decision, ctx):
+        calls.append(symbol)
+        if symbol == 'BAD/USDT':
+            raise RuntimeError("boom")
+
+    pipeline = AIDecisionPipeline(brain, on_decision, max_inflight=1, timeout=1)
+    pipeline.submit('BAD/USDT', 'a')
+    pipeline.submit('GOOD/USDT', 'b')
+    await pipeline.drain()
+    assert calls == ['BAD/USDT', 'GOOD/USDT']
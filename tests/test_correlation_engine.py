@@ -0,0 +1,130 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+from src.modules.correlation_engine import CorrelationEngine
+from src.utils.ring_buffer import OHLCVRingBuffer
+
+PERIOD = 30
+HOUR_MS = 3600 * 1000
+
+
+def make_rows(closes, start=0, skip=()):
+    return [[float((start + i) * HOUR_MS), c, c, c, c, 1.0] for i, c in enumerate(closes) if i not in skip]
+
+
+def expected_corr(rows_sym, rows_ref, period=PERIOD):
+    """Referensi: intersect timestamp seluruh store (termasuk candle berjalan) + Pearson window terakhir."""
+    a, b = np.asarray(rows_sym), np.asarray(rows_ref)
+    _, i, j = np.intersect1d(a[:, 0], b[:, 0], return_indices=True)
+    return float(np.corrcoef(a[i[-period:], 4], b[j[-period:], 4])[0, 1])
+
+
+def new_engine():
+    return CorrelationEngine(period=PERIOD, reference='BTC/USDT', timeframe='1h')
+
+
+def test_incremental_updates_match_full_recompute():
+    rng = np.random.default_rng(3)
+    n = 120
+    btc = 30000 + np.cumsum(rng.normal(0, 50, n))
+    alt = 0.01 * btc + np.cumsum(rng.normal(0, 1, n))
+
+    warm = 60
+    btc_rows = make_rows(btc[:warm])
+    alt_rows = make_rows(alt[:warm], skip={40})
+    bars_btc = OHLCVRingBuffer(500, btc_rows)
+    bars_alt = OHLCVRingBuffer(500, alt_rows)
+
+    engine = new_engine()
+    assert engine.correlation('ALT/USDT', bars_alt, bars_btc) == pytest.approx(expected_corr(alt_rows, btc_rows), rel=1e-9)
+
+    # Streaming: candle baru -> candle sebelumnya close (urutan referensi / simbol bergantian)
+    for i in range(warm, n):
+        btc_rows.append(make_rows([btc[i]], start=i)[0])
+        alt_rows.append(make_rows([alt[i]], start=i)[0])
+        pairs = [('BTC/USDT', bars_btc, btc_rows), ('ALT/USDT', bars_alt, alt_rows)]
+        for sym, bars, rows in (pairs if i % 2 else pairs[::-1]):
+            bars.append(rows[-1])
+            engine.on_candle_close(sym, '1h', list(bars[-2]))
+
+        corr = engine.correlation('ALT/USDT', bars_alt, bars_btc)
+        assert corr == pytest.approx(expected_corr(alt_rows, btc_rows), rel=1e-9)
+
+    # State tidak pernah di-rebuild dari store selama streaming
+    assert engine._pairs['ALT/USDT'].pushes >= n - warm
+
+
+def test_gap_invalidates_and_rebuilds_from_store():
+    rng = np.random.default_rng(5)
+    btc = 100 + np.cumsum(rng.normal(0, 1, 80))
+    alt = 100 + np.cumsum(rng.normal(0, 1, 80))
+    btc_rows, alt_rows = make_rows(btc), make_rows(alt)
+    bars_btc, bars_alt = OHLCVRingBuffer(500, btc_rows[:50]), OHLCVRingBuffer(500, alt_rows[:50])
+
+    engine = new_engine()
+    engine.correlation('ALT/USDT', bars_alt, bars_btc)
+
+    # Candle 50..54 terlewat (WS reconnect) -> candle 55 membuat gap
+    engine.on_candle_close('ALT/USDT', '1h', alt_rows[55])
+    assert 'ALT/USDT' not in engine._closes
+
+    bars_btc.extend(btc_rows[50:70])
+    bars_alt.extend(alt_rows[50:70])
+    corr = engine.correlation('ALT/USDT', bars_alt, bars_btc)
+    assert corr == pytest.approx(expected_corr(alt_rows[:70], btc_rows[:70]), rel=1e-9)
+
+
+def test_correlation_matrix_matches_numpy():
+    rng = np.random.default_rng(9)
+    n = 50
+    base = np.cumsum(rng.normal(0, 1, n))
+    series = {
+        'BTC/USDT': 100 + base,
+        'ETH/USDT': 50 + 0.8 * base + np.cumsum(rng.normal(0, 0.3, n)),
+        'SOL/USDT': 20 - 0.5 * base + np.cumsum(rng.normal(0, 0.5, n)),
+    }
+    engine = new_engine()
+    for sym, closes in series.items():
+        engine.seed(sym, OHLCVRingBuffer(500, make_rows(closes)))
+    engine.seed('NEW/USDT', OHLCVRingBuffer(500, make_rows(rng.normal(size=5), start=n - 5)))
+
+    symbols, matrix = engine.correlation_matrix(['BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'NEW/USDT'])
+    closed = np.column_stack([series[s][:-1][-PERIOD:] for s in symbols[:3]])
+    np.testing.assert_allclose(matrix[:3, :3], np.corrcoef(closed, rowvar=False), rtol=1e-9)
+
+    # Data tidak lengkap -> NaN (diagonal tetap 1)
+    assert np.isnan(matrix[3, 0]) and matrix[3, 3] == 1.0
+
+    # Cache per candle close referensi
+    assert engine.correlation_matrix(symbols)[1] is matrix
+
+
+def test_late_symbol_close_invalidates_cached_matrix():
+    rng = np.random.default_rng(11)
+    n = 50
+    btc = 100 + np.cumsum(rng.normal(0, 1, n))
+    eth = 50 + 0.5 * btc + np.cumsum(rng.normal(0, 0.3, n))
+    btc_rows, eth_rows = make_rows(btc), make_rows(eth)
+
+    engine = new_engine()
+    engine.seed('BTC/USDT', OHLCVRingBuffer(500, btc_rows[:n - 1]))
+    engine.seed('ETH/USDT', OHLCVRingBuffer(500, eth_rows[:n - 1]))
+
+    # Referensi close duluan -> matriks dibangun saat ETH belum close di ts yang sama
+    engine.on_candle_close('BTC/USDT', '1h', btc_rows[n - 2])
+    symbols, matrix = engine.correlation_matrix(['BTC/USDT', 'ETH/USDT'])
+    assert np.isnan(matrix[0, 1])
+
+    engine.on_candle_close('ETH/USDT', '1h', eth_rows[n - 2])
+    _, matrix = engine.correlation_matrix(symbols)
+    expected = np.corrcoef(btc[:n - 1][-PERIOD:], eth[:n - 1][-PERIOD:])[0, 1]
+    assert matrix[0, 1] == pytest.approx(expected, rel=1e-9)
@@ -0,0 +1,102 @@
+import sys
+import os
+import json
+import asyncio
+import pytest
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+from src.modules.event_queues import LatestWinsQueue, DropOldestQueue, LosslessQueue, EventChannel
+from src.modules.market_data import MarketDataManager
+
+
+@pytest.mark.asyncio
+async def test_latest_wins_coalesces_per_key():
+    q = LatestWinsQueue('ticker')
+    await q.put({'s': 'BTCUSDT', 'c': 1}, key='BTCUSDT')
+    await q.put({'s': 'ETHUSDT', 'c': 2}, key='ETHUSDT')
+    await q.put({'s': 'BTCUSDT', 'c': 3}, key='BTCUSDT')
+
+    assert q.qsize() == 2
+    assert q.coalesced == 1
+    # Urutan antrian tetap (BTC dulu), isinya nilai terbaru
+    assert await q.get() == {'s': 'BTCUSDT', 'c': 3}
+    assert await q.get() == {'s': 'ETHUSDT', 'c': 2}
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_is_bounded():
+    q = DropOldestQueue('aggTrade', maxsize=3)
+    for i in range(5):
+        await q.put(i)
+    assert q.qsize() == 3 and q.dropped == 2
+    assert [await q.get() for _ in range(3)] == [2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_lossless_applies_backpressure():
+    q = LosslessQueue('user', maxsize=1)
+    await q.put('a')
+    blocked = asyncio.create_task(q.put('b'))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    assert await q.get() == 'a'
+    await asyncio.wait_for(blocked, 1)
+    assert await q.get() == 'b'
+    assert q.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_order_handler_does_not_block_reader():
+    mgr = MarketDataManager(exchange=None)
+    release = asyncio.Event()
+    orders, prices = [], []
+
+    async def slow_order_update(payload):
+        await release.wait() # Simulasi REST / Telegram lambat
+        orders.append(payload['i'])
+
+    async def trailing(symbol, price):
+        prices.append((symbol, price))
+
+    mgr._ws_callbacks = {'order_update': slow_order_update, 'trailing': trailing}
+    mgr._ws_handlers = mgr._build_ws_handlers()
+    mgr._ws_channels = mgr._build_ws_channels()
+    for ch in mgr._unique_ws_channels():
+        ch.start()
+
+    try:
+        for i in range(3):
+            await mgr._on_ws_message(json.dumps({"data": {"e": "ORDER_TRADE_UPDATE", "i": i}}))
+        for price in ("1", "2", "3"):
+            await asyncio.wait_for(
+                mgr._on_ws_message(json.dumps({"data": {"e": "24hrMiniTicker", "s": "BTCUSDT", "c": price}})), 0.1
+            )
+
+        for _ in range(50):
+            if prices:
+                break
+            await asyncio.sleep(0.01)
+        # Ticker tetap diproses walau order handler macet, dan dicoalesce ke harga terbaru
+        assert prices and prices[-1][1] == 3.0
+        assert orders == []
+
+        release.set()
+        for _ in range(50):
+            if len(orders) == 3:
+                break
+            await asyncio.sleep(0.01)
+        assert orders == [0, 1, 2] # lossless + berurutan
+
+        stats = mgr.ws_queue_stats()
+        assert set(stats) == {'user', 'kline', 'depth', 'ticker'}
+        assert stats['user']['processed'] == 3
+    finally:
+        for ch in mgr._unique_ws_channels():
+            await ch.stop()
@@ -0,0 +1,107 @@
+import sys
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import numpy as np
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+from src.modules.exposure import ExposureManager, normalize_side
+
+SYMBOLS = ['ETH/USDT', 'SOL/USDT', 'AVAX/USDT', 'NEAR/USDT', 'DOGE/USDT', 'XAUT/USDT']
+# 4 alt berkorelasi tinggi, DOGE sedang, XAUT berkorelasi negatif
+MATRIX = np.array([
+    [1.00, 0.90, 0.85, 0.88, 0.50, -0.80],
+    [0.90, 1.00, 0.87, 0.86, 0.50, -0.80],
+    [0.85, 0.87, 1.00, 0.84, 0.50, -0.80],
+    [0.88, 0.86, 0.84, 1.00, 0.50, -0.80],
+    [0.50, 0.50, 0.50, 0.50, 1.00, 0.00],
+    [-0.80, -0.80, -0.80, -0.80, 0.00, 1.00],
+])
+
+
+def make_manager(positions=(), pending=()):
+    executor = SimpleNamespace(
+        position_cache={sym.split('/')[0]: {'symbol': sym, 'side': side} for sym, side in positions},
+        safety_orders_tracker={sym: {'status': 'WAITING_ENTRY', 'side': side} for sym, side in pending},
+    )
+    mgr = ExposureManager(executor)
+    mgr.threshold, mgr.max_correlated, mgr.downsize_step, mgr.min_scale = 0.75, 3, 0.25, 0.25
+    mgr.update_correlations(SYMBOLS, MATRIX)
+    return mgr
+
+
+def test_no_correlated_exposure_allows_full_size():
+    mgr = make_manager(positions=[('DOGE/USDT', 'LONG')])
+    result = mgr.check_entry('ETH/USDT', 'buy')
+    assert result['allowed'] and result['scale'] == 1.0 and result['correlated'] == []
+
+
+def test_correlated_same_direction_downsizes_then_rejects():
+    mgr = make_manager(positions=[('SOL/USDT', 'LONG')])
+    result = mgr.check_entry('ETH/USDT', 'buy')
+    assert result['allowed'] and result['scale'] == 0.75
+    assert result['correlated'] == [('SOL/USDT', 0.9)]
+
+    # Pending limit entry juga dihitung sebagai exposure
+    mgr = make_manager(positions=[('SOL/USDT', 'LONG'), ('AVAX/USDT', 'LONG')], pending=[('NEAR/USDT', 'LONG')])
+    result = mgr.check_entry('ETH/USDT', 'LONG')
+    assert result['allowed'] is False
+    assert {sym for sym, _ in result['correlated']} == {'SOL/USDT', 'AVAX/USDT', 'NEAR/USDT'}
+
+
+def test_opposite_direction_and_negative_correlation():
+    # Short SOL saat long ETH = hedge, bukan konsentrasi
+    mgr = make_manager(positions=[('SOL/USDT', 'SHORT')])
+    assert mgr.check_entry('ETH/USDT', 'buy')['scale'] == 1.0
+
+    # Short XAUT (korelasi -0.8) saat long ETH = risiko searah
+    mgr = make_manager(positions=[('XAUT/USDT', 'SHORT')])
+    result = mgr.check_entry('ETH/USDT', 'buy')
+    assert result['correlated'] == [('XAUT/USDT', -0.8)] and result['scale'] == 0.75
+
+
+def test_unknown_symbol_or_nan_is_ignored():
+    mgr = make_manager(positions=[('SOL/USDT', 'LONG')])
+    assert mgr.check_entry('NEW/USDT', 'buy')['scale'] == 1.0
+
+    matrix = MATRIX.copy()
+    matrix[0, 1] = matrix[1, 0] = np.nan
+    mgr.update_correlations(SYMBOLS, matrix)
+    assert mgr.check_entry('ETH/USDT', 'buy')['correlated'] == []
+
+
+def test_normalize_side():
+    assert normalize_side('buy') == normalize_side('LONG') == 'LONG'
+    assert normalize_side('sell') == normalize_side('short') == 'SHORT'
+
+
+def test_nan_pair_refetches_matrix_once_per_late_symbol_close():
+    from src.modules.exposure import config  # config yang dipakai modul (bisa di-mock test lain)
+    matrix = MATRIX.copy()
+    matrix[0, 1] = matrix[1, 0] = np.nan
+    bars = lambda ts: [[ts - 1000, 0, 0, 0, 1], [ts, 0, 0, 0, 1], [ts + 1000, 0, 0, 0, 1]]
+    store = {sym: {config.TIMEFRAME_TREND: bars(2000)} for sym in (config.BTC_SYMBOL, 'ETH/USDT')}
+    store['SOL/USDT'] = {config.TIMEFRAME_TREND: bars(1000)}  # Close SOL belum masuk
+    market_data = SimpleNamespace(
+        market_store=store,
+        get_correlation_matrix=MagicMock(side_effect=[(SYMBOLS, matrix), (SYMBOLS, MATRIX)]),
+    )
+    mgr = make_manager(positions=[('SOL/USDT', 'LONG'), ('MANUAL/USDT', 'LONG')])
+    mgr.market_data = market_data
+
+    # Candle BTC baru -> 1 fetch; SOL masih NaN, MANUAL di luar watchlist: tidak fetch ulang
+    assert mgr.check_entry('ETH/USDT', 'buy')['correlated'] == []
+    assert mgr.check_entry('ETH/USDT', 'buy')['correlated'] == []
+    assert market_data.get_correlation_matrix.call_count == 1
+
+    # Close SOL telat masuk -> tepat 1 fetch ulang
+    store['SOL/USDT'][config.TIMEFRAME_TREND] = bars(2000)
+    assert mgr.check_entry('ETH/USDT', 'buy')['correlated'] == [('SOL/USDT', 0.9)]
+    mgr.check_entry('ETH/USDT', 'buy')
+    assert market_data.get_correlation_matrix.call_count == 2
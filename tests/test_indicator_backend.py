@@ -0,0 +1,107 @@
+import sys
+import os
+import math
+import asyncio
+import pytest
+import numpy as np
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+import config
+config.PAKAI_DEMO = False # Avoid creating CCXT instance
+
+from src.modules import market_data as md
+from src.modules.market_data import MarketDataManager, _calculate_tech_data_threaded
+from src.utils.ring_buffer import OHLCVRingBuffer
+
+SYMBOLS = ['AAA/USDT', 'BBB/USDT', 'CCC/USDT']
+
+
+def make_rows(n, seed, interval_ms):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    rows = []
+    for i, c in enumerate(close):
+        op = close[i - 1] if i else c
+        rows.append([i * interval_ms, op, max(op, c) * 1.002, min(op, c) * 0.998, c, 500.0 + i])
+    return rows
+
+
+def make_manager(backend):
+    mgr = MarketDataManager(exchange=None)
+    mgr.indicator_engine = None # Paksa jalur kalkulasi penuh
+    mgr.indicator_backend = backend
+    for i, sym in enumerate(SYMBOLS):
+        mgr.market_store[sym] = {
+            config.TIMEFRAME_EXEC: OHLCVRingBuffer(config.LIMIT_EXEC, make_rows(config.LIMIT_EXEC, i, 900_000)),
+            config.TIMEFRAME_TREND: OHLCVRingBuffer(config.LIMIT_TREND, make_rows(config.LIMIT_TREND, 10 + i, 14_400_000)),
+        }
+    return mgr
+
+
+@pytest.mark.asyncio
+async def test_thread_batch_fills_cache():
+    mgr = make_manager('thread')
+    results = await mgr.refresh_technical_data(SYMBOLS + ['MISSING/USDT'])
+
+    assert set(results) == set(SYMBOLS)
+    for sym in SYMBOLS:
+        bars_exec = mgr.market_store[sym][config.TIMEFRAME_EXEC].snapshot()
+        bars_trend = mgr.market_store[sym][config.TIMEFRAME_TREND].snapshot()
+        expected = _calculate_tech_data_threaded(bars_exec, bars_trend, sym)
+        assert results[sym]['rsi'] == pytest.approx(expected['rsi'])
+        assert mgr.tech_cache[sym]['timestamp'] == bars_exec[-2][0]
+
+    # Cache hit -> tidak ada dispatch ulang
+    async def fail(jobs):
+        raise AssertionError("should not recompute")
+    mgr._run_tech_calc_batch = fail
+    assert (await mgr.get_technical_data(SYMBOLS[0]))['rsi'] == results[SYMBOLS[0]]['rsi']
+
+
+@pytest.mark.asyncio
+async def test_process_backend_matches_thread_backend():
+    config.INDICATOR_PROCESS_WORKERS = 2
+    try:
+        thread_res = await make_manager('thread').refresh_technical_data(SYMBOLS)
+        process_res = await make_manager('process').refresh_technical_data(SYMBOLS)
+    finally:
+        md.shutdown_indicator_pool()
+        config.INDICATOR_PROCESS_WORKERS = 0
+
+    assert set(process_res) == set(SYMBOLS)
+    for sym in SYMBOLS:
+        for key in ['price', 'rsi', 'adx', 'atr', 'stoch_k', 'bb_upper']:
+            a, b = float(thread_res[sym][key]), float(process_res[sym][key])
+            assert (math.isnan(a) and math.isnan(b)) or a == b
+        assert thread_res[sym]['market_structure'] == process_res[sym]['market_structure']
+
+
+@pytest.mark.asyncio
+async def test_candle_close_queues_single_batch():
+    mgr = make_manager('process')
+    config.INDICATOR_BATCH_WINDOW = 0.01
+    dispatched = []
+
+    async def fake_refresh(symbols):
+        dispatched.append(sorted(symbols))
+        return {}
+    mgr.refresh_technical_data = fake_refresh
+
+    try:
+        for sym in SYMBOLS:
+            last = mgr.market_store[sym][config.TIMEFRAME_EXEC][-1]
+            await mgr._handle_kline({
+                's': sym.replace('/', ''),
+                'k': {'i': config.TIMEFRAME_EXEC, 't': last[0] + 900_000, 'o': 1, 'h': 1, 'l': 1, 'c': 1, 'v': 1}
+            })
+        await mgr._batch_refresh_task
+    finally:
+        config.INDICATOR_BATCH_WINDOW = 0.5
+
+    assert dispatched == [sorted(SYMBOLS)]
@@ -0,0 +1,137 @@
+import sys
+import os
+import math
+import asyncio
+import pytest
+import numpy as np
+from collections import deque
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+import config
+config.PAKAI_DEMO = False # Avoid creating CCXT instance
+config.CONCURRENCY_LIMIT = 20
+
+from src.modules.market_data import MarketDataManager, _calculate_tech_data_threaded
+from src.modules.indicator_engine import IndicatorEngine
+
+NUMERIC_KEYS = ['price', 'rsi', 'adx', 'ema_fast', 'ema_slow', 'vol_ma', 'volume',
+                'bb_upper', 'bb_lower', 'stoch_k', 'stoch_d', 'atr']
+
+EXEC_MS = 15 * 60 * 1000
+
+
+def make_bars(n, seed=7, start_ts=0, interval_ms=EXEC_MS):
+    """Random walk OHLCV bars: [timestamp, open, high, low, close, volume]"""
+    rng = np.random.default_rng(seed)
+    bars = []
+    price = 100.0
+    for i in range(n):
+        op = price
+        cl = max(1.0, op * (1 + rng.normal(0, 0.01)))
+        hi = max(op, cl) * (1 + abs(rng.normal(0, 0.004)))
+        lo = min(op, cl) * (1 - abs(rng.normal(0, 0.004)))
+        vol = float(rng.uniform(100, 1000))
+        bars.append([start_ts + i * interval_ms, op, hi, lo, cl, vol])
+        price = cl
+    return bars
+
+
+def assert_tech_equal(expected, actual, rel=1e-9):
+    for key in NUMERIC_KEYS:
+        e, a = float(expected[key]), float(actual[key])
+        if math.isnan(e):
+            assert math.isnan(a), f"{key}: expected NaN, got {a}"
+        else:
+            assert a == pytest.approx(e, rel=rel, abs=1e-9), f"{key}: {a} != {e}"
+    for key in ['price_vs_ema', 'trend_major', 'pivots', 'market_structure',
+                'wick_rejection', 'candle_timestamp', 'global_trend_1d']:
+        assert expected[key] == actual[key], f"{key}: {actual[key]} != {expected[key]}"
+
+
+def test_engine_matches_pandas_on_full_window():
+    mgr = MarketDataManager(exchange=None)
+    bars_exec = make_bars(config.LIMIT_EXEC)
+    bars_trend = make_bars(config.LIMIT_TREND, seed=11, interval_ms=4 * 3600 * 1000)
+
+    expected = _calculate_tech_data_threaded(bars_exec, bars_trend, 'BTC/USDT')
+    actual = mgr._build_tech_data_incremental('BTC/USDT', bars_exec, bars_trend)
+
+    assert expected is not None and actual is not None
+    assert_tech_equal(expected, actual)
+
+
+@pytest.mark.asyncio
+async def test_engine_tracks_sliding_window_via_kline():
+    mgr = MarketDataManager(exchange=None)
+    symbol = config.BTC_SYMBOL
+    all_bars = make_bars(config.LIMIT_EXEC + 60, seed=3)
+
+    mgr.market_store[symbol][config.TIMEFRAME_EXEC] = deque(all_bars[:config.LIMIT_EXEC], maxlen=config.LIMIT_EXEC)
+    bars_trend = make_bars(config.LIMIT_TREND, seed=5, interval_ms=4 * 3600 * 1000)
+    mgr.market_store[symbol][config.TIMEFRAME_TREND] = deque(bars_trend, maxlen=config.LIMIT_TREND)
+
+    # Warm-up state dari store
+    state = mgr.indicator_engine.exec_state(symbol, list(mgr.market_store[symbol][config.TIMEFRAME_EXEC]))
+    assert state.ready
+
+    # Stream candle baru via WebSocket payload
+    for bar in all_bars[config.LIMIT_EXEC:]:
+        await mgr._handle_kline({
+            's': 'BTCUSDT',
+            'k': {'i': config.TIMEFRAME_EXEC, 't': bar[0], 'o': bar[1], 'h': bar[2], 'l': bar[3], 'c': bar[4], 'v': bar[5]}
+        })
+
+    store = list(mgr.market_store[symbol][config.TIMEFRAME_EXEC])
+    # State harus diupdate incremental (tidak di-rebuild)
+    assert mgr.indicator_engine._exec_states[symbol] is state
+    assert state.last_ts == store[-2][0]
+
+    expected = _calculate_tech_data_threaded(store, bars_trend, symbol)
+    actual = mgr._build_tech_data_incremental(symbol, store, bars_trend)
+    # Window pandas bergeser (seed berbeda) -> selisih sangat kecil
+    assert_tech_equal(expected, actual, rel=1e-6)
+
+
+def test_gap_invalidates_state():
+    engine = IndicatorEngine()
+    bars = make_bars(100)
+    state = engine.exec_state('BTC/USDT', bars)
+    assert state.last_ts == bars[-2][0]
+
+    # Candle loncat (ada yang hilang) -> state dibuang, rebuild lazily
+    gap_candle = [bars[-2][0] + 3 * EXEC_MS, 100.0, 101.0, 99.0, 100.5, 500.0]
+    engine.on_candle_close('BTC/USDT', config.TIMEFRAME_EXEC, gap_candle)
+    assert 'BTC/USDT' not in engine._exec_states
+
+    rebuilt = engine.exec_state('BTC/USDT', bars)
+    assert rebuilt is not state
+    assert rebuilt.last_ts == bars[-2][0]
+
+
+def test_btc_trend_uses_engine():
+    mgr = MarketDataManager(exchange=None)
+    bars = make_bars(config.LIMIT_TREND, seed=9, interval_ms=4 * 3600 * 1000)
+    mgr.market_store[config.BTC_SYMBOL][config.TIMEFRAME_TREND] = deque(bars, maxlen=config.LIMIT_TREND)
+
+    import pandas as pd
+    import pandas_ta as ta
+    df = pd.DataFrame(bars, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    ema = df.ta.ema(length=config.BTC_EMA_PERIOD).iloc[-1]
+    expected = "BULLISH" if df['close'].iloc[-1] > ema else "BEARISH"
+
+    mgr._update_btc_trend()
+    assert mgr.btc_trend == expected
+
+    state = mgr.indicator_engine._trend_states[config.BTC_SYMBOL]
+    assert state.peek_ema(config.BTC_EMA_PERIOD, bars[-1][4]) == pytest.approx(ema, rel=1e-9)
+
+
+if __name__ == "__main__":
+    test_engine_matches_pandas_on_full_window()
+    asyncio.run(test_engine_tracks_sliding_window_via_kline())
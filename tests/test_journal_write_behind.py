@@ -0,0 +1,211 @@
+import sys
+import os
+import asyncio
+import json
+import pytest
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+from pymongo.errors import AutoReconnect, BulkWriteError
+from src.modules.journal import TradeJournal
+from src.modules.mongo_manager import MongoManager
+
+
+class FakeMongo:
+    """insert_trades: gagal total saat down, atau hanya menerima `accept` dokumen pertama."""
+
+    def __init__(self):
+        self.docs = []
+        self.down = False
+        self.accept = None
+        self.calls = 0
+
+    def insert_trades(self, trades):
+        self.calls += 1
+        if self.down:
+            return 0, []
+        n = len(trades) if self.accept is None else min(self.accept, len(trades))
+        self.docs.extend(dict(t) for t in trades[:n])
+        return n, []
+
+    def insert_trade(self, trade):
+        return self.insert_trades([trade])[0] == 1
+
+
+def make_journal(tmp_path, mongo):
+    journal = TradeJournal(mongo=mongo)
+    journal.spill_path = str(tmp_path / 'spill.jsonl')
+    journal.batch_size = 2
+    journal.flush_interval = 0.01
+    journal.retry_interval = 0
+    return journal
+
+
+def trade(i, pnl=1.0):
+    return {'symbol': f'COIN{i}/USDT', 'side': 'LONG', 'pnl_usdt': pnl, 'size_usdt': 100, 'prompt': 'p', 'reason': 'r'}
+
+
+@pytest.mark.asyncio
+async def test_log_trade_is_queued_and_batched(tmp_path):
+    mongo = FakeMongo()
+    journal = make_journal(tmp_path, mongo)
+    journal.start()
+
+    for i in range(5):
+        assert journal.log_trade(trade(i)) is True
+    assert mongo.docs == []  # Hot path tidak menulis langsung
+
+    await journal.close()
+    assert [d['symbol'] for d in mongo.docs] == [f'COIN{i}/USDT' for i in range(5)]
+    assert mongo.docs[0]['result'] == 'WIN' and mongo.docs[0]['pnl_percent'] == pytest.approx(1.0)
+    assert mongo.calls == 3  # insert_many per batch (2 + 2 + 1)
+
+
+@pytest.mark.asyncio
+async def test_failed_writes_spill_and_replay_in_order(tmp_path):
+    mongo = FakeMongo()
+    mongo.down = True
+    journal = make_journal(tmp_path, mongo)
+
+    journal._queue.extend(journal.build_trade_doc(trade(i)) for i in range(3))
+    await journal.flush()
+    with open(journal.spill_path) as f:
+        assert [json.loads(line)['symbol'] for line in f] == ['COIN0/USDT', 'COIN1/USDT', 'COIN2/USDT']
+
+    # Selama backlog ada, dokumen baru masuk ke belakang spill
+    mongo.down = False
+    mongo.accept = 1  # Partial failure: hanya 1 dokumen per batch yang masuk
+    journal._queue.append(journal.build_trade_doc(trade(3)))
+    await journal.flush()
+    assert [d['symbol'] for d in mongo.docs] == ['COIN0/USDT']
+    with open(journal.spill_path) as f:
+        assert [json.loads(line)['symbol'] for line in f] == ['COIN1/USDT', 'COIN2/USDT', 'COIN3/USDT']
+
+    mongo.accept = None
+    await journal.flush()
+    assert [d['symbol'] for d in mongo.docs] == [f'COIN{i}/USDT' for i in range(4)]
+    assert not os.path.exists(journal.spill_path)
+
+
+@pytest.mark.asyncio
+async def test_slow_database_does_not_block_event_loop(tmp_path):
+    class SlowMongo(FakeMongo):
+        def insert_trades(self, trades):
+            import time
+            time.sleep(0.2)  # Mis. serverSelectionTimeout
+            return super().insert_trades(trades)
+
+    mongo = SlowMongo()
+    journal = make_journal(tmp_path, mongo)
+    journal.start()
+    journal.log_trade(trade(0))
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    ticks = 0
+    while loop.time() - start < 0.15:
+        await asyncio.sleep(0.01)
+        ticks += 1
+    assert ticks >= 10  # Loop tetap berjalan selama insert berlangsung di thread
+
+    await journal.close()
+    assert len(mongo.docs) == 1
+
+
+@pytest.mark.asyncio
+async def test_close_stops_writer_without_cancel(tmp_path):
+    mongo = FakeMongo()
+    journal = make_journal(tmp_path, mongo)
+    journal.flush_interval = 60  # Close tidak boleh menunggu interval flush
+    task = journal.start()
+    journal.log_trade(trade(0))
+
+    await asyncio.wait_for(journal.close(), timeout=1)
+    assert task.done() and not task.cancelled()
+    assert len(mongo.docs) == 1 and not os.path.exists(journal.spill_path)
+
+    # Setelah writer berhenti: spill lokal, bukan insert / connect Mongo di event loop
+    journal._mongo = None
+    assert journal.log_trade(trade(1)) is True
+    assert journal._mongo is None and len(mongo.docs) == 1
+    with open(journal.spill_path) as f:
+        assert [json.loads(line)['symbol'] for line in f] == ['COIN1/USDT']
+
+
+@pytest.mark.asyncio
+async def test_trades_logged_during_final_flush_are_spilled(tmp_path):
+    class SlowMongo(FakeMongo):
+        def insert_trades(self, trades):
+            import time
+            time.sleep(0.05)
+            return super().insert_trades(trades)
+
+    mongo = SlowMongo()
+    journal = make_journal(tmp_path, mongo)
+    journal.start()
+    journal.log_trade(trade(0))
+
+    closing = asyncio.create_task(journal.close())
+    await asyncio.sleep(0.02)  # Flush terakhir sedang menulis COIN0
+    assert journal.log_trade(trade(1)) is True
+    await closing
+
+    assert [d['symbol'] for d in mongo.docs] == ['COIN0/USDT']
+    with open(journal.spill_path) as f:
+        assert [json.loads(line)['symbol'] for line in f] == ['COIN1/USDT']
+
+
+class FakeCollection:
+    """insert_many ordered dengan unique _id; `fail` = {_id: exception} sebelum dokumen itu ditulis."""
+
+    def __init__(self):
+        self.docs = {}
+        self.fail = {}
+
+    def insert_many(self, docs, ordered=True):
+        for i, doc in enumerate(docs):
+            error = self.fail.pop(doc['_id'], None)
+            if isinstance(error, Exception):
+                raise error
+            if error is not None or doc['_id'] in self.docs:
+                code = error if error is not None else 11000
+                raise BulkWriteError({'nInserted': i, 'writeErrors': [{'index': i, 'code': code, 'errmsg': 'err'}]})
+            self.docs[doc['_id']] = doc
+
+
+def make_mongo(collection):
+    mongo = object.__new__(MongoManager)  # Tanpa connect (singleton asli tidak disentuh)
+    mongo.db = object()
+    mongo.trades_collection = collection
+    return mongo
+
+
+def test_insert_trades_is_idempotent_and_quarantines_permanent_failures(tmp_path):
+    collection = FakeCollection()
+    mongo = make_mongo(collection)
+    docs = [{'_id': str(i), 'symbol': f'COIN{i}/USDT'} for i in range(4)]
+
+    # Koneksi putus setelah sebagian dokumen terkirim -> retryable, sisa di-retry
+    collection.fail['2'] = AutoReconnect('connection reset')
+    assert mongo.insert_trades(docs) == (0, [])
+    mongo.db = object()
+
+    # Retry: dokumen yang sudah masuk = duplicate _id (bukan duplikat data); '3' gagal validasi permanen
+    collection.fail['3'] = 121
+    assert mongo.insert_trades(docs) == (4, [docs[3]])
+    assert sorted(collection.docs) == ['0', '1', '2']
+
+    # Journal: dokumen yang ditolak permanen tidak menahan spill, dipindah ke karantina
+    journal = make_journal(tmp_path, mongo)
+    journal.quarantine_path = str(tmp_path / 'quarantine.jsonl')
+    bad = {'_id': 'bad', 'symbol': 'BAD/USDT'}
+    collection.fail['bad'] = 121
+    journal._write_or_spill([bad, {'_id': 'ok', 'symbol': 'OK/USDT'}])
+    assert 'ok' in collection.docs and not os.path.exists(journal.spill_path)
+    with open(journal.quarantine_path) as f:
+        assert [json.loads(line)['_id'] for line in f] == ['bad']
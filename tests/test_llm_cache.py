@@ -0,0 +1,77 @@
+import sys
+import os
+import asyncio
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+import config
+from src.modules.llm_cache import LLMResponseCache
+from src.modules.ai_brain import AIBrain
+
+
+def test_key_is_content_addressed():
+    k1 = LLMResponseCache.make_key('m', 0.0, None, "Analyze  BTC\n\n  now")
+    k2 = LLMResponseCache.make_key('m', 0.0, None, "Analyze BTC now")
+    assert k1 == k2 # Normalisasi whitespace
+    assert k1 != LLMResponseCache.make_key('m', 0.3, None, "Analyze BTC now")
+    assert k1 != LLMResponseCache.make_key('other', 0.0, None, "Analyze BTC now")
+    assert k1 != LLMResponseCache.make_key('m', 0.0, {"reasoning": {"effort": "high"}}, "Analyze BTC now")
+
+
+@pytest.mark.asyncio
+async def test_lru_ttl_and_persistence(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = LLMResponseCache(path=path, ttl=3600, max_entries=2)
+
+    await cache.put('a', {"decision": "BUY"})
+    await cache.put('b', {"decision": "SELL"})
+    assert cache.get('a')['decision'] == "BUY" # 'a' jadi most recent
+    await cache.put('c', {"decision": "WAIT"}) # Evict 'b' (LRU)
+
+    assert cache.get('b') is None
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+    cache.close()
+
+    # Restart -> dimuat dari disk
+    reloaded = LLMResponseCache(path=path, ttl=3600, max_entries=2)
+    assert reloaded.get('a') == {"decision": "BUY"}
+    assert reloaded.get('c') == {"decision": "WAIT"}
+    assert reloaded.get('b') is None
+
+    # TTL expired
+    reloaded._mem['a'] = (0, {"decision": "BUY"})
+    assert reloaded.get('a') is None
+    reloaded.close()
+
+
+@pytest.mark.asyncio
+async def test_ai_brain_skips_api_on_hit(tmp_path):
+    with patch.object(config, 'AI_API_KEY', 'dummy_key'), \
+         patch.object(config, 'AI_CACHE_ENABLED', True), \
+         patch.object(config, 'AI_CACHE_FILE', str(tmp_path / "brain.sqlite")), \
+         patch('src.modules.ai_brain.AsyncOpenAI') as MockClient:
+
+        mock_create = AsyncMock(return_value=MagicMock(
+            choices=[MagicMock(message=MagicMock(content='{"decision": "BUY", "confidence": 90}', reasoning=None))]
+        ))
+        MockClient.return_value.chat.completions.create = mock_create
+
+        brain = AIBrain()
+        first = await brain.analyze_market("Same prompt")
+        first['decision'] = 'MUTATED' # Caller mutation tidak boleh merusak cache
+        second = await brain.analyze_market("Same   prompt")
+
+        assert mock_create.await_count == 1
+        assert second['decision'] == 'BUY'
+        assert brain.cache.stats()['hits'] == 1
+
+        await brain.analyze_market("Different prompt")
+        assert mock_create.await_count == 2
+        brain.cache.close()
@@ -0,0 +1,122 @@
+import sys
+import os
+import random
+import pytest
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+from src.modules.order_book import LocalOrderBook
+from src.modules.market_data import MarketDataManager
+
+
+def make_snapshot(last_id=100):
+    return {
+        'bids': [[100.0 - i, 1.0] for i in range(1, 6)],   # 99..95
+        'asks': [[100.0 + i, 1.0] for i in range(1, 6)],   # 101..105
+        'nonce': last_id
+    }
+
+
+def diff(first, final, prev, bids=(), asks=()):
+    return {'e': 'depthUpdate', 's': 'BTCUSDT', 'U': first, 'u': final, 'pu': prev,
+            'b': [[str(p), str(q)] for p, q in bids], 'a': [[str(p), str(q)] for p, q in asks]}
+
+
+def naive_imbalance(book, range_pct):
+    """Referensi: hitung ulang dari nol seperti get_order_book_depth lama."""
+    bids, asks = book.top_levels(10 ** 6)
+    mid = (bids[0][0] + asks[0][0]) / 2
+    bids_vol = sum(p * q for p, q in bids if p >= mid * (1 - range_pct))
+    asks_vol = sum(p * q for p, q in asks if p <= mid * (1 + range_pct))
+    return bids_vol, asks_vol
+
+
+def test_snapshot_then_sequential_diffs():
+    book = LocalOrderBook('BTC/USDT', range_pct=0.5)
+    # Diff sebelum snapshot di-buffer
+    assert book.apply_diff(diff(95, 99, 94, bids=[(99, 5)])) is None
+    assert book.apply_diff(diff(100, 102, 99, bids=[(99.5, 2)])) is None
+
+    assert book.apply_snapshot(make_snapshot(100)) is True
+    # Event u=99 < lastUpdateId dibuang, event U=100..u=102 diterapkan
+    assert book.best_bid() == 99.5
+    assert book._bids[99.0] == 1.0
+    assert book.last_update_id == 102
+
+    assert book.apply_diff(diff(103, 104, 102, asks=[(101, 0)])) is True
+    assert book.best_ask() == 102.0
+    assert book.depth() == (6, 4)
+
+
+def test_sequence_gap_requires_resync():
+    book = LocalOrderBook('BTC/USDT', range_pct=0.5)
+    book.apply_snapshot(make_snapshot(100))
+    assert book.apply_diff(diff(99, 101, 98)) is True
+
+    # pu tidak sama dengan u sebelumnya -> gap
+    assert book.apply_diff(diff(105, 106, 104)) is False
+    assert book.synced is False
+    assert book.resyncs == 1
+    assert book.imbalance() is None
+
+    # Snapshot baru -> event gap di-buffer tetap di-replay
+    book.apply_snapshot(make_snapshot(105))
+    assert book.synced is True
+    assert book.last_update_id == 106
+
+
+def test_first_event_after_snapshot_must_cover_last_update_id():
+    book = LocalOrderBook('BTC/USDT', range_pct=0.5)
+    book.apply_snapshot(make_snapshot(100))
+    # U > lastUpdateId -> snapshot tertinggal
+    assert book.apply_diff(diff(110, 111, 109)) is False
+    assert book.synced is False
+
+
+def test_running_notional_matches_full_recompute():
+    rng = random.Random(7)
+    range_pct = 0.02
+    book = LocalOrderBook('BTC/USDT', range_pct=range_pct)
+    book.apply_snapshot({
+        'bids': [[round(100 - i * 0.05, 2), rng.uniform(0.1, 5)] for i in range(1, 200)],
+        'asks': [[round(100 + i * 0.05, 2), rng.uniform(0.1, 5)] for i in range(1, 200)],
+        'nonce': 1
+    })
+
+    last = 1
+    for i in range(2000):
+        # Mid bergeser perlahan -> band ikut bergeser
+        center = 100 + 3 * ((i % 400) / 400 - 0.5)
+        bids = [(round(center - rng.randint(1, 150) * 0.05, 2), rng.choice([0, rng.uniform(0.1, 5)])) for _ in range(3)]
+        asks = [(round(center + rng.randint(1, 150) * 0.05, 2), rng.choice([0, rng.uniform(0.1, 5)])) for _ in range(3)]
+        assert book.apply_diff(diff(last, last + 2, last, bids=bids, asks=asks)) is True
+        last += 2
+
+        if book.best_bid() is not None and book.best_ask() is not None and book.best_bid() < book.best_ask():
+            expected_bids, expected_asks = naive_imbalance(book, range_pct)
+            assert book.bid_notional == pytest.approx(expected_bids, rel=1e-9, abs=1e-6)
+            assert book.ask_notional == pytest.approx(expected_asks, rel=1e-9, abs=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_market_data_uses_local_book_when_synced():
+    mgr = MarketDataManager(exchange=None)
+    mgr.use_local_order_book = True
+    mgr._schedule_book_resync = lambda symbol: None
+
+    await mgr._handle_depth_update(diff(1, 2, 0, bids=[(99, 1)]))
+    book = mgr.local_books['BTC/USDT']
+    assert book.synced is False
+
+    book.range_pct = 0.5
+    book.apply_snapshot(make_snapshot(1))
+    result = await mgr.get_order_book_depth('BTC/USDT')
+    assert result['bids_vol_usdt'] == pytest.approx(book.bid_notional)
+    assert result['imbalance_pct'] == pytest.approx(
+        (book.bid_notional - book.ask_notional) / (book.bid_notional + book.ask_notional) * 100
+    )
@@ -3,7 +3,6 @@ import asyncio
 import sys
 import os
 import pytest
-from collections import deque
 from unittest.mock import MagicMock
 
 # Add root and src to path
@@ -15,6 +14,7 @@ if os.path.join(repo_root, 'src') not in sys.path:
 
 import src.config as config
 from src.modules.market_data import MarketDataManager
+from src.utils.ring_buffer import OHLCVRingBuffer
 
 @pytest.mark.asyncio
 async def test_verify_limits():
@@ -27,7 +27,7 @@ async def test_verify_limits():
     print(f"Timeframe: {config.TIMEFRAME_EXEC}, Limit: {config.LIMIT_EXEC}")
 
     store = mgr.market_store[config.BTC_SYMBOL][config.TIMEFRAME_EXEC]
-    assert isinstance(store, deque), "Store is not a deque"
+    assert isinstance(store, OHLCVRingBuffer), "Store is not a ring buffer"
     assert store.maxlen == config.LIMIT_EXEC, f"Maxlen mismatch. Expected {config.LIMIT_EXEC}, got {store.maxlen}"
 
     # Push data beyond limit
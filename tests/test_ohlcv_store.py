@@ -0,0 +1,118 @@
+import sys
+import os
+import time
+import asyncio
+import numpy as np
+import pytest
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+import config
+config.PAKAI_DEMO = False # Avoid creating CCXT instance
+
+from src.utils.ohlcv_store import OHLCVDiskStore, merge_tail
+from src.modules.market_data import MarketDataManager
+
+INTERVAL_MS = 15 * 60 * 1000
+
+
+def make_rows(n, end_ts):
+    start = end_ts - (n - 1) * INTERVAL_MS
+    return [[float(start + i * INTERVAL_MS), 1.0, 2.0, 0.5, 1.0 + i, 10.0] for i in range(n)]
+
+
+class FakeExchange:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.calls.append({"since": since, "limit": limit})
+        rows = self.rows
+        if since is not None:
+            rows = [r for r in rows if r[0] >= since]
+            return rows[:limit]
+        return rows[-limit:]
+
+
+def test_save_load_roundtrip(tmp_path):
+    store = OHLCVDiskStore(str(tmp_path))
+    rows = make_rows(50, 1_000 * INTERVAL_MS)
+    assert store.save('BTC/USDT:USDT', '15m', rows)
+
+    loaded = store.load('BTC/USDT:USDT', '15m', limit=20)
+    assert loaded.shape == (20, 6)
+    np.testing.assert_array_equal(loaded, np.asarray(rows)[-20:])
+    assert store.load('ETH/USDT', '15m') is None
+
+
+def test_corrupt_file_returns_none(tmp_path):
+    store = OHLCVDiskStore(str(tmp_path))
+    with open(store.path('BTC/USDT', '1h'), 'wb') as f:
+        f.write(b'not a npy file')
+    assert store.load('BTC/USDT', '1h') is None
+
+
+def test_merge_tail_replaces_open_candle():
+    cached = np.asarray(make_rows(5, 10 * INTERVAL_MS))
+    tail = [[10 * INTERVAL_MS, 9, 9, 9, 9, 9], [11 * INTERVAL_MS, 8, 8, 8, 8, 8]]
+    merged = merge_tail(cached, tail)
+    assert len(merged) == 6
+    assert merged[-2][4] == 9 # candle terakhir cache (belum close) diganti versi fetch
+    assert merged[-1][0] == 11 * INTERVAL_MS
+
+
+@pytest.mark.asyncio
+async def test_load_ohlcv_fetches_only_tail(tmp_path, monkeypatch):
+    limit = 100
+    now_ms = (int(time.time() * 1000) // INTERVAL_MS) * INTERVAL_MS
+    full = make_rows(limit + 3, now_ms)
+
+    exchange = FakeExchange(full)
+    mgr = MarketDataManager(exchange)
+    mgr.ohlcv_store = OHLCVDiskStore(str(tmp_path))
+
+    # Cache di disk ketinggalan 3 candle
+    mgr.ohlcv_store.save('BTC/USDT', '15m', full[:limit])
+
+    bars = await mgr._load_ohlcv('BTC/USDT', '15m', limit)
+
+    assert len(exchange.calls) == 1
+    assert exchange.calls[0]["since"] == full[limit - 1][0]
+    assert exchange.calls[0]["limit"] <= 6
+    np.testing.assert_array_equal(bars, np.asarray(full)[-limit:])
+    assert mgr.ohlcv_fetch_stats == {"full": 0, "tail": 1}
+
+
+@pytest.mark.asyncio
+async def test_load_ohlcv_full_fetch_when_cache_stale(tmp_path):
+    limit = 100
+    now_ms = (int(time.time() * 1000) // INTERVAL_MS) * INTERVAL_MS
+    exchange = FakeExchange(make_rows(limit, now_ms))
+    mgr = MarketDataManager(exchange)
+    mgr.ohlcv_store = OHLCVDiskStore(str(tmp_path))
+
+    # Cache terlalu lama (gap > limit candle) -> full fetch
+    mgr.ohlcv_store.save('BTC/USDT', '15m', make_rows(limit, now_ms - 500 * INTERVAL_MS))
+    bars = await mgr._load_ohlcv('BTC/USDT', '15m', limit)
+
+    assert exchange.calls == [{"since": None, "limit": limit}]
+    assert len(bars) == limit
+    assert mgr.ohlcv_fetch_stats == {"full": 1, "tail": 0}
+
+
+@pytest.mark.asyncio
+async def test_save_ohlcv_cache_writes_all_buffers(tmp_path):
+    mgr = MarketDataManager(FakeExchange([]))
+    mgr.ohlcv_store = OHLCVDiskStore(str(tmp_path))
+    mgr.market_store = {'BTC/USDT': mgr._new_symbol_store()}
+    mgr.market_store['BTC/USDT'][config.TIMEFRAME_EXEC].extend(make_rows(10, 100 * INTERVAL_MS))
+
+    saved = await mgr.save_ohlcv_cache()
+    assert saved == 1
+    assert mgr.ohlcv_store.load('BTC/USDT', config.TIMEFRAME_EXEC).shape == (10, 6)
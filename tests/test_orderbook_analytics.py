@@ -0,0 +1,76 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+from src.utils.orderbook_analytics import analyze_order_book, band_label
+
+
+def loop_imbalance(bids, asks, band):
+    """Referensi: loop lama get_order_book_depth."""
+    mid = (bids[0][0] + asks[0][0]) / 2
+    bids_vol = 0
+    for price, qty in bids:
+        if price < mid * (1 - band): break
+        bids_vol += price * qty
+    asks_vol = 0
+    for price, qty in asks:
+        if price > mid * (1 + band): break
+        asks_vol += price * qty
+    return bids_vol, asks_vol, (bids_vol - asks_vol) / (bids_vol + asks_vol) * 100
+
+
+@pytest.mark.parametrize("levels", [20, 100, 1000])
+def test_band_imbalance_matches_loop(levels):
+    rng = np.random.default_rng(levels)
+    tick = 8.0 / levels
+    bids = np.column_stack([100.0 - tick * np.arange(1, levels + 1), rng.uniform(0.1, 10, levels)])
+    asks = np.column_stack([100.0 + tick * np.arange(1, levels + 1), rng.uniform(0.1, 10, levels)])
+
+    result = analyze_order_book(bids, asks, bands=(0.005, 0.01, 0.02, 0.05), main_band=0.02)
+    for band in (0.005, 0.01, 0.02, 0.05):
+        b_vol, a_vol, imb = loop_imbalance(bids.tolist(), asks.tolist(), band)
+        stats = result['bands'][band_label(band)]
+        assert stats['bids_vol_usdt'] == pytest.approx(b_vol)
+        assert stats['asks_vol_usdt'] == pytest.approx(a_vol)
+        assert stats['imbalance_pct'] == pytest.approx(imb)
+
+    # Key lama tetap ada (main band 2%)
+    assert result['imbalance_pct'] == pytest.approx(result['bands']['2%']['imbalance_pct'])
+    assert result['levels'] == (levels, levels)
+
+
+def test_microprice_leans_to_thin_side():
+    bids = [[99.0, 10.0], [98.0, 1.0]]
+    asks = [[101.0, 1.0], [102.0, 1.0]]
+    result = analyze_order_book(bids, asks, bands=(0.05,), main_band=0.05)
+    # Bid tebal -> harga cenderung naik -> microprice di atas mid
+    assert result['microprice'] == pytest.approx((99.0 * 1.0 + 101.0 * 10.0) / 11.0)
+    assert result['microprice_bias_pct'] > 0
+    assert result['spread_pct'] == pytest.approx(2.0)
+
+
+def test_wall_detection_and_slope():
+    bids = [[100.0 - i * 0.1, 1.0] for i in range(1, 21)]
+    asks = [[100.0 + i * 0.1, 1.0] for i in range(1, 21)]
+    bids[5][1] = 20.0  # Wall di 99.4
+
+    result = analyze_order_book(bids, asks, bands=(0.01, 0.05), main_band=0.01, wall_multiplier=5.0)
+    assert result['bid_wall']['price'] == pytest.approx(99.4)
+    assert result['bid_wall']['strength'] >= 5.0
+    assert result['ask_wall'] is None
+    # Sisi bid lebih tebal -> slope bid lebih curam
+    assert result['bid_slope'] > result['ask_slope'] > 0
+    assert result['slope_ratio'] > 1
+
+
+def test_empty_book_returns_none():
+    assert analyze_order_book([], [[101.0, 1.0]]) is None
+    assert analyze_order_book(np.empty((0, 2)), np.empty((0, 2))) is None
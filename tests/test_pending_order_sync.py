@@ -0,0 +1,96 @@
+import sys
+import os
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+
+def waiting(entry_id, expires_in=3600):
+    return {'status': 'WAITING_ENTRY', 'entry_id': entry_id, 'expires_at': time.time() + expires_in}
+
+
+def order_event(order_id, status, symbol='BTCUSDT'):
+    return {'s': symbol, 'i': order_id, 'X': status, 'o': 'LIMIT', 'ot': 'LIMIT'}
+
+
+def test_single_all_symbols_fetch_then_event_driven(executor, exchange):
+    exchange.fetch_open_orders.return_value = [{'id': '1'}, {'id': '2'}, {'id': '3'}]
+    executor.safety_orders_tracker = {'A/USDT': waiting('1'), 'B/USDT': waiting('2'), 'C/USDT': waiting('3')}
+
+    with patch('src.modules.executor.kirim_tele', new=AsyncMock()):
+        asyncio.run(executor.sync_pending_orders((True, 0)))
+        assert exchange.fetch_open_orders.await_count == 1
+        assert exchange.fetch_open_orders.call_args.args == ()  # Tanpa simbol (semua simbol)
+
+        # Stream hidup: perubahan datang via event, tanpa REST
+        executor.on_order_update(order_event('2', 'CANCELED', 'BUSDT'))
+        asyncio.run(executor.sync_pending_orders((True, 0)))
+    assert exchange.fetch_open_orders.await_count == 1
+    assert set(executor.safety_orders_tracker) == {'A/USDT', 'C/USDT'}
+
+
+def test_stream_reconnect_or_down_forces_resync(executor, exchange):
+    exchange.fetch_open_orders.return_value = [{'id': '1'}]
+    executor.safety_orders_tracker = {'A/USDT': waiting('1')}
+    asyncio.run(executor.sync_pending_orders((True, 0)))
+    asyncio.run(executor.sync_pending_orders((True, 1)))
+    asyncio.run(executor.sync_pending_orders(None))
+    assert exchange.fetch_open_orders.await_count == 3
+
+
+def test_filled_order_moves_to_pending_and_failed_resync_keeps_tracker(executor, exchange):
+    executor.safety_orders_tracker = {'A/USDT': waiting('1')}
+    executor.position_cache = {'A': {'symbol': 'A/USDT', 'contracts': 1.0, 'side': 'LONG'}}
+
+    exchange.fetch_open_orders.side_effect = Exception('timeout')
+    asyncio.run(executor.sync_pending_orders(None))
+    assert executor.safety_orders_tracker['A/USDT']['status'] == 'WAITING_ENTRY'
+
+    exchange.fetch_open_orders.side_effect = None
+    asyncio.run(executor.sync_pending_orders(None))
+    assert executor.safety_orders_tracker['A/USDT']['status'] == 'PENDING'
+
+
+def test_events_during_resync_win_over_rest_snapshot(executor, exchange):
+
+    async def slow_fetch():
+        await asyncio.sleep(0.01)
+        executor.on_order_update(order_event('9', 'NEW'))
+        return [{'id': '8'}]
+
+    exchange.fetch_open_orders = AsyncMock(side_effect=slow_fetch)
+    asyncio.run(executor.resync_open_orders((True, 0)))
+    assert executor.open_order_ids == {'8', '9'}
+
+
+def test_expiry_timer_fires_on_deadline_and_skips_stale_entries(executor, exchange):
+
+    async def run():
+        executor.safety_orders_tracker = {
+            'A/USDT': waiting('1', expires_in=0.05),
+            'B/USDT': waiting('2', expires_in=3600),
+        }
+        with patch('src.modules.executor.kirim_tele', new=AsyncMock()):
+            timer = asyncio.create_task(executor.run_timers())
+            await asyncio.sleep(0.01)
+
+            # Order baru dengan deadline lebih dekat membangunkan timer
+            executor.safety_orders_tracker['C/USDT'] = waiting('3', expires_in=0.02)
+            executor.schedule_expiry('C/USDT', '3', executor.safety_orders_tracker['C/USDT']['expires_at'])
+            # Order A di-cancel manual sebelum expiry -> entry heap basi
+            del executor.safety_orders_tracker['A/USDT']
+
+            await asyncio.sleep(0.1)
+            timer.cancel()
+            await asyncio.gather(timer, return_exceptions=True)
+
+    asyncio.run(run())
+    exchange.cancel_order.assert_awaited_once_with('3', 'C/USDT')
+    assert set(executor.safety_orders_tracker) == {'B/USDT'}
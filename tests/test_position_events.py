@@ -0,0 +1,79 @@
+import sys
+import os
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+
+def account_update(*positions, ts=None):
+    return {'e': 'ACCOUNT_UPDATE', 'E': ts or int(time.time() * 1000), 'a': {'m': 'ORDER', 'P': list(positions)}}
+
+
+def rest_pos(symbol, contracts, side, entry=100.0):
+    return {'symbol': f"{symbol}:USDT", 'contracts': contracts, 'side': side, 'entryPrice': entry}
+
+
+def test_account_update_opens_changes_and_closes_positions(executor, exchange):
+    changed = executor.apply_account_update(account_update(
+        {'s': 'BTCUSDT', 'pa': '0.5', 'ep': '50000', 'ps': 'BOTH'},
+        {'s': 'ETHUSDT', 'pa': '-2', 'ep': '3000', 'ps': 'BOTH'},
+    ))
+    assert changed == ['BTC/USDT', 'ETH/USDT']
+    assert executor.position_cache['BTC'] == {'symbol': 'BTC/USDT', 'contracts': 0.5, 'side': 'LONG', 'entryPrice': 50000.0}
+    assert executor.position_cache['ETH']['side'] == 'SHORT' and executor.position_cache['ETH']['contracts'] == 2.0
+
+    assert executor.apply_account_update(account_update({'s': 'BTCUSDT', 'pa': '0', 'ep': '0', 'ps': 'BOTH'})) == []
+    assert 'BTC' not in executor.position_cache
+    exchange.fetch_positions.assert_not_called()
+
+
+def test_hedge_mode_closing_other_leg_keeps_position(executor):
+    executor.apply_account_update(account_update({'s': 'SOLUSDT', 'pa': '3', 'ep': '150', 'ps': 'LONG'}))
+    executor.apply_account_update(account_update({'s': 'SOLUSDT', 'pa': '0', 'ep': '0', 'ps': 'SHORT'}))
+    assert executor.position_cache['SOL']['side'] == 'LONG'
+
+
+def test_reconcile_detects_drift_and_adopts_exchange_state(executor, exchange):
+    exchange.fetch_positions.return_value = [rest_pos('BTC/USDT', 1.0, 'long')]
+    asyncio.run(executor.reconcile_positions((True, 0)))
+    assert executor.position_drift_count == 0  # Sync awal bukan drift
+
+    # Event close BTC hilang + posisi manual DOGE tidak pernah terlihat via WS
+    exchange.fetch_positions.return_value = [rest_pos('DOGE/USDT', 1000, 'short')]
+    assert asyncio.run(executor.reconcile_positions((True, 0))) == 1
+    assert executor.position_drift_count == 2
+    assert list(executor.position_cache) == ['DOGE']
+
+
+def test_reconcile_keeps_ws_updates_newer_than_rest_snapshot(executor, exchange):
+
+    async def slow_fetch():
+        await asyncio.sleep(0.01)
+        # Event WS datang saat REST sedang berjalan
+        # 'E' exchange tertinggal 5 detik dari jam lokal (clock skew)
+        executor.apply_account_update(account_update({'s': 'ETHUSDT', 'pa': '1', 'ep': '3000', 'ps': 'BOTH'},
+                                                     ts=int(time.time() * 1000) - 5000))
+        return []
+
+    exchange.fetch_positions = AsyncMock(side_effect=slow_fetch)
+    executor._last_reconcile = 1.0
+    asyncio.run(executor.reconcile_positions((True, 0)))
+    assert 'ETH' in executor.position_cache
+    assert executor.position_drift_count == 0
+
+
+def test_reconcile_schedule(executor):
+    assert executor.needs_position_reconcile(None)  # Stream belum jalan -> polling
+    asyncio.run(executor.reconcile_positions((True, 0)))
+    assert not executor.needs_position_reconcile((True, 0))
+    assert executor.needs_position_reconcile((False, 0))  # Stream putus
+    assert executor.needs_position_reconcile((True, 1))  # Baru reconnect: event bisa hilang
+    executor._last_reconcile -= 10_000
+    assert executor.needs_position_reconcile((True, 0))
@@ -0,0 +1,87 @@
+import sys
+import os
+import time
+import asyncio
+import pytest
+import ccxt.async_support as ccxt
+from unittest.mock import AsyncMock, MagicMock
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+from src.modules.rest_scheduler import (
+    RestRequestScheduler, estimate_weight,
+    PRIORITY_ORDER, PRIORITY_SAFETY, PRIORITY_MARKET, PRIORITY_SLOW
+)
+
+
+def test_estimate_weight_by_params():
+    assert estimate_weight('fetch_ohlcv', ('BTC/USDT', '15m'), {'limit': 300}) == 2
+    assert estimate_weight('fetch_ohlcv', ('BTC/USDT', '4h'), {'limit': 500}) == 5
+    assert estimate_weight('fetch_order_book', ('BTC/USDT', 20)) == 2
+    assert estimate_weight('fetch_order_book', ('BTC/USDT', 1000)) == 20
+    assert estimate_weight('fetch_open_orders', ('BTC/USDT',)) == 1
+    assert estimate_weight('fetch_open_orders', ()) == 40
+    assert estimate_weight('fetch_positions') == 5
+    assert estimate_weight('unknown_endpoint') == 1
+
+
+def test_low_priority_deferred_before_orders():
+    sched = RestRequestScheduler(weight_limit=100, priority_share={'ORDER': 0.95, 'SAFETY': 0.85, 'MARKET': 0.7, 'SLOW': 0.5})
+    now = time.time()
+    sched._roll_window(now)
+    sched.used_weight = 60
+
+    # SLOW sudah melewati porsinya (50) -> tunggu window berikutnya
+    assert sched._delay(1, PRIORITY_SLOW, now) > 0
+    # Budget cadangan tetap tersedia untuk market / safety / order
+    assert sched._delay(1, PRIORITY_MARKET, now) == 0
+    assert sched._delay(5, PRIORITY_SAFETY, now) == 0
+    assert sched._delay(1, PRIORITY_ORDER, now) == 0
+
+    sched.used_weight = 94
+    assert sched._delay(1, PRIORITY_ORDER, now) == 0
+    assert sched._delay(5, PRIORITY_SAFETY, now) > 0
+
+
+def test_waiting_high_priority_goes_first():
+    sched = RestRequestScheduler(weight_limit=100)
+    now = time.time()
+    sched._roll_window(now)
+    sched._waiting[PRIORITY_ORDER] = 1
+    assert sched._delay(1, PRIORITY_SLOW, now) > 0
+    assert sched._delay(1, PRIORITY_ORDER, now) == 0
+
+
+@pytest.mark.asyncio
+async def test_request_counts_weight_and_syncs_header():
+    sched = RestRequestScheduler(weight_limit=2400)
+    exchange = MagicMock()
+    exchange.fetch_positions = AsyncMock(return_value=[])
+    exchange.last_response_headers = {'X-MBX-USED-WEIGHT-1M': '321'}
+
+    result = await sched.request(exchange, 'fetch_positions', priority=PRIORITY_SAFETY)
+
+    assert result == []
+    exchange.fetch_positions.assert_awaited_once_with()
+    assert sched.used_weight == 321
+    assert sched.stats()['requests']['SAFETY'] == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_error_blocks_all_requests():
+    sched = RestRequestScheduler(weight_limit=2400)
+    exchange = MagicMock()
+    exchange.fetch_ticker = AsyncMock(side_effect=ccxt.RateLimitExceeded('429 Too Many Requests'))
+    exchange.last_response_headers = {'Retry-After': '7'}
+
+    with pytest.raises(ccxt.RateLimitExceeded):
+        await sched.request(exchange, 'fetch_ticker', 'BTC/USDT', priority=PRIORITY_MARKET)
+
+    assert sched.rate_limit_hits == 1
+    delay = sched._delay(1, PRIORITY_ORDER, time.time())
+    assert 6 < delay <= 7
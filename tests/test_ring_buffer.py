@@ -0,0 +1,99 @@
+import sys
+import os
+import numpy as np
+import pytest
+from collections import deque
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+import config
+config.PAKAI_DEMO = False # Avoid creating CCXT instance
+
+from src.utils.ring_buffer import OHLCVRingBuffer, snapshot_bars
+from src.modules.market_data import MarketDataManager
+
+
+def make_rows(n, start=0):
+    return [[float(i * 1000), 1.0 + i, 2.0 + i, 0.5 + i, 1.5 + i, 10.0 + i] for i in range(start, start + n)]
+
+
+def test_matches_deque_semantics_across_compaction():
+    maxlen = 7
+    buf = OHLCVRingBuffer(maxlen)
+    ref = deque(maxlen=maxlen)
+
+    # Lewati beberapa kali compaction (kapasitas fisik 2x maxlen)
+    for row in make_rows(50):
+        buf.append(row)
+        ref.append(row)
+        assert len(buf) == len(ref)
+        assert np.array_equal(buf.view(), np.array(ref))
+
+    # Update candle berjalan seperti _handle_kline
+    buf[-1] = [49000.0, 0, 0, 0, 99.0, 0]
+    assert buf[-1][4] == 99.0
+    assert buf.view()[-1][4] == 99.0
+
+
+def test_view_is_zero_copy_and_snapshot_is_static():
+    buf = OHLCVRingBuffer(5, make_rows(5))
+    view = buf.view()
+    snap = buf.snapshot()
+
+    assert np.shares_memory(view, buf._buf)
+    assert not np.shares_memory(snap, buf._buf)
+    assert np.array_equal(buf.column('close'), view[:, 4])
+
+    buf[-1] = [4000.0, 0, 0, 0, -1.0, 0]
+    assert view[-1][4] == -1.0
+    assert snap[-1][4] != -1.0
+
+
+def test_extend_keeps_latest_rows():
+    buf = OHLCVRingBuffer(10, make_rows(25))
+    assert len(buf) == 10
+    assert buf[0][0] == 15000.0
+    assert buf[-1][0] == 24000.0
+
+    buf.extend(make_rows(3, start=25))
+    assert len(buf) == 10
+    assert buf[-1][0] == 27000.0
+
+
+def test_snapshot_bars_accepts_plain_lists():
+    rows = make_rows(3)
+    assert snapshot_bars(rows) == rows
+    assert snapshot_bars(None) == []
+    assert isinstance(snapshot_bars(OHLCVRingBuffer(3, rows)), np.ndarray)
+
+
+@pytest.mark.asyncio
+async def test_correlation_on_ring_buffer_matches_pandas():
+    import pandas as pd
+
+    mgr = MarketDataManager(exchange=None)
+    rng = np.random.default_rng(1)
+    n = config.CORRELATION_PERIOD + 20
+    ts = np.arange(n) * 3600 * 1000.0
+    btc = 100 + np.cumsum(rng.normal(0, 1, n))
+    alt = 0.5 * btc + np.cumsum(rng.normal(0, 1, n))
+
+    btc_rows = [[t, c, c, c, c, 1.0] for t, c in zip(ts, btc)]
+    # Alt kehilangan 1 candle -> harus di-align by timestamp
+    alt_rows = [[t, c, c, c, c, 1.0] for i, (t, c) in enumerate(zip(ts, alt)) if i != n - 10]
+
+    mgr.market_store[config.BTC_SYMBOL][config.TIMEFRAME_TREND] = OHLCVRingBuffer(config.LIMIT_TREND, btc_rows)
+    mgr.market_store['ALT/USDT'] = {config.TIMEFRAME_TREND: OHLCVRingBuffer(config.LIMIT_TREND, alt_rows)}
+
+    df_sym = pd.DataFrame(alt_rows, columns=['timestamp','o','h','l','c','v'])
+    df_btc = pd.DataFrame(btc_rows, columns=['timestamp','o','h','l','c','v'])
+    merged = pd.merge(df_sym[['timestamp','c']], df_btc[['timestamp','c']], on='timestamp', suffixes=('_sym', '_btc'))
+    expected = merged['c_sym'].rolling(config.CORRELATION_PERIOD).corr(merged['c_btc']).iloc[-1]
+
+    corr = await mgr.get_btc_correlation('ALT/USDT')
+    assert corr == pytest.approx(expected, rel=1e-9)
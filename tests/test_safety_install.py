@@ -0,0 +1,91 @@
+import sys
+import os
+import asyncio
+from unittest.mock import AsyncMock, patch
+import ccxt
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+POS = {'entryPrice': 100.0, 'contracts': 1.0, 'side': 'LONG'}
+
+
+def test_symbols_are_secured_in_parallel_with_sl_tp_together(executor, exchange):
+    in_flight = 0
+    peak = 0
+
+    async def create_order(symbol, type_, *args):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return {'id': f"{symbol}-{type_}"}
+
+    exchange.create_order = create_order
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await asyncio.gather(*[executor.install_safety_orders(sym, POS) for sym in ('A/USDT', 'B/USDT', 'C/USDT')])
+        return results, loop.time() - start
+
+    results, elapsed = asyncio.run(run())
+    assert results == [True, True, True]
+    assert peak == 6  # 3 simbol x (SL + TP) berjalan bersamaan
+    assert elapsed < 0.1  # Bukan 6 x 50ms berurutan
+    assert executor.safety_order_ids['B/USDT'] == {'sl': 'B/USDT-STOP_MARKET', 'tp': 'B/USDT-TAKE_PROFIT_MARKET'}
+
+
+def test_network_errors_are_retried_with_backoff(executor, exchange):
+    create_order = exchange.create_order
+    create_order.side_effect = [ccxt.RequestTimeout('timeout'), {'id': 1}, {'id': 2}]
+
+    with patch('src.modules.executor.asyncio.sleep', new=AsyncMock()) as sleep:
+        assert asyncio.run(executor.install_safety_orders('A/USDT', POS)) is True
+    assert create_order.await_count == 3
+    sleep.assert_awaited_once()
+
+
+def test_order_errors_are_not_retried_and_install_fails(executor, exchange):
+    create_order = exchange.create_order
+    create_order.side_effect = ccxt.InvalidOrder('would immediately trigger')
+
+    with patch('src.modules.executor.asyncio.sleep', new=AsyncMock()) as sleep:
+        assert asyncio.run(executor.install_safety_orders('A/USDT', POS)) is False
+    assert create_order.await_count == 2  # SL + TP, masing-masing 1x
+    sleep.assert_not_awaited()
+
+
+def test_retry_reuses_client_order_id_and_duplicate_resolves_to_existing_order(executor, exchange):
+    # Timeout tapi SL sebenarnya sudah masuk -> retry ditolak duplicate -> order dicari via client ID
+    sl_results = iter([ccxt.RequestTimeout('timeout'), ccxt.InvalidOrder('binance {"code":-4116,"msg":"ClientOrderId is duplicated."}')])
+
+    async def create_order(symbol, type_, *args):
+        if type_ == 'TAKE_PROFIT_MARKET':
+            return {'id': 'tp-1'}
+        raise next(sl_results)
+
+    exchange.create_order.side_effect = create_order
+    exchange.fetch_order = AsyncMock(return_value={'id': 'sl-1'})
+
+    with patch('src.modules.executor.asyncio.sleep', new=AsyncMock()):
+        assert asyncio.run(executor.install_safety_orders('A/USDT', POS)) is True
+
+    sl_calls = [c for c in exchange.create_order.call_args_list if c.args[1] == 'STOP_MARKET']
+    client_ids = {c.args[5]['newClientOrderId'] for c in sl_calls}
+    assert len(sl_calls) == 2 and len(client_ids) == 1  # Order logis yang sama, ID yang sama
+    exchange.fetch_order.assert_awaited_once_with(None, 'A/USDT', {'origClientOrderId': client_ids.pop(), 'trigger': True})
+    assert executor.safety_order_ids['A/USDT'] == {'sl': 'sl-1', 'tp': 'tp-1'}
+
+
+def test_duplicate_on_first_attempt_is_not_treated_as_success(executor, exchange):
+    exchange.create_order.side_effect = ccxt.InvalidOrder('ClientOrderId is duplicated.')
+    exchange.fetch_order = AsyncMock()
+
+    assert asyncio.run(executor.install_safety_orders('A/USDT', POS)) is False
+    exchange.fetch_order.assert_not_awaited()
@@ -0,0 +1,119 @@
+import sys
+import os
+import asyncio
+import pytest
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+import config
+config.PAKAI_DEMO = False # Avoid creating CCXT instance
+
+from src.modules.scheduler import ScanScheduler
+from src.modules.market_data import MarketDataManager
+
+
+@pytest.mark.asyncio
+async def test_bounded_concurrency_and_dedupe():
+    active = 0
+    peak = 0
+    seen = []
+
+    async def handler(symbol):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        seen.append(symbol)
+        active -= 1
+
+    sched = ScanScheduler(handler, max_concurrency=3)
+    symbols = [f"C{i}/USDT" for i in range(10)]
+    for sym in symbols:
+        assert sched.enqueue(sym)
+    assert not sched.enqueue(symbols[0]) # Dedupe selama masih di antrian
+
+    sched.start()
+    await asyncio.wait_for(sched.queue.join(), timeout=2)
+    await sched.stop()
+
+    assert sorted(seen) == sorted(symbols)
+    assert peak == 3
+    assert sched.stats()['processed'] == 10
+
+
+@pytest.mark.asyncio
+async def test_event_during_processing_is_rescanned_not_parallel():
+    runs = []
+    gate = asyncio.Event()
+
+    async def handler(symbol):
+        runs.append(symbol)
+        if len(runs) == 1:
+            await gate.wait()
+
+    sched = ScanScheduler(handler, max_concurrency=2)
+    sched.start()
+    sched.enqueue('BTC/USDT')
+    await asyncio.sleep(0.01)
+
+    # Candle close baru saat BTC masih diproses -> tidak dijalankan paralel
+    sched.on_candle_close('BTC/USDT', config.TIMEFRAME_EXEC)
+    await asyncio.sleep(0.01)
+    assert runs == ['BTC/USDT']
+
+    gate.set()
+    await asyncio.sleep(0.05)
+    await sched.stop()
+    assert runs == ['BTC/USDT', 'BTC/USDT']
+
+
+@pytest.mark.asyncio
+async def test_kline_close_notifies_scheduler():
+    mgr = MarketDataManager(exchange=None)
+    events = []
+    sched = ScanScheduler(lambda s: None)
+    sched.enqueue = lambda symbol: events.append(symbol)
+    mgr.add_candle_close_listener(sched.on_candle_close)
+
+    def kline(ts, interval):
+        return {'s': 'BTCUSDT', 'k': {'i': interval, 't': ts, 'o': 1, 'h': 1, 'l': 1, 'c': 1, 'v': 1}}
+
+    await mgr._handle_kline(kline(1000, config.TIMEFRAME_EXEC))
+    await mgr._handle_kline(kline(1000, config.TIMEFRAME_EXEC)) # Update candle berjalan
+    assert events == []
+
+    await mgr._handle_kline(kline(2000, config.TIMEFRAME_EXEC)) # Candle 1000 close
+    await mgr._handle_kline(kline(2000, config.TIMEFRAME_TREND))
+    await mgr._handle_kline(kline(3000, config.TIMEFRAME_TREND)) # Close TF trend -> diabaikan
+    assert events == ['BTC/USDT']
+
+
+@pytest.mark.asyncio
+async def test_ineligible_symbols_are_skipped_without_analysis():
+    import time
+    seen = []
+    eligible_at = {'BTC/USDT': 0, 'ETH/USDT': time.time() + 60, 'SOL/USDT': float('inf')}
+
+    async def handler(symbol):
+        seen.append(symbol)
+
+    sched = ScanScheduler(handler, max_concurrency=1, next_eligible_fn=lambda s: eligible_at[s])
+    assert sched.enqueue('BTC/USDT')
+    assert not sched.enqueue('ETH/USDT')  # Cooldown
+    assert not sched.enqueue('SOL/USDT')  # Posisi aktif
+
+    # Menjadi tidak eligible saat masih di antrian (mis. entry baru) -> skip saat diambil worker
+    eligible_at['DOGE/USDT'] = 0
+    assert sched.enqueue('DOGE/USDT')
+    eligible_at['DOGE/USDT'] = float('inf')
+
+    sched.start()
+    await asyncio.wait_for(sched.queue.join(), timeout=2)
+    await sched.stop()
+    assert seen == ['BTC/USDT']
+    assert sched.stats()['skipped'] == 3
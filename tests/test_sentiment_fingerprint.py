@@ -0,0 +1,70 @@
+import unittest
+import config
+from src.modules.sentiment import SentimentAnalyzer
+from src.utils.prompt_builder import build_sentiment_delta_prompt
+
+
+class TestSentimentFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = SentimentAnalyzer()
+        self.analyzer.raw_news = ["Bitcoin hits 100k (A)", "Fed holds rates (B)", "Solana upgrade (C)"]
+        self.analyzer.last_fng = {"value": 55, "classification": "Greed"}
+
+    def _analyze(self, inflow="Positive"):
+        plan = self.analyzer.plan_analysis(inflow)
+        self.analyzer.save_analysis({"overall_sentiment": "BULLISH", "sentiment_score": 65, "summary": "ok", "key_drivers": ["ETF"]})
+        self.analyzer.mark_analyzed(plan)
+        return plan
+
+    def test_first_run_is_full(self):
+        self.assertEqual(self.analyzer.plan_analysis("Positive")['mode'], "full")
+
+    def test_unchanged_inputs_skip(self):
+        self._analyze()
+        # Urutan berbeda (shuffle) tetap dianggap sama
+        self.analyzer.raw_news = list(reversed(self.analyzer.raw_news))
+        self.assertEqual(self.analyzer.plan_analysis("Positive")['mode'], "skip")
+
+    def test_new_headline_is_delta(self):
+        self._analyze()
+        self.analyzer.raw_news = self.analyzer.raw_news + ["ETF inflow record (D)"]
+        plan = self.analyzer.plan_analysis("Positive")
+        self.assertEqual(plan['mode'], "delta")
+        self.assertEqual(plan['new_headlines'], ["ETF inflow record (D)"])
+
+    def test_mood_change_forces_full(self):
+        self._analyze()
+        self.analyzer.last_fng = {"value": 20, "classification": "Extreme Fear"}
+        self.assertEqual(self.analyzer.plan_analysis("Positive")['mode'], "full")
+        self.analyzer.last_fng = {"value": 55, "classification": "Greed"}
+        self.assertEqual(self.analyzer.plan_analysis("Negative")['mode'], "full")
+
+    def test_too_many_new_headlines_forces_full(self):
+        self._analyze()
+        limit = getattr(config, 'SENTIMENT_DELTA_MAX_HEADLINES', 5)
+        self.analyzer.raw_news = [f"Fresh news {i}" for i in range(limit + 1)]
+        self.assertEqual(self.analyzer.plan_analysis("Positive")['mode'], "full")
+
+    def test_delta_chain_limit(self):
+        self._analyze()
+        chain = getattr(config, 'SENTIMENT_MAX_DELTA_CHAIN', 3)
+        for i in range(chain):
+            self.analyzer.raw_news = self.analyzer.raw_news + [f"Extra {i}"]
+            self.assertEqual(self._analyze()['mode'], "delta")
+        self.analyzer.raw_news = self.analyzer.raw_news + ["One more"]
+        self.assertEqual(self.analyzer.plan_analysis("Positive")['mode'], "full")
+
+    def test_delta_prompt_contains_only_new_headlines(self):
+        prompt = build_sentiment_delta_prompt(
+            {"fng_value": 55, "fng_text": "Greed"},
+            {"stablecoin_inflow": "Positive"},
+            {"overall_sentiment": "BULLISH", "sentiment_score": 65, "summary": "ok", "key_drivers": ["ETF"]},
+            ["ETF inflow record (D)"]
+        )
+        self.assertIn("ETF inflow record (D)", prompt)
+        self.assertNotIn("Solana upgrade", prompt)
+        self.assertIn("BULLISH", prompt)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import sys
+import os
+import asyncio
+import pytest
+import ccxt
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+
+@pytest.fixture
+def executor(executor, exchange):
+    exchange.create_order.side_effect = [{'id': 101}, {'id': 102}, {'id': 103}]
+    exchange.fetch_open_orders.return_value = [{'id': 7, 'type': 'stop_market'}]
+    executor.safety_orders_tracker = {"BTC/USDT": {"status": "PENDING", "atr_value": 0}}
+    return executor
+
+
+def order_event(order_id, status, order_type='STOP_MARKET'):
+    return {'s': 'BTCUSDT', 'i': order_id, 'X': status, 'o': order_type, 'ot': order_type}
+
+
+def test_install_caches_ids_and_amend_skips_fetch(executor, exchange):
+    pos = {'entryPrice': 100.0, 'contracts': 2.0, 'side': 'LONG'}
+    assert asyncio.run(executor.install_safety_orders("BTC/USDT", pos)) is True
+    assert executor.safety_order_ids["BTC/USDT"] == {'sl': '101', 'tp': '102'}
+    assert executor.safety_orders_tracker["BTC/USDT"]["sl_order_id"] == '101'
+
+    executor.position_cache = {'BTC': {'symbol': 'BTC/USDT', 'contracts': 2.0, 'side': 'LONG'}}
+    exchange.create_order.reset_mock()
+    asyncio.run(executor._amend_sl_order("BTC/USDT", 105.0, 'LONG'))
+
+    exchange.fetch_open_orders.assert_not_called()
+    # Place-then-cancel: SL baru (reduceOnly) dibuat sebelum SL lama dibatalkan
+    args = exchange.create_order.call_args.args
+    assert args[1] == 'STOP_MARKET' and args[3] == '2.0' and args[5]['reduceOnly'] is True
+    exchange.cancel_order.assert_awaited_once_with('101', "BTC/USDT", {'trigger': True})
+    assert executor.get_safety_order_id("BTC/USDT", 'sl') == '103'
+    executor.save_tracker.assert_awaited()  # ID SL baru ikut tersimpan
+
+
+def test_amend_without_position_qty_cancels_then_places(executor, exchange):
+    executor.safety_order_ids["BTC/USDT"] = {'sl': '55'}
+    calls = []
+    exchange.cancel_order.side_effect = lambda *a: calls.append('cancel')
+    exchange.create_order.side_effect = lambda *a: calls.append('create') or {'id': 56}
+
+    asyncio.run(executor._amend_sl_order("BTC/USDT", 95.0, 'LONG'))
+    assert calls == ['cancel', 'create']
+    assert exchange.create_order.call_args.args[5]['closePosition'] is True
+    assert executor.get_safety_order_id("BTC/USDT", 'sl') == '56'
+
+
+def test_empty_cache_falls_back_to_single_lookup(executor, exchange):
+    asyncio.run(executor._amend_sl_order("BTC/USDT", 95.0, 'LONG'))
+    exchange.fetch_open_orders.assert_awaited_once_with("BTC/USDT", None, None, {'trigger': True})
+    exchange.cancel_order.assert_awaited_once_with('7', "BTC/USDT", {'trigger': True})
+
+
+def test_order_update_keeps_index_current(executor):
+    executor.on_order_update(order_event(200, 'NEW'))
+    executor.on_order_update(order_event(300, 'NEW', 'TAKE_PROFIT_MARKET'))
+    assert executor.safety_order_ids["BTC/USDT"] == {'sl': '200', 'tp': '300'}
+
+    # Cancel order lama (place-then-cancel) tidak menghapus ID baru
+    executor.on_order_update(order_event(199, 'CANCELED'))
+    assert executor.get_safety_order_id("BTC/USDT", 'sl') == '200'
+
+    # SL ter-trigger: event 'o' berubah jadi MARKET, 'ot' tetap STOP_MARKET
+    event = order_event(200, 'FILLED')
+    event['o'] = 'MARKET'
+    executor.on_order_update(event)
+    assert executor.get_safety_order_id("BTC/USDT", 'sl') is None
+    assert 'sl_order_id' not in executor.safety_orders_tracker["BTC/USDT"]
+
+    executor.on_order_update(order_event(400, 'NEW', 'LIMIT'))  # Entry order: bukan safety
+    assert executor.safety_order_ids["BTC/USDT"] == {'tp': '300'}
+
+
+def test_failed_cancel_of_old_sl_rolls_back_new_sl(executor, exchange):
+    executor.safety_order_ids["BTC/USDT"] = {'sl': '101'}
+    executor.position_cache = {'BTC': {'symbol': 'BTC/USDT', 'contracts': 2.0, 'side': 'LONG'}}
+    exchange.create_order.side_effect = [{'id': 102}]
+    exchange.cancel_order.side_effect = [ccxt.ExchangeError('cancel failed'), None]
+
+    asyncio.run(executor._amend_sl_order("BTC/USDT", 105.0, 'LONG'))
+    # SL lama tetap hidup -> SL baru dibatalkan, index tetap menunjuk SL lama
+    assert [c.args[0] for c in exchange.cancel_order.await_args_list] == ['101', '102']
+    assert executor.get_safety_order_id("BTC/USDT", 'sl') == '101'
+
+    # Mode closePosition: SL lama gagal dibatalkan -> tidak pasang SL kedua
+    executor.position_cache = {}
+    exchange.create_order.reset_mock()
+    exchange.cancel_order.side_effect = ccxt.ExchangeError('cancel failed')
+    asyncio.run(executor._amend_sl_order("BTC/USDT", 105.0, 'LONG'))
+    exchange.create_order.assert_not_called()
+
+
+def test_algo_update_keeps_index_and_triggered_stop_does_not_overwrite(executor):
+    def algo_event(algo_id, status, order_type='STOP_MARKET'):
+        return {'s': 'BTCUSDT', 'aid': algo_id, 'X': status, 'o': order_type}
+
+    executor.on_algo_update(algo_event(500, 'NEW'))
+    executor.on_algo_update(algo_event(600, 'NEW', 'TAKE_PROFIT_MARKET'))
+    assert executor.safety_order_ids["BTC/USDT"] == {'sl': '500', 'tp': '600'}
+
+    # Stop ter-trigger: order MARKET baru (ot=STOP_MARKET) bukan SL yang masih aktif
+    event = order_event(900, 'NEW')
+    event['o'] = 'MARKET'
+    executor.on_order_update(event)
+    assert executor.get_safety_order_id("BTC/USDT", 'sl') == '500'
+
+    executor.on_algo_update(algo_event(500, 'TRIGGERING'))
+    assert executor.get_safety_order_id("BTC/USDT", 'sl') == '500'
+    executor.on_algo_update(algo_event(500, 'TRIGGERED'))
+    assert executor.get_safety_order_id("BTC/USDT", 'sl') is None
+    assert executor.safety_order_ids["BTC/USDT"] == {'tp': '600'}
@@ -0,0 +1,138 @@
+import sys
+import os
+import json
+import asyncio
+import pytest
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+import config
+config.PAKAI_DEMO = False # Avoid creating CCXT instance
+
+from src.modules import stream_manager as sm
+from src.modules.stream_manager import WebSocketShard, shard_streams
+from src.modules.market_data import MarketDataManager
+
+BASE_URL = "wss://fstream.binance.com/stream?streams="
+
+
+def test_shard_streams_keeps_symbol_groups_together():
+    groups = [[f"s{i}@a", f"s{i}@b", f"s{i}@c"] for i in range(10)]
+    shards = shard_streams(groups, 7)
+
+    assert all(len(s) <= 7 for s in shards)
+    assert sum(len(s) for s in shards) == 30
+    for shard in shards:
+        prefixes = {st.split('@')[0] for st in shard}
+        for p in prefixes:
+            assert sum(1 for st in shard if st.startswith(p + '@')) == 3
+
+
+def test_large_watchlist_is_fully_subscribed(monkeypatch):
+    monkeypatch.setattr(config, 'DAFTAR_KOIN', [{"symbol": f"C{i}/USDT"} for i in range(150)])
+    mgr = MarketDataManager(exchange=None)
+
+    groups = mgr._build_market_stream_groups()
+    shards = shard_streams(groups, config.WS_MAX_STREAMS_PER_CONNECTION)
+    streams = [st for s in shards for st in s]
+
+    assert len(streams) == 150 * 6 + 2 # + BTC kline trend & aggTrade
+    assert len(set(streams)) == len(streams)
+    assert all(len(s) <= config.WS_MAX_STREAMS_PER_CONNECTION for s in shards)
+
+
+def test_long_url_falls_back_to_subscribe():
+    short = WebSocketShard("a", BASE_URL, None, streams=["btcusdt@aggTrade"])
+    url, pending = short._build_url(short.streams)
+    assert url == BASE_URL + "btcusdt@aggTrade" and pending == []
+
+    streams = [f"coin{i}usdt@depth20@500ms" for i in range(300)]
+    url, pending = short._build_url(streams)
+    assert url == "wss://fstream.binance.com/stream"
+    assert pending == streams
+
+
+class FakeWS:
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.sent = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def send(self, msg):
+        self.sent.append(msg)
+
+    async def recv(self):
+        if self.messages:
+            return self.messages.pop(0)
+        await asyncio.sleep(3600)
+
+
+@pytest.mark.asyncio
+async def test_shard_reconnects_independently(monkeypatch):
+    monkeypatch.setattr(config, 'WS_RECONNECT_BASE_DELAY', 0.001, raising=False)
+    attempts = []
+
+    def fake_connect(url):
+        attempts.append(url)
+        if len(attempts) == 1:
+            raise ConnectionError("boom")
+        return FakeWS([json.dumps({"data": {"e": "test"}})])
+
+    monkeypatch.setattr(sm.websockets, 'connect', fake_connect)
+
+    received = []
+
+    async def on_message(msg):
+        received.append(msg)
+
+    shard = WebSocketShard("market-0", BASE_URL, on_message, streams=["btcusdt@aggTrade"])
+    task = asyncio.create_task(shard.run())
+    for _ in range(200):
+        if received:
+            break
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert shard.reconnects == 1
+    assert len(attempts) == 2
+    assert received and shard.messages == 1
+
+
+@pytest.mark.asyncio
+async def test_user_shard_gets_fresh_listen_key(monkeypatch):
+    keys = iter(["key-1", "key-2"])
+    attempts = []
+
+    def fake_connect(url):
+        attempts.append(url)
+        if len(attempts) == 1:
+            raise ConnectionError("drop")
+        return FakeWS([])
+
+    monkeypatch.setattr(config, 'WS_RECONNECT_BASE_DELAY', 0.001, raising=False)
+    monkeypatch.setattr(sm.websockets, 'connect', fake_connect)
+
+    async def provider():
+        return [next(keys)]
+
+    shard = WebSocketShard("user", BASE_URL, None, streams_provider=provider)
+    task = asyncio.create_task(shard.run())
+    for _ in range(200):
+        if len(attempts) >= 2:
+            break
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert attempts == [BASE_URL + "key-1", BASE_URL + "key-2"]
@@ -0,0 +1,98 @@
+import sys
+import os
+import math
+import asyncio
+import pytest
+import numpy as np
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+import config
+config.PAKAI_DEMO = False # Avoid creating CCXT instance
+
+from src.modules.market_data import MarketDataManager, _calculate_tech_data_threaded
+from src.utils.ring_buffer import OHLCVRingBuffer
+
+NUMERIC_KEYS = ['price', 'rsi', 'adx', 'ema_fast', 'ema_slow', 'vol_ma', 'volume',
+                'bb_upper', 'bb_lower', 'stoch_k', 'stoch_d', 'atr']
+EXEC_MS = 15 * 60 * 1000
+TREND_MS = 4 * 3600 * 1000
+
+
+def make_rows(n, seed, interval_ms, end_ts):
+    """Random walk OHLCV, candle terakhir berakhir di end_ts (agar simbol ter-align)"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    price = 50.0 + seed
+    for i in range(n):
+        op = price
+        cl = max(1.0, op * (1 + rng.normal(0, 0.01)))
+        hi = max(op, cl) * (1 + abs(rng.normal(0, 0.004)))
+        lo = min(op, cl) * (1 - abs(rng.normal(0, 0.004)))
+        rows.append([end_ts - (n - 1 - i) * interval_ms, op, hi, lo, cl, float(rng.uniform(100, 1000))])
+        price = cl
+    return rows
+
+
+def build_manager(lengths):
+    mgr = MarketDataManager(exchange=None)
+    symbols = []
+    for i, n in enumerate(lengths):
+        sym = f"C{i}/USDT"
+        symbols.append(sym)
+        mgr.market_store[sym] = {
+            config.TIMEFRAME_EXEC: OHLCVRingBuffer(config.LIMIT_EXEC, make_rows(n, i, EXEC_MS, 10**12)),
+            config.TIMEFRAME_TREND: OHLCVRingBuffer(config.LIMIT_TREND, make_rows(config.LIMIT_TREND, 100 + i, TREND_MS, 10**12)),
+        }
+        mgr.funding_rates[sym] = 0.0001 * i
+    return mgr, symbols
+
+
+@pytest.mark.asyncio
+async def test_batch_matches_per_symbol_pandas():
+    # Panjang berbeda -> dikelompokkan per alignment, tetap identik per simbol
+    mgr, symbols = build_manager([config.LIMIT_EXEC] * 6 + [120, 80])
+    results = await mgr.compute_technical_batch(symbols)
+
+    assert set(results) == set(symbols)
+    for sym in symbols:
+        bars_exec = mgr.market_store[sym][config.TIMEFRAME_EXEC].snapshot()
+        bars_trend = mgr.market_store[sym][config.TIMEFRAME_TREND].snapshot()
+        expected = _calculate_tech_data_threaded(bars_exec, bars_trend, sym)
+        actual = results[sym]
+
+        for key in NUMERIC_KEYS:
+            e, a = float(expected[key]), float(actual[key])
+            if math.isnan(e):
+                assert math.isnan(a), f"{sym} {key}"
+            else:
+                assert a == pytest.approx(e, rel=1e-9, abs=1e-9), f"{sym} {key}: {a} != {e}"
+        for key in ['price_vs_ema', 'trend_major', 'pivots', 'market_structure',
+                    'wick_rejection', 'candle_timestamp', 'global_trend_1d']:
+            assert expected[key] == actual[key], f"{sym} {key}"
+
+        # Field dinamis sama seperti get_technical_data
+        assert actual['funding_rate'] == mgr.funding_rates[sym]
+        assert actual['btc_trend'] == mgr.btc_trend
+
+
+@pytest.mark.asyncio
+async def test_batch_uses_and_fills_tech_cache():
+    mgr, symbols = build_manager([config.LIMIT_EXEC] * 3)
+    await mgr.compute_technical_batch(symbols)
+    assert set(mgr.tech_cache) == set(symbols)
+
+    # Setelah batch, get_technical_data harus cache hit (tidak ada recompute)
+    mgr.indicator_engine = None
+    async def fail(jobs):
+        raise AssertionError("should not recompute")
+    mgr._run_tech_calc_batch = fail
+
+    single = await mgr.get_technical_data(symbols[0])
+    batch_again = await mgr.compute_technical_batch(symbols[:1])
+    assert single['rsi'] == batch_again[symbols[0]]['rsi']
@@ -0,0 +1,74 @@
+import sys
+import os
+import asyncio
+import time
+from unittest.mock import patch
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+from src.modules.timer_service import TimerService
+
+
+def test_pop_due_orders_by_deadline_with_reschedule_and_cancel():
+    timers = TimerService()
+    fired = []
+    timers.schedule('a', 30, fired.append, 'a')
+    timers.schedule('b', 10, fired.append, 'b')
+    timers.schedule('c', 20, fired.append, 'c')
+    timers.schedule('a', 5, fired.append, 'a2')  # Reschedule: deadline lama dibuang
+    assert timers.cancel('c')
+    assert len(timers) == 2 and timers.deadline('a') == 5 and timers.next_deadline() == 5
+
+    for _, callback, args in timers.pop_due(now=25):
+        callback(*args)
+    assert fired == ['a2', 'b']
+    assert len(timers) == 0 and timers.next_deadline() is None
+
+
+def test_run_fires_precisely_and_wakes_for_earlier_timer():
+    async def run():
+        timers = TimerService()
+        fired = {}
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        async def record(key):
+            fired[key] = loop.time() - start
+
+        timers.schedule('late', time.time() + 0.2, record, 'late')
+        task = asyncio.create_task(timers.run())
+        await asyncio.sleep(0.01)
+        timers.schedule('early', time.time() + 0.03, record, 'early')  # Timer tidur harus dibangunkan
+        timers.schedule('broken', time.time() + 0.01, lambda: 1 / 0)  # Error callback tidak menghentikan timer
+
+        await asyncio.sleep(0.3)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return fired, timers.fired
+
+    fired, count = asyncio.run(run())
+    assert 0.03 <= fired['early'] < 0.1
+    assert 0.2 <= fired['late'] < 0.28
+    assert count == 3
+
+
+def test_executor_cooldown_and_next_eligible_time(executor):
+    assert executor.next_eligible_time('BTC/USDT') == 0
+    executor.set_cooldown('BTC/USDT', 60)
+    assert executor.is_under_cooldown('BTC/USDT')
+    assert executor.next_eligible_time('BTC/USDT') == executor.symbol_cooldown['BTC/USDT']
+    assert executor.timers.deadline(('cooldown', 'BTC/USDT')) == executor.symbol_cooldown['BTC/USDT']
+
+    # Timer akhir cooldown membersihkan state tepat waktu (tanpa cek lazy)
+    for _, callback, args in executor.timers.pop_due(now=time.time() + 61):
+        with patch('src.modules.executor.time.time', return_value=time.time() + 61):
+            callback(*args)
+    assert 'BTC/USDT' not in executor.symbol_cooldown
+
+    executor.position_cache = {'ETH': {'symbol': 'ETH/USDT', 'contracts': 1.0, 'side': 'LONG'}}
+    assert executor.next_eligible_time('ETH/USDT') == float('inf')
@@ -0,0 +1,85 @@
+import sys
+import os
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+from src.modules.trailing_engine import TrailingEngine
+
+
+class FakeExecutor:
+    def __init__(self, tracker):
+        self.safety_orders_tracker = tracker
+        self.check_trailing_on_price = AsyncMock()
+
+
+@pytest.mark.asyncio
+async def test_untracked_symbols_are_skipped():
+    executor = FakeExecutor({
+        'BTC/USDT': {'status': 'SECURED'},
+        'ETH/USDT': {'status': 'WAITING_ENTRY'},
+    })
+    engine = TrailingEngine(executor, interval=0.01)
+
+    await engine.on_price('SOL/USDT', 10.0)
+    await engine.on_price('ETH/USDT', 2000.0)
+    await engine.on_price('BTC/USDT', 60000.0)
+
+    assert engine.ignored == 2
+    assert list(engine._slots) == ['BTC/USDT']
+
+
+@pytest.mark.asyncio
+async def test_ticks_are_coalesced_into_one_evaluation():
+    executor = FakeExecutor({'BTC/USDT': {'status': 'SECURED'}})
+    engine = TrailingEngine(executor, interval=0.01)
+
+    for price in (100.0, 101.0, 99.0, 100.5):
+        await engine.on_price('BTC/USDT', price)
+
+    assert await engine.evaluate() == 1
+    # Belum trailing -> harga terakhir (aktivasi)
+    executor.check_trailing_on_price.assert_awaited_once_with('BTC/USDT', 100.5)
+    assert await engine.evaluate() == 0 # Tidak ada tick baru -> tidak ada evaluasi
+
+
+@pytest.mark.asyncio
+async def test_active_trailing_uses_extreme_since_last_eval():
+    executor = FakeExecutor({
+        'BTC/USDT': {'status': 'SECURED', 'trailing_active': True, 'side': 'LONG'},
+        'ETH/USDT': {'status': 'SECURED', 'trailing_active': True, 'side': 'SHORT'},
+    })
+    engine = TrailingEngine(executor, interval=0.01)
+
+    for price in (100.0, 105.0, 102.0):
+        await engine.on_price('BTC/USDT', price)
+    for price in (50.0, 47.0, 49.0):
+        await engine.on_price('ETH/USDT', price)
+
+    await engine.evaluate()
+    calls = {c.args[0]: c.args[1] for c in executor.check_trailing_on_price.await_args_list}
+    assert calls == {'BTC/USDT': 105.0, 'ETH/USDT': 47.0}
+
+
+@pytest.mark.asyncio
+async def test_run_loop_evaluates_periodically():
+    executor = FakeExecutor({'BTC/USDT': {'status': 'SECURED'}})
+    engine = TrailingEngine(executor, interval=0.01)
+    task = engine.start()
+    try:
+        await engine.on_price('BTC/USDT', 1.0)
+        for _ in range(100):
+            if executor.check_trailing_on_price.await_count:
+                break
+            await asyncio.sleep(0.01)
+        assert executor.check_trailing_on_price.await_count == 1
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
@@ -31,6 +31,10 @@ config.DEFAULT_TP_PERCENT = 0.025
 config.LIMIT_ORDER_EXPIRY_SECONDS = 3600
 config.DEFAULT_MARGIN_TYPE = 'isolated'
 config.TRAILING_SL_UPDATE_COOLDOWN = 3
+config.RATE_LIMIT_WEIGHT_PER_MINUTE = 2400
+config.RATE_LIMIT_PRIORITY_SHARE = {}
+config.ORDER_SLTP_RETRIES = 3
+config.ORDER_SLTP_RETRY_DELAY = 2
 
 # 4. Import Module Under Test
 from src.modules.executor import OrderExecutor
@@ -0,0 +1,60 @@
+import sys
+import os
+import json
+import pytest
+
+# Add root and src to path
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
+if os.path.join(repo_root, 'src') not in sys.path:
+    sys.path.append(os.path.join(repo_root, 'src'))
+
+import src.config as config
+config.PAKAI_DEMO = False # Avoid creating CCXT instance
+
+from src.modules.market_data import MarketDataManager
+from src.utils.json_codec import get_json_decoder
+
+
+def test_decoder_fallback():
+    name, loads = get_json_decoder('json')
+    assert name == 'json' and loads('{"a": 1}') == {"a": 1}
+
+    name, loads = get_json_decoder('auto')
+    assert name in ('orjson', 'msgspec', 'json')
+    assert loads(b'{"data": {"e": "kline"}}') == {"data": {"e": "kline"}}
+
+
+def test_raw_symbol_map():
+    mgr = MarketDataManager(exchange=None)
+    assert mgr._ccxt_symbol(config.BTC_SYMBOL.replace('/', '')) == config.BTC_SYMBOL
+    # Simbol di luar watchlist -> fallback lama, lalu di-cache
+    assert mgr._ccxt_symbol('XYZUSDT') == 'XYZ/USDT'
+    assert mgr._raw_symbol_map['XYZUSDT'] == 'XYZ/USDT'
+
+
+@pytest.mark.asyncio
+async def test_dispatch_table_routes_events():
+    mgr = MarketDataManager(exchange=None)
+    whales, accounts = [], []
+
+    async def on_account(payload):
+        accounts.append(payload)
+
+    mgr._ws_callbacks = {
+        'account_update': on_account,
+        'whale': lambda sym, amount, side: whales.append((sym, amount, side)),
+    }
+    mgr._ws_handlers = mgr._build_ws_handlers()
+    assert '24hrMiniTicker' not in mgr._ws_handlers # Tidak ada consumer -> tidak di-parse
+
+    big = {"e": "aggTrade", "s": "BTCUSDT", "p": "50000", "q": str(config.WHALE_THRESHOLD_USDT), "m": True}
+    small = {"e": "aggTrade", "s": "BTCUSDT", "p": "1", "q": "1", "m": False}
+    for payload in (big, small, {"e": "ACCOUNT_UPDATE", "a": {}}, {"e": "unknownEvent"}):
+        await mgr._on_ws_message(json.dumps({"stream": "x", "data": payload}))
+
+    assert whales == [("BTC/USDT", 50000 * config.WHALE_THRESHOLD_USDT, "SELL")]
+    assert len(accounts) == 1
+
+    await mgr._on_ws_message(json.dumps({"result": None, "id": 1})) # Respon SUBSCRIBE diabaikan